@@ -0,0 +1,92 @@
+"""Command line entry point: ``python -m benchmarks run|compare``."""
+
+import argparse
+import sys
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from .compare import DEFAULT_THRESHOLD, compare_reports, has_regressions
+from .runner import build_report, load_report, save_report
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "baseline.json"
+DEFAULT_RESULTS = Path(__file__).parent / "results" / "latest.json"
+
+console = Console()
+
+
+def run(names: list[str], output: Path) -> int:
+    """Run the selected benchmarks and save a report."""
+    from .cases import BENCHMARKS
+
+    selected = names or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        console.print(f"[red]Unknown benchmarks: {', '.join(unknown)}[/red]")
+        return 2
+
+    results = {}
+    for name in selected:
+        with console.status(f"Running {name}..."):
+            results[name] = BENCHMARKS[name]()
+        console.print(f"{name}: median {results[name]['median']:.2f} ms")
+
+    save_report(build_report(results), output)
+    console.print(f"Results saved to {output}")
+    return 0
+
+
+def compare(baseline_path: Path, current_path: Path, threshold: float) -> int:
+    """Compare two reports and return a non-zero exit code on regressions."""
+    rows = compare_reports(load_report(baseline_path), load_report(current_path), threshold)
+
+    table = Table(title=f"Benchmarks vs baseline (threshold {threshold:.0%})")
+    table.add_column("Benchmark")
+    table.add_column("Baseline ms", justify="right")
+    table.add_column("Current ms", justify="right")
+    table.add_column("Change", justify="right")
+    table.add_column("Status")
+
+    styles = {"regression": "red", "improvement": "green", "ok": "", "missing": "yellow"}
+    for row in rows:
+        table.add_row(
+            row["name"],
+            "-" if row["baseline"] is None else f"{row['baseline']:.2f}",
+            "-" if row["current"] is None else f"{row['current']:.2f}",
+            "-" if row["change"] is None else f"{row['change']:+.1%}",
+            f"[{styles[row['status']]}]{row['status']}[/]" if styles[row["status"]] else "ok",
+        )
+    console.print(table)
+
+    return 1 if has_regressions(rows) else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse arguments and dispatch to ``run`` or ``compare``."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks and store the results")
+    run_parser.add_argument("names", nargs="*", help="Benchmarks to run (default: all)")
+    run_parser.add_argument("--output", "-o", type=Path, default=DEFAULT_RESULTS)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare results with a baseline")
+    compare_parser.add_argument("current", type=Path, nargs="?", default=DEFAULT_RESULTS)
+    compare_parser.add_argument("--baseline", "-b", type=Path, default=DEFAULT_BASELINE)
+    compare_parser.add_argument(
+        "--threshold",
+        "-t",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown as a fraction before flagging a regression",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return run(args.names, args.output)
+    return compare(args.baseline, args.current, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
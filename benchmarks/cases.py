@@ -0,0 +1,346 @@
+"""Benchmark cases for TicketPlease hot paths."""
+
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import toml
+
+from .runner import measure, summarize_samples
+from .stub_provider import StubProvider
+
+BENCHMARKS: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def benchmark(name: str) -> Callable[[Callable[[], dict[str, Any]]], Callable[[], dict[str, Any]]]:
+    """Register a benchmark case under the given name."""
+
+    def register(func: Callable[[], dict[str, Any]]) -> Callable[[], dict[str, Any]]:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+@contextmanager
+def isolated_home(config: dict[str, Any] | None = None) -> Iterator[Path]:
+    """Point HOME at a temporary directory, optionally containing a config file."""
+    previous_home = os.environ.get("HOME")
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        if config is not None:
+            config_dir = Path(home) / ".config" / "ticketplease"
+            config_dir.mkdir(parents=True)
+            (config_dir / "config.toml").write_text(toml.dumps(config), encoding="utf-8")
+        try:
+            yield Path(home)
+        finally:
+            if previous_home is None:
+                os.environ.pop("HOME", None)
+            else:
+                os.environ["HOME"] = previous_home
+
+
+def sample_config(api_base: str = "") -> dict[str, Any]:
+    """Build a realistic configuration for benchmarks."""
+    return {
+        "api_keys": {"provider": "openai", "api_key": "sk-benchmark"},
+        "llm": {"model": "openai/stub-model", "api_base": api_base},
+        "preferences": {
+            "default_output_language": "en",
+            "default_platform": "github",
+            "default_ac_path": "",
+            "default_dod_path": "",
+        },
+    }
+
+
+def large_items(prefix: str, count: int) -> list[str]:
+    """Build a long list of template items."""
+    return [f"{prefix} item {index}: the feature behaves as documented" for index in range(count)]
+
+
+def template_library_files(root: Path, files: int = 100, items_per_file: int = 100) -> None:
+    """Write a template library of ``files * items_per_file`` varied items."""
+    subjects = ["Refunds", "Invoices", "Sessions", "Exports", "Webhooks", "Reports", "Tokens"]
+    verbs = ["are validated", "are logged", "expire", "are retried", "are audited", "render"]
+    details = ["for every tenant", "within 5 seconds", "in all locales", "after a deploy"]
+    for file_index in range(files):
+        lines = [
+            f"{subjects[(file_index + index) % len(subjects)]} {verbs[index % len(verbs)]} "
+            f"{details[(file_index * index) % len(details)]} (rule {file_index}-{index})"
+            for index in range(items_per_file)
+        ]
+        (root / f"team-{file_index}.md").write_text("\n".join(lines), encoding="utf-8")
+
+
+@benchmark("cli_cold_start")
+def bench_cli_cold_start() -> dict[str, Any]:
+    """Spawn ``tk --version`` in a fresh interpreter."""
+    samples = []
+    for _ in range(5):
+        result = measure(
+            lambda: subprocess.run(
+                [sys.executable, "-m", "cli.main", "--version"],
+                capture_output=True,
+                check=True,
+            ),
+            repeat=1,
+            warmup=0,
+        )
+        samples.append(result["median"])
+    return summarize_samples(samples)
+
+
+@benchmark("config_load")
+def bench_config_load() -> dict[str, Any]:
+    """Load ``config.toml`` from disk with a fresh ``Config``."""
+    from config.service import Config
+
+    with isolated_home(sample_config()):
+        return measure(lambda: Config().load(), repeat=200)
+
+
+@benchmark("supported_models")
+def bench_supported_models() -> dict[str, Any]:
+    """Build the provider model catalog used by the wizard."""
+    from ai.models import ModelProvider
+
+    return measure(ModelProvider.get_supported_models, repeat=20)
+
+
+@benchmark("build_prompt_large_templates")
+def bench_build_prompt() -> dict[str, Any]:
+    """Build a generation prompt with thousands of AC and DoD items."""
+    from ai.service import AIService
+
+    service = AIService("openai", "sk-benchmark", "gpt-4o-mini")
+    description = "Implement the reporting dashboard. " * 200
+    acceptance_criteria = large_items("AC", 2000)
+    definition_of_done = large_items("DoD", 2000)
+
+    return measure(
+        lambda: service._build_prompt(
+            description, acceptance_criteria, definition_of_done, "github", "en"
+        ),
+        repeat=50,
+    )
+
+
+@benchmark("display_result_5k_lines")
+def bench_display_result() -> dict[str, Any]:
+    """Render a 5,000-line generated description in the terminal UI."""
+    from rich.console import Console
+
+    from config.service import Config
+    from ticketplease.generator import TaskGenerator
+
+    description = "\n".join(f"- [ ] Line {index} of the generated task" for index in range(5000))
+
+    with isolated_home(sample_config()):
+        generator = TaskGenerator(Config())
+        sink = Console(file=io.StringIO(), width=120, force_terminal=True)
+        with patch("ticketplease.generator.console", sink):
+            return measure(lambda: generator._display_result(description), repeat=3)
+
+
+@benchmark("end_to_end_stub_generation")
+def bench_end_to_end() -> dict[str, Any]:
+    """Generate a description through litellm against the local stub provider."""
+    from ai.service import AIService
+    from config.service import Config
+    from ticketplease.templates import template_cache
+
+    with StubProvider() as stub, isolated_home(sample_config(stub.api_base)) as home:
+        templates = home / "dod.md"
+        templates.write_text("\n".join(large_items("DoD", 50)), encoding="utf-8")
+
+        def run() -> None:
+            config = Config()
+            service = AIService(
+                config.get_provider(),
+                config.get_api_key() or "",
+                config.get_model(),
+                api_base=config.get_api_base(),
+            )
+            service.generate_task_description(
+                "Add CSV export to the reports page",
+                [],
+                template_cache().load(str(templates)) or [],
+                config.get_platform(),
+                config.get_language(),
+            )
+
+        return measure(run, repeat=20, warmup=2)
+
+
+@benchmark("cassette_replay_pipeline")
+def bench_cassette_replay() -> dict[str, Any]:
+    """Run the TaskGenerator generation step offline from a recorded cassette."""
+    from rich.console import Console
+
+    from ai.cassette import Cassette
+    from ai.service import AIService
+    from config.service import Config
+    from ticketplease.generator import TaskGenerator
+
+    task_data = {
+        "task_description": "Add CSV export to the reports page. " * 50,
+        "platform": "github",
+        "language": "en",
+        "acceptance_criteria": large_items("AC", 100),
+        "definition_of_done": large_items("DoD", 100),
+    }
+    content = "\n".join(f"- [ ] Generated line {index}" for index in range(500))
+
+    with tempfile.TemporaryDirectory() as workdir, isolated_home(sample_config()):
+        cassette_path = Path(workdir) / "generation.json"
+        with StubProvider(content=content) as stub:
+            recorder = Cassette(cassette_path, mode="record")
+            AIService(
+                "openai",
+                "sk-benchmark",
+                "openai/stub-model",
+                api_base=stub.api_base,
+                completion_fn=recorder.wrap(),
+            ).generate_task_description(
+                task_data["task_description"],
+                task_data["acceptance_criteria"],
+                task_data["definition_of_done"],
+                task_data["platform"],
+                task_data["language"],
+            )
+
+        generator = TaskGenerator(Config())
+        sink = Console(file=io.StringIO(), width=120)
+
+        def run() -> None:
+            player = Cassette(cassette_path, mode="replay")
+            service = AIService(
+                "openai", "sk-benchmark", "openai/stub-model", completion_fn=player.wrap()
+            )
+            generator._generate_description(service, task_data)
+
+        with patch("ticketplease.generator.console", sink):
+            return measure(run, repeat=50)
+
+
+@benchmark("template_index_build_10k")
+def bench_template_index_build() -> dict[str, Any]:
+    """Index a 10,000-item template library from parsed templates."""
+    from ticketplease.library import TemplateLibrary
+    from ticketplease.templates import TemplateCache
+
+    with tempfile.TemporaryDirectory() as root:
+        template_library_files(Path(root))
+        cache = TemplateCache()
+        TemplateLibrary(Path(root), cache).refresh()
+        return measure(lambda: TemplateLibrary(Path(root), cache).refresh(), repeat=5)
+
+
+@benchmark("template_search_10k")
+def bench_template_search() -> dict[str, Any]:
+    """Run a fuzzy query against a 10,000-item template library."""
+    from ticketplease.library import TemplateLibrary
+    from ticketplease.templates import TemplateCache
+
+    with tempfile.TemporaryDirectory() as root:
+        template_library_files(Path(root))
+        library = TemplateLibrary(Path(root), TemplateCache())
+        library.refresh()
+        return measure(lambda: library.search("refund retried tenat", limit=20), repeat=50)
+
+
+@benchmark("select_relevant_items_120")
+def bench_select_relevant_items() -> dict[str, Any]:
+    """Pick the 12 DoD items most relevant to a task out of 120 and report the prompt sizes."""
+    from ai.service import AIService
+    from ticketplease.relevance import select_relevant
+
+    service = AIService("openai", "sk-benchmark", "gpt-4o-mini")
+    description = "Allow partial refunds of a payment from the billing page"
+    topics = ["refunds", "billing", "sessions", "exports", "webhooks", "reports"]
+    items = [
+        f"{topics[index % len(topics)].capitalize()} rule {index}: behaviour is documented"
+        for index in range(120)
+    ]
+
+    def prompt_length(definition_of_done: list[str]) -> int:
+        return len(service._build_prompt(description, [], definition_of_done, "github", "en"))
+
+    result = measure(lambda: select_relevant(items, description, 12), repeat=200)
+    result["prompt_chars_all"] = prompt_length(items)
+    result["prompt_chars_relevant"] = prompt_length(select_relevant(items, description, 12))
+    return result
+
+
+@benchmark("condense_description_200k")
+def bench_condense_description() -> dict[str, Any]:
+    """Condense a 200 KB pasted log with 50 ms chunk summaries, cold and from the cache."""
+    from ai.summarize import Summarizer, SummaryCache
+
+    def summarize(chunk: str) -> str:
+        time.sleep(0.05)
+        return f"Handled {chunk.count(chr(10))} requests without errors."
+
+    text = "\n".join(f"INFO request {index} handled in 12ms" for index in range(6000))
+    text += "\nValueError: amount exceeds the payment"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        summarizer = Summarizer(summarize, "stub", SummaryCache(Path(workdir) / "summaries.db"))
+        started_at = time.perf_counter()
+        condensed = summarizer.condense(text)
+        cold_ms = (time.perf_counter() - started_at) * 1000
+        result = measure(lambda: summarizer.condense(text), repeat=20)
+        result["cold_ms"] = round(cold_ms, 3)
+        result["chars_in"] = len(text)
+        result["chars_out"] = len(condensed)
+        return result
+
+
+@benchmark("symbol_index_update_50k")
+def bench_symbol_index_update() -> dict[str, Any]:
+    """Update the symbol index of a 50k-file git repository after editing 10 files."""
+    from ticketplease.symbols import SymbolIndex
+
+    with tempfile.TemporaryDirectory() as workdir:
+        root = Path(workdir) / "repo"
+        for index in range(50_000):
+            folder = root / f"pkg{index // 500}"
+            folder.mkdir(parents=True, exist_ok=True)
+            if index % 2:
+                (folder / f"mod{index}.ts").write_text(f"export function handler{index}() {{}}\n")
+            else:
+                (folder / f"mod{index}.py").write_text(
+                    f"class Model{index}:\n    def save(self):\n        pass\n"
+                )
+        subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+        subprocess.run(["git", "add", "."], cwd=root, check=True)
+
+        symbol_index = SymbolIndex(Path(workdir) / "symbols.db", root)
+        started_at = time.perf_counter()
+        symbol_index.update()
+        cold_ms = (time.perf_counter() - started_at) * 1000
+        edited = 0
+
+        def edit_and_update() -> None:
+            nonlocal edited
+            for _ in range(10):
+                edited += 2
+                path = root / f"pkg{edited % 50_000 // 500}" / f"mod{edited % 50_000}.py"
+                path.write_text(path.read_text() + f"\ndef added{edited}():\n    pass\n")
+            symbol_index.update()
+
+        result = measure(edit_and_update, repeat=5)
+        result["cold_ms"] = round(cold_ms, 3)
+        result["files"] = symbol_index.stats()["files"]
+        symbol_index.close()
+        return result
@@ -0,0 +1,62 @@
+"""Compare benchmark reports against a stored baseline."""
+
+from typing import Any
+
+DEFAULT_THRESHOLD = 0.20
+
+
+def compare_reports(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    metric: str = "median",
+) -> list[dict[str, Any]]:
+    """Compare each benchmark present in both reports.
+
+    A benchmark regresses when its metric grew by more than ``threshold``
+    (a fraction, 0.20 meaning 20%) relative to the baseline.
+    """
+    baseline_results = baseline.get("results", {})
+    current_results = current.get("results", {})
+
+    rows = []
+    for name in sorted(set(baseline_results) | set(current_results)):
+        before = baseline_results.get(name, {}).get(metric)
+        after = current_results.get(name, {}).get(metric)
+
+        if before is None or after is None:
+            rows.append(
+                {
+                    "name": name,
+                    "baseline": before,
+                    "current": after,
+                    "change": None,
+                    "status": "missing",
+                }
+            )
+            continue
+
+        change = (after - before) / before if before else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+
+        rows.append(
+            {
+                "name": name,
+                "baseline": before,
+                "current": after,
+                "change": change,
+                "status": status,
+            }
+        )
+
+    return rows
+
+
+def has_regressions(rows: list[dict[str, Any]]) -> bool:
+    """Return whether any compared benchmark regressed."""
+    return any(row["status"] == "regression" for row in rows)
@@ -0,0 +1,76 @@
+"""Timing helpers and result persistence for the benchmark suite."""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+
+def measure(func: Callable[[], Any], repeat: int = 10, warmup: int = 1) -> dict[str, Any]:
+    """Run a callable several times and return timing statistics in milliseconds."""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started_at) * 1000)
+
+    return summarize_samples(samples)
+
+
+def summarize_samples(samples: list[float]) -> dict[str, Any]:
+    """Summarize raw millisecond samples."""
+    ordered = sorted(samples)
+    p90_index = max(0, int(round(0.9 * len(ordered))) - 1)
+    return {
+        "unit": "ms",
+        "samples": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p90": ordered[p90_index],
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_report(results: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """Wrap benchmark results with metadata about the environment."""
+    return {
+        "metadata": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def save_report(report: dict[str, Any], path: Path) -> None:
+    """Write a report as JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_report(path: Path) -> dict[str, Any]:
+    """Read a report written by ``save_report``."""
+    return json.loads(path.read_text(encoding="utf-8"))
@@ -0,0 +1,318 @@
+"""Local OpenAI-compatible stub provider used by benchmarks and offline tests."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+DEFAULT_CONTENT = "### Description\nStub description\n\n### Acceptance Criteria\n- [ ] Works\n"
+
+
+class StubProvider:
+    """Serve canned chat completions on a random local port.
+
+    The API key of each request is kept in ``api_keys``. Keys in
+    ``rejected_keys`` get a 401, and ``rate_limits`` maps keys to the
+    remaining-requests header sent back with their completions.
+    """
+
+    def __init__(self, content: str = DEFAULT_CONTENT, latency: float = 0.0) -> None:
+        """Initialize the stub with the content to return and an artificial latency."""
+        self.content = content
+        self.latency = latency
+        self.requests: list[dict[str, Any]] = []
+        self.api_keys: list[str] = []
+        self.rejected_keys: set[str] = set()
+        self.rate_limits: dict[str, int] = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._build_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def api_base(self) -> str:
+        """Base URL to pass to litellm as ``api_base``."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubProvider":
+        """Start serving in a background thread."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubProvider":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def completion_payload(self, model: str) -> dict[str, Any]:
+        """Build a chat completion response body."""
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": self.content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 100,
+                "completion_tokens": max(1, len(self.content) // 4),
+                "total_tokens": 100 + max(1, len(self.content) // 4),
+            },
+        }
+
+    def stream_chunks(self, model: str) -> list[dict[str, Any]]:
+        """Build the streamed chunks for the configured content."""
+        words = self.content.split(" ")
+        chunks = []
+        for index, word in enumerate(words):
+            text = word if index == len(words) - 1 else word + " "
+            chunks.append(
+                {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+                }
+            )
+        chunks.append(
+            {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+        )
+        return chunks
+
+    def _build_handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                api_key = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                stub.requests.append(body)
+                stub.api_keys.append(api_key)
+
+                if api_key in stub.rejected_keys:
+                    self._send_json({"error": {"message": "Invalid API key"}}, 401)
+                    return
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                model = body.get("model", "stub-model")
+                if body.get("stream"):
+                    self._send_stream(model)
+                else:
+                    headers = {}
+                    if api_key in stub.rate_limits:
+                        headers["x-ratelimit-remaining-requests"] = str(stub.rate_limits[api_key])
+                    self._send_json(stub.completion_payload(model), headers=headers)
+
+            def _send_json(
+                self,
+                payload: dict[str, Any],
+                status: int = 200,
+                headers: dict[str, str] | None = None,
+            ) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, model: str) -> None:
+                events = [f"data: {json.dumps(chunk)}\n\n" for chunk in stub.stream_chunks(model)]
+                data = ("".join(events) + "data: [DONE]\n\n").encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        return Handler
+
+
+class BatchStubProvider(StubProvider):
+    """Stub provider that also emulates the OpenAI and Anthropic batch APIs.
+
+    A batch reports progress on each status poll and ends after
+    ``polls_until_done`` polls. Requests whose prompt contains
+    ``failing_marker`` get an error result instead of a completion.
+    """
+
+    def __init__(self, content: str = DEFAULT_CONTENT, polls_until_done: int = 2) -> None:
+        """Initialize the stub with the content to return and the polls before batches end."""
+        self.polls_until_done = polls_until_done
+        self.failing_marker = "FAIL"
+        self.batches: dict[str, dict[str, Any]] = {}
+        self.files: dict[str, bytes] = {}
+        super().__init__(content)
+
+    def batch_requests(self, batch_id: str) -> list[dict[str, Any]]:
+        """Get the requests submitted in a batch as ``{"custom_id", "params"}`` items."""
+        return self.batches[batch_id]["requests"]
+
+    def _result(self, request: dict[str, Any]) -> dict[str, Any] | None:
+        """Get the completion for a request, or None when it should fail."""
+        prompt = json.dumps(request["params"]["messages"])
+        if self.failing_marker and self.failing_marker in prompt:
+            return None
+        return self.completion_payload(request["params"]["model"])
+
+    def _advance(self, batch_id: str) -> dict[str, Any]:
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        if batch["polls"] < self.polls_until_done:
+            if batch["kind"] == "openai":
+                batch["object"]["status"] = "in_progress"
+            return batch
+        if batch["kind"] == "openai" and batch["object"]["status"] != "completed":
+            self._finish_openai(batch)
+        elif batch["kind"] == "anthropic" and batch["object"]["processing_status"] != "ended":
+            batch["object"]["processing_status"] = "ended"
+            batch["object"]["results_url"] = f"{self.api_base}/messages/batches/{batch_id}/results"
+        return batch
+
+    def _finish_openai(self, batch: dict[str, Any]) -> None:
+        output, errors = [], []
+        for request in batch["requests"]:
+            completion = self._result(request)
+            if completion is None:
+                body = {"error": {"message": "Invalid request", "type": "invalid_request_error"}}
+                response = {"status_code": 400, "body": body}
+                errors.append({"custom_id": request["custom_id"], "response": response})
+            else:
+                response = {"status_code": 200, "body": completion}
+                output.append({"custom_id": request["custom_id"], "response": response})
+        for file_key, lines in (("output_file_id", output), ("error_file_id", errors)):
+            if lines:
+                file_id = f"file-{len(self.files)}"
+                self.files[file_id] = "\n".join(json.dumps(line) for line in lines).encode()
+                batch["object"][file_key] = file_id
+        batch["object"]["status"] = "completed"
+
+    def _anthropic_results(self, batch: dict[str, Any]) -> bytes:
+        lines = []
+        for request in batch["requests"]:
+            completion = self._result(request)
+            if completion is None:
+                error = {"type": "invalid_request_error", "message": "Invalid request"}
+                result = {"type": "errored", "error": {"type": "error", "error": error}}
+            else:
+                message = completion["choices"][0]["message"]
+                usage = completion["usage"]
+                result = {
+                    "type": "succeeded",
+                    "message": {
+                        "type": "message",
+                        "role": "assistant",
+                        "content": [{"type": "text", "text": message["content"]}],
+                        "usage": {
+                            "input_tokens": usage["prompt_tokens"],
+                            "output_tokens": usage["completion_tokens"],
+                        },
+                    },
+                }
+            lines.append({"custom_id": request["custom_id"], "result": result})
+        return "\n".join(json.dumps(line) for line in lines).encode()
+
+    def _build_handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+        base_handler = super()._build_handler()
+
+        class Handler(base_handler):  # type: ignore[valid-type, misc]
+            def do_POST(self) -> None:
+                if self.path == "/v1/files":
+                    self._upload_file()
+                elif self.path == "/v1/batches":
+                    self._create_batch("openai")
+                elif self.path == "/v1/messages/batches":
+                    self._create_batch("anthropic")
+                else:
+                    super().do_POST()
+
+            def do_GET(self) -> None:
+                parts = self.path.strip("/").split("/")
+                if parts[1:2] == ["files"] and parts[3:] == ["content"]:
+                    self._send_bytes(stub.files[parts[2]])
+                elif parts[1:2] == ["batches"] and parts[2] in stub.batches:
+                    self._send_json(stub._advance(parts[2])["object"])
+                elif parts[1:3] == ["messages", "batches"] and parts[3] in stub.batches:
+                    batch = stub.batches[parts[3]]
+                    if parts[4:] == ["results"]:
+                        self._send_bytes(stub._anthropic_results(batch))
+                    else:
+                        self._send_json(stub._advance(parts[3])["object"])
+                else:
+                    self._send_json({"error": {"message": "Not found"}}, 404)
+
+            def _upload_file(self) -> None:
+                boundary = self.headers["Content-Type"].split("boundary=", 1)[1]
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                for part in body.split(f"--{boundary}".encode()):
+                    if b'name="file"' in part:
+                        content = part.split(b"\r\n\r\n", 1)[1].removesuffix(b"\r\n")
+                        file_id = f"file-{len(stub.files)}"
+                        stub.files[file_id] = content
+                        self._send_json({"id": file_id, "object": "file", "purpose": "batch"})
+                        return
+                self._send_json({"error": {"message": "Missing file"}}, 400)
+
+            def _create_batch(self, kind: str) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                batch_id = f"batch_{len(stub.batches)}"
+                if kind == "openai":
+                    lines = stub.files[body["input_file_id"]].decode().splitlines()
+                    requests = [
+                        {"custom_id": line["custom_id"], "params": line["body"]}
+                        for line in map(json.loads, lines)
+                    ]
+                    batch = {"id": batch_id, "object": "batch", "status": "validating"}
+                else:
+                    requests = body["requests"]
+                    batch = {
+                        "id": batch_id,
+                        "type": "message_batch",
+                        "processing_status": "in_progress",
+                        "results_url": None,
+                    }
+                stub.batches[batch_id] = {
+                    "kind": kind,
+                    "requests": requests,
+                    "polls": 0,
+                    "object": batch,
+                }
+                self._send_json(batch)
+
+            def _send_bytes(self, data: bytes) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/jsonl")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
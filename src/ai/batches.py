@@ -0,0 +1,229 @@
+"""Clients for provider batch APIs (OpenAI Batch API, Anthropic Message Batches).
+
+Batch endpoints answer within hours instead of seconds, at a discount. Both
+clients share one interface: ``submit`` a list of ``(custom_id, params)``
+requests, ``status`` until it is terminal, then ``results`` mapping each
+custom id to ``{"ok", "description", "usage"}`` or ``{"ok": False, "error"}``.
+"""
+
+import json
+import urllib.error
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any
+
+DEFAULT_API_BASES = {
+    "openai": "https://api.openai.com/v1",
+    "anthropic": "https://api.anthropic.com/v1",
+}
+ANTHROPIC_VERSION = "2023-06-01"
+REQUEST_TIMEOUT = 60.0
+BATCH_DISCOUNT = 0.5
+
+
+class BatchAPIError(RuntimeError):
+    """Raised when a provider batch API request fails."""
+
+
+def provider_model(provider: str, model: str) -> str:
+    """Strip the litellm provider prefix from a model name."""
+    return model.removeprefix(f"{provider}/")
+
+
+class _BatchClient(ABC):
+    """JSON-over-HTTP plumbing shared by the provider clients."""
+
+    def __init__(self, api_key: str, api_base: str | None, provider: str) -> None:
+        self.api_key = api_key
+        self.api_base = (api_base or DEFAULT_API_BASES[provider]).rstrip("/")
+
+    @abstractmethod
+    def _headers(self) -> dict[str, str]:
+        """Get the authentication and version headers of the provider."""
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        content_type: str = "application/json",
+    ) -> bytes:
+        if not url.startswith("http"):
+            url = f"{self.api_base}{url}"
+        headers = self._headers()
+        if body is not None:
+            headers["Content-Type"] = content_type
+        request = urllib.request.Request(url, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", "replace")
+            raise BatchAPIError(f"{method} {url} failed with {e.code}: {detail}") from e
+        except urllib.error.URLError as e:
+            raise BatchAPIError(f"{method} {url} failed: {e.reason}") from e
+
+    def _json(self, method: str, url: str, payload: dict[str, Any] | None = None) -> Any:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        return json.loads(self._request(method, url, body))
+
+    def _jsonl(self, url: str) -> list[dict[str, Any]]:
+        data = self._request("GET", url).decode("utf-8")
+        return [json.loads(line) for line in data.splitlines() if line.strip()]
+
+
+class OpenAIBatchClient(_BatchClient):
+    """Client for the OpenAI Batch API (JSONL file upload, then a batch over it)."""
+
+    TERMINAL = ("completed", "failed", "expired", "cancelled")
+
+    def __init__(self, api_key: str, api_base: str | None = None) -> None:
+        """Initialize the client for an API key and an optional API base URL."""
+        super().__init__(api_key, api_base, "openai")
+
+    def _headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def submit(self, requests: list[tuple[str, dict[str, Any]]]) -> str:
+        """Upload the requests and start a batch, returning its id."""
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": params,
+                }
+            )
+            for custom_id, params in requests
+        ]
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="purpose"\r\n\r\nbatch\r\n'
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="batch.jsonl"\r\n'
+            "Content-Type: application/jsonl\r\n\r\n" + "\n".join(lines) + f"\r\n--{boundary}--\r\n"
+        ).encode("utf-8")
+        upload = json.loads(
+            self._request("POST", "/files", body, f"multipart/form-data; boundary={boundary}")
+        )
+        batch = self._json(
+            "POST",
+            "/batches",
+            {
+                "input_file_id": upload["id"],
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+            },
+        )
+        return batch["id"]
+
+    def status(self, batch_id: str) -> tuple[str, bool]:
+        """Get the provider status of a batch and whether it is terminal."""
+        batch = self._json("GET", f"/batches/{batch_id}")
+        return batch["status"], batch["status"] in self.TERMINAL
+
+    def results(self, batch_id: str) -> dict[str, dict[str, Any]]:
+        """Get the results of a terminal batch by custom id."""
+        batch = self._json("GET", f"/batches/{batch_id}")
+        if batch["status"] == "failed":
+            raise BatchAPIError(f"Batch {batch_id} failed: {batch.get('errors')}")
+
+        results = {}
+        for file_key in ("output_file_id", "error_file_id"):
+            if batch.get(file_key):
+                for line in self._jsonl(f"/files/{batch[file_key]}/content"):
+                    results[line["custom_id"]] = self._result(line)
+        return results
+
+    def _result(self, line: dict[str, Any]) -> dict[str, Any]:
+        response = line.get("response") or {}
+        body = response.get("body") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or body.get("error") or {}
+            return {"ok": False, "error": error.get("message") or "Batch request failed"}
+
+        usage = body.get("usage") or {}
+        return {
+            "ok": True,
+            "description": (body["choices"][0]["message"].get("content") or "").strip(),
+            "usage": {
+                "prompt_tokens": int(usage.get("prompt_tokens", 0)),
+                "completion_tokens": int(usage.get("completion_tokens", 0)),
+            },
+        }
+
+
+class AnthropicBatchClient(_BatchClient):
+    """Client for the Anthropic Message Batches API."""
+
+    def __init__(self, api_key: str, api_base: str | None = None) -> None:
+        """Initialize the client for an API key and an optional API base URL."""
+        super().__init__(api_key, api_base, "anthropic")
+
+    def _headers(self) -> dict[str, str]:
+        return {"x-api-key": self.api_key, "anthropic-version": ANTHROPIC_VERSION}
+
+    def submit(self, requests: list[tuple[str, dict[str, Any]]]) -> str:
+        """Create a message batch, returning its id."""
+        batch = self._json(
+            "POST",
+            "/messages/batches",
+            {
+                "requests": [
+                    {"custom_id": custom_id, "params": params} for custom_id, params in requests
+                ]
+            },
+        )
+        return batch["id"]
+
+    def status(self, batch_id: str) -> tuple[str, bool]:
+        """Get the provider status of a batch and whether it is terminal."""
+        batch = self._json("GET", f"/messages/batches/{batch_id}")
+        return batch["processing_status"], batch["processing_status"] == "ended"
+
+    def results(self, batch_id: str) -> dict[str, dict[str, Any]]:
+        """Get the results of an ended batch by custom id."""
+        batch = self._json("GET", f"/messages/batches/{batch_id}")
+        return {
+            line["custom_id"]: self._result(line["result"])
+            for line in self._jsonl(batch["results_url"])
+        }
+
+    def _result(self, result: dict[str, Any]) -> dict[str, Any]:
+        if result.get("type") != "succeeded":
+            error = (result.get("error") or {}).get("error") or result.get("error") or {}
+            return {"ok": False, "error": error.get("message") or f"Request {result.get('type')}"}
+
+        message = result["message"]
+        usage = message.get("usage") or {}
+        text = "".join(
+            block.get("text", "") for block in message.get("content", []) if block["type"] == "text"
+        )
+        return {
+            "ok": True,
+            "description": text.strip(),
+            "usage": {
+                "prompt_tokens": int(usage.get("input_tokens", 0)),
+                "completion_tokens": int(usage.get("output_tokens", 0)),
+            },
+        }
+
+
+def create_batch_client(
+    provider: str, api_key: str, api_base: str | None = None
+) -> OpenAIBatchClient | AnthropicBatchClient:
+    """Create the batch client for a provider.
+
+    Raises ValueError for providers without a supported batch API.
+    """
+    if provider == "openai":
+        return OpenAIBatchClient(api_key, api_base)
+    if provider == "anthropic":
+        return AnthropicBatchClient(api_key, api_base)
+    raise ValueError(
+        f"Provider '{provider}' has no supported batch API. Use one of: "
+        f"{', '.join(DEFAULT_API_BASES)}"
+    )
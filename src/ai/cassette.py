@@ -0,0 +1,158 @@
+"""Record and replay AI completions for offline, reproducible runs."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from config.storage import atomic_write
+
+CASSETTE_MODES = ("record", "replay")
+REQUEST_KEYS = ("model", "messages", "temperature", "max_tokens", "stream")
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no recorded interaction matches a request."""
+
+
+def request_key(completion_params: dict[str, Any]) -> str:
+    """Return a stable key for the parts of a request that determine the response."""
+    relevant = {key: completion_params.get(key) for key in REQUEST_KEYS}
+    encoded = json.dumps(relevant, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _to_dict(obj: Any) -> dict[str, Any]:
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return dict(obj)
+
+
+class Cassette:
+    """A file of recorded completion interactions.
+
+    In ``record`` mode, calls go to the real completion function and each
+    request/response pair (or streamed chunk sequence with per-chunk offsets)
+    is appended to the cassette. In ``replay`` mode, responses are served from
+    the cassette in recorded order for identical requests, optionally sleeping
+    to reproduce the original timing.
+    """
+
+    def __init__(self, path: Path, mode: str = "replay", realtime: bool = False) -> None:
+        """Initialize the cassette, loading existing interactions from disk."""
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unsupported cassette mode '{mode}'. Use 'record' or 'replay'.")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.realtime = realtime
+        self.interactions: list[dict[str, Any]] = []
+        self._replay_positions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            self.interactions = json.loads(self.path.read_text(encoding="utf-8"))["interactions"]
+        elif mode == "replay":
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+
+    @classmethod
+    def from_env(cls) -> "Cassette | None":
+        """Build a cassette from ``TK_CASSETTE`` and related environment variables."""
+        path = os.environ.get("TK_CASSETTE")
+        if not path:
+            return None
+
+        return cls(
+            Path(path).expanduser(),
+            mode=os.environ.get("TK_CASSETTE_MODE", "replay"),
+            realtime=os.environ.get("TK_CASSETTE_REALTIME", "") not in ("", "0", "false"),
+        )
+
+    def wrap(self, completion: Callable[..., Any] | None = None) -> Callable[..., Any]:
+        """Return a completion function bound to this cassette."""
+        import litellm
+
+        real_completion = completion or litellm.completion
+
+        def cassette_completion(**completion_params: Any) -> Any:
+            if self.mode == "replay":
+                return self._replay(completion_params)
+            return self._record(real_completion, completion_params)
+
+        return cassette_completion
+
+    def _record(self, completion: Callable[..., Any], completion_params: dict[str, Any]) -> Any:
+        started_at = time.perf_counter()
+        response = completion(**completion_params)
+        interaction: dict[str, Any] = {
+            "key": request_key(completion_params),
+            "request": {key: completion_params.get(key) for key in REQUEST_KEYS},
+        }
+
+        if not completion_params.get("stream"):
+            interaction["latency"] = time.perf_counter() - started_at
+            interaction["response"] = _to_dict(response)
+            self._append(interaction)
+            return response
+
+        return self._record_stream(response, interaction, started_at)
+
+    def _record_stream(
+        self, stream: Any, interaction: dict[str, Any], started_at: float
+    ) -> Iterator[Any]:
+        chunks = []
+        for chunk in stream:
+            chunks.append({"offset": time.perf_counter() - started_at, "data": _to_dict(chunk)})
+            yield chunk
+
+        interaction["latency"] = time.perf_counter() - started_at
+        interaction["chunks"] = chunks
+        self._append(interaction)
+
+    def _append(self, interaction: dict[str, Any]) -> None:
+        with self._lock:
+            self.interactions.append(interaction)
+            self.save()
+
+    def save(self) -> None:
+        """Write the cassette atomically so an interrupted recording stays readable."""
+        atomic_write(
+            self.path, json.dumps({"version": 1, "interactions": self.interactions}, indent=1)
+        )
+
+    def _next_interaction(self, key: str) -> dict[str, Any]:
+        with self._lock:
+            matches = [item for item in self.interactions if item["key"] == key]
+            if not matches:
+                raise CassetteMissError("No recorded interaction matches this request")
+
+            position = self._replay_positions.get(key, 0)
+            self._replay_positions[key] = position + 1
+            return matches[min(position, len(matches) - 1)]
+
+    def _replay(self, completion_params: dict[str, Any]) -> Any:
+        import litellm
+
+        interaction = self._next_interaction(request_key(completion_params))
+
+        if "chunks" in interaction:
+            return self._replay_stream(interaction["chunks"])
+
+        if self.realtime:
+            time.sleep(interaction.get("latency", 0.0))
+        return litellm.ModelResponse(**interaction["response"])
+
+    def _replay_stream(self, chunks: list[dict[str, Any]]) -> Iterator[Any]:
+        from litellm.types.utils import ModelResponseStream
+
+        started_at = time.perf_counter()
+        for chunk in chunks:
+            if self.realtime:
+                delay = chunk["offset"] - (time.perf_counter() - started_at)
+                if delay > 0:
+                    time.sleep(delay)
+            yield ModelResponseStream(**chunk["data"])
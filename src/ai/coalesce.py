@@ -0,0 +1,69 @@
+"""In-flight deduplication of identical AI requests."""
+
+import threading
+from collections.abc import Callable
+from typing import Any
+
+
+class _Flight:
+    """A call in progress and the outcome its waiters receive."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Share one execution among concurrent calls with the same key.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait and receive the same result (or exception). Nothing is cached
+    once the call completes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty group."""
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: str, func: Callable[[], Any]) -> tuple[Any, bool]:
+        """Run ``func`` or join the identical call in flight.
+
+        Returns the result and whether it was shared from another caller.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def stats(self) -> dict[str, int]:
+        """Get the number of executed and coalesced calls so far."""
+        with self._lock:
+            return {"executed": self._executed, "coalesced": self._coalesced}
+
+
+completion_flights = SingleFlight()
@@ -0,0 +1,204 @@
+"""Pool of API keys for one provider, balanced by their remaining rate-limit budget."""
+
+import hashlib
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any
+
+RATE_LIMIT_COOLDOWN = 60.0
+QUOTA_COOLDOWN = 3600.0
+AUTH_STATUSES = (401, 403)
+
+_REMAINING_HEADERS = (
+    "x-ratelimit-remaining-requests",
+    "anthropic-ratelimit-requests-remaining",
+)
+_RESET_HEADERS = (
+    "x-ratelimit-reset-requests",
+    "anthropic-ratelimit-requests-reset",
+)
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def key_id(api_key: str) -> str:
+    """Get a short identifier for an API key that is safe to store and display."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def response_headers(response: Any) -> dict[str, str]:
+    """Get the provider response headers litellm attached to a response, lower-cased."""
+    hidden = getattr(response, "_hidden_params", None) or {}
+    headers = (hidden.get("additional_headers") or {}) if isinstance(hidden, dict) else {}
+    return {
+        name.lower().removeprefix("llm_provider-"): str(value) for name, value in headers.items()
+    }
+
+
+def parse_reset(value: str, now: float) -> float | None:
+    """Parse a rate-limit reset header (``6m0s``, ``1.5s``, seconds or an RFC 3339 time)."""
+    value = value.strip()
+    try:
+        return now + float(value)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return now + sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class _KeyState:
+    """Budget and health of one key."""
+
+    def __init__(self, api_key: str) -> None:
+        self.api_key = api_key
+        self.key_id = key_id(api_key)
+        self.remaining: int | None = None
+        self.reset_at: float | None = None
+        self.sidelined_until = 0.0
+        self.disabled = False
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+
+
+class KeyPool:
+    """Distribute requests across the API keys of one provider.
+
+    Each request goes to the healthy key with the most remaining requests
+    according to the provider's rate-limit headers (keys not heard from yet
+    count as having budget). Keys that fail authentication are disabled;
+    keys that hit a rate limit or quota are sidelined until they reset.
+    """
+
+    def __init__(self, api_keys: list[str]) -> None:
+        """Initialize the pool. Duplicate and empty keys are ignored."""
+        unique = list(dict.fromkeys(key for key in api_keys if key))
+        if not unique:
+            raise ValueError("A key pool needs at least one API key")
+        self._keys = [_KeyState(api_key) for api_key in unique]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of keys in the pool."""
+        return len(self._keys)
+
+    def acquire(self, exclude: set[str] | None = None) -> str:
+        """Choose a key for the next request.
+
+        Raises RuntimeError when every key is disabled, sidelined or excluded.
+        """
+        now = time.time()
+        with self._lock:
+            candidates = [
+                state
+                for state in self._keys
+                if not state.disabled
+                and state.sidelined_until <= now
+                and state.api_key not in (exclude or set())
+            ]
+            if not candidates:
+                raise RuntimeError("No API key in the pool is currently usable")
+
+            for state in candidates:
+                if state.reset_at is not None and state.reset_at <= now:
+                    state.remaining, state.reset_at = None, None
+
+            chosen = max(candidates, key=self._budget)
+            chosen.in_flight += 1
+            chosen.requests += 1
+            if chosen.remaining is not None:
+                chosen.remaining -= 1
+            return chosen.api_key
+
+    @staticmethod
+    def _budget(state: _KeyState) -> tuple[float, int]:
+        remaining = float("inf") if state.remaining is None else state.remaining
+        return remaining, -state.in_flight
+
+    def release(self, api_key: str, response: Any = None) -> None:
+        """Record a successful request and the rate-limit headers of its response."""
+        headers = response_headers(response) if response is not None else {}
+        now = time.time()
+        with self._lock:
+            state = self._state(api_key)
+            state.in_flight -= 1
+            for name in _REMAINING_HEADERS:
+                if name in headers:
+                    try:
+                        state.remaining = int(float(headers[name]))
+                    except ValueError:
+                        pass
+            for name in _RESET_HEADERS:
+                if name in headers:
+                    state.reset_at = parse_reset(headers[name], now)
+
+    def report_error(self, api_key: str, error: BaseException) -> bool:
+        """Record a failed request, returning whether another key may succeed."""
+        status = getattr(error, "status_code", None)
+        message = str(error).lower()
+        now = time.time()
+        with self._lock:
+            state = self._state(api_key)
+            state.in_flight -= 1
+            state.errors += 1
+            if status in AUTH_STATUSES:
+                state.disabled = True
+                return True
+            if status == 402 or "insufficient_quota" in message:
+                state.sidelined_until = now + QUOTA_COOLDOWN
+                return True
+            if status == 429:
+                if state.reset_at is not None and state.reset_at > now:
+                    state.sidelined_until = state.reset_at
+                else:
+                    state.sidelined_until = now + RATE_LIMIT_COOLDOWN
+                return True
+            return False
+
+    @staticmethod
+    def _status(state: _KeyState, now: float) -> str:
+        if state.disabled:
+            return "disabled"
+        if state.sidelined_until > now:
+            return "sidelined"
+        return "ok"
+
+    def _state(self, api_key: str) -> _KeyState:
+        return next(state for state in self._keys if state.api_key == api_key)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Get the budget and health of each key, identified by its key id."""
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "key_id": state.key_id,
+                    "requests": state.requests,
+                    "errors": state.errors,
+                    "remaining": state.remaining,
+                    "status": self._status(state, now),
+                }
+                for state in self._keys
+            ]
+
+
+_pools: dict[tuple[str, ...], KeyPool] = {}
+_pools_lock = threading.Lock()
+
+
+def shared_key_pool(api_keys: list[str]) -> KeyPool:
+    """Get the process-wide pool for a set of keys, so all services share one budget."""
+    identity = tuple(sorted(set(filter(None, api_keys))))
+    with _pools_lock:
+        if identity not in _pools:
+            _pools[identity] = KeyPool(api_keys)
+        return _pools[identity]
@@ -0,0 +1,208 @@
+"""In-process operational metrics rendered in the Prometheus text format."""
+
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Any
+
+LABELS = ("provider", "model", "platform", "operation")
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """A metric family with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"Unknown labels for {self.name}: {', '.join(sorted(unknown))}")
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _pairs(self, key: tuple[str, ...]) -> list[tuple[str, str]]:
+        return list(zip(self.labelnames, key, strict=True))
+
+    @abstractmethod
+    def _samples(self) -> list[str]:
+        """Render the sample lines of every label set."""
+
+    def render(self) -> str:
+        """Render the family with its HELP and TYPE lines."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add ``amount`` to the series with these labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Get the current value of a series."""
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self._pairs(key))} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    """A value that goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        """Subtract ``amount`` from the series with these labels."""
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Observations counted in cumulative buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = (*sorted(buckets), math.inf)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation in the series with these labels."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.setdefault(
+                key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def count(self, **labels: Any) -> int:
+        """Get the number of observations of a series."""
+        key = self._key(labels)
+        with self._lock:
+            return self._values[key]["count"] if key in self._values else 0
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for key, series in sorted(self._values.items()):
+            pairs = self._pairs(key)
+            for bound, count in zip(self.buckets, series["buckets"], strict=True):
+                labels = _format_labels([*pairs, ("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """A set of metric families rendered together."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics: list[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """Register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        """Register a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: Any) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all families in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+requests_total = registry.counter(
+    "tk_requests_total", "Task requests processed, by outcome.", (*LABELS, "status")
+)
+requests_in_flight = registry.gauge(
+    "tk_requests_in_flight", "Task requests being processed, including queued ones.", LABELS
+)
+queued_requests = registry.gauge(
+    "tk_queued_requests", "Task requests waiting for the scheduler.", (*LABELS, "priority")
+)
+request_duration = registry.histogram(
+    "tk_request_duration_seconds", "Total task request time, including the queue.", LABELS
+)
+queue_wait = registry.histogram(
+    "tk_queue_wait_seconds", "Time task requests waited for the scheduler.", (*LABELS, "priority")
+)
+time_to_first_token = registry.histogram(
+    "tk_time_to_first_token_seconds", "Time until a streamed completion produced text.", LABELS
+)
+completions_total = registry.counter(
+    "tk_completions_total",
+    "AI completions by result: ok, coalesced (shared another call) or error.",
+    (*LABELS, "result"),
+)
+tokens_total = registry.counter(
+    "tk_tokens_total",
+    "Tokens used by completions, by type: prompt, completion or cached.",
+    (*LABELS, "type"),
+)
+retries_total = registry.counter(
+    "tk_retries_total", "AI calls retried with another API key of the pool.", LABELS
+)
@@ -1,7 +1,5 @@
 """AI model management and retrieval from LiteLLM."""
 
-import litellm
-
 
 class ModelProvider:
     """Manages AI model retrieval and organization by provider."""
@@ -25,6 +23,8 @@ class ModelProvider:
     @staticmethod
     def get_openai_models() -> list[str]:
         """Get OpenAI models from litellm."""
+        import litellm
+
         # Use litellm's OpenAI-specific model list
         openai_models = litellm.open_ai_chat_completion_models
 
@@ -68,6 +68,8 @@ class ModelProvider:
     @staticmethod
     def get_anthropic_models() -> list[str]:
         """Get Anthropic models from litellm."""
+        import litellm
+
         # Use litellm's Anthropic-specific model list
         anthropic_models = litellm.anthropic_models
 
@@ -95,6 +97,8 @@ class ModelProvider:
     @staticmethod
     def get_gemini_models() -> list[str]:
         """Get Gemini models from litellm."""
+        import litellm
+
         # Use litellm's Gemini-specific model list
         gemini_models = litellm.gemini_models
 
@@ -116,6 +120,8 @@ class ModelProvider:
     @staticmethod
     def get_openrouter_models() -> list[str]:
         """Get OpenRouter models from litellm."""
+        import litellm
+
         # Use litellm's OpenRouter-specific model list
         openrouter_models = litellm.openrouter_models
 
@@ -7,8 +7,12 @@ def get_task_generation_prompt(
     dod_text: str,
     format_instructions: str,
     language: str,
+    context: str = "",
 ) -> str:
-    """Generate the prompt for task description generation."""
+    """Generate the prompt for task description generation.
+
+    ``context`` holds excerpts of attached code and diffs, if any.
+    """
     # Determine what needs to be generated vs what should be used as-is
     ac_instruction = ""
     dod_instruction = ""
@@ -27,10 +31,17 @@ Use the following Definition of Done exactly as provided (do not modify or gener
     else:
         dod_instruction = "Generate appropriate Definition of Done items for this task."
 
+    context_section = ""
+    if context.strip():
+        context_section = f"""
+Relevant code and changes (excerpts, for reference; mention files and symbols where useful):
+{context}
+"""
+
     return f"""Generate a professional task description in {language} based on the following information:
 
 Task Description: {task_description}
-
+{context_section}
 {ac_instruction}
 
 {dod_instruction}
@@ -53,6 +64,43 @@ User's refinement request:
 Please provide the refined description:"""
 
 
+def get_conversion_prompt(description: str, format_instructions: str, language: str) -> str:
+    """Generate the prompt for converting a task description to another platform format."""
+    return f"""Convert the following task description to the target format, in {language}.
+
+Keep the content, Acceptance Criteria and Definition of Done items unchanged; only adapt the structure and markup.
+
+Task description:
+{description}
+
+{format_instructions}
+
+Please provide only the converted description:"""
+
+
+def get_summary_prompt(text: str) -> str:
+    """Generate the prompt for summarizing one chunk of an oversized task description."""
+    return f"""Summarize the following part of a task description for a developer who will write the ticket.
+
+Keep requirements, decisions, names of components, files and errors, and any numbers that matter. Drop repetition, boilerplate and log noise. Do not add information.
+
+Text:
+{text}
+
+Please provide only the summary:"""
+
+
+def get_condensed_description(summary: str, excerpts: list[str]) -> str:
+    """Combine the summary of an oversized description with its verbatim excerpts."""
+    if not excerpts:
+        return summary
+    excerpt_text = "\n".join(f"    {excerpt}" for excerpt in excerpts)
+    return f"""{summary}
+
+Verbatim excerpts from the original text:
+{excerpt_text}"""
+
+
 def get_github_format_instructions() -> str:
     """Get format instructions for GitHub Markdown."""
     return """
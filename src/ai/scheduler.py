@@ -0,0 +1,205 @@
+"""Priority scheduling of AI calls under a shared rate-limit budget."""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from .usage import percentile
+
+PRIORITIES = ("interactive", "refine", "batch")
+WAIT_SAMPLES = 1000
+
+
+class TokenBucket:
+    """Token bucket refilled at a constant rate, allowing bursts up to its capacity."""
+
+    def __init__(self, rate_per_second: float, capacity: float) -> None:
+        """Initialize a full bucket."""
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def try_take(self, now: float) -> float:
+        """Take one token, returning 0 on success or the seconds until one is available."""
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._updated_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate_per_second
+
+
+class _Ticket:
+    """A waiting request and its fair-queuing tags."""
+
+    def __init__(self, priority: str, caller: str, finish: float, sequence: int) -> None:
+        self.priority = priority
+        self.caller = caller
+        self.finish = finish
+        self.sequence = sequence
+        self.enqueued_at = time.monotonic()
+        self.cancelled = False
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.finish, self.sequence) < (other.finish, other.sequence)
+
+
+class Scheduler:
+    """Admit AI calls by priority class, fairly across callers, within a shared budget.
+
+    Classes are served in ``PRIORITIES`` order: a waiting interactive request is
+    always admitted before refine and batch requests. Within a class, callers
+    share capacity by weighted fair queuing, so one caller's backlog cannot
+    starve the others. All classes draw from one budget of
+    ``requests_per_minute`` (0 for unlimited) and ``max_concurrency`` calls in
+    flight (0 for unlimited).
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        max_concurrency: int = 0,
+        weights: dict[str, float] | None = None,
+        burst: float | None = None,
+    ) -> None:
+        """Initialize the scheduler with its budget and per-caller weights."""
+        self.max_concurrency = max_concurrency
+        self.weights = weights or {}
+        self._bucket = (
+            TokenBucket(requests_per_minute / 60, burst or max(1.0, requests_per_minute / 60))
+            if requests_per_minute > 0
+            else None
+        )
+        self._condition = threading.Condition()
+        self._queues: dict[str, list[_Ticket]] = {priority: [] for priority in PRIORITIES}
+        self._virtual_time = dict.fromkeys(PRIORITIES, 0.0)
+        self._last_finish: dict[tuple[str, str], float] = {}
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._granted = dict.fromkeys(PRIORITIES, 0)
+        self._waits: dict[str, deque[float]] = {
+            priority: deque(maxlen=WAIT_SAMPLES) for priority in PRIORITIES
+        }
+
+    def acquire(
+        self, priority: str = "interactive", caller: str = "", timeout: float | None = None
+    ) -> None:
+        """Block until the request may call the provider.
+
+        Raises TimeoutError if it is not admitted within ``timeout`` seconds.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'. Use one of: {', '.join(PRIORITIES)}")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            ticket = self._enqueue(priority, caller)
+            while True:
+                delay = self._try_admit(ticket)
+                if delay == 0:
+                    break
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        ticket.cancelled = True
+                        self._condition.notify_all()
+                        raise TimeoutError("Timed out waiting for the scheduler")
+                    delay = min(delay, remaining) if delay else remaining
+                self._condition.wait(delay)
+            self._condition.notify_all()
+
+    def throttle(self, timeout: float | None = None) -> None:
+        """Block until the rate budget allows one more provider call.
+
+        For extra calls made on behalf of an admitted request, such as chunk
+        summaries: they count against ``requests_per_minute`` but hold no
+        concurrency slot. Raises TimeoutError after ``timeout`` seconds.
+        """
+        if self._bucket is None:
+            return
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while delay := self._bucket.try_take(time.monotonic()):
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for the scheduler")
+                    delay = min(delay, remaining)
+                self._condition.wait(delay)
+
+    def release(self) -> None:
+        """Mark an admitted request as finished."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(
+        self, priority: str = "interactive", caller: str = "", timeout: float | None = None
+    ) -> Iterator[None]:
+        """Hold an admission for the duration of the block."""
+        self.acquire(priority, caller, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _enqueue(self, priority: str, caller: str) -> _Ticket:
+        weight = self.weights.get(caller, 1.0)
+        start = max(self._virtual_time[priority], self._last_finish.get((priority, caller), 0.0))
+        finish = start + 1.0 / weight
+        self._last_finish[(priority, caller)] = finish
+        ticket = _Ticket(priority, caller, finish, next(self._sequence))
+        heapq.heappush(self._queues[priority], ticket)
+        return ticket
+
+    def _head(self) -> _Ticket | None:
+        for priority in PRIORITIES:
+            waiting = self._queues[priority]
+            while waiting and waiting[0].cancelled:
+                heapq.heappop(waiting)
+            if waiting:
+                return waiting[0]
+        return None
+
+    def _try_admit(self, ticket: _Ticket) -> float | None:
+        """Admit the ticket if it is next and there is budget; otherwise return how long to wait."""
+        if self._head() is not ticket:
+            return None
+        if self.max_concurrency and self._in_flight >= self.max_concurrency:
+            return None
+
+        if self._bucket is not None:
+            delay = self._bucket.try_take(time.monotonic())
+            if delay:
+                return delay
+
+        heapq.heappop(self._queues[ticket.priority])
+        self._virtual_time[ticket.priority] = ticket.finish
+        self._in_flight += 1
+        self._granted[ticket.priority] += 1
+        self._waits[ticket.priority].append((time.monotonic() - ticket.enqueued_at) * 1000)
+        return 0
+
+    def stats(self) -> dict[str, Any]:
+        """Get queue depth, admissions and wait times per priority class."""
+        with self._condition:
+            classes = {}
+            for priority in PRIORITIES:
+                waits = list(self._waits[priority])
+                classes[priority] = {
+                    "queued": sum(not ticket.cancelled for ticket in self._queues[priority]),
+                    "granted": self._granted[priority],
+                    "wait_p50_ms": percentile(waits, 0.50),
+                    "wait_p90_ms": percentile(waits, 0.90),
+                    "wait_max_ms": max(waits, default=0.0),
+                }
+            return {"in_flight": self._in_flight, "classes": classes}
@@ -1,43 +1,220 @@
 """AI integration module for TicketPlease."""
 
-import litellm
+import hashlib
+import json
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
 
+from . import metrics
+from .batches import BATCH_DISCOUNT, provider_model
+from .coalesce import SingleFlight, completion_flights
+from .keypool import KeyPool, key_id
 from .prompts import (
+    get_conversion_prompt,
     get_github_format_instructions,
     get_jira_format_instructions,
     get_refinement_prompt,
+    get_summary_prompt,
     get_task_generation_prompt,
 )
+from .summarize import Summarizer
+from .usage import UsageLedger, compute_cost, estimate_cost, extract_usage
 
 
 class AIService:
     """Service for interacting with AI models."""
 
-    def __init__(self, provider: str, api_key: str, model: str) -> None:
-        """Initialize the AI service."""
+    def __init__(
+        self,
+        provider: str,
+        api_key: str,
+        model: str,
+        ledger: UsageLedger | None = None,
+        api_base: str | None = None,
+        completion_fn: Callable[..., Any] | None = None,
+        flights: SingleFlight | None = None,
+        key_pool: KeyPool | None = None,
+        summarizer: Summarizer | None = None,
+    ) -> None:
+        """Initialize the AI service.
+
+        ``completion_fn`` replaces ``litellm.completion``, e.g. with a cassette player.
+        Identical concurrent completions share one upstream call through
+        ``flights`` (the process-wide group by default). With a ``key_pool``,
+        each call uses the pool key with the most rate-limit budget left and
+        is retried with another key on auth, quota or rate-limit errors.
+        With a ``summarizer``, oversized task descriptions are condensed
+        before they are put in the generation prompt.
+        """
         self.provider = provider
         self.api_key = api_key
         self.model = model
+        self.ledger = ledger
+        self.api_base = api_base
+        self.completion_fn = completion_fn
+        self.flights = flights or completion_flights
+        self.key_pool = key_pool
+        self.summarizer = summarizer
+        self.last_usage: dict[str, Any] | None = None
+        self._platform = ""
+        self._key_id = key_id(api_key)
         self._setup_litellm()
 
     def _setup_litellm(self) -> None:
         """Setup litellm configuration."""
+        import litellm
+
         litellm.api_key = self.api_key
         litellm.set_verbose = False
 
-    def _get_completion(self, prompt: str, error_message: str) -> str:
+    def _completion_params(self, prompt: str) -> dict[str, Any]:
+        """Build the standardized completion parameters for a prompt."""
+        completion_params: dict[str, Any] = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.7,
+            "max_tokens": 1000,
+        }
+        if self.api_base:
+            completion_params["api_base"] = self.api_base
+        return completion_params
+
+    def _complete(self, operation: str, **completion_params: Any) -> Any:
+        """Call the configured completion function, with a key from the pool if there is one."""
+        import litellm
+
+        completion = self.completion_fn or litellm.completion
+        if self.key_pool is None:
+            return completion(**completion_params)
+
+        tried: set[str] = set()
+        while True:
+            api_key = self.key_pool.acquire(tried)
+            try:
+                response = completion(**completion_params, api_key=api_key)
+            except Exception as e:
+                tried.add(api_key)
+                if not self.key_pool.report_error(api_key, e) or len(tried) == len(self.key_pool):
+                    raise
+                metrics.retries_total.inc(**self._metric_labels(operation))
+                continue
+            self.key_pool.release(api_key, response)
+            self._key_id = key_id(api_key)
+            return response
+
+    def _flight_key(self, completion_params: dict[str, Any]) -> str:
+        """Build the key under which identical requests are coalesced."""
+        payload = json.dumps(
+            [self.provider, self.api_key, completion_params], sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_completion(self, prompt: str, error_message: str, operation: str) -> str:
         """Get completion from LLM with standardized parameters."""
+        completion_params = self._completion_params(prompt)
+        started_at = time.perf_counter()
         try:
-            response = litellm.completion(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=1000,
+            response, coalesced = self.flights.do(
+                self._flight_key(completion_params),
+                lambda: self._complete(operation, **completion_params),
             )
-            return response.choices[0].message.content or ""
         except Exception as e:
+            metrics.completions_total.inc(result="error", **self._metric_labels(operation))
+            raise RuntimeError(f"{error_message}: {e}") from e
+
+        latency_ms = (time.perf_counter() - started_at) * 1000
+        self._record_usage(response, operation, latency_ms, coalesced)
+        return response.choices[0].message.content or ""
+
+    def _stream_completion(self, prompt: str, error_message: str, operation: str) -> Iterator[str]:
+        """Stream completion text from the LLM as it is generated."""
+        completion_params = self._completion_params(prompt)
+        completion_params["stream"] = True
+        completion_params["stream_options"] = {"include_usage": True}
+
+        started_at = time.perf_counter()
+        first_text_at = None
+        chunks = []
+        try:
+            for chunk in self._complete(operation, **completion_params):
+                chunks.append(chunk)
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    if first_text_at is None:
+                        first_text_at = time.perf_counter()
+                        metrics.time_to_first_token.observe(
+                            first_text_at - started_at, **self._metric_labels(operation)
+                        )
+                    yield content
+        except Exception as e:
+            metrics.completions_total.inc(result="error", **self._metric_labels(operation))
             raise RuntimeError(f"{error_message}: {e}") from e
 
+        latency_ms = (time.perf_counter() - started_at) * 1000
+        self._record_usage(self._rebuild_streamed_response(chunks), operation, latency_ms)
+
+    def _rebuild_streamed_response(self, chunks: list[Any]) -> Any:
+        """Rebuild a complete response from streamed chunks to extract usage and cost."""
+        import litellm
+
+        try:
+            return litellm.stream_chunk_builder(chunks)
+        except Exception:
+            return None
+
+    def _record_usage(
+        self, response: Any, operation: str, latency_ms: float, coalesced: bool = False
+    ) -> None:
+        """Keep the usage of the last call and append it to the ledger.
+
+        A coalesced call shared another caller's response, so it spent no tokens.
+        """
+        if coalesced:
+            tokens = {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+            cost = 0.0
+        else:
+            tokens = extract_usage(response)
+            cost = compute_cost(response)
+        self._store_usage(operation, tokens, cost, latency_ms, coalesced)
+
+    def _store_usage(
+        self,
+        operation: str,
+        tokens: dict[str, int],
+        cost: float,
+        latency_ms: float,
+        coalesced: bool = False,
+    ) -> None:
+        """Keep usage as ``last_usage``, count it in metrics and append it to the ledger."""
+        self.last_usage = {
+            "operation": operation,
+            "provider": self.provider,
+            "model": self.model,
+            "platform": self._platform,
+            **tokens,
+            "latency_ms": latency_ms,
+            "cost": cost,
+            "coalesced": coalesced,
+            "key_id": "" if coalesced else self._key_id,
+        }
+
+        labels = self._metric_labels(operation)
+        metrics.completions_total.inc(result="coalesced" if coalesced else "ok", **labels)
+        for token_type in ("prompt", "completion", "cached"):
+            metrics.tokens_total.inc(tokens[f"{token_type}_tokens"], type=token_type, **labels)
+
+        if self.ledger is not None:
+            self.ledger.record(**self.last_usage)
+
+    def _metric_labels(self, operation: str) -> dict[str, str]:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "platform": self._platform,
+            "operation": operation,
+        }
+
     def generate_task_description(
         self,
         task_description: str,
@@ -45,21 +222,122 @@ class AIService:
         definition_of_done: list[str],
         platform: str,
         language: str,
+        context: str = "",
     ) -> str:
-        """Generate a task description using AI."""
+        """Generate a task description using AI, with optional code ``context``."""
+        self._platform = platform
         prompt = self._build_prompt(
             task_description,
             acceptance_criteria,
             definition_of_done,
             platform,
             language,
+            context,
         )
-        return self._get_completion(prompt, "Error generating task description")
+        return self._get_completion(prompt, "Error generating task description", "generate")
+
+    def generate_task_description_stream(
+        self,
+        task_description: str,
+        acceptance_criteria: list[str],
+        definition_of_done: list[str],
+        platform: str,
+        language: str,
+        context: str = "",
+    ) -> Iterator[str]:
+        """Generate a task description using AI, yielding text as it is produced."""
+        self._platform = platform
+        prompt = self._build_prompt(
+            task_description,
+            acceptance_criteria,
+            definition_of_done,
+            platform,
+            language,
+            context,
+        )
+        return self._stream_completion(prompt, "Error generating task description", "generate")
 
     def refine_task_description(self, current_description: str, refinement_request: str) -> str:
         """Refine an existing task description."""
         prompt = get_refinement_prompt(current_description, refinement_request)
-        return self._get_completion(prompt, "Error refining task description")
+        return self._get_completion(prompt, "Error refining task description", "refine")
+
+    def refine_task_description_stream(
+        self, current_description: str, refinement_request: str
+    ) -> Iterator[str]:
+        """Refine an existing task description, yielding text as it is produced."""
+        prompt = get_refinement_prompt(current_description, refinement_request)
+        return self._stream_completion(prompt, "Error refining task description", "refine")
+
+    def convert_task_description(self, description: str, platform: str, language: str) -> str:
+        """Convert an existing task description to the format of another platform."""
+        self._platform = platform
+        prompt = get_conversion_prompt(description, self._format_instructions(platform), language)
+        return self._get_completion(prompt, "Error converting task description", "convert")
+
+    def convert_task_description_stream(
+        self, description: str, platform: str, language: str
+    ) -> Iterator[str]:
+        """Convert an existing task description, yielding text as it is produced."""
+        self._platform = platform
+        prompt = get_conversion_prompt(description, self._format_instructions(platform), language)
+        return self._stream_completion(prompt, "Error converting task description", "convert")
+
+    def summarize_chunk(self, text: str) -> str:
+        """Summarize one chunk of an oversized task description."""
+        return self._get_completion(
+            get_summary_prompt(text), "Error summarizing task description", "summarize"
+        )
+
+    def batch_request(self, spec: dict[str, Any]) -> dict[str, Any]:
+        """Build the provider batch request parameters for a parsed task spec.
+
+        The prompt and parameters are the same as for the live call; the model
+        is named the way the provider's own API expects.
+        """
+        if spec["operation"] == "refine":
+            prompt = get_refinement_prompt(spec["description"], spec["refinement"])
+        elif spec["operation"] == "convert":
+            prompt = get_conversion_prompt(
+                spec["description"], self._format_instructions(spec["platform"]), spec["language"]
+            )
+        else:
+            prompt = self._build_prompt(
+                spec["description"],
+                spec["acceptance_criteria"],
+                spec["definition_of_done"],
+                spec["platform"],
+                spec["language"],
+                spec.get("context", ""),
+            )
+
+        params = self._completion_params(prompt)
+        params.pop("api_base", None)
+        params["model"] = provider_model(self.provider, self.model)
+        return params
+
+    def record_batch_usage(
+        self, spec: dict[str, Any], usage: dict[str, int], latency_ms: float
+    ) -> dict[str, Any]:
+        """Record the usage of a provider batch result, priced at the batch discount."""
+        if spec["operation"] != "refine":
+            self._platform = spec["platform"]
+        tokens = {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "cached_tokens": 0,
+        }
+        cost = BATCH_DISCOUNT * estimate_cost(
+            self.model, tokens["prompt_tokens"], tokens["completion_tokens"]
+        )
+        self._store_usage(spec["operation"], tokens, cost, latency_ms)
+        return dict(self.last_usage or {})
+
+    def _format_instructions(self, platform: str) -> str:
+        """Get the format instructions for a platform."""
+        if platform.lower() == "github":
+            return get_github_format_instructions()
+        return get_jira_format_instructions()
 
     def _build_prompt(
         self,
@@ -68,16 +346,19 @@ class AIService:
         definition_of_done: list[str],
         platform: str,
         language: str,
+        context: str = "",
     ) -> str:
         """Build the prompt for task description generation."""
+        if self.summarizer is not None:
+            task_description = self.summarizer.condense(task_description)
         ac_text = "\n".join(f"- {criterion}" for criterion in acceptance_criteria)
         dod_text = "\n".join(f"- {item}" for item in definition_of_done)
 
-        if platform.lower() == "github":
-            format_instructions = get_github_format_instructions()
-        else:  # Jira
-            format_instructions = get_jira_format_instructions()
-
         return get_task_generation_prompt(
-            task_description, ac_text, dod_text, format_instructions, language
+            task_description,
+            ac_text,
+            dod_text,
+            self._format_instructions(platform),
+            language,
+            context,
         )
@@ -0,0 +1,179 @@
+"""Map-reduce condensation of oversized task descriptions.
+
+Pasted stack traces, log dumps or design drafts can exceed what the
+generation prompt should carry. Such descriptions are split into chunks,
+each chunk is summarized concurrently (usually with a cheaper model), and
+the summaries are reduced again until they fit. Salient lines such as
+errors are kept verbatim, since summaries tend to paraphrase them away.
+Chunk summaries are cached by content hash, so pasting the same log twice
+costs nothing.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .prompts import get_condensed_description
+from .scheduler import Scheduler
+
+MAX_CHARS = 12000
+CHUNK_CHARS = 6000
+MAX_WORKERS = 4
+MAX_ROUNDS = 3
+MAX_EXCERPTS = 12
+EXCERPT_CHARS = 240
+
+_SALIENT = re.compile(
+    r"(errors?|exceptions?)\b|\b(traceback|fatal|fail(ed|ure)?|panic|critical|warn(ing)?)\b"
+    r"|^\s*(at \S+\(|File \".+\", line \d+)",
+    re.IGNORECASE,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    key TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    summary TEXT NOT NULL
+);
+"""
+
+
+def chunk_text(text: str, chunk_chars: int) -> list[str]:
+    """Split text into chunks of at most ``chunk_chars``, preferring line boundaries."""
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        while len(line) > chunk_chars:
+            line_part, line = line[:chunk_chars], line[chunk_chars:]
+            if current:
+                chunks.append("".join(current))
+                current, size = [], 0
+            chunks.append(line_part)
+        if size + len(line) > chunk_chars and current:
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    if current:
+        chunks.append("".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def salient_lines(text: str, limit: int = MAX_EXCERPTS) -> list[str]:
+    """Get the first distinct error-like lines of a text, shortened to ``EXCERPT_CHARS``."""
+    excerpts: list[str] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or not _SALIENT.search(line):
+            continue
+        line = line[:EXCERPT_CHARS]
+        if line not in excerpts:
+            excerpts.append(line)
+            if len(excerpts) == limit:
+                break
+    return excerpts
+
+
+class SummaryCache:
+    """SQLite cache of chunk summaries keyed by a hash of the model and chunk text."""
+
+    def __init__(self, db_path: Path) -> None:
+        """Initialize the cache. The database is opened lazily on first use."""
+        self.db_path = db_path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database connection and ensure the schema exists."""
+        if self._connection is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.db_path, isolation_level=None, timeout=5.0, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> str | None:
+        """Get a cached summary, or None when the chunk has not been summarized."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT summary FROM summaries WHERE key = ?", (key,))
+                .fetchone()
+            )
+        return row[0] if row else None
+
+    def put(self, key: str, summary: str) -> None:
+        """Store a chunk summary."""
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO summaries (key, created_at, summary) VALUES (?, ?, ?)",
+                (key, time.time(), summary),
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class Summarizer:
+    """Condense descriptions longer than ``max_chars`` with concurrent chunk summaries.
+
+    ``summarize`` turns one chunk into its summary, e.g. a service's
+    ``summarize_chunk``; ``model`` names it in cache keys. With a
+    ``scheduler``, each uncached summary waits for the shared rate budget.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[str], str],
+        model: str,
+        cache: SummaryCache | None = None,
+        max_chars: int = MAX_CHARS,
+        chunk_chars: int = CHUNK_CHARS,
+        max_workers: int = MAX_WORKERS,
+        scheduler: Scheduler | None = None,
+    ) -> None:
+        """Initialize the summarizer; a ``max_chars`` of 0 disables it."""
+        self.summarize = summarize
+        self.model = model
+        self.cache = cache
+        self.max_chars = max_chars
+        self.chunk_chars = chunk_chars
+        self.max_workers = max_workers
+        self.scheduler = scheduler
+
+    def condense(self, text: str) -> str:
+        """Return the text unchanged if it fits, else its summary and salient excerpts."""
+        if self.max_chars <= 0 or len(text) <= self.max_chars:
+            return text
+
+        summary = text
+        for _ in range(MAX_ROUNDS):
+            chunks = chunk_text(summary, self.chunk_chars)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+                summary = "\n\n".join(pool.map(self._summarize_chunk, chunks))
+            if len(summary) <= self.max_chars or len(chunks) == 1:
+                break
+        return get_condensed_description(summary[: self.max_chars], salient_lines(text))
+
+    def _summarize_chunk(self, chunk: str) -> str:
+        key = hashlib.sha256(f"{self.model}\0{chunk}".encode()).hexdigest()
+        summary = self.cache.get(key) if self.cache is not None else None
+        if summary is None:
+            if self.scheduler is not None:
+                self.scheduler.throttle()
+            summary = self.summarize(chunk).strip()
+            if self.cache is not None and summary:
+                self.cache.put(key, summary)
+        return summary
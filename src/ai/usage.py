@@ -0,0 +1,228 @@
+"""Local token and cost ledger for AI completions."""
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+GROUP_BY_COLUMNS = {
+    "day": "date(created_at, 'unixepoch', 'localtime')",
+    "model": "model",
+    "provider": "provider",
+    "platform": "platform",
+    "operation": "operation",
+    "key": "key_id",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    operation TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    platform TEXT NOT NULL DEFAULT '',
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0,
+    latency_ms REAL NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    coalesced INTEGER NOT NULL DEFAULT 0,
+    key_id TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_usage_created_at ON usage (created_at);
+"""
+
+_ADDED_COLUMNS = {
+    "coalesced": "ALTER TABLE usage ADD COLUMN coalesced INTEGER NOT NULL DEFAULT 0",
+    "key_id": "ALTER TABLE usage ADD COLUMN key_id TEXT NOT NULL DEFAULT ''",
+}
+
+
+def extract_usage(response: Any) -> dict[str, int]:
+    """Extract prompt, completion and cached token counts from a completion response."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+
+    prompt_details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(prompt_details, "cached_tokens", None) or getattr(
+        usage, "cache_read_input_tokens", 0
+    )
+
+    return {
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+        "cached_tokens": int(cached_tokens or 0),
+    }
+
+
+def compute_cost(response: Any) -> float:
+    """Compute the cost of a completion response using litellm's cost tables."""
+    import litellm
+
+    try:
+        return float(litellm.completion_cost(completion_response=response) or 0.0)
+    except Exception:
+        return 0.0
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate the cost of a token count using litellm's cost tables."""
+    import litellm
+
+    try:
+        prompt_cost, completion_cost = litellm.cost_per_token(
+            model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+        return float(prompt_cost + completion_cost)
+    except Exception:
+        return 0.0
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class UsageLedger:
+    """Append-only SQLite ledger of AI completion usage."""
+
+    def __init__(self, db_path: Path) -> None:
+        """Initialize the ledger. The database is opened lazily on first use."""
+        self.db_path = db_path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database connection and ensure the schema exists."""
+        if self._connection is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.db_path, isolation_level=None, timeout=5.0, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._migrate(connection)
+            self._connection = connection
+        return self._connection
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        """Add columns introduced after a ledger was created."""
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(usage)")}
+        for column, statement in _ADDED_COLUMNS.items():
+            if column not in columns:
+                connection.execute(statement)
+
+    def record(
+        self,
+        operation: str,
+        provider: str,
+        model: str,
+        platform: str = "",
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cached_tokens: int = 0,
+        latency_ms: float = 0.0,
+        cost: float = 0.0,
+        coalesced: bool = False,
+        key_id: str = "",
+    ) -> None:
+        """Append a usage entry. Ledger failures never interrupt the caller."""
+        try:
+            with self._lock:
+                self._connect().execute(
+                    "INSERT INTO usage (created_at, operation, provider, model, platform, "
+                    "prompt_tokens, completion_tokens, cached_tokens, latency_ms, cost, coalesced, "
+                    "key_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        time.time(),
+                        operation,
+                        provider,
+                        model,
+                        platform,
+                        prompt_tokens,
+                        completion_tokens,
+                        cached_tokens,
+                        latency_ms,
+                        cost,
+                        int(coalesced),
+                        key_id,
+                    ),
+                )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Could not record usage in %s: %s", self.db_path, e)
+
+    def summarize(self, group_by: str = "day", since: float | None = None) -> list[dict[str, Any]]:
+        """Aggregate usage entries by the given dimension."""
+        if group_by not in GROUP_BY_COLUMNS:
+            raise ValueError(
+                f"Unsupported grouping '{group_by}'. Use one of: {', '.join(GROUP_BY_COLUMNS)}"
+            )
+
+        if not Path(self.db_path).exists():
+            return []
+
+        query = (
+            f"SELECT {GROUP_BY_COLUMNS[group_by]} AS grp, prompt_tokens, completion_tokens, "
+            "cached_tokens, latency_ms, cost, coalesced FROM usage"
+        )
+        params: tuple[Any, ...] = ()
+        if since is not None:
+            query += " WHERE created_at >= ?"
+            params = (since,)
+
+        with self._lock:
+            rows = self._connect().execute(query, params).fetchall()
+
+        groups: dict[str, dict[str, Any]] = {}
+        for row in rows:
+            key, prompt_tokens, completion_tokens, cached_tokens, latency_ms, cost, coalesced = row
+            group = groups.setdefault(
+                key or "-",
+                {
+                    "group": key or "-",
+                    "calls": 0,
+                    "coalesced": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cached_tokens": 0,
+                    "cost": 0.0,
+                    "latencies": [],
+                },
+            )
+            group["calls"] += 1
+            group["coalesced"] += coalesced
+            group["prompt_tokens"] += prompt_tokens
+            group["completion_tokens"] += completion_tokens
+            group["cached_tokens"] += cached_tokens
+            group["cost"] += cost
+            group["latencies"].append(latency_ms)
+
+        summary = []
+        for key in sorted(groups):
+            group = groups[key]
+            latencies = group.pop("latencies")
+            group["latency_p50_ms"] = percentile(latencies, 0.50)
+            group["latency_p90_ms"] = percentile(latencies, 0.90)
+            group["latency_p99_ms"] = percentile(latencies, 0.99)
+            summary.append(group)
+
+        return summary
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -3,7 +3,23 @@
 import typer
 from rich.console import Console
 
-from ticketplease.main import run_config, run_task_generation
+from ticketplease.main import (
+    build_config,
+    run_batch,
+    run_config,
+    run_daemon,
+    run_non_interactive_generation,
+    run_serve,
+    run_stats,
+    run_stream,
+    run_symbol_index,
+    run_task_generation,
+    run_template_search,
+    run_worker,
+    show_daemon_status,
+    stop_daemon,
+)
+from ticketplease.output import OUTPUT_FORMATS
 
 from . import __version__
 
@@ -12,13 +28,86 @@ app = typer.Typer(
     help="CLI assistant for generating task descriptions using AI",
     add_completion=False,
 )
+templates_app = typer.Typer(help="Work with the AC/DoD template library")
+app.add_typer(templates_app, name="templates")
 console = Console()
 
 
 @app.command()
-def please() -> None:
-    """Start the interactive task generation flow."""
-    run_task_generation()
+def please(
+    description_file: str | None = typer.Option(
+        None,
+        "--description-file",
+        "-f",
+        help="Read the task description from a file ('-' for stdin) and skip all prompts",
+    ),
+    ac: str | None = typer.Option(None, "--ac", help="Acceptance criteria file"),
+    dod: str | None = typer.Option(None, "--dod", help="Definition of done file"),
+    platform: str | None = typer.Option(None, "--platform", "-p", help="github or jira"),
+    language: str | None = typer.Option(None, "--language", "-l", help="Output language code"),
+    model: str | None = typer.Option(None, "--model", "-m", help="Model to use for this run"),
+    output: str | None = typer.Option(
+        None, "--output", "-o", help="Write the result to a file ('-' for stdout)"
+    ),
+    output_format: str | None = typer.Option(
+        None,
+        "--format",
+        help="Write the result as plain, json or markdown to stdout instead of the rich view",
+    ),
+    relevant_items: int | None = typer.Option(
+        None,
+        "--relevant-items",
+        "-k",
+        min=0,
+        help="Send only the N AC/DoD items most relevant to the task (0 sends all)",
+    ),
+    attach: list[str] | None = typer.Option(
+        None,
+        "--attach",
+        "-a",
+        help="Add excerpts of a code file as context (repeat for several files)",
+    ),
+    from_diff: str | None = typer.Option(
+        None, "--from-diff", help="Add excerpts of the git diff of a revision range as context"
+    ),
+) -> None:
+    """Generate a task description interactively, or from files with --description-file."""
+    if output_format and output_format not in OUTPUT_FORMATS:
+        raise typer.BadParameter(
+            f"--format must be one of: {', '.join(OUTPUT_FORMATS)}", param_hint="--format"
+        )
+
+    if description_file is None:
+        if ac or dod or output:
+            raise typer.BadParameter("--ac, --dod and --output require --description-file")
+        run_task_generation(
+            build_config(
+                platform=platform,
+                language=language,
+                model=model,
+                relevant_items=relevant_items,
+            ),
+            output_format,
+            attach=attach,
+            from_diff=from_diff,
+        )
+        return
+
+    succeeded = run_non_interactive_generation(
+        description_file,
+        ac_file=ac,
+        dod_file=dod,
+        platform=platform,
+        language=language,
+        model=model,
+        output=output or "-",
+        output_format=output_format or "plain",
+        relevant_items=relevant_items,
+        attach=attach,
+        from_diff=from_diff,
+    )
+    if not succeeded:
+        raise typer.Exit(code=1)
 
 
 @app.command()
@@ -27,6 +116,159 @@ def config() -> None:
     run_config(is_update=True)
 
 
+@app.command()
+def stream(
+    concurrency: int = typer.Option(
+        4, "--concurrency", "-c", min=1, help="Maximum number of tasks processed at once"
+    ),
+) -> None:
+    """Read JSON task specs from stdin (one per line) and write JSON results to stdout."""
+    if not run_stream(concurrency):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def batch(
+    input_file: str = typer.Argument(
+        ..., help="File of JSON task specs, one per line ('-' for stdin)"
+    ),
+    output: str = typer.Option("-", "--output", "-o", help="Write JSON results to a file"),
+    concurrency: int = typer.Option(
+        4, "--concurrency", "-c", min=1, help="Maximum number of tasks processed at once"
+    ),
+    caller: str | None = typer.Option(
+        None, "--caller", help="Name used to share capacity fairly with other batch jobs"
+    ),
+    journal: str | None = typer.Option(
+        None,
+        "--journal",
+        help="Checkpoint file used to resume interrupted runs (default: one per input file)",
+    ),
+    spool: str | None = typer.Option(
+        None, "--spool", help="Queue the tasks in a shared directory for tk worker processes"
+    ),
+    async_provider_batch: bool = typer.Option(
+        False,
+        "--async-provider-batch",
+        help="Submit the tasks to the provider's batch API (cheaper, results within 24h)",
+    ),
+    poll_interval: float = typer.Option(
+        30, "--poll-interval", min=0, help="Seconds between provider batch status checks"
+    ),
+) -> None:
+    """Process a file of JSON task specs at batch priority, behind interactive requests."""
+    if not run_batch(
+        input_file,
+        output,
+        concurrency,
+        caller,
+        journal,
+        spool,
+        async_provider_batch,
+        poll_interval,
+    ):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def worker(
+    spool: str = typer.Argument(..., help="Shared spool directory filled by tk batch --spool"),
+    concurrency: int = typer.Option(
+        4, "--concurrency", "-c", min=1, help="Maximum number of jobs processed at once"
+    ),
+    lease: float = typer.Option(
+        60,
+        "--lease",
+        min=1,
+        help="Seconds before jobs of an unresponsive worker are requeued (same on all workers)",
+    ),
+    exit_when_empty: bool = typer.Option(
+        False, "--exit-when-empty", help="Exit once no jobs are pending or leased"
+    ),
+) -> None:
+    """Process batch jobs from a shared spool, on this machine and with its API key."""
+    if not run_worker(spool, concurrency, lease, exit_when_empty):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def daemon(
+    idle_timeout: float = typer.Option(
+        900, "--idle-timeout", "-t", min=0, help="Exit after N idle seconds (0 to never exit)"
+    ),
+    concurrency: int = typer.Option(
+        4, "--concurrency", "-c", min=1, help="Maximum number of requests processed at once"
+    ),
+    stop: bool = typer.Option(False, "--stop", help="Stop the running daemon"),
+    status: bool = typer.Option(False, "--status", help="Show whether a daemon is running"),
+) -> None:
+    """Keep AI services warm in the background so other tk commands start faster."""
+    if stop:
+        succeeded = stop_daemon()
+    elif status:
+        succeeded = show_daemon_status()
+    else:
+        succeeded = run_daemon(idle_timeout, concurrency)
+    if not succeeded:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on"),
+    port: int = typer.Option(8765, "--port", help="Port to listen on"),
+    concurrency: int = typer.Option(
+        4, "--concurrency", "-c", min=1, help="Maximum number of AI calls running at once"
+    ),
+    timeout: float = typer.Option(
+        120, "--timeout", "-t", min=1, help="Seconds before a request fails with 504"
+    ),
+    max_pending: int = typer.Option(
+        64, "--max-pending", min=1, help="Requests allowed in flight before answering 503"
+    ),
+) -> None:
+    """Serve generate, refine and convert endpoints over a local HTTP API."""
+    if not run_serve(host, port, concurrency, timeout, max_pending):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def stats(
+    by: str = typer.Option(
+        "day", "--by", "-b", help="Group by day, model, provider, platform, operation or key"
+    ),
+    days: int = typer.Option(0, "--days", "-d", help="Only include the last N days"),
+) -> None:
+    """Show token usage and cost recorded locally."""
+    if not run_stats(group_by=by, days=days or None):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def index(
+    query: str | None = typer.Argument(
+        None, help="Text naming symbols or files to look up instead of printing counts"
+    ),
+) -> None:
+    """Update the symbol index of the current git repository."""
+    if not run_symbol_index(query):
+        raise typer.Exit(code=1)
+
+
+@templates_app.command("search")
+def templates_search(
+    query: str = typer.Argument(..., help="Words to look for; misspellings and prefixes match"),
+    limit: int = typer.Option(10, "--limit", "-n", min=1, help="Maximum number of items"),
+    as_json: bool = typer.Option(False, "--json", help="Print one JSON object per item"),
+    library: str | None = typer.Option(
+        None, "--library", help="Template library directory (default: from configuration)"
+    ),
+) -> None:
+    """Search the items of the template library, best matches first."""
+    if not run_template_search(query, limit, as_json, library):
+        raise typer.Exit(code=1)
+
+
 @app.callback(invoke_without_command=True)
 def main(
     ctx: typer.Context,
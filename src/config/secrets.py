@@ -0,0 +1,193 @@
+"""API key storage in the OS keyring with a short-lived session cache."""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import keyring
+from keyring.backend import KeyringBackend
+from keyring.errors import KeyringError, PasswordDeleteError
+
+from .storage import atomic_write
+
+KEYRING_SERVICE = "ticketplease"
+DEFAULT_CACHE_TTL = 300.0
+
+_memory_cache: dict[str, tuple[str, float]] = {}
+_memory_cache_lock = threading.Lock()
+
+
+class _ExplicitOnly:
+    """Priority that raises, so keyring never selects the backend automatically."""
+
+    def __get__(self, instance: object, owner: type) -> float:
+        raise RuntimeError(f"{owner.__name__} must be configured explicitly")
+
+
+class FileKeyring(KeyringBackend):
+    """Keyring backend storing secrets in a local JSON file.
+
+    Intended for tests and headless CI. It is never selected automatically;
+    enable it with ``keyring.set_keyring(FileKeyring(path))`` or
+    ``PYTHON_KEYRING_BACKEND=config.secrets.FileKeyring`` (path from
+    ``TK_KEYRING_FILE``).
+    """
+
+    priority = _ExplicitOnly()  # type: ignore[assignment]
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Initialize the backend with the file that holds the secrets."""
+        super().__init__()
+        default_path = Path.home() / ".config" / "ticketplease" / "keyring.json"
+        self.path = Path(path or os.environ.get("TK_KEYRING_FILE") or default_path)
+
+    def _read(self) -> dict[str, dict[str, str]]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+
+    def get_password(self, service: str, username: str) -> str | None:
+        """Get the secret stored for a service and username."""
+        return self._read().get(service, {}).get(username)
+
+    def set_password(self, service: str, username: str, password: str) -> None:
+        """Store a secret for a service and username."""
+        secrets = self._read()
+        secrets.setdefault(service, {})[username] = password
+        atomic_write(self.path, json.dumps(secrets))
+
+    def delete_password(self, service: str, username: str) -> None:
+        """Delete the secret stored for a service and username."""
+        secrets = self._read()
+        if username not in secrets.get(service, {}):
+            raise PasswordDeleteError("Secret not found")
+        del secrets[service][username]
+        atomic_write(self.path, json.dumps(secrets))
+
+
+def _cache_ttl() -> float:
+    try:
+        return float(os.environ.get("TK_KEYRING_CACHE_TTL", DEFAULT_CACHE_TTL))
+    except ValueError:
+        return DEFAULT_CACHE_TTL
+
+
+def _session_cache_path() -> Path | None:
+    """Return the per-user session cache file, kept on the runtime tmpfs only."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir or not os.path.isdir(runtime_dir):
+        return None
+    return Path(runtime_dir) / "ticketplease" / "keyring-cache.json"
+
+
+class SecretStore:
+    """Read and write API keys through the OS keyring.
+
+    Lookups are cached in memory for the process and, on systems with an
+    ``XDG_RUNTIME_DIR``, in a 0600 session file on the runtime tmpfs so that
+    consecutive ``tk`` invocations skip slow keyring backends. Entries expire
+    after ``TK_KEYRING_CACHE_TTL`` seconds (0 disables caching).
+    """
+
+    def __init__(self, service: str = KEYRING_SERVICE) -> None:
+        """Initialize the store for a keyring service name."""
+        self.service = service
+
+    def _cache_key(self, username: str) -> str:
+        return f"{self.service}:{username}"
+
+    def get(self, username: str) -> str | None:
+        """Get a secret, using the session cache when it is still fresh."""
+        ttl = _cache_ttl()
+        cache_key = self._cache_key(username)
+        now = time.time()
+
+        if ttl > 0:
+            cached = self._read_cache(cache_key, now)
+            if cached is not None:
+                return cached
+
+        try:
+            secret = keyring.get_password(self.service, username)
+        except KeyringError:
+            return None
+
+        if secret is not None and ttl > 0:
+            self._write_cache(cache_key, secret, now + ttl)
+        return secret
+
+    def set(self, username: str, secret: str) -> None:
+        """Store a secret in the keyring. Raises KeyringError if no backend is usable."""
+        keyring.set_password(self.service, username, secret)
+        self._forget(self._cache_key(username))
+
+    def delete(self, username: str) -> None:
+        """Remove a secret from the keyring, ignoring missing entries."""
+        try:
+            keyring.delete_password(self.service, username)
+        except (PasswordDeleteError, KeyringError):
+            pass
+        self._forget(self._cache_key(username))
+
+    def _read_cache(self, cache_key: str, now: float) -> str | None:
+        with _memory_cache_lock:
+            cached = _memory_cache.get(cache_key)
+        if cached and cached[1] > now:
+            return cached[0]
+
+        session_entry = self._load_session_cache().get(cache_key)
+        if session_entry and session_entry[1] > now:
+            with _memory_cache_lock:
+                _memory_cache[cache_key] = (session_entry[0], session_entry[1])
+            return session_entry[0]
+        return None
+
+    def _write_cache(self, cache_key: str, secret: str, expires_at: float) -> None:
+        with _memory_cache_lock:
+            _memory_cache[cache_key] = (secret, expires_at)
+
+        path = _session_cache_path()
+        if path is None:
+            return
+        now = time.time()
+        entries = {
+            key: value for key, value in self._load_session_cache().items() if value[1] > now
+        }
+        entries[cache_key] = (secret, expires_at)
+        try:
+            atomic_write(path, json.dumps(entries))
+        except OSError:
+            pass
+
+    def _forget(self, cache_key: str) -> None:
+        with _memory_cache_lock:
+            _memory_cache.pop(cache_key, None)
+
+        path = _session_cache_path()
+        entries = self._load_session_cache()
+        if path is not None and cache_key in entries:
+            del entries[cache_key]
+            try:
+                atomic_write(path, json.dumps(entries))
+            except OSError:
+                pass
+
+    def _load_session_cache(self) -> dict[str, tuple[str, float]]:
+        path = _session_cache_path()
+        if path is None:
+            return {}
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            return {key: (str(value[0]), float(value[1])) for key, value in raw.items()}
+        except (OSError, ValueError, TypeError, KeyError, IndexError, AttributeError):
+            # Unreadable or malformed caches are treated as empty and rewritten
+            return {}
+
+
+def clear_memory_cache() -> None:
+    """Forget all secrets cached in this process."""
+    with _memory_cache_lock:
+        _memory_cache.clear()
@@ -1,9 +1,78 @@
 """Configuration management for TicketPlease."""
 
+import copy
+import os
+import threading
 from pathlib import Path
 from typing import Any
 
 import toml
+from keyring.errors import KeyringError
+
+from .secrets import SecretStore
+from .storage import atomic_write, file_lock, parse_toml
+
+SnapshotKey = tuple[int, int, int]
+
+ENV_OVERRIDES = {
+    ("api_keys", "provider"): "TK_PROVIDER",
+    ("api_keys", "api_key"): "TK_API_KEY",
+    ("llm", "model"): "TK_MODEL",
+    ("llm", "api_base"): "TK_API_BASE",
+    ("llm", "summary_model"): "TK_SUMMARY_MODEL",
+    ("preferences", "default_output_language"): "TK_LANGUAGE",
+    ("preferences", "default_platform"): "TK_PLATFORM",
+    ("preferences", "default_ac_path"): "TK_AC_PATH",
+    ("preferences", "default_dod_path"): "TK_DOD_PATH",
+    ("preferences", "template_library"): "TK_TEMPLATE_LIBRARY",
+    ("preferences", "relevant_items"): "TK_RELEVANT_ITEMS",
+    ("preferences", "max_description_chars"): "TK_MAX_DESCRIPTION_CHARS",
+    ("preferences", "context_tokens"): "TK_CONTEXT_TOKENS",
+    ("preferences", "template_tags"): "TK_TEMPLATE_TAGS",
+    ("preferences", "symbol_index"): "TK_SYMBOL_INDEX",
+    ("limits", "requests_per_minute"): "TK_REQUESTS_PER_MINUTE",
+    ("limits", "max_concurrency"): "TK_MAX_CONCURRENCY",
+}
+
+_snapshots: dict[Path, tuple[SnapshotKey, dict[str, Any]]] = {}
+_snapshots_lock = threading.Lock()
+
+
+def _snapshot_key(stat_result: os.stat_result) -> SnapshotKey:
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+
+def load_snapshot(path: Path) -> dict[str, Any] | None:
+    """Return a private copy of the parsed file, reusing the process-wide snapshot.
+
+    The snapshot is revalidated against the (mtime, size, inode) of the opened
+    file, so it is only re-parsed after the file has been replaced or modified.
+    Returns None if the file does not exist.
+    """
+    try:
+        with open(path, "rb") as config_file:
+            key = _snapshot_key(os.fstat(config_file.fileno()))
+            with _snapshots_lock:
+                cached = _snapshots.get(path)
+            if cached is None or cached[0] != key:
+                parsed = parse_toml(config_file.read())
+                with _snapshots_lock:
+                    _snapshots[path] = (key, parsed)
+                cached = (key, parsed)
+    except FileNotFoundError:
+        return None
+
+    return copy.deepcopy(cached[1])
+
+
+def snapshot_is_current(path: Path) -> bool:
+    """Check whether the cached snapshot still matches the file on disk."""
+    with _snapshots_lock:
+        cached = _snapshots.get(path)
+    try:
+        return cached is not None and cached[0] == _snapshot_key(os.stat(path))
+    except FileNotFoundError:
+        return cached is None
 
 
 class Config:
@@ -14,23 +83,82 @@ class Config:
         self.config_dir = Path.home() / ".config" / "ticketplease"
         self.config_file = self.config_dir / "config.toml"
         self._config: dict[str, Any] | None = None
+        self._overrides: dict[tuple[str, str], str] = {}
+
+    def set_override(self, section: str, key: str, value: str) -> None:
+        """Override a setting for this process only. Overrides are never saved."""
+        self._overrides[(section, key)] = value
+
+    def _get_setting(self, section: str, key: str, default: Any = None) -> Any:
+        """Resolve a setting from overrides, then TK_* environment variables, then the file."""
+        if (section, key) in self._overrides:
+            return self._overrides[(section, key)]
+
+        env_var = ENV_OVERRIDES.get((section, key))
+        if env_var and os.environ.get(env_var):
+            return os.environ[env_var]
+
+        return self.load().get(section, {}).get(key, default)
 
     def load(self) -> dict[str, Any]:
         """Load configuration from file."""
         if self._config is None:
-            if self.config_file.exists():
-                self._config = toml.load(self.config_file)
-            else:
-                self._config = self._get_default_config()
+            snapshot = load_snapshot(self.config_file) if self.config_file.exists() else None
+            self._config = snapshot if snapshot is not None else self._get_default_config()
         return self._config
 
+    def reload_if_changed(self) -> bool:
+        """Drop the loaded configuration if the file changed on disk since it was read."""
+        if self._config is None or snapshot_is_current(self.config_file):
+            return False
+        self._config = None
+        return True
+
     def save(self, config: dict[str, Any]) -> None:
-        """Save configuration to file."""
-        self.config_dir.mkdir(parents=True, exist_ok=True)
-        with open(self.config_file, "w") as f:
-            toml.dump(config, f)
+        """Save configuration to file atomically under an exclusive lock.
+
+        A plaintext API key is moved to the OS keyring when one is available and
+        only a marker is written to the file.
+        """
+        file_config = self._move_api_key_to_keyring(config)
+        lock_path = self.config_file.with_name(self.config_file.name + ".lock")
+        with file_lock(lock_path):
+            atomic_write(self.config_file, toml.dumps(file_config))
+            load_snapshot(self.config_file)
         self._config = config
 
+    def _move_api_key_to_keyring(self, config: dict[str, Any]) -> dict[str, Any]:
+        """Return the configuration to write to disk, storing API keys in the keyring.
+
+        Pool keys are stored as ``<provider>#<n>`` and only their count is written.
+        """
+        api_keys = config.get("api_keys", {})
+        api_key = api_keys.get("api_key")
+        provider = api_keys.get("provider")
+        pool = api_keys.get("pool")
+        plaintext_pool = {
+            name: keys
+            for name, keys in (pool.items() if isinstance(pool, dict) else ())
+            if isinstance(keys, list)
+        }
+        if not (api_key and provider) and not plaintext_pool:
+            return config
+
+        store = SecretStore()
+        file_config = copy.deepcopy(config)
+        try:
+            if api_key and provider:
+                store.set(provider, api_key)
+                file_config["api_keys"].pop("api_key")
+                file_config["api_keys"]["api_key_storage"] = "keyring"
+            for name, keys in plaintext_pool.items():
+                for number, key in enumerate(keys, 1):
+                    store.set(f"{name}#{number}", str(key))
+                file_config["api_keys"]["pool"][name] = len(keys)
+        except KeyringError:
+            return config
+        return file_config
+
     def _get_default_config(self) -> dict[str, Any]:
         """Get default configuration."""
         return {
@@ -50,46 +178,151 @@ class Config:
         }
 
     def get_api_key(self) -> str | None:
-        """Get the API key from configuration."""
-        config = self.load()
-        return config.get("api_keys", {}).get("api_key")
+        """Get the API key from overrides, configuration or the OS keyring."""
+        api_key = self._get_setting("api_keys", "api_key")
+        if api_key:
+            return api_key
+
+        api_keys = self.load().get("api_keys", {})
+        provider = self.get_provider()
+        if api_keys.get("api_key_storage") == "keyring" and provider:
+            return SecretStore().get(provider)
+
+        return api_key
+
+    def get_api_keys(self) -> list[str]:
+        """Get every API key for the provider: the main key, then its pool.
+
+        The pool comes from TK_API_KEYS (comma-separated) or from the
+        ``[api_keys.pool]`` table, which lists keys per provider, or how many
+        of them are stored in the keyring.
+        """
+        keys = [self.get_api_key() or ""]
+        if os.environ.get("TK_API_KEYS"):
+            keys.extend(key.strip() for key in os.environ["TK_API_KEYS"].split(","))
+        else:
+            provider = self.get_provider()
+            pool = self.load().get("api_keys", {}).get("pool", {})
+            provider_keys = pool.get(provider, []) if isinstance(pool, dict) else []
+            if isinstance(provider_keys, list):
+                keys.extend(str(key) for key in provider_keys)
+            elif isinstance(provider_keys, int):
+                store = SecretStore()
+                keys.extend(
+                    store.get(f"{provider}#{number}") or ""
+                    for number in range(1, provider_keys + 1)
+                )
+        return list(dict.fromkeys(key for key in keys if key))
 
     def get_provider(self) -> str:
         """Get the AI provider from configuration."""
-        config = self.load()
-        return config.get("api_keys", {}).get("provider", "openai")
+        return self._get_setting("api_keys", "provider", "openai")
 
     def get_model(self) -> str:
         """Get the LLM model from configuration."""
-        config = self.load()
-        return config.get("llm", {}).get("model", "gpt-4o-mini")
+        return self._get_setting("llm", "model", "gpt-4o-mini")
+
+    def get_api_base(self) -> str | None:
+        """Get the custom API base URL for OpenAI-compatible endpoints, if any."""
+        return self._get_setting("llm", "api_base") or None
+
+    def get_summary_model(self) -> str:
+        """Get the model that condenses oversized descriptions, defaulting to the main model."""
+        return self._get_setting("llm", "summary_model") or self.get_model()
 
     def get_language(self) -> str:
         """Get the default output language."""
-        config = self.load()
-        return config.get("preferences", {}).get("default_output_language", "es")
+        return self._get_setting("preferences", "default_output_language", "es")
 
     def get_platform(self) -> str:
         """Get the default platform."""
-        config = self.load()
-        return config.get("preferences", {}).get("default_platform", "github")  # noqa: E501
+        return self._get_setting("preferences", "default_platform", "github")
 
     def get_ac_path(self) -> str:
         """Get the default acceptance criteria path."""
-        config = self.load()
-        return config.get("preferences", {}).get("default_ac_path", "")
+        return self._get_setting("preferences", "default_ac_path", "")
 
     def get_dod_path(self) -> str:
         """Get the default definition of done path."""
-        config = self.load()
-        return config.get("preferences", {}).get("default_dod_path", "")
+        return self._get_setting("preferences", "default_dod_path", "")
+
+    def get_template_library(self) -> str:
+        """Get the directory of searchable AC/DoD template files."""
+        return self._get_setting("preferences", "template_library", "")
+
+    def get_template_tags(self) -> list[str]:
+        """Get the tags that select items of structured templates (empty selects all)."""
+        tags = self._get_setting("preferences", "template_tags", [])
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        return [str(tag).strip() for tag in tags if str(tag).strip()]
+
+    def get_relevant_items(self) -> int:
+        """Get how many AC/DoD items most relevant to a task are kept (0 keeps all)."""
+        try:
+            return max(0, int(self._get_setting("preferences", "relevant_items", 0) or 0))
+        except ValueError:
+            return 0
+
+    def get_max_description_chars(self) -> int:
+        """Get the description length above which it is condensed (0 never condenses)."""
+        try:
+            return max(0, int(self._get_setting("preferences", "max_description_chars", 12000)))
+        except ValueError:
+            return 12000
+
+    def get_context_tokens(self) -> int:
+        """Get the token budget for excerpts of attached files and diffs."""
+        try:
+            return max(0, int(self._get_setting("preferences", "context_tokens", 2000)))
+        except ValueError:
+            return 2000
+
+    def get_symbol_index(self) -> bool:
+        """Check whether the current repository's symbol index grounds tickets (opt-in)."""
+        value = self._get_setting("preferences", "symbol_index", False)
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+
+    def get_requests_per_minute(self) -> float:
+        """Get the shared provider request budget per minute (0 for unlimited)."""
+        try:
+            return float(self._get_setting("limits", "requests_per_minute", 0) or 0)
+        except ValueError:
+            return 0.0
+
+    def get_max_concurrency(self) -> int:
+        """Get the maximum number of provider calls in flight (0 to use the command default)."""
+        try:
+            return int(self._get_setting("limits", "max_concurrency", 0) or 0)
+        except ValueError:
+            return 0
+
+    def get_caller_weights(self) -> dict[str, float]:
+        """Get the fair-queuing weight of each caller (1 when not listed)."""
+        weights = self._get_setting("limits", "caller_weights", {})
+        if not isinstance(weights, dict):
+            return {}
+        return {
+            str(caller): float(weight)
+            for caller, weight in weights.items()
+            if isinstance(weight, int | float) and weight > 0
+        }
+
+    def get_usage_db_path(self) -> Path:
+        """Get the path of the local usage ledger database."""
+        return self.config_dir / "usage.db"
+
+    def get_summary_cache_path(self) -> Path:
+        """Get the path of the cache of description chunk summaries."""
+        return self.config_dir / "summaries.db"
 
     def is_configured(self) -> bool:
         """Check if the configuration is complete and valid."""
-        config = self.load()
-        api_key = config.get("api_keys", {}).get("api_key", "")
-        provider = config.get("api_keys", {}).get("provider", "")
-        model = config.get("llm", {}).get("model", "")
+        api_key = self.get_api_key()
+        provider = self._get_setting("api_keys", "provider", "")
+        model = self._get_setting("llm", "model", "")
 
         return bool(api_key and provider and model)
 
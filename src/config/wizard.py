@@ -9,6 +9,7 @@ from rich.panel import Panel
 from rich.text import Text
 
 from ai import ModelProvider
+from ticketplease.templates import TemplateError, template_cache
 from ticketplease.utils import expand_file_path
 
 from .service import Config
@@ -19,9 +20,9 @@ console = Console()
 class ConfigWizard:
     """Configuration wizard for first-time setup."""
 
-    def __init__(self) -> None:
+    def __init__(self, config: Config | None = None) -> None:
         """Initialize the configuration wizard."""
-        self.config = Config()
+        self.config = config or Config()
         self.providers = {
             "OpenAI": "openai",
             "Anthropic": "anthropic",
@@ -146,7 +147,12 @@ class ConfigWizard:
         """Process the user's update choice."""
         if update_choice == "🤖 AI Provider & Model":
             llm_config = self._collect_llm_config(current_config)
-            current_config.update(llm_config)
+            api_keys = current_config.setdefault("api_keys", {})
+            if llm_config["api_keys"]["provider"] != api_keys.get("provider"):
+                # The key pool belongs to the previous provider
+                api_keys.pop("pool", None)
+            api_keys.update(llm_config["api_keys"])
+            current_config.setdefault("llm", {}).update(llm_config["llm"])
         elif update_choice == "🌐 Language & Platform":
             preferences = self._collect_preferences(current_config, include_file_paths=False)
             current_config.update(preferences)
@@ -435,12 +441,17 @@ class ConfigWizard:
             return True  # Empty path is valid (optional)
 
         expanded_path = expand_file_path(path)
-        file_path = Path(expanded_path)
+        try:
+            if template_cache().load(expanded_path) is not None:
+                return True
+        except TemplateError as e:
+            return str(e)
 
+        file_path = Path(expanded_path)
         if not file_path.exists():
             return f"File does not exist: {expanded_path}"
 
         if not file_path.is_file():
             return f"Path is not a file: {expanded_path}"
 
-        return True
+        return f"File is not readable: {expanded_path}"
@@ -0,0 +1,284 @@
+"""Code context for tickets: excerpts of attached files and git diffs within a token budget.
+
+Files and diffs are streamed line by line. Only bounded windows around
+lines that mention the task's terms or define the symbols it names are
+kept, plus every diff hunk up to its size limit, so attaching a large file
+or a huge diff needs little memory. The best excerpts that fit the budget
+are rendered in source order.
+"""
+
+import heapq
+import itertools
+import os
+import re
+import subprocess
+import tempfile
+from collections import deque
+from collections.abc import Iterable, Iterator
+
+from .relevance import stem
+from .utils import expand_file_path
+
+DEFAULT_CONTEXT_TOKENS = 2000
+CHARS_PER_TOKEN = 4
+CONTEXT_LINES = 3
+MAX_EXCERPT_LINES = 60
+MAX_LINE_CHARS = 400
+MAX_CANDIDATES = 200
+
+_WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_IDENTIFIER = re.compile(r"[A-Za-z_][\w.]{3,}")
+_DEFINITION = re.compile(
+    r"^\s*(?:export\s+|pub\s+|async\s+|default\s+)*"
+    r"(?:def|class|function|func|fn|interface|struct|enum|trait|type)\s+(\w+)"
+)
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)")
+
+# (score, order, source, first line, text)
+Excerpt = tuple[float, int, str, int, str]
+
+
+def query_terms(text: str) -> tuple[set[str], set[str]]:
+    """Get the stemmed words and the identifiers of a task description.
+
+    Identifiers are split on case and underscores, so ``_collect_platform``
+    contributes "collect" and "platform".
+    """
+    words = {stem(word.lower()) for word in _WORD.findall(text) if len(word) >= 3}
+    identifiers = {
+        part for identifier in _IDENTIFIER.findall(text) for part in identifier.split(".")
+    }
+    return words, {identifier for identifier in identifiers if len(identifier) >= 4}
+
+
+def score_line(line: str, words: set[str], identifiers: set[str]) -> float:
+    """Score a line by the task words it contains, weighting named identifiers and definitions."""
+    score = float(len(words & {stem(word.lower()) for word in _WORD.findall(line)}))
+    if not score:
+        return 0.0
+    score += 3 * sum(1 for identifier in identifiers if identifier in line)
+    definition = _DEFINITION.match(line)
+    if definition and definition.group(1) in identifiers:
+        score += 5
+    return score
+
+
+class ContextBuilder:
+    """Collect the excerpts of files and diffs most relevant to a task, within a budget."""
+
+    def __init__(self, query: str, budget_tokens: int = DEFAULT_CONTEXT_TOKENS) -> None:
+        """Initialize the builder for a task description and a token budget."""
+        self.words, self.identifiers = query_terms(query)
+        self.budget = max(0, budget_tokens) * CHARS_PER_TOKEN
+        self._candidates: list[Excerpt] = []
+        self._order = itertools.count()
+
+    def add_file(self, path: str) -> None:
+        """Add the excerpts of a text file; raises ValueError when it cannot be read."""
+        expanded = expand_file_path(path)
+        try:
+            size = os.path.getsize(expanded)
+            with open(expanded, encoding="utf-8", errors="replace") as file:
+                if size <= self.budget:
+                    text = file.read()
+                    if "\0" in text:
+                        raise ValueError(f"Cannot attach binary file: {path}")
+                    score = sum(
+                        score_line(line, self.words, self.identifiers) for line in text.splitlines()
+                    )
+                    self._add(score + 1, path, 1, text.rstrip("\n"))
+                    return
+                self._add_windows(path, file)
+        except OSError as e:
+            raise ValueError(f"File does not exist or is not readable: {path}") from e
+
+    def _add_windows(self, path: str, lines: Iterable[str]) -> None:
+        """Add windows of context around the matching lines of a stream of lines."""
+        before: deque[tuple[int, str]] = deque(maxlen=CONTEXT_LINES)
+        window: list[tuple[int, str]] = []
+        score = 0.0
+        remaining = 0
+        head: list[str] = []
+        for number, line in enumerate(lines, 1):
+            if "\0" in line:
+                raise ValueError(f"Cannot attach binary file: {path}")
+            line = line.rstrip("\n")[:MAX_LINE_CHARS]
+            if len(head) < MAX_EXCERPT_LINES:
+                head.append(line)
+            line_score = score_line(line, self.words, self.identifiers)
+            if window:
+                window.append((number, line))
+                score += line_score
+                remaining = CONTEXT_LINES if line_score else remaining - 1
+                if remaining <= 0 or len(window) >= MAX_EXCERPT_LINES:
+                    self._add_window(path, window, score)
+                    window, score = [], 0.0
+                    before.clear()
+                    continue
+            elif line_score:
+                window = [*before, (number, line)]
+                score = line_score
+                remaining = CONTEXT_LINES
+            before.append((number, line))
+        if window:
+            self._add_window(path, window, score)
+        if not self._has_source(path):
+            self._add(0.5, path, 1, "\n".join(head))
+
+    def _add_window(self, path: str, window: list[tuple[int, str]], score: float) -> None:
+        self._add(score, path, window[0][0], "\n".join(line for _, line in window))
+
+    def add_diff(self, revision_range: str, cwd: str | None = None) -> None:
+        """Add the hunks of ``git diff`` for a revision range, streamed from git.
+
+        Raises ValueError when git is missing or the range is invalid.
+        """
+        _check_revision_range(revision_range)
+        with tempfile.TemporaryFile() as errors:
+            try:
+                process = subprocess.Popen(
+                    ["git", "diff", "--no-color", "--unified=3", revision_range, "--"],
+                    cwd=cwd,
+                    stdout=subprocess.PIPE,
+                    stderr=errors,
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace",
+                )
+            except OSError as e:
+                raise ValueError(f"Could not run git: {e}") from e
+
+            with process:
+                for path, line_number, score, text in self._diff_hunks(process.stdout or ()):
+                    self._add(score, f"{path} ({revision_range})", line_number, text)
+            if process.returncode:
+                errors.seek(0)
+                message = errors.read().decode("utf-8", errors="replace").strip()
+                raise ValueError(f"git diff {revision_range} failed: {message}")
+
+    def _diff_hunks(self, lines: Iterable[str]) -> Iterator[tuple[str, int, float, str]]:
+        """Split a unified diff stream into bounded hunks with their scores."""
+        path = ""
+        hunk: list[str] = []
+        skipped = 0
+        line_number = 0
+        score = 0.0
+
+        def finish() -> tuple[str, int, float, str]:
+            text = "\n".join(hunk)
+            if skipped:
+                text += f"\n... {skipped} more lines"
+            return path, line_number, score, text
+
+        for line in lines:
+            line = line.rstrip("\n")[:MAX_LINE_CHARS]
+            if line.startswith("diff --git "):
+                if hunk:
+                    yield finish()
+                hunk = []
+                path = line.rsplit(" b/", 1)[-1]
+                continue
+            header = _HUNK_HEADER.match(line)
+            if header:
+                if hunk:
+                    yield finish()
+                line_number = int(header.group(1))
+                score = 1.0 + score_line(path.replace("/", " "), self.words, self.identifiers)
+                hunk, skipped = [line], 0
+                continue
+            if not hunk:
+                continue
+            if len(hunk) < MAX_EXCERPT_LINES:
+                hunk.append(line)
+            else:
+                skipped += 1
+            if line[:1] in "+-":
+                score += score_line(line[1:], self.words, self.identifiers)
+        if hunk:
+            yield finish()
+
+    def _add(self, score: float, source: str, line_number: int, text: str) -> None:
+        """Keep a candidate excerpt, dropping the lowest scoring one beyond the limit."""
+        if not text.strip():
+            return
+        excerpt = (score, -next(self._order), source, line_number, text)
+        if len(self._candidates) < MAX_CANDIDATES:
+            heapq.heappush(self._candidates, excerpt)
+        else:
+            heapq.heappushpop(self._candidates, excerpt)
+
+    def _has_source(self, source: str) -> bool:
+        return any(candidate[2] == source for candidate in self._candidates)
+
+    def render(self) -> str:
+        """Render the best excerpts that fit the budget, in the order they were read."""
+        selected = []
+        used = 0
+        omitted = 0
+        for excerpt in sorted(self._candidates, reverse=True):
+            size = len(excerpt[4]) + len(excerpt[2]) + 16
+            if used + size > self.budget:
+                omitted += 1
+                continue
+            selected.append(excerpt)
+            used += size
+
+        sections = [
+            f"--- {source}:{line_number}\n{text}"
+            for _, _, source, line_number, text in sorted(selected, key=lambda e: -e[1])
+        ]
+        if omitted:
+            sections.append(f"({omitted} more excerpts omitted to fit the context budget)")
+        return "\n\n".join(sections)
+
+
+def _check_revision_range(revision_range: str) -> None:
+    """Reject revision ranges that git would parse as options (e.g. ``--output=FILE``)."""
+    if not revision_range or revision_range.startswith("-"):
+        raise ValueError(f"Invalid revision range: {revision_range!r}")
+
+
+def check_sources(
+    paths: Iterable[str] = (), revision_range: str | None = None, cwd: str | None = None
+) -> None:
+    """Check that attachments are readable files and the revision range resolves.
+
+    Raises ValueError naming the first problem, so mistakes are reported
+    before any prompt is answered.
+    """
+    for path in paths:
+        expanded = expand_file_path(path)
+        if not os.path.isfile(expanded) or not os.access(expanded, os.R_OK):
+            raise ValueError(f"File does not exist or is not readable: {path}")
+
+    if revision_range is None:
+        return
+    _check_revision_range(revision_range)
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--quiet", revision_range, "--"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError as e:
+        raise ValueError(f"Could not run git: {e}") from e
+    if result.returncode:
+        message = result.stderr.strip() or "unknown revision"
+        raise ValueError(f"Invalid revision range {revision_range}: {message}")
+
+
+def build_context(
+    paths: Iterable[str] = (),
+    revision_range: str | None = None,
+    query: str = "",
+    budget_tokens: int = DEFAULT_CONTEXT_TOKENS,
+) -> str:
+    """Build the code context section for attached files and a git revision range."""
+    builder = ContextBuilder(query, budget_tokens)
+    for path in paths:
+        builder.add_file(path)
+    if revision_range:
+        builder.add_diff(revision_range)
+    return builder.render()
@@ -1,5 +1,8 @@
 """Data collection module for TicketPlease."""
 
+import subprocess
+import sys
+import time
 from pathlib import Path
 from typing import Any
 
@@ -9,7 +12,20 @@ from rich.panel import Panel
 
 from config.service import Config
 
-from .utils import read_file_content, validate_file_path
+from .attachments import build_context, check_sources
+from .editor import (
+    AUTOSAVE_INTERVAL,
+    EDIT_KEYWORD,
+    DraftStore,
+    bracketed_paste,
+    edit_text,
+    read_multiline,
+)
+from .library import template_library
+from .relevance import select_relevant
+from .symbols import repository_symbols
+from .templates import TemplateError, template_cache
+from .utils import expand_file_path, validate_file_path
 
 console = Console()
 
@@ -29,8 +45,14 @@ class TaskDataCollector:
             "Español": "es",
         }
 
-    def collect_task_data(self) -> dict[str, Any]:
-        """Collect all task data from user."""
+    def collect_task_data(
+        self, attach: list[str] | None = None, from_diff: str | None = None
+    ) -> dict[str, Any]:
+        """Collect all task data from user, with code context from ``attach`` and ``from_diff``.
+
+        Attachments and the revision range are checked before the first prompt.
+        """
+        check_sources(attach or [], from_diff)
         console.print()
         console.print(
             Panel.fit(
@@ -47,18 +69,178 @@ class TaskDataCollector:
         language = self._collect_language()
 
         # Collect acceptance criteria
-        acceptance_criteria = self._collect_acceptance_criteria()
+        acceptance_criteria = self._collect_acceptance_criteria(
+            platform, language, task_description
+        )
 
         # Collect definition of done
-        definition_of_done = self._collect_definition_of_done()
+        definition_of_done = self._collect_definition_of_done(platform, language, task_description)
 
-        return {
+        task_data = {
             "task_description": task_description,
             "platform": platform,
             "language": language,
             "acceptance_criteria": acceptance_criteria,
             "definition_of_done": definition_of_done,
         }
+        self._attach_context(task_data, attach, from_diff, interactive=True)
+        return task_data
+
+    def collect_task_data_from_options(
+        self,
+        description_file: str,
+        ac_file: str | None = None,
+        dod_file: str | None = None,
+        platform: str | None = None,
+        language: str | None = None,
+        attach: list[str] | None = None,
+        from_diff: str | None = None,
+    ) -> dict[str, Any]:
+        """Collect task data from files and options without prompting.
+
+        ``description_file`` may be ``-`` to read the description from stdin.
+        AC and DoD fall back to the configured default files when not given.
+        Excerpts of ``attach`` files and of the ``from_diff`` git revision
+        range are added as code context.
+        """
+        task_description = self._read_description(description_file)
+        if not task_description:
+            raise ValueError("Task description cannot be empty")
+
+        platform = (platform or self.config.get_platform()).lower()
+        if platform not in self.platforms.values():
+            raise ValueError(
+                f"Unsupported platform '{platform}'. Use one of: {', '.join(self.platforms.values())}"
+            )
+
+        language = language or self.config.get_language()
+        task_data = {
+            "task_description": task_description,
+            "platform": platform,
+            "language": language,
+            "acceptance_criteria": self._read_criteria_option(
+                ac_file, self.config.get_ac_path(), platform, language
+            ),
+            "definition_of_done": self._read_criteria_option(
+                dod_file, self.config.get_dod_path(), platform, language
+            ),
+        }
+        for key, label in (
+            ("acceptance_criteria", "acceptance criteria"),
+            ("definition_of_done", "definition of done items"),
+        ):
+            task_data[key] = self._keep_relevant(
+                task_data[key], label, task_description, interactive=False
+            )
+        self._attach_context(task_data, attach, from_diff, interactive=False)
+        return task_data
+
+    def _keep_relevant(
+        self, items: list[str], label: str, task_description: str, interactive: bool
+    ) -> list[str]:
+        """Keep only the items of a loaded template file most relevant to the task.
+
+        Applies when configured. The kept items are previewed in the terminal,
+        or summarized on stderr when running without prompts.
+        """
+        kept = select_relevant(items, task_description, self.config.get_relevant_items())
+        if len(kept) == len(items):
+            return items
+
+        summary = f"Kept the {len(kept)} of {len(items)} {label} most relevant to the task"
+        if not interactive:
+            print(f"{summary}.", file=sys.stderr)
+            return kept
+        console.print(f"\n🎯 {summary}:")
+        for item in kept:
+            console.print(f"  [dim]- {item}[/dim]")
+        return kept
+
+    def _attach_context(
+        self,
+        task_data: dict[str, Any],
+        attach: list[str] | None,
+        from_diff: str | None,
+        interactive: bool,
+    ) -> None:
+        """Add excerpts of attached files and a git diff as the task's code context.
+
+        When the symbol index is enabled, the repository's files and symbols
+        named in the description are listed first.
+        """
+        sections = []
+        if self.config.get_symbol_index():
+            symbols = repository_symbols(self.config, task_data["task_description"])
+            if symbols:
+                sections.append(f"Symbols in this repository named by the task:\n{symbols}")
+        if attach or from_diff:
+            sections.append(
+                build_context(
+                    attach or [],
+                    from_diff,
+                    task_data["task_description"],
+                    self.config.get_context_tokens(),
+                )
+            )
+        context = "\n\n".join(section for section in sections if section)
+        if not context:
+            return
+
+        task_data["context"] = context
+        summary = f"Attached {len(context)} characters of code context"
+        if interactive:
+            console.print(f"\n📎 {summary}")
+        else:
+            print(f"{summary}.", file=sys.stderr)
+
+    def _read_description(self, description_file: str) -> str:
+        """Read the task description from a file or stdin."""
+        if description_file == "-":
+            return sys.stdin.read().strip()
+
+        if not validate_file_path(description_file):
+            raise ValueError(f"File does not exist or is not readable: {description_file}")
+
+        with open(expand_file_path(description_file), encoding="utf-8") as f:
+            return f.read().strip()
+
+    def _read_criteria_option(
+        self,
+        file_path: str | None,
+        default_path: str,
+        platform: str | None = None,
+        language: str | None = None,
+    ) -> list[str]:
+        """Read criteria from an explicit file, falling back to the configured default."""
+        if file_path:
+            items = self._load_template(file_path, platform, language)
+            if items is None:
+                raise ValueError(f"File does not exist or is not readable: {file_path}")
+            return items
+
+        return (
+            self._load_template(default_path, platform, language) if default_path else None
+        ) or []
+
+    def _load_template(
+        self, file_path: str, platform: str | None = None, language: str | None = None
+    ) -> list[str] | None:
+        """Render the items of a template file for the platform, language and configured tags."""
+        return template_cache().load(
+            file_path, platform=platform, language=language, tags=self.config.get_template_tags()
+        )
+
+    def _load_default_template(
+        self, file_path: str, platform: str | None, language: str | None
+    ) -> list[str] | None:
+        """Render a configured default template, warning instead of failing when it is invalid."""
+        if not file_path:
+            return None
+        try:
+            return self._load_template(file_path, platform, language)
+        except TemplateError as e:
+            console.print(f"⚠️  {e}")
+            return None
 
     def _collect_task_description(self) -> str:
         """Collect task description from user using multiline input."""
@@ -70,31 +252,54 @@ class TaskDataCollector:
         return task_description.strip()
 
     def _collect_multiline_input(self) -> str:
-        """Collect multiline input from user using DONE keyword to finish."""
+        """Collect multiline input finished with DONE, or written in $EDITOR with EDIT.
+
+        The draft is autosaved while typing and on cancel, and the editor
+        starts from it.
+        """
+        drafts = DraftStore()
         while True:
             console.print("\n[bold]What needs to be done? (Describe the task in detail)[/bold]")
             console.print("[dim]• Enter your description (multiple lines supported)[/dim]")
             console.print("[dim]• Type 'DONE' on a new line to finish[/dim]")
+            console.print(
+                "[dim]• Type 'EDIT' to write it in your editor, from your last draft[/dim]"
+            )
             console.print("[dim]• Press Ctrl+C to cancel[/dim]")
             console.print()
 
-            lines = []
+            lines: list[str] = []
+            saved_at = time.monotonic()
+
+            def autosave(lines: list[str]) -> None:
+                nonlocal saved_at
+                if time.monotonic() - saved_at >= AUTOSAVE_INTERVAL:
+                    drafts.save("\n".join(lines))
+                    saved_at = time.monotonic()
+
             try:
-                while True:
-                    line = input()
-                    if line.strip().upper() == "DONE":
-                        break
-                    lines.append(line)
+                with bracketed_paste():
+                    keyword = read_multiline(input, lines, autosave)
             except KeyboardInterrupt:
+                drafts.save("\n".join(lines))
                 raise KeyboardInterrupt("Task generation cancelled") from None
             except EOFError:
                 # Handle Ctrl+D gracefully
+                drafts.save("\n".join(lines))
                 console.print("\n[yellow]Input cancelled[/yellow]")
                 raise KeyboardInterrupt("Task generation cancelled") from None
 
             result = "\n".join(lines).strip()
+            if keyword == EDIT_KEYWORD:
+                try:
+                    result = edit_text(result or drafts.load()).strip()
+                except (OSError, subprocess.CalledProcessError) as e:
+                    console.print(f"[red]Could not open the editor: {e}[/red]")
+                    drafts.save(result)
+                    continue
 
             if result:
+                drafts.save(result)
                 return result
 
             console.print("[red]Task description cannot be empty[/red]")
@@ -131,13 +336,19 @@ class TaskDataCollector:
 
         return self.languages[language_choice]
 
-    def _collect_acceptance_criteria(self) -> list[str]:
+    def _collect_acceptance_criteria(
+        self,
+        platform: str | None = None,
+        language: str | None = None,
+        task_description: str = "",
+    ) -> list[str]:
         """Collect acceptance criteria from user."""
         console.print("\n[bold]Acceptance Criteria[/bold]")
 
         # Check if there's a default AC file
         default_ac_path = self.config.get_ac_path()
-        if default_ac_path and validate_file_path(default_ac_path):
+        criteria = self._load_default_template(default_ac_path, platform, language)
+        if criteria is not None:
             use_file = questionary.confirm(
                 f"Use default AC file ({Path(default_ac_path).name})?",
                 default=True,
@@ -146,20 +357,16 @@ class TaskDataCollector:
             if use_file is None:
                 raise KeyboardInterrupt("Task generation cancelled")
 
-            if use_file:
-                criteria = read_file_content(default_ac_path)
-                if criteria:
-                    console.print(f"✅ Loaded {len(criteria)} criteria from file")
-                    return criteria
+            if use_file and criteria:
+                console.print(f"✅ Loaded {len(criteria)} criteria from file")
+                return self._keep_relevant(
+                    criteria, "acceptance criteria", task_description, interactive=True
+                )
 
         # Manual input or file selection
         input_method = questionary.select(
             "How would you like to provide acceptance criteria?",
-            choices=[
-                "📝 Enter manually",
-                "📁 Load from file",
-                "🤖 Skip (AI will generate automatically)",
-            ],
+            choices=self._criteria_input_methods(),
         ).ask()
 
         if not input_method:
@@ -168,17 +375,28 @@ class TaskDataCollector:
         if input_method == "📝 Enter manually":
             return self._collect_criteria_manually("acceptance criteria")
         elif input_method == "📁 Load from file":
-            return self._collect_criteria_from_file("acceptance criteria")
+            items = self._collect_criteria_from_file("acceptance criteria", platform, language)
+            return self._keep_relevant(
+                items, "acceptance criteria", task_description, interactive=True
+            )
+        elif input_method == "🔎 Search template library":
+            return self._collect_criteria_from_library("acceptance criteria", platform, language)
         else:  # Skip
             return []
 
-    def _collect_definition_of_done(self) -> list[str]:
+    def _collect_definition_of_done(
+        self,
+        platform: str | None = None,
+        language: str | None = None,
+        task_description: str = "",
+    ) -> list[str]:
         """Collect definition of done from user."""
         console.print("\n[bold]Definition of Done[/bold]")
 
         # Check if there's a default DoD file
         default_dod_path = self.config.get_dod_path()
-        if default_dod_path and validate_file_path(default_dod_path):
+        dod_items = self._load_default_template(default_dod_path, platform, language)
+        if dod_items is not None:
             use_file = questionary.confirm(
                 f"Use default DoD file ({Path(default_dod_path).name})?",
                 default=True,
@@ -187,20 +405,16 @@ class TaskDataCollector:
             if use_file is None:
                 raise KeyboardInterrupt("Task generation cancelled")
 
-            if use_file:
-                dod_items = read_file_content(default_dod_path)
-                if dod_items:
-                    console.print(f"✅ Loaded {len(dod_items)} items from file")
-                    return dod_items
+            if use_file and dod_items:
+                console.print(f"✅ Loaded {len(dod_items)} items from file")
+                return self._keep_relevant(
+                    dod_items, "definition of done items", task_description, interactive=True
+                )
 
         # Manual input or file selection
         input_method = questionary.select(
             "How would you like to provide definition of done?",
-            choices=[
-                "📝 Enter manually",
-                "📁 Load from file",
-                "🤖 Skip (AI will generate automatically)",
-            ],
+            choices=self._criteria_input_methods(),
         ).ask()
 
         if not input_method:
@@ -209,10 +423,52 @@ class TaskDataCollector:
         if input_method == "📝 Enter manually":
             return self._collect_criteria_manually("definition of done items")
         elif input_method == "📁 Load from file":
-            return self._collect_criteria_from_file("definition of done")
+            items = self._collect_criteria_from_file("definition of done", platform, language)
+            return self._keep_relevant(
+                items, "definition of done items", task_description, interactive=True
+            )
+        elif input_method == "🔎 Search template library":
+            return self._collect_criteria_from_library("definition of done", platform, language)
         else:  # Skip
             return []
 
+    def _criteria_input_methods(self) -> list[str]:
+        """Get the ways of providing criteria, offering search when a library is configured."""
+        methods = ["📝 Enter manually", "📁 Load from file"]
+        if self.config.get_template_library():
+            methods.append("🔎 Search template library")
+        methods.append("🤖 Skip (AI will generate automatically)")
+        return methods
+
+    def _collect_criteria_from_library(
+        self, criteria_type: str, platform: str | None = None, language: str | None = None
+    ) -> list[str]:
+        """Collect criteria by searching the template library and picking matches.
+
+        Items whose conditions exclude the task's platform or language are not offered.
+        """
+        library = template_library(self.config.get_template_library())
+        query = questionary.text(f"Search {len(library)} template items:").ask()
+        if query is None:
+            raise KeyboardInterrupt("Task generation cancelled")
+
+        matches = library.search(query, limit=20, platform=platform, language=language)
+        if not matches:
+            console.print("⚠️  No template items match your search")
+            return []
+
+        selected = questionary.checkbox(
+            f"Select {criteria_type}:",
+            choices=[
+                questionary.Choice(f"{match['text']}  ({match['file']})", value=match["text"])
+                for match in matches
+            ],
+        ).ask()
+        if selected is None:
+            raise KeyboardInterrupt("Task generation cancelled")
+
+        return selected
+
     def _collect_criteria_manually(self, criteria_type: str) -> list[str]:
         """Collect criteria manually from user input."""
         console.print(f"\nEnter {criteria_type} (one per line, empty line to finish):")
@@ -238,7 +494,9 @@ class TaskDataCollector:
 
         return criteria
 
-    def _collect_criteria_from_file(self, criteria_type: str) -> list[str]:
+    def _collect_criteria_from_file(
+        self, criteria_type: str, platform: str | None = None, language: str | None = None
+    ) -> list[str]:
         """Collect criteria from a file."""
         file_path = questionary.path(
             f"Path to {criteria_type} file:",
@@ -249,7 +507,7 @@ class TaskDataCollector:
         if not file_path:
             raise KeyboardInterrupt("Task generation cancelled")
 
-        criteria = read_file_content(file_path)
+        criteria = self._load_template(file_path, platform, language) or []
         if criteria:
             console.print(f"✅ Loaded {len(criteria)} items from file")
         else:
@@ -262,8 +520,11 @@ class TaskDataCollector:
         if not file_path or not file_path.strip():
             return "File path cannot be empty"
 
-        if not validate_file_path(file_path):
-            return f"File does not exist or is not readable: {file_path}"
+        try:
+            if template_cache().load(file_path) is None:
+                return f"File does not exist or is not readable: {file_path}"
+        except TemplateError as e:
+            return str(e)
 
         return True
 
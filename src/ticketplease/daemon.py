@@ -0,0 +1,376 @@
+"""Opt-in background daemon that keeps AI services warm behind a per-user Unix socket."""
+
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from ai.models import ModelProvider
+from ai.scheduler import Scheduler
+from config.service import Config
+
+from .pipeline import TaskProcessor, TaskSpecError, normalize_task_spec
+
+DEFAULT_IDLE_TIMEOUT = 900.0
+DEFAULT_CONCURRENCY = 4
+QUEUED_REQUESTS = 32
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 600.0
+POLL_INTERVAL = 0.5
+
+
+class DaemonUnavailableError(ConnectionError):
+    """Raised when no daemon can serve a request."""
+
+
+def socket_path() -> Path:
+    """Get the per-user daemon socket path, overridable with TK_DAEMON_SOCKET."""
+    if os.environ.get("TK_DAEMON_SOCKET"):
+        return Path(os.environ["TK_DAEMON_SOCKET"])
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return Path(runtime_dir) / "ticketplease" / "daemon.sock"
+    return Path(tempfile.gettempdir()) / f"ticketplease-{os.getuid()}" / "daemon.sock"
+
+
+def check_socket_dir(directory: Path) -> None:
+    """Make sure only the current user can reach the socket directory.
+
+    Raises RuntimeError when it is a symlink, belongs to another user or is
+    accessible to group or others, e.g. a ``/tmp`` directory created first
+    by someone else to intercept task descriptions.
+    """
+    info = os.lstat(directory)
+    if stat.S_ISLNK(info.st_mode) or not stat.S_ISDIR(info.st_mode):
+        raise RuntimeError(f"Daemon socket directory {directory} is not a directory")
+    if info.st_uid != os.getuid():
+        raise RuntimeError(f"Daemon socket directory {directory} belongs to another user")
+    if info.st_mode & 0o077:
+        raise RuntimeError(f"Daemon socket directory {directory} is accessible to other users")
+
+
+def service_settings(config: Config) -> dict[str, Any]:
+    """Get the settings a daemon must share with a client to answer for it."""
+    api_key = config.get_api_key() or ""
+    return {
+        "provider": config.get_provider(),
+        "model": config.get_model(),
+        "api_base": config.get_api_base(),
+        "api_key_sha256": hashlib.sha256(api_key.encode("utf-8")).hexdigest(),
+    }
+
+
+class DaemonClient:
+    """Send JSON requests to a running daemon, one request per connection."""
+
+    def __init__(self, path: Path | None = None, timeout: float = REQUEST_TIMEOUT) -> None:
+        """Initialize the client for a socket path."""
+        self.path = path or socket_path()
+        self.timeout = timeout
+
+    def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Send a request and return the daemon response."""
+        if not self.path.exists():
+            raise DaemonUnavailableError("No daemon is running")
+        try:
+            check_socket_dir(self.path.parent)
+        except (OSError, RuntimeError) as e:
+            raise DaemonUnavailableError(str(e)) from e
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(CONNECT_TIMEOUT)
+                sock.connect(str(self.path))
+                sock.settimeout(self.timeout)
+                sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+                with sock.makefile("rb") as stream:
+                    line = stream.readline()
+        except OSError as e:
+            raise DaemonUnavailableError(f"Daemon is not reachable: {e}") from e
+
+        if not line:
+            raise DaemonUnavailableError("Daemon closed the connection")
+        return json.loads(line)
+
+    def ping(self) -> dict[str, Any] | None:
+        """Get the daemon status, or None when no daemon answers."""
+        try:
+            return self.request({"op": "ping"})
+        except DaemonUnavailableError:
+            return None
+
+
+class RemoteAIService:
+    """AI service front end that forwards calls to the daemon.
+
+    When the daemon is gone or runs with different settings, calls fall back
+    to an in-process service built by ``fallback``.
+    """
+
+    def __init__(
+        self,
+        client: DaemonClient,
+        settings: dict[str, Any],
+        fallback: Callable[[], Any],
+        priority: str | None = None,
+        caller: str = "",
+    ) -> None:
+        """Initialize the front end with the client settings and a local fallback.
+
+        ``priority`` and ``caller`` are passed on to the daemon scheduler.
+        """
+        self.client = client
+        self.settings = settings
+        self.fallback = fallback
+        self.priority = priority
+        self.caller = caller
+        self.last_usage: dict[str, Any] | None = None
+        self._local_service: Any = None
+
+    def generate_task_description(
+        self,
+        task_description: str,
+        acceptance_criteria: list[str],
+        definition_of_done: list[str],
+        platform: str,
+        language: str,
+        context: str = "",
+    ) -> str:
+        """Generate a task description through the daemon."""
+        spec = {
+            "id": 0,
+            "operation": "generate",
+            "description": task_description,
+            "acceptance_criteria": acceptance_criteria,
+            "definition_of_done": definition_of_done,
+            "platform": platform,
+            "language": language,
+        }
+        if context:
+            spec["context"] = context
+        return self._run(
+            spec,
+            lambda service: service.generate_task_description(
+                task_description,
+                acceptance_criteria,
+                definition_of_done,
+                platform,
+                language,
+                context,
+            ),
+        )
+
+    def refine_task_description(self, current_description: str, refinement_request: str) -> str:
+        """Refine a task description through the daemon."""
+        spec = {
+            "id": 0,
+            "operation": "refine",
+            "description": current_description,
+            "refinement": refinement_request,
+        }
+        return self._run(
+            spec,
+            lambda service: service.refine_task_description(
+                current_description, refinement_request
+            ),
+        )
+
+    def _run(self, spec: dict[str, Any], local_call: Callable[[Any], str]) -> str:
+        if self.priority:
+            spec["priority"] = self.priority
+        if self.caller:
+            spec["caller"] = self.caller
+
+        if self._local_service is None:
+            try:
+                record = self.client.request(
+                    {"op": "task", "settings": self.settings, "spec": spec}
+                )
+            except DaemonUnavailableError:
+                record = {"ok": False, "fallback": True}
+
+            if record.get("ok"):
+                self.last_usage = record.get("usage")
+                return record["description"]
+            if not record.get("fallback"):
+                raise RuntimeError(record.get("error") or "Daemon request failed")
+            self._local_service = self.fallback()
+
+        result = local_call(self._local_service)
+        self.last_usage = self._local_service.last_usage
+        return result
+
+
+def connect_daemon(
+    config: Config, fallback: Callable[[], Any], priority: str | None = None, caller: str = ""
+) -> RemoteAIService | None:
+    """Get a daemon-backed AI service, or None when no daemon is running."""
+    client = DaemonClient()
+    if client.ping() is None:
+        return None
+    return RemoteAIService(client, service_settings(config), fallback, priority, caller)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            response = {"ok": False, "error": "Invalid JSON request"}
+        else:
+            response = self.server.task_daemon.handle(request)
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    def __init__(self, path: Path, task_daemon: "TaskDaemon", workers: int) -> None:
+        self.task_daemon = task_daemon
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        super().__init__(str(path), _RequestHandler)
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+class TaskDaemon:
+    """Serve task requests on a Unix socket, keeping the AI stack and configuration warm.
+
+    AI services (and their pooled HTTP connections) are reused between
+    requests. Requests from all clients share one ``scheduler``, so interactive
+    calls are admitted before queued batch work. The configuration file is
+    re-checked before every request and services are rebuilt when it changed.
+    The daemon exits after ``idle_timeout`` seconds without requests (0
+    disables the timeout).
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        service_factory: Callable[[], Any],
+        path: Path | None = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        scheduler: Scheduler | None = None,
+    ) -> None:
+        """Initialize the daemon with the configuration and a factory for AI services."""
+        self.config = config
+        self.service_factory = service_factory
+        self.path = path or socket_path()
+        self.idle_timeout = idle_timeout
+        self.concurrency = concurrency
+        self.scheduler = scheduler or Scheduler(max_concurrency=concurrency)
+        self._processor = TaskProcessor(config, service_factory, self.scheduler)
+        self._settings = service_settings(config)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._last_activity = time.monotonic()
+        self._stopping = threading.Event()
+
+    def warm_up(self) -> None:
+        """Load the AI stack and model catalog, and check that a service can be built."""
+        ModelProvider.get_supported_models()
+        self.service_factory()
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Handle a decoded request and return the response."""
+        with self._lock:
+            self._active += 1
+        try:
+            return self._dispatch(request)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._last_activity = time.monotonic()
+
+    def _dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        operation = request.get("op")
+        if operation == "ping":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "model": self._settings["model"],
+                "scheduler": self.scheduler.stats(),
+            }
+        if operation == "shutdown":
+            self._stopping.set()
+            return {"ok": True}
+        if operation != "task":
+            return {"ok": False, "error": f"Unsupported daemon operation '{operation}'"}
+
+        processor, settings = self._current()
+        if request.get("settings") != settings:
+            return {
+                "ok": False,
+                "fallback": True,
+                "error": "The daemon runs with a different provider, model or API key",
+            }
+
+        raw = request.get("spec")
+        try:
+            spec = normalize_task_spec(raw, None, self.config)
+        except (TaskSpecError, OSError) as e:
+            spec_id = raw.get("id") if isinstance(raw, dict) else None
+            return {"id": spec_id, "ok": False, "error": str(e)}
+        try:
+            return processor.process(spec)
+        except Exception as e:
+            return {"id": spec.get("id"), "ok": False, "error": str(e)}
+
+    def _current(self) -> tuple[TaskProcessor, dict[str, Any]]:
+        with self._lock:
+            if self.config.reload_if_changed():
+                self._processor = TaskProcessor(self.config, self.service_factory, self.scheduler)
+                self._settings = service_settings(self.config)
+            return self._processor, self._settings
+
+    def _idle_expired(self) -> bool:
+        if self.idle_timeout <= 0:
+            return False
+        with self._lock:
+            return self._active == 0 and (
+                time.monotonic() - self._last_activity >= self.idle_timeout
+            )
+
+    def serve(self) -> None:
+        """Listen on the socket until shutdown is requested or the idle timeout expires."""
+        self._prepare_socket()
+        umask = os.umask(0o077)
+        try:
+            server = _UnixServer(self.path, self, self.concurrency + QUEUED_REQUESTS)
+        finally:
+            os.umask(umask)
+        server.timeout = POLL_INTERVAL
+        os.chmod(self.path, 0o600)
+        try:
+            while not self._stopping.is_set() and not self._idle_expired():
+                server.handle_request()
+        finally:
+            server.server_close()
+            self.path.unlink(missing_ok=True)
+
+    def stop(self) -> None:
+        """Ask the serve loop to exit."""
+        self._stopping.set()
+
+    def _prepare_socket(self) -> None:
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        check_socket_dir(self.path.parent)
+        if not self.path.exists():
+            return
+        if DaemonClient(self.path).ping() is not None:
+            raise RuntimeError(f"A daemon is already running on {self.path}")
+        self.path.unlink()
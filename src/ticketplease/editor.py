@@ -0,0 +1,122 @@
+"""Multiline description input: bracketed paste, $EDITOR and draft autosave.
+
+Terminals in bracketed paste mode wrap pasted text in ``ESC[200~`` /
+``ESC[201~``, so a pasted block is taken verbatim: a "DONE" line inside a
+pasted log does not end the input. Readline-based input delivers a paste as
+one line with embedded newlines, which is treated the same way.
+"""
+
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from config.storage import atomic_write
+
+from .templates import default_cache_path
+
+PASTE_START = "\x1b[200~"
+PASTE_END = "\x1b[201~"
+DONE_KEYWORD = "DONE"
+EDIT_KEYWORD = "EDIT"
+AUTOSAVE_INTERVAL = 2.0
+
+
+def default_draft_path() -> Path:
+    """Get the path of the autosaved description draft, next to the template cache."""
+    return default_cache_path().with_name("draft.md")
+
+
+class DraftStore:
+    """The last task description being written, kept across cancels and crashes."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Initialize the store, at the default draft path unless ``path`` is given."""
+        self.path = path or default_draft_path()
+
+    def load(self) -> str:
+        """Get the saved draft, or an empty string when there is none."""
+        try:
+            return self.path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return ""
+
+    def save(self, text: str) -> None:
+        """Replace the draft; blank text keeps the previous one."""
+        if not text.strip():
+            return
+        try:
+            atomic_write(self.path, text)
+        except OSError:
+            pass
+
+
+@contextmanager
+def bracketed_paste() -> Iterator[None]:
+    """Ask an interactive terminal to mark pasted text for the duration of the block."""
+    enabled = sys.stdin.isatty() and sys.stdout.isatty()
+    if enabled:
+        sys.stdout.write("\x1b[?2004h")
+        sys.stdout.flush()
+    try:
+        yield
+    finally:
+        if enabled:
+            sys.stdout.write("\x1b[?2004l")
+            sys.stdout.flush()
+
+
+def read_multiline(
+    read_line: Callable[[], str],
+    lines: list[str],
+    on_line: Callable[[list[str]], None] | None = None,
+) -> str:
+    """Append lines read with ``read_line`` to ``lines`` until a typed keyword.
+
+    Returns the keyword (``DONE`` or ``EDIT``) that ended the input. Pasted
+    lines are never read as keywords.
+    """
+    in_paste = False
+    while True:
+        line = read_line()
+        if PASTE_START in line:
+            in_paste = True
+            line = line.replace(PASTE_START, "")
+        pasted = in_paste or "\n" in line
+        if PASTE_END in line:
+            in_paste = False
+            line = line.replace(PASTE_END, "")
+
+        keyword = line.strip().upper()
+        if not pasted and keyword in (DONE_KEYWORD, EDIT_KEYWORD):
+            return keyword
+
+        lines.extend(line.split("\n"))
+        if on_line is not None:
+            on_line(lines)
+
+
+def edit_text(text: str) -> str:
+    """Open $VISUAL or $EDITOR on a temporary file holding ``text`` and return the saved buffer.
+
+    Bytes that are not valid UTF-8 (an editor saving in another encoding) are
+    replaced rather than discarding the edit. Raises OSError when the editor
+    cannot be started and CalledProcessError when it exits with an error.
+    """
+    editor = os.environ.get("VISUAL") or os.environ.get("EDITOR")
+    if not editor:
+        editor = "notepad" if os.name == "nt" else "vi"
+
+    fd, path = tempfile.mkstemp(prefix="tk-description-", suffix=".md")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+        subprocess.run([*shlex.split(editor), path], check=True)
+        with open(path, encoding="utf-8", errors="replace") as file:
+            return file.read()
+    finally:
+        os.unlink(path)
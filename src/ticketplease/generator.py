@@ -1,21 +1,106 @@
 """Task generation orchestrator for TicketPlease."""
 
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Any
 
 import questionary
+from prompt_toolkit.application import create_app_session
+from prompt_toolkit.output import create_output
 from rich.console import Console
 from rich.panel import Panel
 from rich.syntax import Syntax
 
+from ai.cassette import Cassette
+from ai.keypool import shared_key_pool
+from ai.scheduler import Scheduler
 from ai.service import AIService
+from ai.summarize import Summarizer, SummaryCache
+from ai.usage import UsageLedger
 from config.service import Config
 
 from .collector import TaskDataCollector
-from .utils import copy_to_clipboard
+from .collector import console as collector_console
+from .daemon import RemoteAIService, connect_daemon
+from .output import build_metadata, render_output
+from .utils import copy_to_clipboard, write_output
 
 console = Console()
 
 
+@contextmanager
+def _console_to_stderr(enabled: bool) -> Iterator[None]:
+    """Print the rich output and the prompts to stderr while enabled."""
+    if not enabled:
+        yield
+        return
+    consoles = [console, collector_console]
+    previous = [target.stderr for target in consoles]
+    for target in consoles:
+        target.stderr = True
+    try:
+        with create_app_session(output=create_output(stdout=sys.stderr)):
+            yield
+    finally:
+        for target, was_stderr in zip(consoles, previous, strict=True):
+            target.stderr = was_stderr
+
+
+def build_ai_service(config: Config, scheduler: Scheduler | None = None) -> AIService:
+    """Create an AI service from configuration, honoring TK_CASSETTE when set.
+
+    Oversized descriptions are condensed with the configured summary model,
+    through a service of their own; each summary call takes a token from
+    ``scheduler``'s rate budget.
+    """
+    provider = config.get_provider()
+    api_key = config.get_api_key()
+    model = config.get_model()
+
+    if not api_key:
+        raise ValueError("API key not found in configuration")
+
+    ledger = UsageLedger(config.get_usage_db_path())
+    cassette = Cassette.from_env()
+    api_keys = config.get_api_keys()
+    settings = {
+        "ledger": ledger,
+        "api_base": config.get_api_base(),
+        "completion_fn": cassette.wrap() if cassette else None,
+        "key_pool": shared_key_pool(api_keys) if len(api_keys) > 1 else None,
+    }
+
+    service = AIService(provider, api_key, model, **settings)
+    summary_model = config.get_summary_model()
+    summary_service = AIService(provider, api_key, summary_model, **settings)
+    service.summarizer = Summarizer(
+        summary_service.summarize_chunk,
+        summary_model,
+        SummaryCache(config.get_summary_cache_path()),
+        max_chars=config.get_max_description_chars(),
+        scheduler=scheduler,
+    )
+    return service
+
+
+def build_scheduler(config: Config, concurrency: int = 0) -> Scheduler:
+    """Create the request scheduler from the configured limits.
+
+    ``concurrency`` applies when no ``max_concurrency`` is configured.
+    """
+    return Scheduler(
+        requests_per_minute=config.get_requests_per_minute(),
+        max_concurrency=config.get_max_concurrency() or concurrency,
+        weights=config.get_caller_weights(),
+    )
+
+
+def create_ai_service(config: Config) -> AIService | RemoteAIService:
+    """Create an AI service, forwarding calls to a running daemon when there is one."""
+    return connect_daemon(config, lambda: build_ai_service(config)) or build_ai_service(config)
+
+
 class TaskGenerator:
     """Orchestrates the complete task generation flow."""
 
@@ -24,47 +109,95 @@ class TaskGenerator:
         self.config = config
         self.collector = TaskDataCollector(config)
 
-    def generate_task(self) -> bool:
-        """Execute the complete task generation flow."""
-        try:
-            # Check if configuration is valid
-            if not self.config.is_configured():
-                console.print(
-                    "[red]❌ Configuration is incomplete. Please run 'tkp config' first.[/red]"
-                )
-                return False
+    def generate_task(
+        self,
+        output_format: str | None = None,
+        attach: list[str] | None = None,
+        from_diff: str | None = None,
+    ) -> bool:
+        """Execute the complete task generation flow.
 
-            # Collect task data from user
-            task_data = self.collector.collect_task_data()
+        With an ``output_format``, the result is written to stdout in that format
+        instead of being shown in the interactive result view, and prompts,
+        progress and errors go to stderr so stdout holds only the result. ``attach`` files
+        and the ``from_diff`` revision range add code context to the prompt.
+        """
+        with _console_to_stderr(bool(output_format)):
+            try:
+                # Check if configuration is valid
+                if not self.config.is_configured():
+                    console.print(
+                        "[red]❌ Configuration is incomplete. Please run 'tkp config' first.[/red]"
+                    )
+                    return False
 
-            # Generate task description using AI
-            ai_service = self._create_ai_service()
-            description = self._generate_description(ai_service, task_data)
+                # Collect task data from user
+                task_data = self.collector.collect_task_data(attach, from_diff)
 
-            if not description:
-                console.print("[red]❌ Failed to generate task description.[/red]")
+                # Generate task description using AI
+                ai_service = self._create_ai_service()
+                description = self._generate_description(ai_service, task_data)
+
+                if not description:
+                    console.print("[red]❌ Failed to generate task description.[/red]")
+                    return False
+
+                if output_format:
+                    metadata = build_metadata(
+                        ai_service.last_usage, task_data["platform"], task_data["language"]
+                    )
+                    write_output(render_output(description, output_format, metadata), "-")
+                    return True
+
+                # Show result and handle user actions
+                return self._handle_result(ai_service, description)
+
+            except KeyboardInterrupt:
+                console.print("\n[yellow]❌ Task generation cancelled.[/yellow]")
+                return False
+            except Exception as e:
+                console.print(f"\n[red]❌ Error during task generation: {e}[/red]")
                 return False
 
-            # Show result and handle user actions
-            return self._handle_result(ai_service, description)
+    def generate_task_non_interactive(
+        self, task_data: dict[str, Any], output: str = "-", output_format: str = "plain"
+    ) -> bool:
+        """Generate a description from collected data without prompts or rich output.
 
-        except KeyboardInterrupt:
-            console.print("\n[yellow]❌ Task generation cancelled.[/yellow]")
+        The description is rendered in ``output_format`` and written to ``output``
+        (``-`` for stdout); errors go to stderr.
+        """
+        if not self.config.is_configured():
+            print(
+                "Error: configuration is incomplete. Run 'tk config' or set TK_API_KEY.",
+                file=sys.stderr,
+            )
             return False
+
+        try:
+            ai_service = self._create_ai_service()
+            description = ai_service.generate_task_description(**task_data).strip()
         except Exception as e:
-            console.print(f"\n[red]❌ Error during task generation: {e}[/red]")
+            print(f"Error: {e}", file=sys.stderr)
             return False
 
-    def _create_ai_service(self) -> AIService:
-        """Create AI service instance from configuration."""
-        provider = self.config.get_provider()
-        api_key = self.config.get_api_key()
-        model = self.config.get_model()
+        if not description:
+            print("Error: the model returned an empty description.", file=sys.stderr)
+            return False
 
-        if not api_key:
-            raise ValueError("API key not found in configuration")
+        metadata = build_metadata(
+            ai_service.last_usage, task_data["platform"], task_data["language"]
+        )
+        try:
+            write_output(render_output(description, output_format, metadata), output)
+        except OSError as e:
+            print(f"Error: could not write {output}: {e}", file=sys.stderr)
+            return False
+        return True
 
-        return AIService(provider, api_key, model)
+    def _create_ai_service(self) -> AIService | RemoteAIService:
+        """Create AI service instance from configuration."""
+        return create_ai_service(self.config)
 
     def _generate_description(self, ai_service: AIService, task_data: dict[str, Any]) -> str:
         """Generate task description using AI service."""
@@ -72,13 +205,7 @@ class TaskGenerator:
 
         with console.status("[bold green]Thinking...", spinner="dots"):
             try:
-                description = ai_service.generate_task_description(
-                    task_description=task_data["task_description"],
-                    acceptance_criteria=task_data["acceptance_criteria"],
-                    definition_of_done=task_data["definition_of_done"],
-                    platform=task_data["platform"],
-                    language=task_data["language"],
-                )
+                description = ai_service.generate_task_description(**task_data)
                 return description.strip()
             except Exception as e:
                 console.print(f"\n[red]❌ AI generation failed: {e}[/red]")
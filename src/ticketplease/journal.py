@@ -0,0 +1,151 @@
+"""Checkpoint journal that lets interrupted batch runs resume."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from ai.coalesce import SingleFlight
+from config.service import Config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    completed_at REAL NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS provider_batches (
+    batch_id TEXT PRIMARY KEY,
+    submitted_at REAL NOT NULL,
+    keys TEXT NOT NULL
+);
+"""
+
+_UNKEYED_FIELDS = ("id", "priority", "caller")
+
+
+def idempotency_key(spec: dict[str, Any], config: Config) -> str:
+    """Build a stable key for a parsed spec and the model that would answer it.
+
+    The spec id (the input line number by default) and scheduling fields do
+    not change the result, so they are left out: inserting a line does not
+    change the keys of later lines, and identical specs share one result.
+    Callers keep their own mapping from spec ids to keys.
+    """
+    payload = {key: value for key, value in spec.items() if key not in _UNKEYED_FIELDS}
+    payload["provider"] = config.get_provider()
+    payload["model"] = config.get_model()
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def default_journal_path(config: Config, input_file: str) -> Path:
+    """Get the journal path for an input file, stable across runs from any directory."""
+    resolved = str(Path(input_file).expanduser().resolve())
+    digest = hashlib.sha256(resolved.encode("utf-8")).hexdigest()[:16]
+    return config.config_dir / "journals" / f"{Path(input_file).stem}-{digest}.db"
+
+
+class BatchJournal:
+    """SQLite journal of completed batch results, keyed by idempotency key.
+
+    Every result is committed durably as soon as it completes, so a run that
+    dies part way can be resumed without paying again for finished rows.
+    Failed rows are never journaled and are retried on the next run.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        """Initialize the journal. The database is opened lazily on first use."""
+        self.db_path = db_path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database connection and ensure the schema exists."""
+        if self._connection is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.db_path, isolation_level=None, timeout=5.0, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=FULL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Get the completed result for a key, or None when it has not completed."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT record FROM results WHERE key = ?", (key,))
+                .fetchone()
+            )
+        return json.loads(row[0]) if row else None
+
+    def record(self, key: str, record: dict[str, Any]) -> None:
+        """Store a completed result."""
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO results (key, completed_at, record) VALUES (?, ?, ?)",
+                (key, time.time(), json.dumps(record, ensure_ascii=False)),
+            )
+
+    def run(
+        self,
+        key: str,
+        process: Callable[[], dict[str, Any]],
+    ) -> tuple[dict[str, Any], bool]:
+        """Return the journaled result for ``key``, or run ``process`` and journal it.
+
+        Concurrent calls for the same key share one run. Returns the result and
+        whether it was resumed from the journal or shared with such a call.
+        """
+        record = self.get(key)
+        if record is not None:
+            return record, True
+
+        def run_and_record() -> dict[str, Any]:
+            record = process()
+            if record.get("ok"):
+                self.record(key, record)
+            return record
+
+        return self._flights.do(key, run_and_record)
+
+    def pending_batch(self) -> tuple[str, list[str]] | None:
+        """Get the provider batch submitted by an earlier run and the keys it covers."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT batch_id, keys FROM provider_batches ORDER BY submitted_at DESC LIMIT 1"
+                )
+                .fetchone()
+            )
+        return (row[0], json.loads(row[1])) if row else None
+
+    def save_pending_batch(self, batch_id: str, keys: list[str]) -> None:
+        """Remember a submitted provider batch until its results are journaled."""
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO provider_batches (batch_id, submitted_at, keys) "
+                "VALUES (?, ?, ?)",
+                (batch_id, time.time(), json.dumps(keys)),
+            )
+
+    def clear_pending_batch(self, batch_id: str) -> None:
+        """Forget a provider batch whose results have been collected."""
+        with self._lock:
+            self._connect().execute("DELETE FROM provider_batches WHERE batch_id = ?", (batch_id,))
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,216 @@
+"""Template library: a directory of AC/DoD template files searchable by an inverted index.
+
+Every compiled item of every template file is indexed by its terms, and terms
+are indexed by their character trigrams, so queries match misspelled or
+partially typed words. ``refresh`` only re-reads files whose metadata
+changed, and file contents come from the shared template cache, so keeping
+the index current costs one ``stat`` per file.
+"""
+
+import heapq
+import math
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any
+
+from .templates import (
+    TemplateCache,
+    TemplateError,
+    TemplateItem,
+    TemplateKey,
+    item_applies,
+    template_cache,
+    template_key,
+)
+from .utils import expand_file_path
+
+FUZZY_THRESHOLD = 0.4
+DEFAULT_LIMIT = 10
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-case word terms."""
+    return _TOKEN.findall(text.lower())
+
+
+def trigrams(term: str) -> set[str]:
+    """Get the character trigrams of a term, padded so prefixes share grams."""
+    padded = f"  {term} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+class TemplateLibrary:
+    """In-memory full-text index over the template files under a directory."""
+
+    def __init__(self, root: Path, cache: TemplateCache | None = None) -> None:
+        """Initialize an empty index; call ``refresh`` to load the files."""
+        self.root = Path(root)
+        self.cache = cache
+        self._files: dict[str, tuple[TemplateKey, list[int]]] = {}
+        self._items: dict[int, tuple[str, int, TemplateItem]] = {}
+        self._postings: dict[str, dict[int, int]] = {}
+        self._grams: dict[str, set[str]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of indexed items."""
+        return len(self._items)
+
+    def refresh(self) -> dict[str, int]:
+        """Bring the index up to date with the directory and count the changed files.
+
+        Unreadable files and invalid structured templates are indexed as empty,
+        so they are not read again until their metadata changes.
+        """
+        found = self._scan()
+        changes = {"added": 0, "updated": 0, "removed": 0}
+        cache = self.cache or template_cache()
+        with self._lock:
+            for name in [name for name in self._files if name not in found]:
+                self._remove_file(name)
+                changes["removed"] += 1
+            for name, key in found.items():
+                previous = self._files.get(name)
+                if previous is not None and previous[0] == key:
+                    continue
+                try:
+                    template = cache.get(str(self.root / name), save=False)
+                except TemplateError:
+                    template = None
+                if previous is not None:
+                    self._remove_file(name)
+                self._add_file(name, key, template.items if template is not None else [])
+                changes["updated" if previous is not None else "added"] += 1
+        cache.save()
+        return changes
+
+    def _scan(self) -> dict[str, TemplateKey]:
+        """Find the non-hidden regular files under the root, keyed by relative path."""
+        found = {}
+        for directory, subdirectories, files in os.walk(self.root):
+            subdirectories[:] = [name for name in subdirectories if not name.startswith(".")]
+            for file_name in files:
+                if file_name.startswith("."):
+                    continue
+                path = os.path.join(directory, file_name)
+                try:
+                    key = template_key(os.stat(path))
+                except OSError:
+                    continue
+                found[os.path.relpath(path, self.root)] = key
+        return found
+
+    def _add_file(self, name: str, key: TemplateKey, items: list[TemplateItem]) -> None:
+        item_ids = []
+        for position, item in enumerate(items, 1):
+            item_id = self._next_id
+            self._next_id += 1
+            self._items[item_id] = (name, position, item)
+            item_ids.append(item_id)
+            for term in tokenize(item[0]):
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    for gram in trigrams(term):
+                        self._grams.setdefault(gram, set()).add(term)
+                postings[item_id] = postings.get(item_id, 0) + 1
+        self._files[name] = (key, item_ids)
+
+    def _remove_file(self, name: str) -> None:
+        _, item_ids = self._files.pop(name)
+        for item_id in item_ids:
+            _, _, item = self._items.pop(item_id)
+            for term in set(tokenize(item[0])):
+                postings = self._postings[term]
+                postings.pop(item_id, None)
+                if postings:
+                    continue
+                del self._postings[term]
+                for gram in trigrams(term):
+                    terms = self._grams[gram]
+                    terms.discard(term)
+                    if not terms:
+                        del self._grams[gram]
+
+    def _expand(self, query_term: str) -> dict[str, float]:
+        """Map a query term to the indexed terms it matches, with their similarity."""
+        grams = trigrams(query_term)
+        shared: dict[str, int] = {}
+        for gram in grams:
+            for term in self._grams.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+
+        matches = {}
+        for term, count in shared.items():
+            similarity = count / (len(grams) + len(trigrams(term)) - count)
+            if term.startswith(query_term):
+                similarity = max(similarity, 0.9 if term != query_term else 1.0)
+            if similarity >= FUZZY_THRESHOLD:
+                matches[term] = similarity
+        return matches
+
+    def search(
+        self,
+        query: str,
+        limit: int = DEFAULT_LIMIT,
+        platform: str | None = None,
+        language: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Find the items best matching a query, most relevant first.
+
+        Each query term contributes the IDF of its best matching indexed term
+        in an item, scaled by how similar the two terms are. Items whose
+        conditions exclude the given platform or language are left out.
+        """
+        with self._lock:
+            total = len(self._items)
+            scores: dict[int, float] = {}
+            for query_term in set(tokenize(query)):
+                best: dict[int, float] = {}
+                for term, similarity in self._expand(query_term).items():
+                    postings = self._postings[term]
+                    weight = similarity * math.log(1 + total / len(postings))
+                    for item_id in postings:
+                        if weight > best.get(item_id, 0.0):
+                            best[item_id] = weight
+                for item_id, weight in best.items():
+                    scores[item_id] = scores.get(item_id, 0.0) + weight
+
+            top = heapq.nsmallest(
+                limit,
+                (
+                    entry
+                    for entry in scores.items()
+                    if item_applies(self._items[entry[0]][2], platform, language)
+                ),
+                key=lambda entry: (-entry[1], len(self._items[entry[0]][2][0]), entry[0]),
+            )
+            return [
+                {
+                    "file": self._items[item_id][0],
+                    "item": self._items[item_id][1],
+                    "text": self._items[item_id][2][0],
+                    "score": round(score, 4),
+                }
+                for item_id, score in top
+            ]
+
+
+_libraries: dict[str, TemplateLibrary] = {}
+_libraries_lock = threading.Lock()
+
+
+def template_library(root: str) -> TemplateLibrary:
+    """Get the process-wide, refreshed index of a template library directory."""
+    path = expand_file_path(root)
+    with _libraries_lock:
+        if path not in _libraries:
+            _libraries[path] = TemplateLibrary(Path(path))
+        library = _libraries[path]
+    library.refresh()
+    return library
@@ -1,11 +1,33 @@
 """Main orchestrator for TicketPlease application."""
 
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, TextIO
+
 from rich.console import Console
+from rich.table import Table
 
+from ai.batches import BatchAPIError, create_batch_client
+from ai.usage import UsageLedger
 from config.service import Config
 from config.wizard import ConfigWizard
 
-from .generator import TaskGenerator
+from .daemon import DaemonClient, RemoteAIService, TaskDaemon, service_settings
+from .generator import TaskGenerator, build_ai_service, build_scheduler
+from .journal import BatchJournal, default_journal_path, idempotency_key
+from .library import template_library
+from .pipeline import TaskProcessor, parse_task_spec, run_pipeline
+from .provider_batch import POLL_INTERVAL, run_provider_batch
+from .server import TaskServer
+from .spool import Spool, SpoolWorker, run_spooled, worker_name
+from .symbols import SymbolIndex, default_index_path, repository_root
+from .utils import expand_file_path
 
 console = Console()
 
@@ -22,7 +44,7 @@ def run_config(is_update: bool = False) -> None:
             )
             console.print()
         try:
-            wizard = ConfigWizard()
+            wizard = ConfigWizard(config)
             wizard.run()
         except KeyboardInterrupt:
             console.print("\n❌ Configuration cancelled.")
@@ -41,7 +63,7 @@ def run_config(is_update: bool = False) -> None:
 
     # Configuration exists, run update
     try:
-        wizard = ConfigWizard()
+        wizard = ConfigWizard(config)
         wizard.run_update()
     except KeyboardInterrupt:
         console.print("\n❌ Configuration update cancelled.")
@@ -51,9 +73,34 @@ def run_config(is_update: bool = False) -> None:
         return
 
 
-def run_task_generation() -> None:
-    """Run the task generation flow."""
+def build_config(
+    platform: str | None = None,
+    language: str | None = None,
+    model: str | None = None,
+    relevant_items: int | None = None,
+) -> Config:
+    """Create the configuration with command line overrides applied on top of TK_* variables."""
     config = Config()
+    overrides = {
+        ("preferences", "default_platform"): platform,
+        ("preferences", "default_output_language"): language,
+        ("llm", "model"): model,
+        ("preferences", "relevant_items"): None if relevant_items is None else str(relevant_items),
+    }
+    for (section, key), value in overrides.items():
+        if value:
+            config.set_override(section, key, value)
+    return config
+
+
+def run_task_generation(
+    config: Config | None = None,
+    output_format: str | None = None,
+    attach: list[str] | None = None,
+    from_diff: str | None = None,
+) -> None:
+    """Run the task generation flow."""
+    config = config or Config()
 
     # Check if configuration exists
     if config.is_first_run():
@@ -66,4 +113,450 @@ def run_task_generation() -> None:
         return
 
     generator = TaskGenerator(config)
-    generator.generate_task()
+    generator.generate_task(output_format=output_format, attach=attach, from_diff=from_diff)
+
+
+def run_non_interactive_generation(
+    description_file: str,
+    ac_file: str | None = None,
+    dod_file: str | None = None,
+    platform: str | None = None,
+    language: str | None = None,
+    model: str | None = None,
+    output: str = "-",
+    output_format: str = "plain",
+    relevant_items: int | None = None,
+    attach: list[str] | None = None,
+    from_diff: str | None = None,
+) -> bool:
+    """Generate a task description from files and flags without any prompt."""
+    config = build_config(
+        platform=platform, language=language, model=model, relevant_items=relevant_items
+    )
+    generator = TaskGenerator(config)
+
+    try:
+        task_data = generator.collector.collect_task_data_from_options(
+            description_file,
+            ac_file=ac_file,
+            dod_file=dod_file,
+            attach=attach,
+            from_diff=from_diff,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+
+    return generator.generate_task_non_interactive(task_data, output, output_format)
+
+
+def write_json_line(record: dict[str, Any], stream: TextIO | None = None) -> None:
+    """Write one JSON record per line to stdout (or ``stream``) and flush it immediately."""
+    stream = stream or sys.stdout
+    stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def build_task_processor(
+    config: Config, priority: str | None = None, caller: str = ""
+) -> TaskProcessor:
+    """Create a processor that forwards to a running daemon, or runs in process.
+
+    The daemon schedules the requests of all its clients together; in process,
+    the configured limits apply to this command only.
+    """
+    client = DaemonClient()
+    if client.ping() is not None:
+        return TaskProcessor(
+            config,
+            lambda: RemoteAIService(
+                client,
+                service_settings(config),
+                lambda: build_ai_service(config),
+                priority,
+                caller,
+            ),
+        )
+    scheduler = build_scheduler(config)
+    return TaskProcessor(
+        config, lambda: build_ai_service(config, scheduler), scheduler, priority, caller
+    )
+
+
+def run_stream(concurrency: int) -> bool:
+    """Process NDJSON task specs from stdin and write NDJSON results to stdout."""
+    config = Config()
+    if not config.is_configured():
+        print(
+            "Error: configuration is incomplete. Run 'tk config' or set TK_API_KEY.",
+            file=sys.stderr,
+        )
+        return False
+
+    processor = build_task_processor(config)
+    counts = run_pipeline(
+        sys.stdin,
+        lambda line, line_number: parse_task_spec(line, line_number, config),
+        processor.process,
+        write_json_line,
+        concurrency=concurrency,
+    )
+    return counts["failed"] == 0
+
+
+def run_batch(
+    input_file: str,
+    output: str,
+    concurrency: int,
+    caller: str | None = None,
+    journal_path: str | None = None,
+    spool_dir: str | None = None,
+    provider_batch: bool = False,
+    poll_interval: float = POLL_INTERVAL,
+) -> bool:
+    """Process a file of NDJSON task specs in the batch priority class.
+
+    Completed results are checkpointed to a journal (by default one per input
+    file), so rerunning an interrupted batch skips finished rows and retries
+    only failures. With ``spool_dir`` the specs are queued for ``tk worker``
+    processes instead, and the spool keeps the results. With
+    ``provider_batch`` they are submitted to the provider's batch API, which
+    is cheaper but may take hours. Output files are written under a temporary
+    name and only renamed into place once the run ends.
+    """
+    config = Config()
+    if not config.is_configured():
+        print(
+            "Error: configuration is incomplete. Run 'tk config' or set TK_API_KEY.",
+            file=sys.stderr,
+        )
+        return False
+    if provider_batch and spool_dir is not None:
+        print("Error: --async-provider-batch cannot be combined with --spool.", file=sys.stderr)
+        return False
+
+    batch_client = None
+    if provider_batch:
+        try:
+            batch_client = create_batch_client(
+                config.get_provider(), config.get_api_key() or "", config.get_api_base()
+            )
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return False
+
+    caller = caller or f"batch:{Path(input_file).name}"
+    processor = build_task_processor(config, priority="batch", caller=caller)
+    if journal_path is None and input_file != "-" and spool_dir is None:
+        journal_path = str(default_journal_path(config, input_file))
+    journal = BatchJournal(Path(journal_path)) if journal_path else None
+    partial_output = f"{output}.partial"
+    resumed = []
+
+    def process(spec: dict[str, Any]) -> dict[str, Any]:
+        if journal is None:
+            return processor.process(spec)
+        key = idempotency_key(spec, config)
+        record, was_resumed = journal.run(key, lambda: processor.process(spec))
+        if was_resumed:
+            resumed.append(key)
+        return {**record, "id": spec["id"]}
+
+    with ExitStack() as stack:
+        try:
+            lines = (
+                sys.stdin
+                if input_file == "-"
+                else stack.enter_context(open(input_file, encoding="utf-8"))
+            )
+            results = (
+                sys.stdout
+                if output == "-"
+                else stack.enter_context(open(partial_output, "w", encoding="utf-8"))
+            )
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return False
+        if journal is not None:
+            stack.callback(journal.close)
+
+        def parse(line: str, line_number: int) -> dict[str, Any]:
+            return parse_task_spec(line, line_number, config)
+
+        def emit(record: dict[str, Any]) -> None:
+            write_json_line(record, results)
+
+        if spool_dir is not None:
+            counts = run_spooled(
+                Spool(Path(spool_dir)),
+                lines,
+                parse,
+                lambda spec: idempotency_key(spec, config),
+                emit,
+            )
+        elif batch_client is not None:
+            try:
+                counts = run_provider_batch(
+                    build_ai_service(config, build_scheduler(config)),
+                    batch_client,
+                    lines,
+                    parse,
+                    lambda spec: idempotency_key(spec, config),
+                    emit,
+                    journal,
+                    poll_interval,
+                    lambda status: print(status, file=sys.stderr),
+                )
+            except BatchAPIError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return False
+        else:
+            counts = run_pipeline(lines, parse, process, emit, concurrency=concurrency)
+        if results is not sys.stdout:
+            os.fsync(results.fileno())
+
+    if output != "-":
+        os.replace(partial_output, output)
+
+    summary = f"Processed {counts['processed']} tasks, {counts['failed']} failed."
+    if journal is not None:
+        summary += f" {counts.get('resumed', len(resumed))} resumed from {journal_path}."
+    print(summary, file=sys.stderr)
+    return counts["failed"] == 0
+
+
+def run_worker(
+    spool_dir: str, concurrency: int, lease_seconds: float, exit_when_empty: bool
+) -> bool:
+    """Process jobs from a shared spool with this machine's configuration and API key."""
+    config = Config()
+    if not config.is_configured():
+        print(
+            "Error: configuration is incomplete. Run 'tk config' or set TK_API_KEY.",
+            file=sys.stderr,
+        )
+        return False
+
+    spool = Spool(Path(spool_dir), lease_seconds)
+    name = worker_name()
+    processor = build_task_processor(config, priority="batch", caller=f"worker:{name}")
+    worker = SpoolWorker(spool, processor.process, name, concurrency)
+    print(f"Worker {worker.name} processing jobs from {spool.root}", file=sys.stderr)
+    try:
+        completed = worker.run(exit_when_empty)
+    except KeyboardInterrupt:
+        worker.stop()
+        completed = worker.completed
+    except (OSError, ValueError) as e:
+        print(f"Error: spool {spool.root}: {e}", file=sys.stderr)
+        print(f"Completed {worker.completed} jobs before the error.", file=sys.stderr)
+        return False
+    print(f"Completed {completed} jobs.", file=sys.stderr)
+    return True
+
+
+def run_daemon(idle_timeout: float, concurrency: int) -> bool:
+    """Run the background daemon in the foreground until it is stopped or idle."""
+    config = Config()
+    if not config.is_configured():
+        console.print("[red]❌ Configuration is incomplete. Run 'tk config' first.[/red]")
+        return False
+
+    scheduler = build_scheduler(config, concurrency)
+    daemon = TaskDaemon(
+        config,
+        lambda: build_ai_service(config, scheduler),
+        idle_timeout=idle_timeout,
+        concurrency=concurrency,
+        scheduler=scheduler,
+    )
+    try:
+        daemon.warm_up()
+        console.print(f"[green]✅ Daemon listening on {daemon.path}[/green]")
+        daemon.serve()
+    except (RuntimeError, ValueError, OSError) as e:
+        console.print(f"[red]❌ {e}[/red]")
+        return False
+    except KeyboardInterrupt:
+        daemon.stop()
+    return True
+
+
+def stop_daemon() -> bool:
+    """Ask a running daemon to exit."""
+    client = DaemonClient()
+    if client.ping() is None:
+        console.print("[yellow]No daemon is running.[/yellow]")
+        return False
+    client.request({"op": "shutdown"})
+    console.print("✅ Daemon stopped.")
+    return True
+
+
+def show_daemon_status() -> bool:
+    """Show whether a daemon is running."""
+    client = DaemonClient()
+    status = client.ping()
+    if status is None:
+        console.print("[yellow]No daemon is running.[/yellow]")
+        return False
+    console.print(
+        f"✅ Daemon running (pid {status['pid']}, model {status['model']}) on {client.path}"
+    )
+    print_scheduler_stats(status["scheduler"])
+    return True
+
+
+def print_scheduler_stats(stats: dict[str, Any]) -> None:
+    """Show queue depth and wait times per priority class."""
+    table = Table(title=f"Scheduler ({stats['in_flight']} in flight)")
+    table.add_column("Class")
+    for column in ("Queued", "Admitted", "Wait p50 ms", "Wait p90 ms", "Wait max ms"):
+        table.add_column(column, justify="right")
+
+    for priority, row in stats["classes"].items():
+        table.add_row(
+            priority,
+            str(row["queued"]),
+            str(row["granted"]),
+            f"{row['wait_p50_ms']:.0f}",
+            f"{row['wait_p90_ms']:.0f}",
+            f"{row['wait_max_ms']:.0f}",
+        )
+
+    console.print(table)
+
+
+def run_serve(host: str, port: int, concurrency: int, timeout: float, max_pending: int) -> bool:
+    """Serve the HTTP API until interrupted."""
+    config = Config()
+    if not config.is_configured():
+        console.print("[red]❌ Configuration is incomplete. Run 'tk config' first.[/red]")
+        return False
+
+    scheduler = build_scheduler(config, concurrency)
+    server = TaskServer(
+        config,
+        lambda: build_ai_service(config, scheduler),
+        host=host,
+        port=port,
+        concurrency=concurrency,
+        timeout=timeout,
+        max_pending=max_pending,
+        scheduler=scheduler,
+    )
+    console.print(f"[green]✅ Serving on http://{host}:{port}[/green]")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        console.print(f"[red]❌ {e}[/red]")
+        return False
+    return True
+
+
+def run_stats(group_by: str = "day", days: int | None = None) -> bool:
+    """Show aggregated token usage and cost from the local ledger.
+
+    Returns False when the grouping is not supported.
+    """
+    config = Config()
+    ledger = UsageLedger(config.get_usage_db_path())
+    since = time.time() - days * 86400 if days else None
+
+    try:
+        summary = ledger.summarize(group_by, since)
+    except ValueError as e:
+        console.print(f"[red]❌ {e}[/red]")
+        return False
+    finally:
+        ledger.close()
+
+    if not summary:
+        console.print("[yellow]No usage recorded yet.[/yellow]")
+        return True
+
+    table = Table(title=f"Usage by {group_by}")
+    table.add_column(group_by.capitalize())
+    for column in (
+        "Calls",
+        "Coalesced",
+        "Prompt",
+        "Completion",
+        "Cached",
+        "Cost ($)",
+        "p50 ms",
+        "p90 ms",
+        "p99 ms",
+    ):
+        table.add_column(column, justify="right")
+
+    for row in summary:
+        table.add_row(
+            str(row["group"]),
+            str(row["calls"]),
+            str(row["coalesced"]),
+            str(row["prompt_tokens"]),
+            str(row["completion_tokens"]),
+            str(row["cached_tokens"]),
+            f"{row['cost']:.4f}",
+            f"{row['latency_p50_ms']:.0f}",
+            f"{row['latency_p90_ms']:.0f}",
+            f"{row['latency_p99_ms']:.0f}",
+        )
+
+    console.print(table)
+    return True
+
+
+def run_symbol_index(query: str | None = None) -> bool:
+    """Update the current repository's symbol index and print the symbols named in ``query``."""
+    root = repository_root()
+    if root is None:
+        print("Error: not inside a git repository.", file=sys.stderr)
+        return False
+
+    index = SymbolIndex(default_index_path(Config(), root), root)
+    try:
+        started = time.perf_counter()
+        changes = index.update()
+        elapsed = time.perf_counter() - started
+        if query:
+            for match in index.lookup(query):
+                print(f"{match['path']}:{match['line']}: {match['kind']} {match['name']}")
+            return True
+        counts = index.stats()
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+    finally:
+        index.close()
+
+    print(
+        f"Indexed {counts['symbols']} symbols in {counts['files']} files in {elapsed:.2f}s "
+        f"({changes['added']} added, {changes['updated']} updated, "
+        f"{changes['removed']} removed)."
+    )
+    return True
+
+
+def run_template_search(
+    query: str, limit: int, as_json: bool = False, library: str | None = None
+) -> bool:
+    """Search the template library and print the best matching items."""
+    root = library or Config().get_template_library()
+    if not root or not Path(expand_file_path(root)).is_dir():
+        print(
+            "Error: no template library directory. Set template_library in the [preferences] "
+            "section, TK_TEMPLATE_LIBRARY or --library.",
+            file=sys.stderr,
+        )
+        return False
+
+    for match in template_library(root).search(query, limit):
+        if as_json:
+            write_json_line(match)
+        else:
+            print(f"{match['file']}:{match['item']}: {match['text']}")
+    return True
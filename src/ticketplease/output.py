@@ -0,0 +1,54 @@
+"""Machine-readable output formats for generated descriptions."""
+
+import json
+from typing import Any
+
+OUTPUT_FORMATS = ("plain", "json", "markdown")
+
+METADATA_KEYS = (
+    "provider",
+    "model",
+    "platform",
+    "language",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "latency_ms",
+    "cost",
+    "coalesced",
+)
+
+
+def build_metadata(
+    usage: dict[str, Any] | None, platform: str = "", language: str = ""
+) -> dict[str, Any]:
+    """Collect result metadata from the AI service usage of the last call."""
+    metadata: dict[str, Any] = {"platform": platform, "language": language}
+    if usage:
+        metadata.update({key: usage[key] for key in METADATA_KEYS if key in usage})
+        metadata["platform"] = platform or usage.get("platform", "")
+    return {key: metadata[key] for key in METADATA_KEYS if key in metadata}
+
+
+def render_output(description: str, output_format: str, metadata: dict[str, Any]) -> str:
+    """Render a description in one of the machine-readable output formats.
+
+    ``plain`` is the raw description, ``json`` a single object with the
+    description and metadata, and ``markdown`` the description preceded by a
+    YAML front matter block with the metadata.
+    """
+    if output_format == "plain":
+        return description
+
+    if output_format == "json":
+        return json.dumps({"description": description, **metadata}, ensure_ascii=False)
+
+    if output_format == "markdown":
+        front_matter = "\n".join(
+            f"{key}: {json.dumps(value, ensure_ascii=False)}" for key, value in metadata.items()
+        )
+        return f"---\n{front_matter}\n---\n\n{description}"
+
+    raise ValueError(
+        f"Unsupported output format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+    )
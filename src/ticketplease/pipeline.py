@@ -0,0 +1,322 @@
+"""NDJSON task pipeline: one JSON task spec in, one JSON result out."""
+
+import json
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any
+
+from ai import metrics
+from ai.scheduler import PRIORITIES, Scheduler
+from ai.service import AIService
+from config.service import Config
+
+from .relevance import select_relevant
+from .templates import TemplateError, template_cache
+
+DEFAULT_CONCURRENCY = 4
+OPERATIONS = ("generate", "refine", "convert")
+PLATFORMS = ("github", "jira")
+
+
+class TaskSpecError(ValueError):
+    """Raised when a task spec line is not a valid request."""
+
+
+def parse_task_spec(line: str, line_number: int, config: Config) -> dict[str, Any]:
+    """Parse and normalize one NDJSON task spec; ``id`` defaults to the line number."""
+    try:
+        raw = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise TaskSpecError(f"Invalid JSON: {e.msg}") from e
+
+    return normalize_task_spec(raw, line_number, config)
+
+
+def normalize_task_spec(raw: Any, default_id: Any, config: Config) -> dict[str, Any]:
+    """Validate a decoded task spec and fill defaults from the configuration.
+
+    Generate specs need ``description`` and accept ``acceptance_criteria`` /
+    ``definition_of_done`` lists or ``ac_file`` / ``dod_file`` paths, plus
+    ``platform``, ``language``, template ``tags`` and a code ``context``
+    (excerpts of files or diffs). Refine specs need ``description`` (the
+    current text) and ``refinement``. Convert specs need ``description`` and
+    accept the target ``platform`` and ``language``. Any spec may name its
+    scheduling ``priority`` class and ``caller``.
+    """
+    if not isinstance(raw, dict):
+        raise TaskSpecError("Task spec must be a JSON object")
+
+    operation = raw.get("operation", "generate")
+    if operation not in OPERATIONS:
+        raise TaskSpecError(f"Unsupported operation '{operation}'")
+
+    description = str(raw.get("description") or "").strip()
+    if not description:
+        raise TaskSpecError("Task spec requires a non-empty 'description'")
+
+    spec: dict[str, Any] = {
+        "id": raw.get("id", default_id),
+        "operation": operation,
+        "description": description,
+    }
+
+    for key in ("priority", "caller"):
+        if raw.get(key):
+            spec[key] = str(raw[key])
+    if spec.get("priority", PRIORITIES[0]) not in PRIORITIES:
+        raise TaskSpecError(f"Unsupported priority '{spec['priority']}'")
+
+    if operation == "refine":
+        refinement = str(raw.get("refinement") or "").strip()
+        if not refinement:
+            raise TaskSpecError("Refine specs require a non-empty 'refinement'")
+        spec["refinement"] = refinement
+        return spec
+
+    platform = str(raw.get("platform") or config.get_platform()).lower()
+    if platform not in PLATFORMS:
+        raise TaskSpecError(f"Unsupported platform '{platform}'")
+
+    spec["platform"] = platform
+    spec["language"] = raw.get("language") or config.get_language()
+    if operation == "convert":
+        return spec
+
+    if raw.get("context"):
+        spec["context"] = str(raw["context"])
+
+    tags = raw.get("tags")
+    if tags is None:
+        tags = config.get_template_tags()
+    elif not isinstance(tags, list):
+        raise TaskSpecError("'tags' must be a list of strings")
+
+    relevant_items = config.get_relevant_items()
+    for list_key, file_key in (
+        ("acceptance_criteria", "ac_file"),
+        ("definition_of_done", "dod_file"),
+    ):
+        items = _criteria(raw, list_key, file_key, spec, [str(tag) for tag in tags])
+        if raw.get(list_key) is None and raw.get(file_key):
+            items = select_relevant(items, description, relevant_items)
+        spec[list_key] = items
+    return spec
+
+
+def _generation_args(spec: dict[str, Any]) -> dict[str, Any]:
+    """Map a generate spec to the arguments of the AI service generation methods."""
+    args = {
+        "task_description": spec["description"],
+        "acceptance_criteria": spec["acceptance_criteria"],
+        "definition_of_done": spec["definition_of_done"],
+        "platform": spec["platform"],
+        "language": spec["language"],
+    }
+    if spec.get("context"):
+        args["context"] = spec["context"]
+    return args
+
+
+def _criteria(
+    raw: dict[str, Any], list_key: str, file_key: str, spec: dict[str, Any], tags: list[str]
+) -> list[str]:
+    if raw.get(list_key) is not None:
+        if not isinstance(raw[list_key], list):
+            raise TaskSpecError(f"'{list_key}' must be a list of strings")
+        return [str(item).strip() for item in raw[list_key] if str(item).strip()]
+    if raw.get(file_key):
+        try:
+            items = template_cache().load(
+                str(raw[file_key]), platform=spec["platform"], language=spec["language"], tags=tags
+            )
+        except TemplateError as e:
+            raise TaskSpecError(str(e)) from e
+        return items or []
+    return []
+
+
+class TaskProcessor:
+    """Run task specs against configured AI services kept in a pool for reuse.
+
+    With a ``scheduler``, each spec waits for admission in its priority class:
+    the spec's ``priority``, else the processor's, else ``refine`` for
+    refinements and ``interactive`` for everything else. Request counts,
+    queue and total latency are recorded in ``ai.metrics``.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        service_factory: Callable[[], AIService],
+        scheduler: Scheduler | None = None,
+        priority: str | None = None,
+        caller: str = "",
+    ) -> None:
+        """Initialize the processor with a factory that builds configured AI services."""
+        self.config = config
+        self.service_factory = service_factory
+        self.scheduler = scheduler
+        self.priority = priority
+        self.caller = caller
+        self._idle_services: queue.SimpleQueue[AIService] = queue.SimpleQueue()
+
+    @contextmanager
+    def _service(self) -> Iterator[AIService]:
+        try:
+            service = self._idle_services.get_nowait()
+        except queue.Empty:
+            service = self.service_factory()
+        try:
+            yield service
+        finally:
+            self._idle_services.put(service)
+
+    def _metric_labels(self, spec: dict[str, Any]) -> dict[str, str]:
+        return {
+            "provider": self.config.get_provider(),
+            "model": self.config.get_model(),
+            "platform": spec.get("platform", ""),
+            "operation": spec["operation"],
+        }
+
+    @contextmanager
+    def _admission(self, spec: dict[str, Any], timeout: float | None) -> Iterator[None]:
+        labels = self._metric_labels(spec)
+        started_at = time.perf_counter()
+        metrics.requests_in_flight.inc(**labels)
+        status = "error"
+        try:
+            with self._scheduled(spec, timeout, labels):
+                yield
+            status = "ok"
+        finally:
+            metrics.requests_in_flight.dec(**labels)
+            metrics.requests_total.inc(status=status, **labels)
+            metrics.request_duration.observe(time.perf_counter() - started_at, **labels)
+
+    @contextmanager
+    def _scheduled(
+        self, spec: dict[str, Any], timeout: float | None, labels: dict[str, str]
+    ) -> Iterator[None]:
+        if self.scheduler is None:
+            yield
+            return
+
+        default = "refine" if spec["operation"] == "refine" else "interactive"
+        priority = spec.get("priority") or self.priority or default
+        started_at = time.perf_counter()
+        metrics.queued_requests.inc(priority=priority, **labels)
+        try:
+            self.scheduler.acquire(priority, spec.get("caller", self.caller), timeout)
+        finally:
+            metrics.queued_requests.dec(priority=priority, **labels)
+        metrics.queue_wait.observe(time.perf_counter() - started_at, priority=priority, **labels)
+
+        try:
+            yield
+        finally:
+            self.scheduler.release()
+
+    def process(self, spec: dict[str, Any], timeout: float | None = None) -> dict[str, Any]:
+        """Process a parsed spec and return its result record.
+
+        ``timeout`` bounds the wait for scheduler admission (TimeoutError when exceeded).
+        """
+        with self._admission(spec, timeout), self._service() as service:
+            return self._run(service, spec)
+
+    def _run(self, service: AIService, spec: dict[str, Any]) -> dict[str, Any]:
+        if spec["operation"] == "refine":
+            description = service.refine_task_description(spec["description"], spec["refinement"])
+        elif spec["operation"] == "convert":
+            description = service.convert_task_description(
+                spec["description"], spec["platform"], spec["language"]
+            )
+        else:
+            description = service.generate_task_description(**_generation_args(spec))
+
+        return self._result(spec, service, description)
+
+    def stream(
+        self, spec: dict[str, Any], on_text: Callable[[str], None], timeout: float | None = None
+    ) -> dict[str, Any]:
+        """Process a parsed spec, passing text to ``on_text`` as it is generated."""
+        with self._admission(spec, timeout), self._service() as service:
+            chunks = []
+            for text in self._stream_texts(service, spec):
+                chunks.append(text)
+                on_text(text)
+            return self._result(spec, service, "".join(chunks))
+
+    def _stream_texts(self, service: AIService, spec: dict[str, Any]) -> Iterator[str]:
+        if spec["operation"] == "refine":
+            return service.refine_task_description_stream(spec["description"], spec["refinement"])
+        if spec["operation"] == "convert":
+            return service.convert_task_description_stream(
+                spec["description"], spec["platform"], spec["language"]
+            )
+        return service.generate_task_description_stream(**_generation_args(spec))
+
+    def _result(self, spec: dict[str, Any], service: AIService, description: str) -> dict[str, Any]:
+        return {
+            "id": spec["id"],
+            "ok": True,
+            "description": description.strip(),
+            "usage": service.last_usage,
+        }
+
+
+def run_pipeline(
+    lines: Iterable[str],
+    parse: Callable[[str, int], dict[str, Any]],
+    process: Callable[[dict[str, Any]], dict[str, Any]],
+    emit: Callable[[dict[str, Any]], None],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> dict[str, int]:
+    """Process NDJSON lines concurrently and emit results as they complete.
+
+    At most ``concurrency`` specs are in flight: the next line is only read
+    once a slot frees up, so memory stays flat for unbounded input. Results are
+    emitted in completion order; failures become ``{"ok": false}`` records.
+    """
+    slots = threading.BoundedSemaphore(concurrency)
+    emit_lock = threading.Lock()
+    counts = {"processed": 0, "failed": 0}
+
+    def emit_record(record: dict[str, Any]) -> None:
+        with emit_lock:
+            counts["processed"] += 1
+            if not record.get("ok"):
+                counts["failed"] += 1
+            emit(record)
+
+    def on_done(spec_id: Any, future: Future) -> None:
+        try:
+            record = future.result()
+        except Exception as e:
+            record = {"id": spec_id, "ok": False, "error": str(e)}
+        try:
+            emit_record(record)
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+
+            try:
+                spec = parse(line, line_number)
+            except ValueError as e:
+                emit_record({"id": line_number, "ok": False, "error": str(e)})
+                continue
+
+            slots.acquire()
+            future = executor.submit(process, spec)
+            future.add_done_callback(lambda done, spec_id=spec["id"]: on_done(spec_id, done))
+
+    return counts
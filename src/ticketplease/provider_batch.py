@@ -0,0 +1,103 @@
+"""Run a batch of task specs through the provider's asynchronous batch API."""
+
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from ai.batches import AnthropicBatchClient, OpenAIBatchClient
+from ai.service import AIService
+
+from .journal import BatchJournal
+
+POLL_INTERVAL = 30.0
+
+
+def run_provider_batch(
+    service: AIService,
+    client: OpenAIBatchClient | AnthropicBatchClient,
+    lines: Iterable[str],
+    parse: Callable[[str, int], dict[str, Any]],
+    key_for: Callable[[dict[str, Any]], str],
+    emit: Callable[[dict[str, Any]], None],
+    journal: BatchJournal | None = None,
+    poll_interval: float = POLL_INTERVAL,
+    on_status: Callable[[str], None] | None = None,
+) -> dict[str, int]:
+    """Submit NDJSON task specs as one provider batch and emit results once it ends.
+
+    Records have the same shape as in live mode. Each spec's idempotency key
+    is its custom id, so identical specs are sent once. With a journal,
+    completed rows are skipped and the submitted batch is remembered: a run
+    interrupted while waiting picks the same batch up again instead of
+    paying for a new one. Raises BatchAPIError when the provider API fails.
+    """
+    counts = {"processed": 0, "failed": 0, "resumed": 0}
+
+    def emit_record(record: dict[str, Any]) -> None:
+        counts["processed"] += 1
+        if not record.get("ok"):
+            counts["failed"] += 1
+        emit(record)
+
+    pending: dict[str, list[dict[str, Any]]] = {}
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            spec = parse(line, line_number)
+        except ValueError as e:
+            emit_record({"id": line_number, "ok": False, "error": str(e)})
+            continue
+        key = key_for(spec)
+        record = journal.get(key) if journal is not None else None
+        if record is not None:
+            counts["resumed"] += 1
+            emit_record({**record, "id": spec["id"]})
+        else:
+            pending.setdefault(key, []).append(spec)
+
+    if not pending:
+        return counts
+
+    previous = journal.pending_batch() if journal is not None else None
+    if previous is not None and set(previous[1]) == set(pending):
+        batch_id = previous[0]
+    else:
+        batch_id = client.submit(
+            [(key, service.batch_request(specs[0])) for key, specs in pending.items()]
+        )
+        if journal is not None:
+            journal.save_pending_batch(batch_id, list(pending))
+
+    started_at = time.perf_counter()
+    while True:
+        status, done = client.status(batch_id)
+        if on_status is not None:
+            on_status(f"Batch {batch_id}: {status}")
+        if done:
+            break
+        time.sleep(poll_interval)
+    latency_ms = (time.perf_counter() - started_at) * 1000
+
+    results = client.results(batch_id)
+    for key, specs in pending.items():
+        result = results.get(key) or {"ok": False, "error": "No result in the provider batch"}
+        if result["ok"]:
+            usage = service.record_batch_usage(specs[0], result["usage"], latency_ms)
+        for spec in specs:
+            if not result["ok"]:
+                emit_record({"id": spec["id"], "ok": False, "error": result["error"]})
+                continue
+            record = {
+                "id": spec["id"],
+                "ok": True,
+                "description": result["description"],
+                "usage": usage,
+            }
+            if journal is not None:
+                journal.record(key, record)
+            emit_record(record)
+
+    if journal is not None:
+        journal.clear_pending_batch(batch_id)
+    return counts
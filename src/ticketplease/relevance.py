@@ -0,0 +1,72 @@
+"""Local BM25 ranking that keeps only the template items relevant to a task.
+
+Company-wide AC/DoD files can list a hundred items when a dozen apply to a
+given task; sending only those shrinks the prompt, its cost and latency.
+"""
+
+import math
+from collections import Counter
+
+from .library import tokenize
+
+K1 = 1.5
+B = 0.75
+
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+def stem(term: str) -> str:
+    """Strip common English inflections so "refunds" and "refunded" match "refund"."""
+    for suffix in _SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+            return term[: -len(suffix)]
+    return term
+
+
+def bm25_scores(query: str, items: list[str]) -> list[float]:
+    """Score each item against the query with Okapi BM25."""
+    documents = [[stem(term) for term in tokenize(item)] for item in items]
+    if not documents:
+        return []
+
+    average_length = sum(map(len, documents)) / len(documents) or 1.0
+    frequencies = Counter(term for document in documents for term in set(document))
+    query_terms = {stem(term) for term in tokenize(query)}
+    idf = {
+        term: math.log(1 + (len(documents) - frequencies[term] + 0.5) / (frequencies[term] + 0.5))
+        for term in query_terms
+        if term in frequencies
+    }
+
+    scores = []
+    for document in documents:
+        counts = Counter(document)
+        norm = K1 * (1 - B + B * len(document) / average_length)
+        scores.append(
+            sum(
+                weight * counts[term] * (K1 + 1) / (counts[term] + norm)
+                for term, weight in idf.items()
+                if term in counts
+            )
+        )
+    return scores
+
+
+def select_relevant(items: list[str], query: str, limit: int) -> list[str]:
+    """Keep the ``limit`` items most relevant to the query, in their original order.
+
+    Items that share no term with the query are dropped. When no item matches
+    at all (e.g. the task is written in another language), or ``limit`` is 0,
+    the items are returned unchanged.
+    """
+    if limit <= 0 or len(items) <= limit:
+        return items
+
+    scores = bm25_scores(query, items)
+    ranked = sorted(
+        (index for index, score in enumerate(scores) if score > 0),
+        key=lambda index: -scores[index],
+    )
+    if not ranked:
+        return items
+    return [items[index] for index in sorted(ranked[:limit])]
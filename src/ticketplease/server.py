@@ -0,0 +1,283 @@
+"""Local HTTP API exposing task generation to other tools."""
+
+import asyncio
+import json
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from http import HTTPStatus
+from typing import Any
+
+from ai import metrics
+from ai.coalesce import completion_flights
+from ai.scheduler import Scheduler
+from config.service import Config
+
+from .pipeline import TaskProcessor, TaskSpecError, normalize_task_spec
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_MAX_PENDING = 64
+MAX_BODY_BYTES = 1_000_000
+
+# Spec fields that read files on the server; clients send the item lists instead.
+LOCAL_FILE_FIELDS = ("ac_file", "dod_file")
+
+ENDPOINTS = {
+    "/v1/generate": "generate",
+    "/v1/refine": "refine",
+    "/v1/convert": "convert",
+}
+
+
+class HTTPError(Exception):
+    """Raised to answer a request with an error status."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        """Initialize the error with an HTTP status and a message for the client."""
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class TaskServer:
+    """Serve generate, refine and convert requests over HTTP.
+
+    Requests are JSON objects with the same fields as ``tk stream`` task specs
+    and answered with ``{"id", "description", "usage"}``. With ``"stream":
+    true`` the answer is a Server-Sent Events stream of ``delta`` events
+    followed by a ``done`` (or ``error``) event. Requests wait for admission
+    by ``scheduler`` in their ``priority`` class (by default at most
+    ``concurrency`` AI calls at once), at most ``max_pending`` requests are in
+    flight (503 beyond that) and each request gets ``timeout`` seconds (504
+    when exceeded). ``GET /metrics`` serves ``ai.metrics`` in the Prometheus
+    text format.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        service_factory: Callable[[], Any],
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        scheduler: Scheduler | None = None,
+    ) -> None:
+        """Initialize the server with the configuration and a factory for AI services."""
+        self.config = config
+        self.host = host
+        self.port = port
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.scheduler = scheduler or Scheduler(max_concurrency=concurrency)
+        self.processor = TaskProcessor(config, service_factory, self.scheduler)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency + max_pending)
+        self._server: asyncio.AbstractServer | None = None
+        self._pending = 0
+
+    async def start(self) -> None:
+        """Start listening; with port 0 the chosen port is stored in ``port``."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Start the server and serve until cancelled."""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop accepting connections and release the worker pool."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            method, path, body = await self._read_request(reader)
+            await self._route(method, path, body, writer)
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {"error": e.message})
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple[str, str, bytes]:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        method, target, _ = request_line
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from e
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large")
+
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], body
+
+    async def _route(
+        self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter
+    ) -> None:
+        if path == "/healthz":
+            await self._send_json(
+                writer,
+                HTTPStatus.OK,
+                {
+                    "ok": True,
+                    "pending": self._pending,
+                    "coalesced": completion_flights.stats()["coalesced"],
+                    "scheduler": self.scheduler.stats(),
+                },
+            )
+            return
+
+        if path == "/metrics":
+            body = metrics.registry.render().encode("utf-8")
+            writer.write(self._head(HTTPStatus.OK, metrics.CONTENT_TYPE, len(body)) + body)
+            await writer.drain()
+            return
+
+        if path not in ENDPOINTS:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown endpoint '{path}'")
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST")
+
+        try:
+            raw = json.loads(body or b"{}")
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be JSON") from e
+        if not isinstance(raw, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        for field in LOCAL_FILE_FIELDS:
+            if field in raw:
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST,
+                    f"'{field}' is not accepted over HTTP; send the items as a list instead",
+                )
+
+        try:
+            spec = normalize_task_spec({**raw, "operation": ENDPOINTS[path]}, None, self.config)
+        except (TaskSpecError, OSError) as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e)) from e
+
+        if self._pending >= self.max_pending:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Server is busy, retry later")
+
+        if raw.get("stream"):
+            await self._stream(spec, writer)
+            return
+
+        try:
+            record = await self._run(lambda: self.processor.process(spec, self.timeout))
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, "Request timed out") from e
+        except Exception as e:
+            raise HTTPError(HTTPStatus.BAD_GATEWAY, str(e)) from e
+
+        record.pop("ok", None)
+        await self._send_json(writer, HTTPStatus.OK, record)
+
+    async def _run(self, func: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        """Run a blocking call on the worker pool within the request timeout.
+
+        A call stays pending until its worker thread finishes, even after the
+        request timed out, so ``max_pending`` counts the work actually running.
+        """
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+
+        def release(_: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:
+                pass  # The loop closed while the call was running
+
+        future = self._executor.submit(func)
+        future.add_done_callback(release)
+        return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    async def _stream(self, spec: dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        texts: asyncio.Queue[str | None] = asyncio.Queue()
+
+        def on_text(text: str) -> None:
+            loop.call_soon_threadsafe(texts.put_nowait, text)
+
+        writer.write(
+            self._head(HTTPStatus.OK, "text/event-stream", extra=["Cache-Control: no-cache"])
+        )
+        task = asyncio.ensure_future(
+            self._run(lambda: self.processor.stream(spec, on_text, self.timeout))
+        )
+        task.add_done_callback(lambda _: texts.put_nowait(None))
+
+        while (text := await texts.get()) is not None:
+            await self._send_event(writer, "delta", {"text": text})
+
+        try:
+            record = task.result()
+        except (asyncio.TimeoutError, TimeoutError):
+            await self._send_event(writer, "error", {"error": "Request timed out"})
+        except Exception as e:
+            await self._send_event(writer, "error", {"error": str(e)})
+        else:
+            record.pop("ok", None)
+            await self._send_event(writer, "done", record)
+
+    def _head(
+        self,
+        status: HTTPStatus,
+        content_type: str,
+        length: int | None = None,
+        extra: list[str] | None = None,
+    ) -> bytes:
+        lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Type: {content_type}; charset=utf-8",
+            "Connection: close",
+            *(extra or []),
+        ]
+        if length is not None:
+            lines.append(f"Content-Length: {length}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(
+        self, writer: asyncio.StreamWriter, status: HTTPStatus, payload: dict[str, Any]
+    ) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(self._head(status, "application/json", len(body)) + body)
+        await writer.drain()
+
+    async def _send_event(
+        self, writer: asyncio.StreamWriter, event: str, payload: dict[str, Any]
+    ) -> None:
+        data = json.dumps(payload, ensure_ascii=False)
+        writer.write(f"event: {event}\ndata: {data}\n\n".encode())
+        await writer.drain()
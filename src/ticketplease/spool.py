@@ -0,0 +1,319 @@
+"""Shared directory spool that lets workers on several machines process one batch.
+
+Jobs move between subdirectories with atomic renames, which also hold on
+network filesystems where SQLite locking does not::
+
+    pending/<key>.json          waiting to be claimed
+    leased/<key>@<worker>.json  claimed; the file mtime is the lease heartbeat
+    done/<key>.json             result record
+
+A lease that is not renewed within ``lease_seconds`` (the worker died or lost
+the network) is moved back to ``pending`` by any other worker, so every job
+runs at least once. All workers of a spool should use the same lease period.
+Lease mtimes come from the file server's clock, so they are never compared
+with local time: a lease expires once a worker has seen the same mtime for
+``lease_seconds`` of its own monotonic clock.
+"""
+
+import json
+import os
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+DEFAULT_LEASE_SECONDS = 60.0
+POLL_INTERVAL = 1.0
+STATES = ("pending", "leased", "done")
+
+
+def worker_name() -> str:
+    """Get a name identifying this process across machines."""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", f"{socket.gethostname()}-{os.getpid()}")
+
+
+class SpoolJob:
+    """A job claimed by a worker."""
+
+    def __init__(self, key: str, spec: dict[str, Any], lease_path: Path) -> None:
+        """Initialize the job with its key, task spec and lease file."""
+        self.key = key
+        self.spec = spec
+        self.lease_path = lease_path
+
+
+class Spool:
+    """Queue of task specs in a shared directory, claimed by workers with leases."""
+
+    def __init__(self, root: Path, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> None:
+        """Initialize the spool, creating its directories when needed."""
+        self.root = Path(root)
+        self.lease_seconds = lease_seconds
+        self._clock = time.monotonic
+        self._observed: dict[Path, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        for state in (*STATES, "tmp"):
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+
+    def _write(self, path: Path, payload: dict[str, Any]) -> None:
+        """Write a file under a temporary name and rename it into place."""
+        tmp_path = self.root / "tmp" / f"{uuid.uuid4().hex}.json"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(payload, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def _leases(self, key: str | None = None) -> list[Path]:
+        pattern = f"{key}@*.json" if key else "*@*.json"
+        return list((self.root / "leased").glob(pattern))
+
+    def enqueue(self, key: str, spec: dict[str, Any]) -> bool:
+        """Add a job unless it is already queued, claimed or successfully done.
+
+        Failed results are removed so the job runs again.
+        """
+        result = self.result(key)
+        if result is not None and result.get("ok"):
+            return False
+        if (self.root / "pending" / f"{key}.json").exists() or self._leases(key):
+            return False
+
+        (self.root / "done" / f"{key}.json").unlink(missing_ok=True)
+        self._write(self.root / "pending" / f"{key}.json", {"key": key, "spec": spec})
+        return True
+
+    def claim(self, worker: str) -> SpoolJob | None:
+        """Claim a pending job, or return None when there is none."""
+        pending = list((self.root / "pending").glob("*.json"))
+        random.shuffle(pending)
+        for path in pending:
+            lease_path = self.root / "leased" / f"{path.stem}@{worker}.json"
+            try:
+                os.rename(path, lease_path)
+            except FileNotFoundError:
+                continue
+            os.utime(lease_path)
+            with open(lease_path, encoding="utf-8") as file:
+                payload = json.load(file)
+            return SpoolJob(payload["key"], payload["spec"], lease_path)
+        return None
+
+    def heartbeat(self, job: SpoolJob) -> bool:
+        """Renew a lease, returning False when it was lost."""
+        try:
+            os.utime(job.lease_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def complete(self, job: SpoolJob, record: dict[str, Any]) -> None:
+        """Store a job result and release its lease."""
+        self._write(self.root / "done" / f"{job.key}.json", record)
+        job.lease_path.unlink(missing_ok=True)
+
+    def result(self, key: str) -> dict[str, Any] | None:
+        """Get the result of a job, or None when it is not done."""
+        try:
+            with open(self.root / "done" / f"{key}.json", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def requeue_expired(self) -> int:
+        """Move jobs whose lease was not renewed in time back to pending."""
+        requeued = 0
+        with self._lock:
+            now = self._clock()
+            observed = {}
+            for lease_path in self._leases():
+                try:
+                    mtime_ns = lease_path.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                seen_mtime_ns, since = self._observed.get(lease_path, (mtime_ns, now))
+                if seen_mtime_ns != mtime_ns:
+                    since = now
+                if now - since < self.lease_seconds:
+                    observed[lease_path] = (mtime_ns, since)
+                elif self._requeue(lease_path, mtime_ns):
+                    requeued += 1
+            self._observed = observed
+        return requeued
+
+    def _requeue(self, lease_path: Path, mtime_ns: int) -> bool:
+        """Take an expired lease with a rename and requeue it unless it was just renewed."""
+        expired_path = self.root / "tmp" / f"{uuid.uuid4().hex}-{lease_path.name}"
+        try:
+            os.rename(lease_path, expired_path)
+        except FileNotFoundError:
+            return False
+        if expired_path.stat().st_mtime_ns != mtime_ns:
+            os.rename(expired_path, lease_path)
+            return False
+        key = lease_path.name.split("@", 1)[0]
+        os.rename(expired_path, self.root / "pending" / f"{key}.json")
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """Count jobs in each state."""
+        return {state: len(list((self.root / state).glob("*.json"))) for state in STATES}
+
+    def wait(
+        self,
+        keys: Iterable[str],
+        on_result: Callable[[str, dict[str, Any]], None],
+        poll_interval: float = POLL_INTERVAL,
+    ) -> None:
+        """Pass each job key and result to ``on_result`` as it completes, until all are done."""
+        waiting = set(keys)
+        while waiting:
+            for key in sorted(waiting):
+                record = self.result(key)
+                if record is not None:
+                    waiting.discard(key)
+                    on_result(key, record)
+            if waiting:
+                time.sleep(poll_interval)
+
+
+class SpoolWorker:
+    """Claim and process spool jobs with up to ``concurrency`` in flight.
+
+    Leases of running jobs are renewed every third of the lease period, so a
+    job is only requeued when its worker stops renewing it.
+    """
+
+    def __init__(
+        self,
+        spool: Spool,
+        process: Callable[[dict[str, Any]], dict[str, Any]],
+        name: str | None = None,
+        concurrency: int = 1,
+        poll_interval: float = POLL_INTERVAL,
+    ) -> None:
+        """Initialize the worker with the spool and a function that processes a spec."""
+        self.spool = spool
+        self.process = process
+        self.name = name or worker_name()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.completed = 0
+        self._held: set[SpoolJob] = set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def run(self, exit_when_empty: bool = False) -> int:
+        """Process jobs until stopped (or until the spool is empty) and return the count.
+
+        Spool errors (e.g. an unreachable shared filesystem) stop all threads
+        and are raised.
+        """
+        heartbeat = threading.Thread(target=self._renew_leases, daemon=True)
+        heartbeat.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = [
+                    executor.submit(self._work, exit_when_empty) for _ in range(self.concurrency)
+                ]
+            for future in futures:
+                future.result()
+        finally:
+            self._stopping.set()
+            heartbeat.join()
+        return self.completed
+
+    def stop(self) -> None:
+        """Ask the worker to exit once its running jobs finish."""
+        self._stopping.set()
+
+    def _work(self, exit_when_empty: bool) -> None:
+        try:
+            self._work_loop(exit_when_empty)
+        except BaseException:
+            self._stopping.set()
+            raise
+
+    def _work_loop(self, exit_when_empty: bool) -> None:
+        while not self._stopping.is_set():
+            job = self.spool.claim(self.name)
+            if job is None:
+                if self.spool.requeue_expired():
+                    continue
+                if exit_when_empty and not self.spool.stats()["leased"]:
+                    return
+                self._stopping.wait(self.poll_interval)
+                continue
+
+            with self._lock:
+                self._held.add(job)
+            try:
+                self.spool.complete(job, self._run(job))
+            finally:
+                with self._lock:
+                    self._held.discard(job)
+            with self._lock:
+                self.completed += 1
+
+    def _run(self, job: SpoolJob) -> dict[str, Any]:
+        try:
+            return self.process(job.spec)
+        except Exception as e:
+            return {"id": job.spec.get("id"), "ok": False, "error": str(e)}
+
+    def _renew_leases(self) -> None:
+        while not self._stopping.wait(self.spool.lease_seconds / 3):
+            with self._lock:
+                held = list(self._held)
+            for job in held:
+                self.spool.heartbeat(job)
+
+
+def run_spooled(
+    spool: Spool,
+    lines: Iterable[str],
+    parse: Callable[[str, int], dict[str, Any]],
+    key_for: Callable[[dict[str, Any]], str],
+    emit: Callable[[dict[str, Any]], None],
+    poll_interval: float = POLL_INTERVAL,
+) -> dict[str, int]:
+    """Enqueue NDJSON task specs for spool workers and emit their results as they complete.
+
+    Jobs that already succeeded in the spool are not run again; their stored
+    results are emitted like any other. Identical specs run once and their
+    result is emitted for each of their ids.
+    """
+    counts = {"processed": 0, "failed": 0}
+
+    def emit_record(record: dict[str, Any]) -> None:
+        counts["processed"] += 1
+        if not record.get("ok"):
+            counts["failed"] += 1
+        emit(record)
+
+    ids: dict[str, list[Any]] = {}
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            spec = parse(line, line_number)
+        except ValueError as e:
+            emit_record({"id": line_number, "ok": False, "error": str(e)})
+            continue
+        key = key_for(spec)
+        if key not in ids:
+            spool.enqueue(key, spec)
+        ids.setdefault(key, []).append(spec["id"])
+
+    def emit_job(key: str, record: dict[str, Any]) -> None:
+        for spec_id in ids[key]:
+            emit_record({**record, "id": spec_id})
+
+    spool.wait(ids, emit_job, poll_interval)
+    return counts
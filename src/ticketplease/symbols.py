@@ -0,0 +1,357 @@
+"""Local index of the current git repository's files and symbols.
+
+Tickets are more precise when they name what exists ("update
+``TaskDataCollector._collect_platform``"). Tracked source files are listed
+with ``git ls-files -s``. A file is parsed again only when its blob id,
+mtime or size changed, so updating the index of a large repository costs one
+``git`` call and one ``stat`` per source file. Symbols come from
+lightweight per-language patterns, not full parsers.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from config.service import Config
+
+MAX_FILE_BYTES = 1_000_000
+MAX_MATCHES = 20
+MATCHES_PER_NAME = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    oid TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    qualified TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols (name);
+CREATE INDEX IF NOT EXISTS idx_symbols_qualified ON symbols (qualified);
+CREATE INDEX IF NOT EXISTS idx_symbols_path ON symbols (path);
+"""
+
+_PYTHON = re.compile(r"^(\s*)(?:async\s+)?(def|class)\s+(\w+)")
+_JAVASCRIPT = [
+    (re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\*?\s+(\w+)"), "function"),
+    (re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(\w+)"), "class"),
+    (re.compile(r"^\s*(?:export\s+)?(?:declare\s+)?(?:interface|type|enum)\s+(\w+)"), "type"),
+    (
+        re.compile(
+            r"^\s*(?:export\s+)?(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?(?:\([^)]*\)|\w+)\s*=>"
+        ),
+        "function",
+    ),
+]
+_PATTERNS = {
+    ".js": _JAVASCRIPT,
+    ".jsx": _JAVASCRIPT,
+    ".mjs": _JAVASCRIPT,
+    ".cjs": _JAVASCRIPT,
+    ".ts": _JAVASCRIPT,
+    ".tsx": _JAVASCRIPT,
+    ".go": [
+        (re.compile(r"^func\s+(?:\([^)]*\)\s*)?(\w+)"), "function"),
+        (re.compile(r"^type\s+(\w+)"), "type"),
+    ],
+    ".rs": [
+        (re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?fn\s+(\w+)"), "function"),
+        (re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum|trait)\s+(\w+)"), "type"),
+    ],
+    ".java": [
+        (
+            re.compile(
+                r"^\s*(?:(?:public|private|protected|abstract|final|static|sealed)\s+)*"
+                r"(?:class|interface|enum|record)\s+(\w+)"
+            ),
+            "class",
+        ),
+    ],
+    ".kt": [
+        (re.compile(r"^\s*(?:\w+\s+)*(?:class|interface|object)\s+(\w+)"), "class"),
+        (re.compile(r"^\s*(?:\w+\s+)*fun\s+(?:<[^>]*>\s*)?(?:\w+\.)?(\w+)"), "function"),
+    ],
+    ".rb": [
+        (re.compile(r"^\s*(?:class|module)\s+([\w:]+)"), "class"),
+        (re.compile(r"^\s*def\s+(?:self\.)?(\w+[?!]?)"), "function"),
+    ],
+}
+SOURCE_SUFFIXES = frozenset([".py", *_PATTERNS])
+
+# Words that read like code: dotted, snake_case, camelCase or PascalCase names.
+_CODE_NAME = re.compile(
+    r"`([^`\s]+)`|\b([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+|\w*_\w+|[a-z]+[A-Z]\w*|[A-Z][a-z0-9]+[A-Z]\w*)"
+)
+
+
+def parse_symbols(path: str, text: str) -> list[tuple[int, str, str, str]]:
+    """Find the definitions in a source file as (line, kind, name, qualified name).
+
+    Python definitions are qualified by their enclosing classes and functions.
+    """
+    symbols = []
+    suffix = os.path.splitext(path)[1]
+    if suffix == ".py":
+        stack: list[tuple[int, str, str]] = []
+        for number, line in enumerate(text.splitlines(), 1):
+            match = _PYTHON.match(line)
+            if not match:
+                continue
+            indent = len(match.group(1).expandtabs())
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            name = match.group(3)
+            if match.group(2) == "class":
+                kind = "class"
+            else:
+                kind = "method" if stack and stack[-1][2] == "class" else "function"
+            qualified = ".".join([*(entry[1] for entry in stack), name])
+            symbols.append((number, kind, name, qualified))
+            stack.append((indent, name, kind))
+        return symbols
+
+    patterns = _PATTERNS.get(suffix, [])
+    for number, line in enumerate(text.splitlines(), 1):
+        for pattern, kind in patterns:
+            match = pattern.match(line)
+            if match:
+                symbols.append((number, kind, match.group(1), match.group(1)))
+                break
+    return symbols
+
+
+def code_names(text: str) -> list[str]:
+    """Get the names in free text that look like code, in order and without repeats."""
+    names = []
+    for match in _CODE_NAME.finditer(text):
+        name = (match.group(1) or match.group(2)).strip(".(),:;")
+        if len(name) >= 3 and name not in names:
+            names.append(name)
+    return names
+
+
+def repository_root(cwd: str | None = None) -> Path | None:
+    """Get the top-level directory of the git repository at ``cwd``, if any."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    return Path(result.stdout.strip())
+
+
+def default_index_path(config: Config, root: Path) -> Path:
+    """Get the symbol index path for a repository, stable across runs from any directory."""
+    digest = hashlib.sha256(str(root.resolve()).encode("utf-8")).hexdigest()[:16]
+    return config.config_dir / "symbols" / f"{root.name}-{digest}.db"
+
+
+class SymbolIndex:
+    """SQLite index of the symbols defined in a git repository's tracked source files."""
+
+    def __init__(self, db_path: Path, root: Path) -> None:
+        """Initialize the index of ``root``. The database is opened lazily on first use."""
+        self.db_path = db_path
+        self.root = Path(root)
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database connection and ensure the schema exists."""
+        if self._connection is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _tracked_files(self) -> Iterator[tuple[str, str]]:
+        """Stream the tracked source files of the repository with their blob ids."""
+        process = subprocess.Popen(
+            ["git", "ls-files", "-s", "-z"],
+            cwd=self.root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        with process:
+            buffer = b""
+            for chunk in iter(lambda: process.stdout.read(65536) if process.stdout else b"", b""):
+                buffer += chunk
+                *entries, buffer = buffer.split(b"\0")
+                for entry in entries:
+                    info, _, path = entry.partition(b"\t")
+                    name = path.decode("utf-8", errors="surrogateescape")
+                    if os.path.splitext(name)[1] in SOURCE_SUFFIXES:
+                        yield name, info.split(b" ")[1].decode("ascii")
+        if process.returncode:
+            raise ValueError(f"Not a git repository: {self.root}")
+
+    def update(self) -> dict[str, int]:
+        """Bring the index up to date with the repository and count the changed files.
+
+        Tracked files missing from the working tree are dropped like untracked ones.
+        Raises ValueError when the root is not a git repository.
+        """
+        with self._lock:
+            connection = self._connect()
+            known = {
+                path: (oid, mtime_ns, size)
+                for path, oid, mtime_ns, size in connection.execute(
+                    "SELECT path, oid, mtime_ns, size FROM files"
+                )
+            }
+            changes = {"added": 0, "updated": 0, "removed": 0}
+            seen = set()
+            root = os.fspath(self.root)
+            with connection:
+                for path, oid in self._tracked_files():
+                    seen.add(path)
+                    previous = known.get(path)
+                    try:
+                        stat_result = os.stat(os.path.join(root, path))
+                    except OSError:
+                        if previous is not None:
+                            self._remove_file(connection, path)
+                            changes["removed"] += 1
+                        continue
+                    key = (oid, stat_result.st_mtime_ns, stat_result.st_size)
+                    if previous == key:
+                        continue
+                    self._index_file(connection, path, key)
+                    changes["updated" if previous is not None else "added"] += 1
+
+                for path in known.keys() - seen:
+                    self._remove_file(connection, path)
+                    changes["removed"] += 1
+            return changes
+
+    def _remove_file(self, connection: sqlite3.Connection, path: str) -> None:
+        """Drop a file and its symbols from the index."""
+        connection.execute("DELETE FROM files WHERE path = ?", (path,))
+        connection.execute("DELETE FROM symbols WHERE path = ?", (path,))
+
+    def _index_file(
+        self, connection: sqlite3.Connection, path: str, key: tuple[str, int, int]
+    ) -> None:
+        """Replace the symbols of one file."""
+        symbols: list[tuple[int, str, str, str]] = []
+        if key[2] <= MAX_FILE_BYTES:
+            try:
+                text = (self.root / path).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                text = ""
+            symbols = parse_symbols(path, text)
+
+        connection.execute("DELETE FROM symbols WHERE path = ?", (path,))
+        connection.executemany(
+            "INSERT INTO symbols (path, line, kind, name, qualified) VALUES (?, ?, ?, ?, ?)",
+            [(path, *symbol) for symbol in symbols],
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO files (path, oid, mtime_ns, size) VALUES (?, ?, ?, ?)",
+            (path, *key),
+        )
+
+    def stats(self) -> dict[str, int]:
+        """Count the indexed files and symbols."""
+        with self._lock:
+            connection = self._connect()
+            files = connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            symbols = connection.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+        return {"files": files, "symbols": symbols}
+
+    def lookup(self, text: str, limit: int = MAX_MATCHES) -> list[dict[str, Any]]:
+        """Find the files and symbols named in free text, in the order they are mentioned.
+
+        Dotted names match qualified names (``Class.method``) first and fall
+        back to their parts, last first; names with a source file suffix match
+        paths.
+        """
+        matches: list[dict[str, Any]] = []
+        seen: set[tuple[str, int]] = set()
+        with self._lock:
+            connection = self._connect()
+            for name in code_names(text):
+                if len(matches) >= limit:
+                    break
+                for path, line, kind, qualified in self._find(connection, name):
+                    if (path, line) in seen:
+                        continue
+                    seen.add((path, line))
+                    matches.append({"name": qualified, "kind": kind, "path": path, "line": line})
+        return matches[:limit]
+
+    def _find(self, connection: sqlite3.Connection, name: str) -> list[tuple[str, int, str, str]]:
+        if os.path.splitext(name)[1] in SOURCE_SUFFIXES:
+            # Compare the path suffix exactly: LIKE treats "_" as a wildcard
+            # and ignores case.
+            suffix = f"/{name}"
+            rows = connection.execute(
+                "SELECT path FROM files WHERE path = ? OR substr(path, -?) = ? "
+                "ORDER BY path LIMIT ?",
+                (name, len(suffix), suffix, MATCHES_PER_NAME),
+            ).fetchall()
+            return [(path, 1, "file", path) for (path,) in rows]
+
+        query = (
+            "SELECT path, line, kind, qualified FROM symbols WHERE {} = ? "
+            "ORDER BY path, line LIMIT ?"
+        )
+        rows = connection.execute(query.format("qualified"), (name, MATCHES_PER_NAME)).fetchall()
+        for part in reversed(name.split(".") if not rows else []):
+            rows = connection.execute(query.format("name"), (part, MATCHES_PER_NAME)).fetchall()
+            if rows:
+                break
+        return rows
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def format_symbols(matches: list[dict[str, Any]]) -> str:
+    """Render symbol matches as a list of ``name (kind, path:line)`` lines."""
+    return "\n".join(
+        f"- {match['name']} ({match['kind']}, {match['path']}:{match['line']})" for match in matches
+    )
+
+
+def repository_symbols(config: Config, text: str, cwd: str | None = None) -> str:
+    """Update the index of the current repository and list the symbols named in ``text``.
+
+    Returns an empty string outside a git repository or when nothing matches.
+    """
+    root = repository_root(cwd)
+    if root is None:
+        return ""
+    index = SymbolIndex(default_index_path(config, root), root)
+    try:
+        index.update()
+        return format_symbols(index.lookup(text))
+    except (ValueError, sqlite3.Error):
+        return ""
+    finally:
+        index.close()
@@ -0,0 +1,324 @@
+"""AC/DoD templates: plain-line or structured TOML files, compiled once and cached.
+
+Plain files hold one item per line. ``.toml`` files group items in nested
+sections with tags and platform/language conditions::
+
+    [[sections]]
+    title = "Security"
+    tags = ["backend"]
+    items = [
+        "Passwords are hashed",
+        { text = "Audit events are exported", platforms = ["jira"] },
+        { text = "Sessions", items = ["Expire after 30 minutes", "Can be revoked"] },
+    ]
+
+Both compile to a flat list of items with their conditions, rendered into
+the AC/DoD lists for a platform and language as
+``"Security: Sessions: Can be revoked"``.
+
+Template files often live on slow network home directories. Each file is
+compiled once per (mtime, size, inode): later loads cost a single ``stat``.
+Compiled templates are also persisted to the user cache directory, so a cold
+start skips reading unchanged files too.
+"""
+
+import json
+import os
+import stat
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from config.storage import atomic_write, file_lock, parse_toml
+
+from .utils import expand_file_path
+
+TemplateKey = tuple[int, int, int]
+TemplateItem = tuple[str, frozenset[str], frozenset[str], frozenset[str]]
+
+STRUCTURED_SUFFIXES = (".toml",)
+_CACHE_VERSION = 2
+MAX_CACHE_ENTRIES = 256
+
+
+class TemplateError(ValueError):
+    """Raised when a structured template is invalid."""
+
+
+def default_cache_path() -> Path:
+    """Get the path of the persisted template cache, honoring XDG_CACHE_HOME."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "ticketplease" / "templates.json"
+
+
+def parse_template(text: str) -> list[str]:
+    """Split template text into its non-empty, stripped lines."""
+    return [line.strip() for line in text.strip().split("\n") if line.strip()]
+
+
+def _names(node: dict[str, Any], key: str) -> frozenset[str]:
+    values = node.get(key, [])
+    if isinstance(values, str):
+        values = [values]
+    if not isinstance(values, list):
+        raise TemplateError(f"'{key}' must be a list of strings")
+    return frozenset(str(value).lower() for value in values)
+
+
+def _entries(node: dict[str, Any], key: str) -> list[Any]:
+    entries = node.get(key, [])
+    if not isinstance(entries, list):
+        raise TemplateError(f"'{key}' must be an array")
+    return entries
+
+
+def item_applies(
+    item: TemplateItem,
+    platform: str | None = None,
+    language: str | None = None,
+    tags: Iterable[str] | None = None,
+) -> bool:
+    """Check whether a compiled item applies to a platform and language, and to any of the tags.
+
+    Untagged items apply to every tag; conditions that are not given do not filter.
+    """
+    _, platforms, languages, item_tags = item
+    wanted = frozenset(tag.lower() for tag in tags or ())
+    return (
+        (not platform or not platforms or platform.lower() in platforms)
+        and (not language or not languages or language.lower() in languages)
+        and (not wanted or not item_tags or bool(wanted & item_tags))
+    )
+
+
+class Template:
+    """A compiled template: its items with the platforms, languages and tags they apply to.
+
+    Empty condition sets mean the item applies everywhere.
+    """
+
+    def __init__(self, items: list[TemplateItem]) -> None:
+        """Initialize the template from compiled items."""
+        self.items = items
+
+    @classmethod
+    def from_lines(cls, text: str) -> "Template":
+        """Compile a plain template with one unconditional item per line."""
+        return cls([(item, frozenset(), frozenset(), frozenset()) for item in parse_template(text)])
+
+    @classmethod
+    def from_toml(cls, text: str) -> "Template":
+        """Compile a structured TOML template.
+
+        Raises TemplateError when the file is not valid TOML or not a template.
+        """
+        try:
+            document = parse_toml(text.encode("utf-8"))
+        except ValueError as e:
+            raise TemplateError(f"Invalid TOML: {e}") from e
+
+        items: list[TemplateItem] = []
+        cls._compile(document, [], (frozenset(), frozenset(), frozenset()), items)
+        return cls(items)
+
+    @classmethod
+    def _compile(
+        cls,
+        node: dict[str, Any],
+        path: list[str],
+        inherited: tuple[frozenset[str], frozenset[str], frozenset[str]],
+        items: list[TemplateItem],
+    ) -> None:
+        """Flatten a section or item table, narrowing conditions on the way down."""
+        platforms = _names(node, "platforms") or inherited[0]
+        languages = _names(node, "languages") or inherited[1]
+        tags = inherited[2] | _names(node, "tags")
+
+        for item in _entries(node, "items"):
+            if isinstance(item, str):
+                item = {"text": item}
+            if not isinstance(item, dict) or not str(item.get("text", "")).strip():
+                raise TemplateError("Each item must be a string or a table with 'text'")
+            text = str(item["text"]).strip()
+            if item.get("items"):
+                cls._compile(item, [*path, text], (platforms, languages, tags), items)
+                continue
+            items.append(
+                (
+                    ": ".join([*path, text]),
+                    _names(item, "platforms") or platforms,
+                    _names(item, "languages") or languages,
+                    tags | _names(item, "tags"),
+                )
+            )
+
+        for section in _entries(node, "sections"):
+            if not isinstance(section, dict):
+                raise TemplateError("Each entry of 'sections' must be a table")
+            title = str(section.get("title", "")).strip()
+            cls._compile(
+                section, [*path, title] if title else path, (platforms, languages, tags), items
+            )
+
+    def render(
+        self,
+        platform: str | None = None,
+        language: str | None = None,
+        tags: Iterable[str] | None = None,
+    ) -> list[str]:
+        """Get the items that apply to a platform and language, and to any of the tags."""
+        tags = list(tags or ())
+        return [item[0] for item in self.items if item_applies(item, platform, language, tags)]
+
+    def to_json(self) -> list[list[Any]]:
+        """Serialize the compiled items."""
+        return [[text, sorted(p), sorted(lang), sorted(t)] for text, p, lang, t in self.items]
+
+    @classmethod
+    def from_json(cls, data: list[list[Any]]) -> "Template":
+        """Restore compiled items serialized with ``to_json``."""
+        return cls(
+            [(text, frozenset(p), frozenset(lang), frozenset(t)) for text, p, lang, t in data]
+        )
+
+
+def template_key(stat_result: os.stat_result) -> TemplateKey:
+    """Get the metadata that identifies one version of a file."""
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+
+class TemplateCache:
+    """Parsed template items keyed by absolute path and validated by file metadata."""
+
+    def __init__(self, cache_path: Path | None = None) -> None:
+        """Initialize the cache, persisted to ``cache_path`` when given."""
+        self.cache_path = cache_path
+        self._entries: dict[str, tuple[TemplateKey, Template]] | None = None
+        self._unsaved: dict[str, tuple[TemplateKey, Template]] = {}
+        self._lock = threading.Lock()
+
+    def load(
+        self,
+        file_path: str,
+        save: bool = True,
+        platform: str | None = None,
+        language: str | None = None,
+        tags: Iterable[str] | None = None,
+    ) -> list[str] | None:
+        """Get the items of a template file that apply to a platform, language and tags.
+
+        Returns None when the path is not a readable file; raises TemplateError
+        for invalid structured templates.
+        """
+        template = self.get(file_path, save)
+        return template.render(platform, language, tags) if template is not None else None
+
+    def get(self, file_path: str, save: bool = True) -> Template | None:
+        """Get the compiled template of a file, or None when it is not a readable file.
+
+        Newly compiled files are persisted right away unless ``save`` is False,
+        in which case they are persisted by the next ``save`` call.
+        """
+        path = expand_file_path(file_path)
+        if not path:
+            return None
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(stat_result.st_mode):
+            return None
+
+        key = template_key(stat_result)
+        with self._lock:
+            cached = self._load_entries().get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                key = template_key(os.fstat(file.fileno()))
+                text = file.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+        if path.endswith(STRUCTURED_SUFFIXES):
+            try:
+                template = Template.from_toml(text)
+            except TemplateError as e:
+                raise TemplateError(f"Invalid template {path}: {e}") from e
+        else:
+            template = Template.from_lines(text)
+
+        with self._lock:
+            self._load_entries()[path] = (key, template)
+            self._unsaved[path] = (key, template)
+        if save:
+            self.save()
+        return template
+
+    def _load_entries(self) -> dict[str, tuple[TemplateKey, Template]]:
+        """Get the in-memory entries, reading the persisted cache on first use."""
+        if self._entries is None:
+            self._entries = self._read_persisted()
+        return self._entries
+
+    def _read_persisted(self) -> dict[str, tuple[TemplateKey, Template]]:
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path, encoding="utf-8") as file:
+                data = json.load(file)
+            if not isinstance(data, dict) or data.get("version") != _CACHE_VERSION:
+                return {}
+            return {
+                path: (tuple(entry["key"]), Template.from_json(entry["items"]))
+                for path, entry in data.get("entries", {}).items()
+            }
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            # A cache of another shape is discarded and rebuilt from the files
+            return {}
+
+    def save(self) -> None:
+        """Merge newly parsed files into the persisted cache; other processes may write too.
+
+        Entries for deleted files are dropped and only the ``MAX_CACHE_ENTRIES``
+        most recently parsed files are kept.
+        """
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+        if self.cache_path is None or not unsaved:
+            return
+        try:
+            with file_lock(self.cache_path.with_suffix(".lock")):
+                persisted = self._read_persisted()
+                for path in unsaved:
+                    persisted.pop(path, None)
+                entries = {
+                    path: entry
+                    for path, entry in [*persisted.items(), *unsaved.items()][-MAX_CACHE_ENTRIES:]
+                    if os.path.exists(path)
+                }
+                payload = {
+                    "version": _CACHE_VERSION,
+                    "entries": {
+                        path: {"key": list(key), "items": template.to_json()}
+                        for path, (key, template) in entries.items()
+                    },
+                }
+                atomic_write(self.cache_path, json.dumps(payload, ensure_ascii=False))
+        except OSError:
+            pass
+
+
+_caches: dict[Path, TemplateCache] = {}
+_caches_lock = threading.Lock()
+
+
+def template_cache() -> TemplateCache:
+    """Get the process-wide template cache for the current user cache directory."""
+    cache_path = default_cache_path()
+    with _caches_lock:
+        if cache_path not in _caches:
+            _caches[cache_path] = TemplateCache(cache_path)
+        return _caches[cache_path]
@@ -1,6 +1,7 @@
 """Utility functions for TicketPlease."""
 
 import os
+import sys
 from pathlib import Path
 
 import pyperclip
@@ -15,6 +16,24 @@ def copy_to_clipboard(text: str) -> bool:
         return False
 
 
+def write_output(text: str, output: str) -> None:
+    """Write text with a single buffered write to a file, or to stdout when output is '-'."""
+    data = (text if text.endswith("\n") else text + "\n").encode("utf-8")
+    if output == "-":
+        sys.stdout.flush()
+        stdout_buffer = getattr(sys.stdout, "buffer", None)
+        if stdout_buffer is None:
+            sys.stdout.write(data.decode("utf-8"))
+            sys.stdout.flush()
+            return
+        stdout_buffer.write(data)
+        stdout_buffer.flush()
+        return
+
+    with open(expand_file_path(output), "wb") as f:
+        f.write(data)
+
+
 def expand_file_path(file_path: str) -> str:
     """Expand file path to absolute path, handling ~ and relative paths."""
     if not file_path or not file_path.strip():
@@ -26,25 +45,6 @@ def expand_file_path(file_path: str) -> str:
     return absolute_path
 
 
-def read_file_content(file_path: str) -> list[str]:
-    """Read content from a file and return as list of lines."""
-    try:
-        # Expand the path to handle ~ and relative paths
-        expanded_path = expand_file_path(file_path)
-        path = Path(expanded_path)
-
-        if not path.exists():
-            return []
-
-        with open(path, encoding="utf-8") as f:
-            content = f.read().strip()
-            if not content:
-                return []
-            return [line.strip() for line in content.split("\n") if line.strip()]
-    except Exception:
-        return []
-
-
 def validate_file_path(file_path: str) -> bool:
     """Validate if a file path exists and is readable."""
     try:
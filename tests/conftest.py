@@ -0,0 +1,58 @@
+"""Shared pytest fixtures."""
+
+import subprocess
+from unittest.mock import MagicMock
+
+import keyring
+import pytest
+
+from config.secrets import FileKeyring, clear_memory_cache
+from config.service import Config
+
+
+@pytest.fixture(autouse=True)
+def file_keyring(tmp_path, monkeypatch):
+    """Use a file-backed keyring, daemon socket and cache directory so tests stay isolated."""
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("TK_DAEMON_SOCKET", str(tmp_path / "daemon.sock"))
+    previous_keyring = keyring.get_keyring()
+    backend = FileKeyring(tmp_path / "keyring.json")
+    keyring.set_keyring(backend)
+    clear_memory_cache()
+    yield backend
+    clear_memory_cache()
+    keyring.set_keyring(previous_keyring)
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Create a mock configuration."""
+    config = MagicMock(spec=Config)
+    config.get_provider.return_value = "openai"
+    config.get_model.return_value = "gpt-4o-mini"
+    config.get_api_key.return_value = "sk-test"
+    config.get_api_base.return_value = None
+    config.get_platform.return_value = "github"
+    config.get_language.return_value = "en"
+    config.get_template_tags.return_value = []
+    config.get_relevant_items.return_value = 0
+    config.get_symbol_index.return_value = False
+    config.reload_if_changed.return_value = False
+    config.config_dir = tmp_path
+    return config
+
+
+@pytest.fixture
+def git():
+    """Get a function that runs git commands in test repositories."""
+
+    def run(cwd, *args: str) -> None:
+        subprocess.run(
+            ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+        )
+
+    return run
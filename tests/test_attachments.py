@@ -0,0 +1,155 @@
+"""Tests for code context from attached files and diffs."""
+
+import pytest
+
+from ai.service import AIService
+from ticketplease.attachments import (
+    ContextBuilder,
+    build_context,
+    check_sources,
+    query_terms,
+    score_line,
+)
+
+COLLECTOR = "\n".join(
+    [f"# filler line {index}" for index in range(400)]
+    + [
+        "class TaskDataCollector:",
+        "    def _collect_platform(self) -> str:",
+        '        """Collect target platform from user."""',
+        "        return self.platforms[choice]",
+        "",
+    ]
+    + [f"# trailing line {index}" for index in range(400)]
+)
+
+
+class TestScoring:
+    """Test cases for query terms and line scores."""
+
+    def test_query_terms_split_identifiers(self) -> None:
+        """Test that identifiers are split into words and kept whole."""
+        words, identifiers = query_terms("Update TaskDataCollector._collect_platform")
+
+        assert {"task", "data", "collector", "collect", "platform"} <= words
+        assert {"TaskDataCollector", "_collect_platform"} <= identifiers
+
+    def test_definitions_of_named_symbols_score_highest(self) -> None:
+        """Test that the definition of a named symbol outranks plain mentions."""
+        words, identifiers = query_terms("Fix _collect_platform")
+
+        definition = score_line("    def _collect_platform(self):", words, identifiers)
+        mention = score_line("# the platform is collected here", words, identifiers)
+
+        assert definition > mention > 0
+        assert score_line("unrelated", words, identifiers) == 0
+
+
+class TestContextBuilder:
+    """Test cases for ContextBuilder."""
+
+    def test_small_files_are_attached_whole(self, tmp_path) -> None:
+        """Test that files within the budget are included entirely."""
+        path = tmp_path / "small.py"
+        path.write_text("def export():\n    pass\n")
+
+        context = build_context([str(path)], query="Add export")
+
+        assert context == f"--- {path}:1\ndef export():\n    pass"
+
+    def test_large_files_are_excerpted(self, tmp_path) -> None:
+        """Test that only windows around relevant lines of large files are kept."""
+        path = tmp_path / "collector.py"
+        path.write_text(COLLECTOR)
+
+        context = build_context(
+            [str(path)], query="Update TaskDataCollector._collect_platform", budget_tokens=200
+        )
+
+        assert f"--- {path}:398\n" in context
+        assert "    def _collect_platform(self) -> str:" in context
+        assert "filler line 396" not in context
+        assert "trailing line 10" not in context
+
+    def test_large_files_without_matches_keep_their_head(self, tmp_path) -> None:
+        """Test that an attached file unrelated to the task still contributes its start."""
+        path = tmp_path / "notes.txt"
+        path.write_text("\n".join(f"note {index}" for index in range(2000)))
+
+        context = build_context([str(path)], query="Add export", budget_tokens=300)
+
+        assert context.startswith(f"--- {path}:1\nnote 0\nnote 1")
+
+    def test_budget_keeps_the_best_excerpts(self, tmp_path) -> None:
+        """Test that excerpts beyond the budget are dropped, lowest scores first."""
+        builder = ContextBuilder("refund", budget_tokens=10)
+        builder._add(1.0, "a.py", 1, "x" * 20)
+        builder._add(5.0, "b.py", 1, "y" * 20)
+
+        assert builder.render() == (
+            "--- b.py:1\n" + "y" * 20 + "\n\n(1 more excerpts omitted to fit the context budget)"
+        )
+
+    def test_missing_and_binary_files(self, tmp_path) -> None:
+        """Test that unreadable attachments are reported."""
+        with pytest.raises(ValueError, match="does not exist"):
+            build_context([str(tmp_path / "missing.py")])
+
+        binary = tmp_path / "image.bin"
+        binary.write_bytes(b"\x89PNG\x00\x01")
+        with pytest.raises(ValueError, match="binary"):
+            build_context([str(binary)])
+
+    def test_diff_hunks(self, tmp_path, git) -> None:
+        """Test that diff hunks are streamed from git and attached with their file."""
+        (tmp_path / "billing.py").write_text("def refund():\n    return 0\n")
+        git(tmp_path, "init", "-q")
+        git(tmp_path, "add", ".")
+        git(tmp_path, "commit", "-q", "-m", "first")
+        (tmp_path / "billing.py").write_text("def refund(amount):\n    return amount\n")
+        git(tmp_path, "commit", "-q", "-am", "second")
+
+        builder = ContextBuilder("Allow partial refunds")
+        builder.add_diff("HEAD~1..HEAD", cwd=str(tmp_path))
+        context = builder.render()
+
+        assert context.startswith("--- billing.py (HEAD~1..HEAD):1\n@@ -1,2 +1,2 @@")
+        assert "+def refund(amount):" in context
+
+        with pytest.raises(ValueError, match="git diff"):
+            ContextBuilder("x").add_diff("no-such-revision", cwd=str(tmp_path))
+
+    def test_option_like_ranges_are_rejected(self, tmp_path) -> None:
+        """Test that a revision range is never passed to git as an option."""
+        target = tmp_path / "overwritten"
+
+        with pytest.raises(ValueError, match="Invalid revision range"):
+            ContextBuilder("x").add_diff(f"--output={target}", cwd=str(tmp_path))
+        assert not target.exists()
+
+    def test_check_sources(self, tmp_path, git) -> None:
+        """Test that attachments and revision ranges are validated up front."""
+        (tmp_path / "billing.py").write_text("def refund():\n    return 0\n")
+        git(tmp_path, "init", "-q")
+        git(tmp_path, "add", ".")
+        git(tmp_path, "commit", "-q", "-m", "first")
+
+        check_sources([str(tmp_path / "billing.py")], "HEAD", cwd=str(tmp_path))
+        with pytest.raises(ValueError, match="does not exist"):
+            check_sources([str(tmp_path / "missing.py")])
+        with pytest.raises(ValueError, match="does not exist"):
+            check_sources([str(tmp_path)])
+        with pytest.raises(ValueError, match="Invalid revision range main..HEAD"):
+            check_sources([], "main..HEAD", cwd=str(tmp_path))
+        with pytest.raises(ValueError, match="Invalid revision range"):
+            check_sources([], "--output=x", cwd=str(tmp_path))
+
+    def test_context_is_a_prompt_section(self) -> None:
+        """Test that the context is added to the generation prompt."""
+        service = AIService("openai", "sk-test", "gpt-4o-mini")
+
+        prompt = service._build_prompt("Task", [], [], "github", "en", "--- a.py:1\ncode")
+
+        assert "Relevant code and changes" in prompt
+        assert "--- a.py:1\ncode" in prompt
+        assert "Relevant code" not in service._build_prompt("Task", [], [], "github", "en")
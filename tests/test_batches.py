@@ -0,0 +1,94 @@
+"""Tests for the provider batch API clients, against the local batch emulator."""
+
+import pytest
+
+from ai.batches import (
+    AnthropicBatchClient,
+    BatchAPIError,
+    OpenAIBatchClient,
+    _BatchClient,
+    create_batch_client,
+    provider_model,
+)
+from benchmarks.stub_provider import BatchStubProvider
+
+
+def request(custom_id: str, prompt: str, model: str = "stub-model") -> tuple[str, dict]:
+    """Build a batch request for a prompt."""
+    return custom_id, {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": 1000,
+    }
+
+
+def run(client, requests: list) -> tuple[list[str], dict]:
+    """Submit requests, poll until the batch ends and return the statuses and results."""
+    batch_id = client.submit(requests)
+    statuses = []
+    while True:
+        status, done = client.status(batch_id)
+        statuses.append(status)
+        if done:
+            return statuses, client.results(batch_id)
+
+
+@pytest.mark.parametrize("client_class", [OpenAIBatchClient, AnthropicBatchClient])
+class TestBatchClients:
+    """Test cases shared by both provider batch clients."""
+
+    def test_results_by_custom_id(self, client_class) -> None:
+        """Test that successes and failures come back under their custom ids."""
+        with BatchStubProvider("Generated", polls_until_done=3) as stub:
+            client = client_class("sk-test", stub.api_base)
+            statuses, results = run(client, [request("a", "Write"), request("b", "FAIL this")])
+
+        assert len(statuses) == 3
+        assert results["a"] == {
+            "ok": True,
+            "description": "Generated",
+            "usage": {"prompt_tokens": 100, "completion_tokens": 2},
+        }
+        assert results["b"]["ok"] is False
+        assert results["b"]["error"] == "Invalid request"
+
+    def test_submits_the_request_parameters(self, client_class) -> None:
+        """Test that each request body reaches the provider unchanged."""
+        with BatchStubProvider() as stub:
+            client = client_class("sk-test", stub.api_base)
+            batch_id = client.submit([request("a", "Write", model="gpt-4o-mini")])
+
+            assert stub.batch_requests(batch_id) == [
+                {"custom_id": "a", "params": request("a", "Write", model="gpt-4o-mini")[1]}
+            ]
+
+
+class TestErrors:
+    """Test cases for API errors and client selection."""
+
+    def test_http_errors_raise(self) -> None:
+        """Test that an unknown batch surfaces as a BatchAPIError."""
+        with BatchStubProvider() as stub:
+            with pytest.raises(BatchAPIError, match="404"):
+                OpenAIBatchClient("sk-test", stub.api_base).status("batch_missing")
+
+    def test_create_batch_client(self) -> None:
+        """Test that providers without a batch API are rejected."""
+        assert isinstance(create_batch_client("openai", "sk-test"), OpenAIBatchClient)
+        assert isinstance(create_batch_client("anthropic", "sk-test"), AnthropicBatchClient)
+        with pytest.raises(ValueError, match="no supported batch API"):
+            create_batch_client("gemini", "sk-test")
+
+    def test_provider_model(self) -> None:
+        """Test that the litellm provider prefix is removed from model names."""
+        assert provider_model("anthropic", "anthropic/claude-3-5-haiku") == "claude-3-5-haiku"
+        assert provider_model("openai", "gpt-4o-mini") == "gpt-4o-mini"
+
+    def test_incomplete_client(self) -> None:
+        """Test that a client without provider headers fails when created."""
+
+        class ExampleBatchClient(_BatchClient):
+            pass
+
+        with pytest.raises(TypeError, match="_headers"):
+            ExampleBatchClient("sk-test", "http://localhost", "openai")
@@ -0,0 +1,59 @@
+"""Tests for the benchmark comparison helpers."""
+
+from benchmarks.__main__ import DEFAULT_BASELINE
+from benchmarks.cases import BENCHMARKS
+from benchmarks.compare import compare_reports, has_regressions
+from benchmarks.runner import load_report, summarize_samples
+
+
+def make_report(**medians: float) -> dict:
+    """Build a report with the given median timings."""
+    return {"results": {name: {"median": value} for name, value in medians.items()}}
+
+
+class TestSummarizeSamples:
+    """Test cases for summarize_samples."""
+
+    def test_summarize_samples(self) -> None:
+        """Test summary statistics for raw samples."""
+        summary = summarize_samples([3.0, 1.0, 2.0, 4.0])
+
+        assert summary["samples"] == 4
+        assert summary["min"] == 1.0
+        assert summary["median"] == 2.5
+        assert summary["mean"] == 2.5
+
+
+class TestCompareReports:
+    """Test cases for compare_reports."""
+
+    def test_flags_regression_beyond_threshold(self) -> None:
+        """Test that slowdowns above the threshold are regressions."""
+        rows = compare_reports(make_report(load=10.0), make_report(load=13.0), threshold=0.2)
+
+        assert rows[0]["status"] == "regression"
+        assert has_regressions(rows) is True
+
+    def test_within_threshold_is_ok(self) -> None:
+        """Test that small slowdowns are tolerated."""
+        rows = compare_reports(make_report(load=10.0), make_report(load=11.0), threshold=0.2)
+
+        assert rows[0]["status"] == "ok"
+        assert has_regressions(rows) is False
+
+    def test_improvement_and_missing(self) -> None:
+        """Test improvements and benchmarks missing from one side."""
+        rows = compare_reports(
+            make_report(load=10.0, old=1.0), make_report(load=5.0, new=1.0), threshold=0.2
+        )
+        statuses = {row["name"]: row["status"] for row in rows}
+
+        assert statuses == {"load": "improvement", "new": "missing", "old": "missing"}
+
+
+class TestBaseline:
+    """Test cases for the stored baseline."""
+
+    def test_covers_every_benchmark(self) -> None:
+        """Test that the baseline was regenerated after benchmarks were added or removed."""
+        assert sorted(load_report(DEFAULT_BASELINE)["results"]) == sorted(BENCHMARKS)
@@ -0,0 +1,118 @@
+"""Tests for the cassette record/replay module."""
+
+import litellm
+import pytest
+from litellm.types.utils import ModelResponseStream
+
+from ai.cassette import Cassette, CassetteMissError, request_key
+from ai.service import AIService
+
+
+def fake_completion(**params):
+    """Return a canned response, streamed when requested."""
+    if params.get("stream"):
+        return iter(
+            [
+                ModelResponseStream(
+                    choices=[{"index": 0, "delta": {"content": word}, "finish_reason": None}]
+                )
+                for word in ("Hello ", "world")
+            ]
+        )
+    return litellm.ModelResponse(
+        choices=[{"index": 0, "message": {"role": "assistant", "content": "Recorded answer"}}],
+        usage={"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15},
+    )
+
+
+def failing_completion(**params):
+    """Fail if the real provider is reached during replay."""
+    raise AssertionError("Network call attempted during replay")
+
+
+class TestCassette:
+    """Test cases for Cassette."""
+
+    def test_request_key_ignores_credentials(self) -> None:
+        """Test that the request key only depends on the request content."""
+        params = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "Hi"}]}
+
+        assert request_key(params) == request_key({**params, "api_key": "secret"})
+        assert request_key(params) != request_key({**params, "model": "gpt-4o"})
+
+    def test_record_and_replay(self, tmp_path) -> None:
+        """Test that recorded responses are replayed without calling the provider."""
+        path = tmp_path / "cassette.json"
+        recorder = AIService(
+            "openai",
+            "key",
+            "gpt-4o-mini",
+            completion_fn=Cassette(path, "record").wrap(fake_completion),
+        )
+        recorded = recorder.refine_task_description("Current", "Shorter")
+
+        player = AIService(
+            "openai",
+            "key",
+            "gpt-4o-mini",
+            completion_fn=Cassette(path, "replay").wrap(failing_completion),
+        )
+        replayed = player.refine_task_description("Current", "Shorter")
+
+        assert recorded == replayed == "Recorded answer"
+        assert player.last_usage["prompt_tokens"] == 12
+
+    def test_record_and_replay_stream(self, tmp_path) -> None:
+        """Test that streamed chunks are recorded with offsets and replayed in order."""
+        path = tmp_path / "cassette.json"
+        recorder = AIService(
+            "openai",
+            "key",
+            "gpt-4o-mini",
+            completion_fn=Cassette(path, "record").wrap(fake_completion),
+        )
+        recorded = "".join(
+            recorder.generate_task_description_stream("Task", [], [], "github", "en")
+        )
+
+        cassette = Cassette(path, "replay", realtime=True)
+        player = AIService(
+            "openai", "key", "gpt-4o-mini", completion_fn=cassette.wrap(failing_completion)
+        )
+        replayed = "".join(player.generate_task_description_stream("Task", [], [], "github", "en"))
+
+        assert recorded == replayed == "Hello world"
+        chunks = cassette.interactions[0]["chunks"]
+        assert len(chunks) == 2
+        assert all(chunk["offset"] >= 0 for chunk in chunks)
+
+    def test_replay_miss(self, tmp_path) -> None:
+        """Test that unknown requests fail in replay mode."""
+        path = tmp_path / "cassette.json"
+        Cassette(path, "record").save()
+        completion = Cassette(path, "replay").wrap(failing_completion)
+
+        with pytest.raises(CassetteMissError):
+            completion(model="gpt-4o-mini", messages=[])
+
+    def test_replay_missing_file(self, tmp_path) -> None:
+        """Test that replaying a missing cassette fails early."""
+        with pytest.raises(FileNotFoundError):
+            Cassette(tmp_path / "missing.json", "replay")
+
+    def test_from_env(self, tmp_path, monkeypatch) -> None:
+        """Test building a cassette from environment variables."""
+        monkeypatch.setenv("TK_CASSETTE", str(tmp_path / "cassette.json"))
+        monkeypatch.setenv("TK_CASSETTE_MODE", "record")
+
+        cassette = Cassette.from_env()
+
+        assert cassette is not None
+        assert cassette.mode == "record"
+        assert cassette.realtime is False
+
+    def test_from_env_disabled(self, monkeypatch) -> None:
+        """Test that no cassette is used without TK_CASSETTE."""
+        monkeypatch.delenv("TK_CASSETTE", raising=False)
+
+        assert Cassette.from_env() is None
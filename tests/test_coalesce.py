@@ -0,0 +1,165 @@
+"""Tests for in-flight request coalescing."""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ai.coalesce import SingleFlight
+from ai.service import AIService
+from ai.usage import UsageLedger
+
+
+def run_concurrently(func, count: int) -> list:
+    """Run a function from several threads at once and collect the results."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        try:
+            results[index] = func()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight."""
+
+    def test_concurrent_calls_share_one_execution(self) -> None:
+        """Test that concurrent callers with the same key share one call."""
+        flights = SingleFlight()
+        calls = []
+
+        def slow() -> str:
+            calls.append(1)
+            time.sleep(0.1)
+            return "result"
+
+        results = run_concurrently(lambda: flights.do("key", slow), 5)
+
+        assert calls == [1]
+        assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+        assert {result for result, _ in results} == {"result"}
+        assert flights.stats() == {"executed": 1, "coalesced": 4}
+
+    def test_different_keys_run_separately(self) -> None:
+        """Test that different keys are not coalesced."""
+        flights = SingleFlight()
+
+        assert flights.do("a", lambda: 1) == (1, False)
+        assert flights.do("b", lambda: 2) == (2, False)
+        assert flights.stats() == {"executed": 2, "coalesced": 0}
+
+    def test_sequential_calls_are_not_cached(self) -> None:
+        """Test that a finished call is not reused."""
+        flights = SingleFlight()
+        func = MagicMock(side_effect=["first", "second"])
+
+        assert flights.do("key", func) == ("first", False)
+        assert flights.do("key", func) == ("second", False)
+
+    def test_errors_reach_all_waiters(self) -> None:
+        """Test that every waiter receives the leader's exception."""
+        flights = SingleFlight()
+
+        def failing() -> None:
+            time.sleep(0.1)
+            raise RuntimeError("Rate limited")
+
+        results = run_concurrently(lambda: flights.do("key", failing), 3)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            flights.do("key", failing)
+
+
+class TestAIServiceCoalescing:
+    """Test cases for coalescing in AIService."""
+
+    @patch("ai.service.compute_cost", return_value=0.01)
+    def test_identical_generations_share_one_call(self, mock_cost) -> None:
+        """Test that identical concurrent prompts make one upstream call."""
+        response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Generated"))],
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20),
+        )
+
+        def completion(**params):
+            time.sleep(0.1)
+            return response
+
+        completion_fn = MagicMock(side_effect=completion)
+        ledger = MagicMock(spec=UsageLedger)
+        flights = SingleFlight()
+        services = [
+            AIService(
+                "openai",
+                "key",
+                "gpt-4o-mini",
+                ledger=ledger,
+                completion_fn=completion_fn,
+                flights=flights,
+            )
+            for _ in range(3)
+        ]
+        iterator = iter(services)
+        lock = threading.Lock()
+
+        def generate() -> AIService:
+            with lock:
+                service = next(iterator)
+            service.generate_task_description("Task", ["AC"], [], "github", "en")
+            return service
+
+        finished = run_concurrently(generate, 3)
+
+        completion_fn.assert_called_once()
+        usages = sorted((service.last_usage for service in finished), key=lambda u: u["coalesced"])
+        assert [usage["coalesced"] for usage in usages] == [False, True, True]
+        assert usages[0]["prompt_tokens"] == 100
+        assert usages[1]["prompt_tokens"] == 0
+        assert usages[1]["cost"] == 0.0
+        assert ledger.record.call_count == 3
+        assert flights.stats()["coalesced"] == 2
+
+    def test_different_prompts_are_not_coalesced(self) -> None:
+        """Test that concurrent calls with different prompts each reach the provider."""
+        response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Refined"))], usage=None
+        )
+
+        def completion(**params):
+            time.sleep(0.05)
+            return response
+
+        completion_fn = MagicMock(side_effect=completion)
+        flights = SingleFlight()
+
+        def refine(request: str):
+            service = AIService(
+                "openai", "key", "gpt-4o-mini", completion_fn=completion_fn, flights=flights
+            )
+            return lambda: service.refine_task_description("Text", request)
+
+        requests = iter(["Shorter", "Longer"])
+        lock = threading.Lock()
+
+        def next_refine() -> str:
+            with lock:
+                call = refine(next(requests))
+            return call()
+
+        run_concurrently(next_refine, 2)
+
+        assert completion_fn.call_count == 2
+        assert flights.stats() == {"executed": 2, "coalesced": 0}
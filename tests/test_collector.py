@@ -19,6 +19,9 @@ class TestTaskDataCollector:
         config.get_language.return_value = "en"
         config.get_ac_path.return_value = ""
         config.get_dod_path.return_value = ""
+        config.get_relevant_items.return_value = 0
+        config.get_symbol_index.return_value = False
+        config.get_template_library.return_value = ""
         return config
 
     @pytest.fixture
@@ -26,6 +29,40 @@ class TestTaskDataCollector:
         """Create a TaskDataCollector instance."""
         return TaskDataCollector(mock_config)
 
+    def test_invalid_attachments_fail_before_prompts(self, collector, tmp_path):
+        """Test that a mistyped attachment is reported before any question is asked."""
+        with patch.object(collector, "_collect_task_description") as ask:
+            with pytest.raises(ValueError, match="does not exist"):
+                collector.collect_task_data(attach=[str(tmp_path / "missing.py")])
+
+        ask.assert_not_called()
+
+    @patch("questionary.text")
+    @patch("questionary.select")
+    @patch("questionary.confirm")
+    def test_only_template_files_are_trimmed(
+        self, mock_confirm, mock_select, mock_text, collector, mock_config, tmp_path
+    ):
+        """Test that a default file is trimmed to the relevant items but typed items are kept."""
+        ac = tmp_path / "ac.md"
+        ac.write_text("CSV export includes headers\nDark mode toggle works\n")
+        mock_config.get_ac_path.return_value = str(ac)
+        mock_config.get_relevant_items.return_value = 1
+        mock_confirm.return_value.ask.return_value = True
+
+        assert collector._collect_acceptance_criteria("github", "en", "Add CSV export") == [
+            "CSV export includes headers"
+        ]
+
+        mock_config.get_ac_path.return_value = ""
+        mock_select.return_value.ask.return_value = "📝 Enter manually"
+        mock_text.return_value.ask.side_effect = ["Logs are rotated", "Dark mode works", ""]
+
+        assert collector._collect_acceptance_criteria("github", "en", "Add CSV export") == [
+            "Logs are rotated",
+            "Dark mode works",
+        ]
+
     def test_init(self, mock_config):
         """Test TaskDataCollector initialization."""
         collector = TaskDataCollector(mock_config)
@@ -107,37 +144,33 @@ class TestTaskDataCollector:
         with pytest.raises(KeyboardInterrupt, match="Task generation cancelled"):
             collector._collect_acceptance_criteria()
 
-    @patch("ticketplease.collector.read_file_content")
     @patch("questionary.path")
     @patch("questionary.select")
     def test_collect_acceptance_criteria_from_file_success(
-        self, mock_select, mock_path, mock_read, collector
+        self, mock_select, mock_path, collector, tmp_path
     ):
         """Test successful acceptance criteria collection from file."""
+        criteria_file = tmp_path / "file.txt"
+        criteria_file.write_text("Criterion 1\nCriterion 2\n")
         mock_select.return_value.ask.return_value = "📁 Load from file"
-        mock_path.return_value.ask.return_value = "/path/to/file.txt"
-        mock_read.return_value = ["Criterion 1", "Criterion 2"]
+        mock_path.return_value.ask.return_value = str(criteria_file)
 
         result = collector._collect_acceptance_criteria()
 
         assert len(result) == 2
         assert "Criterion 1" in result
         assert "Criterion 2" in result
-        mock_read.assert_called_once_with("/path/to/file.txt")
 
-    @patch("ticketplease.collector.validate_file_path")
-    @patch("ticketplease.collector.read_file_content")
     @patch("questionary.confirm")
     @patch("questionary.select")
     def test_collect_acceptance_criteria_with_default_file(
-        self, mock_select, mock_confirm, mock_read, mock_validate, collector
+        self, mock_select, mock_confirm, collector, tmp_path
     ):
         """Test acceptance criteria collection with default file."""
-        # Setup mocks
-        collector.config.get_ac_path.return_value = "/path/to/ac.txt"
-        mock_validate.return_value = True
+        ac_file = tmp_path / "ac.txt"
+        ac_file.write_text("AC 1\nAC 2\n")
+        collector.config.get_ac_path.return_value = str(ac_file)
         mock_confirm.return_value.ask.return_value = True
-        mock_read.return_value = ["AC 1", "AC 2"]
 
         result = collector._collect_acceptance_criteria()
 
@@ -145,7 +178,32 @@ class TestTaskDataCollector:
         assert "AC 1" in result
         assert "AC 2" in result
         mock_confirm.assert_called_once()
-        mock_read.assert_called_once_with("/path/to/ac.txt")
+        mock_select.assert_not_called()
+
+    @patch("questionary.checkbox")
+    @patch("questionary.text")
+    @patch("questionary.select")
+    def test_collect_acceptance_criteria_from_library(
+        self, mock_select, mock_text, mock_checkbox, collector, tmp_path
+    ):
+        """Test picking acceptance criteria for the task's platform from a library search."""
+        library = tmp_path / "library"
+        library.mkdir()
+        (library / "payments.md").write_text("Refunds are idempotent\nInvoices are numbered\n")
+        (library / "jira.toml").write_text(
+            "items = [{ text = 'Refunds are linked to Jira', platforms = ['jira'] }]"
+        )
+        collector.config.get_template_library.return_value = str(library)
+        mock_select.return_value.ask.return_value = "🔎 Search template library"
+        mock_text.return_value.ask.return_value = "refund"
+        mock_checkbox.return_value.ask.return_value = ["Refunds are idempotent"]
+
+        result = collector._collect_acceptance_criteria(platform="github")
+
+        assert result == ["Refunds are idempotent"]
+        assert "🔎 Search template library" in mock_select.call_args.kwargs["choices"]
+        choices = mock_checkbox.call_args.kwargs["choices"]
+        assert [choice.value for choice in choices] == ["Refunds are idempotent"]
 
     @patch("questionary.select")
     def test_collect_acceptance_criteria_skip(self, mock_select, collector):
@@ -156,19 +214,16 @@ class TestTaskDataCollector:
 
         assert result == []
 
-    @patch("ticketplease.collector.validate_file_path")
-    @patch("ticketplease.collector.read_file_content")
     @patch("questionary.confirm")
     @patch("questionary.select")
     def test_collect_definition_of_done_with_default_file(
-        self, mock_select, mock_confirm, mock_read, mock_validate, collector
+        self, mock_select, mock_confirm, collector, tmp_path
     ):
         """Test definition of done collection with default file."""
-        # Setup mocks
-        collector.config.get_dod_path.return_value = "/path/to/dod.txt"
-        mock_validate.return_value = True
+        dod_file = tmp_path / "dod.txt"
+        dod_file.write_text("DoD 1\nDoD 2\n")
+        collector.config.get_dod_path.return_value = str(dod_file)
         mock_confirm.return_value.ask.return_value = True
-        mock_read.return_value = ["DoD 1", "DoD 2"]
 
         result = collector._collect_definition_of_done()
 
@@ -176,4 +231,153 @@ class TestTaskDataCollector:
         assert "DoD 1" in result
         assert "DoD 2" in result
         mock_confirm.assert_called_once()
-        mock_read.assert_called_once_with("/path/to/dod.txt")
+        mock_select.assert_not_called()
+
+
+class TestNonInteractiveCollection:
+    """Test cases for collecting task data from files and options."""
+
+    @pytest.fixture
+    def collector(self):
+        """Create a collector with a mock configuration."""
+        config = MagicMock(spec=Config)
+        config.get_platform.return_value = "github"
+        config.get_language.return_value = "en"
+        config.get_ac_path.return_value = ""
+        config.get_dod_path.return_value = ""
+        config.get_relevant_items.return_value = 0
+        config.get_symbol_index.return_value = False
+        config.get_template_tags.return_value = []
+        config.get_context_tokens.return_value = 2000
+        return TaskDataCollector(config)
+
+    def test_collect_from_files(self, collector, tmp_path):
+        """Test reading description, AC and DoD from files."""
+        description = tmp_path / "task.md"
+        description.write_text("Add CSV export\n")
+        ac = tmp_path / "ac.md"
+        ac.write_text("Exports all rows\nHeaders are included\n")
+
+        result = collector.collect_task_data_from_options(
+            str(description), ac_file=str(ac), platform="Jira", language="es"
+        )
+
+        assert result == {
+            "task_description": "Add CSV export",
+            "platform": "jira",
+            "language": "es",
+            "acceptance_criteria": ["Exports all rows", "Headers are included"],
+            "definition_of_done": [],
+        }
+
+    def test_collect_keeps_relevant_items(self, collector, tmp_path, capsys):
+        """Test that only the items most relevant to the task are kept when configured."""
+        description = tmp_path / "task.md"
+        description.write_text("Add CSV export of the reports\n")
+        ac = tmp_path / "ac.md"
+        ac.write_text("Exports include every report\nPasswords are hashed\nLogs are rotated\n")
+        collector.config.get_relevant_items.return_value = 1
+
+        result = collector.collect_task_data_from_options(str(description), ac_file=str(ac))
+
+        assert result["acceptance_criteria"] == ["Exports include every report"]
+        assert "Kept the 1 of 3 acceptance criteria" in capsys.readouterr().err
+
+    def test_collect_renders_structured_templates(self, collector, tmp_path):
+        """Test that structured templates are rendered for the platform, language and tags."""
+        description = tmp_path / "task.md"
+        description.write_text("Add CSV export\n")
+        ac = tmp_path / "ac.toml"
+        ac.write_text(
+            '[[sections]]\ntitle = "Export"\nitems = ["Headers are included", '
+            '{ text = "Linked to the epic", platforms = ["jira"] }, '
+            '{ text = "Uses the admin API", tags = ["admin"] }]\n'
+        )
+
+        result = collector.collect_task_data_from_options(str(description), ac_file=str(ac))
+        assert result["acceptance_criteria"] == [
+            "Export: Headers are included",
+            "Export: Uses the admin API",
+        ]
+
+        collector.config.get_template_tags.return_value = ["ui"]
+        result = collector.collect_task_data_from_options(
+            str(description), ac_file=str(ac), platform="jira"
+        )
+        assert result["acceptance_criteria"] == [
+            "Export: Headers are included",
+            "Export: Linked to the epic",
+        ]
+
+    def test_collect_attaches_code_context(self, collector, tmp_path, capsys):
+        """Test that attached files become the task's code context."""
+        description = tmp_path / "task.md"
+        description.write_text("Add CSV export\n")
+        code = tmp_path / "export.py"
+        code.write_text("def export_csv():\n    pass\n")
+
+        result = collector.collect_task_data_from_options(str(description), attach=[str(code)])
+
+        assert result["context"] == f"--- {code}:1\ndef export_csv():\n    pass"
+        assert "Attached" in capsys.readouterr().err
+        with pytest.raises(ValueError, match="does not exist"):
+            collector.collect_task_data_from_options(
+                str(description), attach=[str(tmp_path / "missing.py")]
+            )
+
+    def test_collect_lists_repository_symbols(self, collector, tmp_path):
+        """Test that symbols named in the description are listed when the index is enabled."""
+        description = tmp_path / "task.md"
+        description.write_text("Fix export_csv\n")
+        collector.config.get_symbol_index.return_value = True
+
+        with patch(
+            "ticketplease.collector.repository_symbols",
+            return_value="- export_csv (function, export.py:1)",
+        ) as lookup:
+            result = collector.collect_task_data_from_options(str(description))
+
+        lookup.assert_called_once_with(collector.config, "Fix export_csv")
+        assert result["context"] == (
+            "Symbols in this repository named by the task:\n- export_csv (function, export.py:1)"
+        )
+
+    def test_collect_from_stdin(self, collector):
+        """Test reading the description from stdin."""
+        with patch("sys.stdin.read", return_value="From a pipe\n"):
+            result = collector.collect_task_data_from_options("-")
+
+        assert result["task_description"] == "From a pipe"
+        assert result["platform"] == "github"
+        assert result["language"] == "en"
+
+    def test_collect_uses_default_template_files(self, collector, tmp_path):
+        """Test that configured default files are used when no file is given."""
+        dod = tmp_path / "dod.md"
+        dod.write_text("Code reviewed\n")
+        collector.config.get_dod_path.return_value = str(dod)
+        description = tmp_path / "task.md"
+        description.write_text("Task")
+
+        result = collector.collect_task_data_from_options(str(description))
+
+        assert result["definition_of_done"] == ["Code reviewed"]
+
+    def test_collect_missing_file(self, collector, tmp_path):
+        """Test that missing files are reported."""
+        with pytest.raises(ValueError, match="does not exist"):
+            collector.collect_task_data_from_options(str(tmp_path / "missing.md"))
+
+    def test_collect_empty_description(self, collector):
+        """Test that an empty description is rejected."""
+        with patch("sys.stdin.read", return_value="   "):
+            with pytest.raises(ValueError, match="cannot be empty"):
+                collector.collect_task_data_from_options("-")
+
+    def test_collect_invalid_platform(self, collector, tmp_path):
+        """Test that unknown platforms are rejected."""
+        description = tmp_path / "task.md"
+        description.write_text("Task")
+
+        with pytest.raises(ValueError, match="Unsupported platform"):
+            collector.collect_task_data_from_options(str(description), platform="gitlab")
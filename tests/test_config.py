@@ -1,8 +1,12 @@
 """Tests for the configuration module."""
 
+import threading
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+from keyring.errors import KeyringError
+
 from config.service import Config
 
 
@@ -66,6 +70,67 @@ class TestConfig:
 
         assert config.get_dod_path() == "/path/to/dod.md"
 
+    def test_get_relevant_items(self, monkeypatch) -> None:
+        """Test that the relevant item count defaults to 0 and ignores invalid values."""
+        config = Config()
+        config._config = {"preferences": {"relevant_items": 12}}
+
+        assert config.get_relevant_items() == 12
+        monkeypatch.setenv("TK_RELEVANT_ITEMS", "many")
+        assert config.get_relevant_items() == 0
+
+    def test_get_template_tags(self, monkeypatch) -> None:
+        """Test getting template tags as a list from config or a comma-separated variable."""
+        config = Config()
+        config._config = {"preferences": {"template_tags": ["backend"]}}
+
+        assert config.get_template_tags() == ["backend"]
+        monkeypatch.setenv("TK_TEMPLATE_TAGS", "api, security,")
+        assert config.get_template_tags() == ["api", "security"]
+
+    def test_get_summary_settings(self, monkeypatch) -> None:
+        """Test that summaries default to the main model and a 12000-character threshold."""
+        config = Config()
+        config._config = {"llm": {"model": "gpt-4o"}}
+
+        assert config.get_summary_model() == "gpt-4o"
+        assert config.get_max_description_chars() == 12000
+        monkeypatch.setenv("TK_SUMMARY_MODEL", "gpt-4o-mini")
+        monkeypatch.setenv("TK_MAX_DESCRIPTION_CHARS", "0")
+        assert config.get_summary_model() == "gpt-4o-mini"
+        assert config.get_max_description_chars() == 0
+
+    def test_get_context_tokens(self, monkeypatch) -> None:
+        """Test that the context budget defaults to 2000 tokens and ignores invalid values."""
+        config = Config()
+        config._config = {}
+
+        assert config.get_context_tokens() == 2000
+        monkeypatch.setenv("TK_CONTEXT_TOKENS", "500")
+        assert config.get_context_tokens() == 500
+        monkeypatch.setenv("TK_CONTEXT_TOKENS", "lots")
+        assert config.get_context_tokens() == 2000
+
+    def test_get_symbol_index(self, monkeypatch) -> None:
+        """Test that the symbol index is opt-in through the file or TK_SYMBOL_INDEX."""
+        config = Config()
+        config._config = {}
+
+        assert config.get_symbol_index() is False
+        config._config = {"preferences": {"symbol_index": True}}
+        assert config.get_symbol_index() is True
+        monkeypatch.setenv("TK_SYMBOL_INDEX", "off")
+        assert config.get_symbol_index() is False
+
+    def test_get_template_library(self, monkeypatch) -> None:
+        """Test getting the template library from config and the environment."""
+        config = Config()
+        config._config = {"preferences": {"template_library": "~/templates"}}
+
+        assert config.get_template_library() == "~/templates"
+        monkeypatch.setenv("TK_TEMPLATE_LIBRARY", "/shared/templates")
+        assert config.get_template_library() == "/shared/templates"
+
     def test_is_configured_true(self) -> None:
         """Test is_configured returns True when config is complete."""
         config = Config()
@@ -118,3 +183,245 @@ class TestConfig:
         config._config = {"llm": {"model": "claude-3-sonnet"}}
 
         assert config.get_model() == "claude-3-sonnet"
+
+
+class TestConfigSnapshot:
+    """Test cases for the shared configuration snapshot and atomic saves."""
+
+    @pytest.fixture
+    def home(self, tmp_path, monkeypatch):
+        """Point the home directory at a temporary directory."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        return tmp_path
+
+    def test_save_and_load_round_trip(self, home) -> None:
+        """Test that saved configuration is loaded by new Config instances."""
+        data = {"api_keys": {"provider": "anthropic"}, "llm": {"model": "claude-3-5-haiku"}}
+        Config().save(data)
+
+        assert Config().load() == data
+        assert (Config().config_file.stat().st_mode & 0o777) == 0o600
+
+    def test_snapshot_is_parsed_once(self, home) -> None:
+        """Test that unchanged files are not parsed again."""
+        Config().save({"llm": {"model": "gpt-4o"}})
+
+        with patch("config.service.parse_toml") as mock_parse:
+            assert Config().get_model() == "gpt-4o"
+            assert Config().get_model() == "gpt-4o"
+
+        mock_parse.assert_not_called()
+
+    def test_snapshot_is_private_copy(self, home) -> None:
+        """Test that mutating a loaded config does not leak into other instances."""
+        Config().save({"llm": {"model": "gpt-4o"}})
+
+        Config().load()["llm"]["model"] = "mutated"
+
+        assert Config().get_model() == "gpt-4o"
+
+    def test_external_change_is_detected(self, home) -> None:
+        """Test that a replaced file invalidates the snapshot."""
+        config = Config()
+        config.save({"llm": {"model": "gpt-4o"}})
+        config.config_file.write_text('[llm]\nmodel = "claude-3-5-haiku"\n# changed size\n')
+
+        assert config.reload_if_changed() is True
+        assert config.get_model() == "claude-3-5-haiku"
+        assert Config().get_model() == "claude-3-5-haiku"
+
+    def test_reload_if_changed_without_changes(self, home) -> None:
+        """Test that reload is a no-op for an unchanged file."""
+        config = Config()
+        config.save({"llm": {"model": "gpt-4o"}})
+
+        assert config.reload_if_changed() is False
+
+    def test_save_leaves_no_temporary_files(self, home) -> None:
+        """Test that atomic saves clean up after themselves."""
+        config = Config()
+        config.save({"llm": {"model": "gpt-4o"}})
+        config.save({"llm": {"model": "gpt-4o-mini"}})
+
+        leftovers = [path.name for path in config.config_dir.iterdir() if path.suffix == ".tmp"]
+        assert leftovers == []
+
+    def test_concurrent_readers_never_see_torn_files(self, home) -> None:
+        """Test that readers always parse a complete file while writers save."""
+        Config().save({"llm": {"model": "model-0"}, "padding": {"text": "x" * 50_000}})
+        errors = []
+
+        def writer() -> None:
+            for index in range(30):
+                Config().save(
+                    {"llm": {"model": f"model-{index}"}, "padding": {"text": "x" * 50_000}}
+                )
+
+        def reader() -> None:
+            for _ in range(100):
+                try:
+                    assert Config().get_model().startswith("model-")
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=writer)] + [
+            threading.Thread(target=reader) for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+
+
+class TestConfigKeyring:
+    """Test cases for API keys stored in the keyring."""
+
+    @pytest.fixture
+    def home(self, tmp_path, monkeypatch):
+        """Point the home directory at a temporary directory."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        return tmp_path
+
+    def test_save_moves_api_key_to_keyring(self, home, file_keyring) -> None:
+        """Test that the API key is not written to the config file."""
+        Config().save(
+            {"api_keys": {"provider": "openai", "api_key": "sk-secret"}, "llm": {"model": "gpt-4o"}}
+        )
+
+        config = Config()
+        assert "sk-secret" not in config.config_file.read_text()
+        assert config.load()["api_keys"]["api_key_storage"] == "keyring"
+        assert file_keyring.get_password("ticketplease", "openai") == "sk-secret"
+        assert config.get_api_key() == "sk-secret"
+        assert config.is_configured() is True
+
+    def test_save_moves_pool_keys_to_keyring(self, home, file_keyring, monkeypatch) -> None:
+        """Test that pool keys are stored in the keyring and only counted in the file."""
+        monkeypatch.delenv("TK_API_KEYS", raising=False)
+        Config().save(
+            {
+                "api_keys": {
+                    "provider": "openai",
+                    "api_key": "sk-main",
+                    "pool": {"openai": ["sk-2", "sk-3"], "anthropic": ["sk-ant"]},
+                }
+            }
+        )
+
+        config = Config()
+        text = config.config_file.read_text()
+        assert "sk-2" not in text and "sk-ant" not in text
+        assert config.load()["api_keys"]["pool"] == {"openai": 2, "anthropic": 1}
+        assert file_keyring.get_password("ticketplease", "openai#2") == "sk-3"
+        assert config.get_api_keys() == ["sk-main", "sk-2", "sk-3"]
+
+    def test_save_keeps_caller_config_intact(self, home) -> None:
+        """Test that saving does not strip the key from the caller's dictionary."""
+        data = {"api_keys": {"provider": "openai", "api_key": "sk-secret"}}
+        config = Config()
+        config.save(data)
+
+        assert data["api_keys"]["api_key"] == "sk-secret"
+        assert config.get_api_key() == "sk-secret"
+
+    def test_save_falls_back_to_plaintext_without_keyring(self, home) -> None:
+        """Test that the key stays in the file when no keyring backend is usable."""
+        with patch("config.service.SecretStore.set", side_effect=KeyringError("no backend")):
+            Config().save({"api_keys": {"provider": "openai", "api_key": "sk-secret"}})
+
+        assert Config().load()["api_keys"]["api_key"] == "sk-secret"
+
+    def test_plaintext_key_takes_precedence(self, home) -> None:
+        """Test that legacy plaintext keys keep working."""
+        config = Config()
+        config._config = {"api_keys": {"provider": "openai", "api_key": "sk-plain"}}
+
+        with patch("config.service.SecretStore.get") as mock_get:
+            assert config.get_api_key() == "sk-plain"
+
+        mock_get.assert_not_called()
+
+
+class TestConfigOverrides:
+    """Test cases for TK_* environment variables and process overrides."""
+
+    def test_environment_overrides_file_values(self, monkeypatch) -> None:
+        """Test that TK_* variables take precedence over the configuration file."""
+        monkeypatch.setenv("TK_MODEL", "claude-3-5-haiku")
+        monkeypatch.setenv("TK_PLATFORM", "jira")
+        config = Config()
+        config._config = {"llm": {"model": "gpt-4o"}, "preferences": {"default_platform": "github"}}
+
+        assert config.get_model() == "claude-3-5-haiku"
+        assert config.get_platform() == "jira"
+
+    def test_explicit_override_wins(self, monkeypatch) -> None:
+        """Test that command line overrides take precedence over the environment."""
+        monkeypatch.setenv("TK_LANGUAGE", "es")
+        config = Config()
+        config._config = {}
+        config.set_override("preferences", "default_output_language", "en")
+
+        assert config.get_language() == "en"
+
+    def test_environment_api_key_configures_without_file(self, monkeypatch) -> None:
+        """Test that CI can run with only environment variables."""
+        monkeypatch.setenv("TK_API_KEY", "sk-env")
+        config = Config()
+        config._config = config._get_default_config()
+
+        assert config.get_api_key() == "sk-env"
+        assert config.is_configured() is True
+
+    def test_overrides_are_not_saved(self, tmp_path, monkeypatch) -> None:
+        """Test that overrides never end up in the configuration file."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        config = Config()
+        config.set_override("llm", "model", "gpt-4o")
+        config.save({"llm": {"model": "gpt-4o-mini"}})
+
+        assert Config().get_model() == "gpt-4o-mini"
+
+    def test_limits(self, monkeypatch) -> None:
+        """Test scheduling limits from the file and the environment."""
+        monkeypatch.setenv("TK_REQUESTS_PER_MINUTE", "120")
+        config = Config()
+        config._config = {
+            "limits": {
+                "max_concurrency": 3,
+                "caller_weights": {"ci": 2, "nightly": 0.5, "broken": "x", "zero": 0},
+            }
+        }
+
+        assert config.get_requests_per_minute() == 120.0
+        assert config.get_max_concurrency() == 3
+        assert config.get_caller_weights() == {"ci": 2.0, "nightly": 0.5}
+
+    def test_limits_default_to_unlimited(self, monkeypatch) -> None:
+        """Test that missing or invalid limits mean no limit."""
+        monkeypatch.setenv("TK_MAX_CONCURRENCY", "many")
+        config = Config()
+        config._config = {}
+
+        assert config.get_requests_per_minute() == 0
+        assert config.get_max_concurrency() == 0
+        assert config.get_caller_weights() == {}
+
+    def test_api_key_pool(self, monkeypatch) -> None:
+        """Test that the pool of the current provider follows the main key."""
+        monkeypatch.delenv("TK_API_KEYS", raising=False)
+        config = Config()
+        config._config = {
+            "api_keys": {
+                "provider": "openai",
+                "api_key": "sk-main",
+                "pool": {"openai": ["sk-2", "sk-main", "sk-3"], "anthropic": ["sk-ant"]},
+            }
+        }
+
+        assert config.get_api_keys() == ["sk-main", "sk-2", "sk-3"]
+
+        monkeypatch.setenv("TK_API_KEYS", "sk-env1, sk-env2")
+        assert config.get_api_keys() == ["sk-main", "sk-env1", "sk-env2"]
@@ -0,0 +1,232 @@
+"""Tests for the background daemon and its thin client."""
+
+import shutil
+import socket
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from ai.service import AIService
+from ticketplease.daemon import (
+    DaemonClient,
+    DaemonUnavailableError,
+    RemoteAIService,
+    TaskDaemon,
+    check_socket_dir,
+    connect_daemon,
+    service_settings,
+    socket_path,
+)
+
+
+@pytest.fixture
+def service():
+    """Create a mock AI service."""
+    service = MagicMock(spec=AIService)
+    service.generate_task_description.return_value = " Generated "
+    service.refine_task_description.return_value = "Refined"
+    service.last_usage = {"prompt_tokens": 12}
+    return service
+
+
+@pytest.fixture
+def sock_path():
+    """Create a short socket path, within the AF_UNIX path length limit."""
+    directory = tempfile.mkdtemp(prefix="tk-", dir="/tmp")
+    yield Path(directory) / "daemon.sock"
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def running_daemon(config, service, sock_path):
+    """Run a daemon in a background thread."""
+    factory = MagicMock(return_value=service)
+    daemon = TaskDaemon(config, factory, path=sock_path, idle_timeout=0, concurrency=1)
+    thread = threading.Thread(target=daemon.serve)
+    thread.start()
+    client = DaemonClient(sock_path)
+    for _ in range(200):
+        if client.ping() is not None:
+            break
+        threading.Event().wait(0.01)
+    yield daemon, factory
+    daemon.stop()
+    thread.join(timeout=5)
+
+
+class TestSocketPath:
+    """Test cases for socket_path."""
+
+    def test_env_override(self, monkeypatch) -> None:
+        """Test that TK_DAEMON_SOCKET wins."""
+        monkeypatch.setenv("TK_DAEMON_SOCKET", "/tmp/custom.sock")
+
+        assert socket_path() == Path("/tmp/custom.sock")
+
+    def test_runtime_dir(self, monkeypatch, tmp_path) -> None:
+        """Test that the socket lives in XDG_RUNTIME_DIR when available."""
+        monkeypatch.delenv("TK_DAEMON_SOCKET")
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+
+        assert socket_path() == tmp_path / "ticketplease" / "daemon.sock"
+
+    def test_socket_dir_must_be_private(self, tmp_path) -> None:
+        """Test that shared, foreign or symlinked socket directories are rejected."""
+        private = tmp_path / "private"
+        private.mkdir(mode=0o700)
+        check_socket_dir(private)
+
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        shared.chmod(0o755)
+        with pytest.raises(RuntimeError, match="accessible to other users"):
+            check_socket_dir(shared)
+
+        link = tmp_path / "link"
+        link.symlink_to(private)
+        with pytest.raises(RuntimeError, match="not a directory"):
+            check_socket_dir(link)
+
+    def test_client_ignores_sockets_in_shared_dirs(self, sock_path) -> None:
+        """Test that a client does not talk to a socket others could have planted."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(str(sock_path))
+        sock_path.parent.chmod(0o777)
+
+        with pytest.raises(DaemonUnavailableError, match="accessible to other users"):
+            DaemonClient(sock_path).request({"op": "ping"})
+
+
+class TestDaemonClient:
+    """Test cases for DaemonClient without a daemon."""
+
+    def test_no_daemon(self, sock_path) -> None:
+        """Test that a missing socket reports the daemon as unavailable."""
+        client = DaemonClient(sock_path)
+
+        assert client.ping() is None
+        with pytest.raises(DaemonUnavailableError):
+            client.request({"op": "ping"})
+
+    def test_stale_socket(self, sock_path) -> None:
+        """Test that a socket nobody listens on is unavailable."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(str(sock_path))
+
+        assert DaemonClient(sock_path).ping() is None
+
+    def test_connect_daemon_without_daemon(self, config) -> None:
+        """Test that the thin client is not used when no daemon runs."""
+        assert connect_daemon(config, MagicMock()) is None
+
+
+class TestTaskDaemon:
+    """Test cases for TaskDaemon served over a socket."""
+
+    def test_generate_reuses_warm_service(self, running_daemon, config, service, sock_path):
+        """Test that requests are answered by a service kept between requests."""
+        _, factory = running_daemon
+        remote = RemoteAIService(DaemonClient(sock_path), service_settings(config), MagicMock())
+
+        first = remote.generate_task_description("Task", ["AC"], [], "jira", "en")
+        second = remote.refine_task_description(first, "Shorter")
+
+        assert first == "Generated"
+        assert second == "Refined"
+        assert remote.last_usage == {"prompt_tokens": 12}
+        service.generate_task_description.assert_called_once_with(
+            task_description="Task",
+            acceptance_criteria=["AC"],
+            definition_of_done=[],
+            platform="jira",
+            language="en",
+        )
+        factory.assert_called_once()
+
+    def test_socket_is_private(self, running_daemon, sock_path) -> None:
+        """Test that only the owner can connect to the daemon socket."""
+        assert sock_path.stat().st_mode & 0o777 == 0o600
+
+    def test_settings_mismatch_falls_back(self, running_daemon, config, sock_path) -> None:
+        """Test that a client with other settings runs the call in process."""
+        settings = {**service_settings(config), "model": "gpt-4o"}
+        local_service = MagicMock(spec=AIService)
+        local_service.generate_task_description.return_value = "Local"
+        local_service.last_usage = {"model": "gpt-4o"}
+        remote = RemoteAIService(DaemonClient(sock_path), settings, lambda: local_service)
+
+        result = remote.generate_task_description("Task", [], [], "github", "en")
+
+        assert result == "Local"
+        assert remote.last_usage == {"model": "gpt-4o"}
+
+    def test_errors_are_raised(self, running_daemon, config, service, sock_path) -> None:
+        """Test that provider errors in the daemon surface to the client."""
+        service.refine_task_description.side_effect = RuntimeError("Rate limited")
+        remote = RemoteAIService(DaemonClient(sock_path), service_settings(config), MagicMock())
+
+        with pytest.raises(RuntimeError, match="Rate limited"):
+            remote.refine_task_description("Text", "Shorter")
+
+    @pytest.mark.parametrize(
+        ("spec", "error"),
+        [
+            (None, "must be a JSON object"),
+            ({"operation": "generate"}, "non-empty 'description'"),
+            ({"description": "Task", "priority": "urgent"}, "Unsupported priority 'urgent'"),
+        ],
+    )
+    def test_invalid_specs_are_rejected(self, running_daemon, config, sock_path, spec, error):
+        """Test that malformed specs get a validation error instead of reaching the service."""
+        record = DaemonClient(sock_path).request(
+            {"op": "task", "settings": service_settings(config), "spec": spec}
+        )
+
+        assert record["ok"] is False
+        assert error in record["error"]
+
+    def test_config_change_rebuilds_services(self, running_daemon, config, sock_path) -> None:
+        """Test that services are rebuilt after the configuration file changes."""
+        _, factory = running_daemon
+        remote = RemoteAIService(DaemonClient(sock_path), service_settings(config), MagicMock())
+
+        remote.refine_task_description("Text", "Shorter")
+        config.reload_if_changed.return_value = True
+        remote.refine_task_description("Text", "Shorter")
+
+        assert factory.call_count == 2
+
+    def test_falls_back_when_daemon_stops(self, running_daemon, config, sock_path) -> None:
+        """Test that the client runs in process once the daemon is gone."""
+        daemon, _ = running_daemon
+        local_service = MagicMock(spec=AIService)
+        local_service.refine_task_description.return_value = "Local"
+        local_service.last_usage = None
+        client = DaemonClient(sock_path)
+        remote = RemoteAIService(client, service_settings(config), lambda: local_service)
+
+        client.request({"op": "shutdown"})
+        for _ in range(200):
+            if not sock_path.exists():
+                break
+            threading.Event().wait(0.01)
+
+        assert remote.refine_task_description("Text", "Shorter") == "Local"
+
+    def test_refuses_second_daemon(self, running_daemon, config, sock_path) -> None:
+        """Test that only one daemon serves a socket."""
+        with pytest.raises(RuntimeError, match="already running"):
+            TaskDaemon(config, MagicMock(), path=sock_path).serve()
+
+    def test_idle_timeout(self, config, sock_path) -> None:
+        """Test that an idle daemon exits and removes its socket."""
+        daemon = TaskDaemon(config, MagicMock(), path=sock_path, idle_timeout=0.1)
+        thread = threading.Thread(target=daemon.serve)
+        thread.start()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert not sock_path.exists()
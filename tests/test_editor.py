@@ -0,0 +1,112 @@
+"""Tests for multiline description input helpers."""
+
+import subprocess
+import sys
+
+import pytest
+
+from ticketplease.editor import (
+    PASTE_END,
+    PASTE_START,
+    DraftStore,
+    default_draft_path,
+    edit_text,
+    read_multiline,
+)
+
+
+def reader(*values: str):
+    """Create a read_line function returning the given values in order."""
+    iterator = iter(values)
+    return lambda: next(iterator)
+
+
+class TestReadMultiline:
+    """Test cases for read_multiline."""
+
+    def test_reads_until_done(self) -> None:
+        """Test that typed lines are read until DONE."""
+        lines: list[str] = []
+
+        assert read_multiline(reader("a", "", "b", " done "), lines) == "DONE"
+        assert lines == ["a", "", "b"]
+
+    def test_pasted_keywords_are_content(self) -> None:
+        """Test that DONE and EDIT inside a bracketed paste are kept as text."""
+        lines: list[str] = []
+        values = (f"{PASTE_START}Traceback", "DONE", "EDIT", f"last line{PASTE_END}", "DONE")
+
+        assert read_multiline(reader(*values), lines) == "DONE"
+        assert lines == ["Traceback", "DONE", "EDIT", "last line"]
+
+    def test_readline_pastes_with_newlines(self) -> None:
+        """Test that a paste delivered as one line with newlines is split and kept."""
+        lines: list[str] = []
+
+        assert read_multiline(reader("first\nDONE\nthird", "edit"), lines) == "EDIT"
+        assert lines == ["first", "DONE", "third"]
+
+    def test_progress_callback(self) -> None:
+        """Test that the callback sees the lines read so far."""
+        seen = []
+
+        read_multiline(reader("a", "b", "DONE"), [], lambda lines: seen.append(len(lines)))
+
+        assert seen == [1, 2]
+
+
+class TestDraftStore:
+    """Test cases for DraftStore."""
+
+    def test_save_and_load(self, tmp_path) -> None:
+        """Test that drafts persist and blank text keeps the previous draft."""
+        drafts = DraftStore(tmp_path / "draft.md")
+
+        assert drafts.load() == ""
+        drafts.save("Add export")
+        drafts.save("  ")
+
+        assert DraftStore(tmp_path / "draft.md").load() == "Add export"
+
+    def test_default_path(self, tmp_path, monkeypatch) -> None:
+        """Test that the draft lives in the user cache directory."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        assert default_draft_path() == tmp_path / "ticketplease" / "draft.md"
+
+
+class TestEditText:
+    """Test cases for edit_text."""
+
+    def test_returns_saved_buffer(self, tmp_path, monkeypatch) -> None:
+        """Test that the editor starts from the text and its saved buffer is returned."""
+        script = tmp_path / "editor.py"
+        script.write_text(
+            "import sys\n"
+            "path = sys.argv[1]\n"
+            "text = open(path).read()\n"
+            "open(path, 'w').write(text.upper() + 'edited')\n"
+        )
+        monkeypatch.delenv("VISUAL", raising=False)
+        monkeypatch.setenv("EDITOR", f"{sys.executable} {script}")
+
+        assert edit_text("draft\n") == "DRAFT\nedited"
+
+    def test_invalid_utf8_is_replaced(self, tmp_path, monkeypatch) -> None:
+        """Test that a buffer saved in another encoding is returned instead of raising."""
+        script = tmp_path / "editor.py"
+        script.write_text("import sys\nopen(sys.argv[1], 'wb').write('Café'.encode('latin-1'))\n")
+        monkeypatch.delenv("VISUAL", raising=False)
+        monkeypatch.setenv("EDITOR", f"{sys.executable} {script}")
+
+        assert edit_text("") == "Caf\ufffd"
+
+    def test_editor_errors(self, monkeypatch) -> None:
+        """Test that missing or failing editors raise."""
+        monkeypatch.setenv("VISUAL", "tk-missing-editor")
+        with pytest.raises(OSError):
+            edit_text("")
+
+        monkeypatch.setenv("VISUAL", f"{sys.executable} -c 'raise SystemExit(1)'")
+        with pytest.raises(subprocess.CalledProcessError):
+            edit_text("")
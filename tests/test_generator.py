@@ -1,12 +1,16 @@
 """Tests for the TaskGenerator module."""
 
+import json
 from unittest.mock import MagicMock, patch
 
 import pytest
+import questionary
+from prompt_toolkit.application import create_app_session
+from prompt_toolkit.input import create_pipe_input
 
 from ai.service import AIService
 from config.service import Config
-from ticketplease.generator import TaskGenerator
+from ticketplease.generator import TaskGenerator, console
 
 
 class TestTaskGenerator:
@@ -313,3 +317,118 @@ class TestTaskGenerator:
 
         # Verify that the syntax object was printed
         mock_console.print.assert_called()
+
+
+class TestMachineReadableOutput:
+    """Test cases for --format output modes."""
+
+    @pytest.fixture
+    def mock_config(self):
+        """Create a mock configuration."""
+        config = MagicMock(spec=Config)
+        config.is_configured.return_value = True
+        return config
+
+    @patch("ticketplease.generator.build_ai_service")
+    def test_non_interactive_json(self, mock_build, mock_config, capsys):
+        """Test that JSON output includes usage metadata."""
+        service = mock_build.return_value
+        service.generate_task_description.return_value = "Generated\n"
+        service.last_usage = {"model": "gpt-4o-mini", "prompt_tokens": 10, "platform": "jira"}
+        task_data = {
+            "task_description": "Task",
+            "platform": "jira",
+            "language": "en",
+            "acceptance_criteria": [],
+            "definition_of_done": [],
+        }
+
+        result = TaskGenerator(mock_config).generate_task_non_interactive(task_data, "-", "json")
+
+        assert result is True
+        assert json.loads(capsys.readouterr().out) == {
+            "description": "Generated",
+            "model": "gpt-4o-mini",
+            "platform": "jira",
+            "language": "en",
+            "prompt_tokens": 10,
+        }
+
+    @patch("ticketplease.generator.build_ai_service")
+    def test_non_interactive_bad_output_path(self, mock_build, mock_config, tmp_path, capsys):
+        """Test that an unwritable output path is reported instead of raising."""
+        mock_build.return_value.generate_task_description.return_value = "Generated"
+        mock_build.return_value.last_usage = None
+        task_data = {
+            "task_description": "Task",
+            "platform": "jira",
+            "language": "en",
+            "acceptance_criteria": [],
+            "definition_of_done": [],
+        }
+        output = str(tmp_path / "missing" / "ticket.md")
+
+        result = TaskGenerator(mock_config).generate_task_non_interactive(task_data, output)
+
+        assert result is False
+        assert f"Error: could not write {output}" in capsys.readouterr().err
+
+    @patch("ticketplease.generator.build_ai_service")
+    def test_interactive_format_prompts_on_stderr(self, mock_build, mock_config, capsys):
+        """Test that with --format the prompts are written to stderr, not stdout."""
+        service = mock_build.return_value
+        service.generate_task_description.return_value = "Generated"
+        service.last_usage = None
+        generator = TaskGenerator(mock_config)
+        generator.collector = MagicMock()
+
+        def collect(*args) -> dict:
+            description = questionary.text("What needs to be done?").ask()
+            return {
+                "task_description": description,
+                "platform": "github",
+                "language": "en",
+                "acceptance_criteria": [],
+                "definition_of_done": [],
+            }
+
+        generator.collector.collect_task_data.side_effect = collect
+
+        with create_pipe_input() as pipe, create_app_session(input=pipe):
+            pipe.send_text("Add export\r")
+            assert generator.generate_task(output_format="json") is True
+
+        captured = capsys.readouterr()
+        assert json.loads(captured.out)["description"] == "Generated"
+        assert "What needs to be done?" in captured.err
+        service.generate_task_description.assert_called_once()
+        assert (
+            service.generate_task_description.call_args.kwargs["task_description"] == "Add export"
+        )
+
+    @patch("ticketplease.generator.Syntax")
+    @patch("ticketplease.generator.build_ai_service")
+    def test_interactive_format_skips_rich_view(self, mock_build, mock_syntax, mock_config, capsys):
+        """Test that --format bypasses the rich view and keeps progress off stdout."""
+        service = mock_build.return_value
+        service.generate_task_description.return_value = "Generated"
+        service.last_usage = None
+        generator = TaskGenerator(mock_config)
+        generator.collector = MagicMock()
+        generator.collector.collect_task_data.return_value = {
+            "task_description": "Task",
+            "platform": "github",
+            "language": "en",
+            "acceptance_criteria": [],
+            "definition_of_done": [],
+        }
+
+        with patch.object(generator, "_get_user_action") as mock_action:
+            assert generator.generate_task(output_format="plain") is True
+
+        mock_action.assert_not_called()
+        mock_syntax.assert_not_called()
+        captured = capsys.readouterr()
+        assert captured.out == "Generated\n"
+        assert "Generating task description" in captured.err
+        assert console.stderr is False
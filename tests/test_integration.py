@@ -1,11 +1,17 @@
 """Integration tests for TicketPlease."""
 
+import json
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
+from typer.testing import CliRunner
 
+from benchmarks.stub_provider import BatchStubProvider
+from cli.main import app
 from config.service import Config
-from ticketplease.main import run_task_generation
+from ticketplease.main import run_batch, run_non_interactive_generation, run_task_generation
+from ticketplease.spool import Spool, SpoolWorker
 
 
 class TestIntegration:
@@ -23,6 +29,8 @@ class TestIntegration:
         config.get_language.return_value = "en"
         config.get_ac_path.return_value = ""
         config.get_dod_path.return_value = ""
+        config.get_relevant_items.return_value = 0
+        config.get_symbol_index.return_value = False
         return config
 
     @patch("ticketplease.main.Config")
@@ -272,3 +280,232 @@ class TestIntegration:
         # Verify the flow
         assert result is False
         mock_collector.collect_task_data.assert_called_once()
+
+
+class TestNonInteractiveIntegration:
+    """Integration tests for the non-interactive `tk please` flow."""
+
+    @pytest.fixture
+    def home(self, tmp_path, monkeypatch):
+        """Use an empty home directory and an environment-only configuration."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("TK_API_KEY", "sk-env")
+        monkeypatch.setenv("TK_LANGUAGE", "en")
+        return tmp_path
+
+    @patch("ticketplease.generator.AIService")
+    def test_writes_description_to_file(self, mock_ai_service_class, home):
+        """Test generating from files and writing the result to a file."""
+        mock_ai_service_class.return_value.generate_task_description.return_value = "Result\n"
+        description = home / "task.md"
+        description.write_text("Add CSV export")
+        output = home / "out.md"
+
+        result = run_non_interactive_generation(
+            str(description), platform="jira", model="gpt-4o", output=str(output)
+        )
+
+        assert result is True
+        assert output.read_text() == "Result\n"
+        main_service, summary_service = mock_ai_service_class.call_args_list
+        assert main_service.args[:3] == ("openai", "sk-env", "gpt-4o")
+        assert summary_service.args[:3] == ("openai", "sk-env", "gpt-4o")
+        mock_ai_service_class.return_value.generate_task_description.assert_called_once_with(
+            task_description="Add CSV export",
+            platform="jira",
+            language="en",
+            acceptance_criteria=[],
+            definition_of_done=[],
+        )
+
+    @patch("ticketplease.generator.AIService")
+    def test_writes_description_to_stdout(self, mock_ai_service_class, home, capsys):
+        """Test that '-' writes only the description to stdout."""
+        mock_ai_service_class.return_value.generate_task_description.return_value = "Result"
+        description = home / "task.md"
+        description.write_text("Add CSV export")
+
+        assert run_non_interactive_generation(str(description)) is True
+
+        assert capsys.readouterr().out == "Result\n"
+
+    def test_missing_description_file(self, home, capsys):
+        """Test that errors are reported on stderr."""
+        result = run_non_interactive_generation(str(home / "missing.md"))
+
+        assert result is False
+        assert "does not exist" in capsys.readouterr().err
+
+    def test_unconfigured(self, home, monkeypatch, capsys):
+        """Test that a missing API key fails without prompting."""
+        monkeypatch.delenv("TK_API_KEY")
+        description = home / "task.md"
+        description.write_text("Add CSV export")
+
+        assert run_non_interactive_generation(str(description)) is False
+        assert "configuration is incomplete" in capsys.readouterr().err
+
+    def test_cli_rejects_output_without_description_file(self):
+        """Test that file-only flags require --description-file."""
+        result = CliRunner().invoke(app, ["please", "--output", "out.md"])
+
+        assert result.exit_code != 0
+
+    def test_stats_rejects_unknown_grouping(self, tmp_path, monkeypatch):
+        """Test that an unsupported --by fails with a non-zero exit code."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+
+        result = CliRunner().invoke(app, ["stats", "--by", "color"])
+
+        assert result.exit_code == 1
+        assert "Unsupported grouping" in result.output
+
+
+class TestBatchIntegration:
+    """Integration tests for `tk batch`."""
+
+    @pytest.fixture
+    def home(self, tmp_path, monkeypatch):
+        """Use an empty home directory and an environment-only configuration."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("TK_API_KEY", "sk-env")
+        monkeypatch.setenv("TK_LANGUAGE", "en")
+        return tmp_path
+
+    @patch("ticketplease.generator.AIService")
+    def test_writes_results_file(self, mock_ai_service_class, home, capsys):
+        """Test that every spec gets a result line and failures are counted."""
+        mock_ai_service_class.return_value.generate_task_description.return_value = "Result"
+        mock_ai_service_class.return_value.last_usage = None
+        specs = home / "tasks.jsonl"
+        specs.write_text('{"id": "A", "description": "Add export"}\n{"id": "B"}\n')
+        output = home / "results.jsonl"
+
+        result = run_batch(str(specs), str(output), concurrency=2)
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert result is False
+        assert {"id": "A", "ok": True, "description": "Result", "usage": None} in records
+        assert [record["ok"] for record in records].count(False) == 1
+        assert "Processed 2 tasks, 1 failed." in capsys.readouterr().err
+
+    @patch("ticketplease.generator.AIService")
+    def test_resumes_from_journal(self, mock_ai_service_class, home, capsys):
+        """Test that a rerun skips completed rows and retries only failures."""
+        service = mock_ai_service_class.return_value
+        service.last_usage = None
+        service.generate_task_description.side_effect = lambda task_description, **_: (
+            f"Done: {task_description}"
+        )
+        service.refine_task_description.side_effect = RuntimeError("Rate limited")
+        specs = home / "tasks.jsonl"
+        specs.write_text(
+            '{"id": "A", "description": "Add export"}\n'
+            '{"id": "B", "operation": "refine", "description": "Text", "refinement": "Short"}\n'
+        )
+        output = home / "results.jsonl"
+
+        assert run_batch(str(specs), str(output), concurrency=1) is False
+        service.refine_task_description.side_effect = None
+        service.refine_task_description.return_value = "Refined"
+        assert run_batch(str(specs), str(output), concurrency=1) is True
+
+        records = {
+            record["id"]: record for record in map(json.loads, output.read_text().splitlines())
+        }
+        assert records["A"]["description"] == "Done: Add export"
+        assert records["B"]["description"] == "Refined"
+        assert service.generate_task_description.call_count == 1
+        assert service.refine_task_description.call_count == 2
+        assert "1 resumed from" in capsys.readouterr().err.splitlines()[-1]
+        assert not (home / "results.jsonl.partial").exists()
+
+    @patch("ticketplease.generator.AIService")
+    def test_resume_survives_inserted_lines(self, mock_ai_service_class, home, capsys):
+        """Test that journal keys do not depend on line numbers and duplicates share a result."""
+        service = mock_ai_service_class.return_value
+        service.last_usage = None
+        service.generate_task_description.side_effect = lambda task_description, **_: (
+            f"Done: {task_description}"
+        )
+        specs = home / "tasks.jsonl"
+        output = home / "results.jsonl"
+        specs.write_text('{"description": "Add export"}\n')
+        assert run_batch(str(specs), str(output), concurrency=1) is True
+
+        specs.write_text(
+            '{"description": "Add import"}\n'
+            '{"description": "Add export"}\n'
+            '{"description": "Add import"}\n'
+        )
+        assert run_batch(str(specs), str(output), concurrency=1) is True
+
+        records = {
+            record["id"]: record for record in map(json.loads, output.read_text().splitlines())
+        }
+        assert records[1]["description"] == "Done: Add import"
+        assert records[2]["description"] == "Done: Add export"
+        assert records[3]["description"] == "Done: Add import"
+        assert service.generate_task_description.call_count == 2
+
+    def test_spooled_batch(self, home, capsys):
+        """Test that --spool hands the tasks to spool workers and collects their results."""
+        spool = Spool(home / "spool")
+        worker = SpoolWorker(
+            spool,
+            lambda spec: {"id": spec["id"], "ok": True, "description": spec["description"]},
+            poll_interval=0.01,
+        )
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        specs = home / "tasks.jsonl"
+        specs.write_text('{"id": "A", "description": "Add export"}\n')
+        output = home / "results.jsonl"
+
+        try:
+            result = run_batch(str(specs), str(output), 1, spool_dir=str(home / "spool"))
+        finally:
+            worker.stop()
+            thread.join()
+
+        assert result is True
+        assert json.loads(output.read_text()) == {
+            "id": "A",
+            "ok": True,
+            "description": "Add export",
+        }
+
+    def test_async_provider_batch(self, home, monkeypatch, capsys):
+        """Test that --async-provider-batch submits one batch and writes live-format results."""
+        specs = home / "tasks.jsonl"
+        specs.write_text(
+            '{"id": "A", "description": "Add export"}\n'
+            '{"id": "B", "operation": "convert", "description": "Text", "platform": "github"}\n'
+        )
+        output = home / "results.jsonl"
+
+        with BatchStubProvider("Batched", polls_until_done=2) as stub:
+            monkeypatch.setenv("TK_API_BASE", stub.api_base)
+            result = run_batch(str(specs), str(output), 1, provider_batch=True, poll_interval=0)
+
+        records = {
+            record["id"]: record for record in map(json.loads, output.read_text().splitlines())
+        }
+        assert result is True
+        assert records["A"]["description"] == records["B"]["description"] == "Batched"
+        assert records["B"]["usage"]["platform"] == "github"
+        assert len(stub.batches) == 1
+        assert not stub.requests
+        assert "completed" in capsys.readouterr().err
+
+    def test_async_provider_batch_needs_batch_api(self, home, monkeypatch, capsys):
+        """Test that providers without a batch API are reported."""
+        monkeypatch.setenv("TK_PROVIDER", "gemini")
+
+        assert run_batch("-", "-", 1, provider_batch=True) is False
+        assert "no supported batch API" in capsys.readouterr().err
+
+    def test_missing_input_file(self, home, capsys):
+        """Test that unreadable input files are reported."""
+        assert run_batch(str(home / "missing.jsonl"), "-", concurrency=1) is False
+        assert "Error:" in capsys.readouterr().err
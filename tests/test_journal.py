@@ -0,0 +1,101 @@
+"""Tests for the batch checkpoint journal."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from ticketplease.journal import BatchJournal, default_journal_path, idempotency_key
+
+
+class TestIdempotencyKey:
+    """Test cases for idempotency_key."""
+
+    def test_stable_and_ignores_scheduling(self, config) -> None:
+        """Test that the key depends on content, not on field order, ids or scheduling fields."""
+        spec = {"id": 1, "operation": "generate", "description": "Task", "platform": "jira"}
+        reordered = {"platform": "jira", "description": "Task", "operation": "generate", "id": 1}
+
+        assert idempotency_key(spec, config) == idempotency_key(reordered, config)
+        assert idempotency_key(spec, config) == idempotency_key(
+            {**spec, "priority": "batch", "caller": "nightly"}, config
+        )
+        assert idempotency_key(spec, config) == idempotency_key({**spec, "id": 2}, config)
+
+    def test_depends_on_model(self, config) -> None:
+        """Test that switching models produces new keys."""
+        spec = {"id": 1, "operation": "generate", "description": "Task"}
+        key = idempotency_key(spec, config)
+        config.get_model.return_value = "gpt-4o"
+
+        assert idempotency_key(spec, config) != key
+
+    def test_default_journal_path(self, config, tmp_path, monkeypatch) -> None:
+        """Test that relative and absolute input paths share one journal."""
+        monkeypatch.chdir(tmp_path)
+
+        path = default_journal_path(config, "tasks.jsonl")
+
+        assert path == default_journal_path(config, str(tmp_path / "tasks.jsonl"))
+        assert path.parent == tmp_path / "journals"
+        assert path.name.startswith("tasks-")
+
+
+class TestBatchJournal:
+    """Test cases for BatchJournal."""
+
+    def test_run_journals_completed_results(self, tmp_path) -> None:
+        """Test that completed results are reused after reopening the journal."""
+        journal = BatchJournal(tmp_path / "journal.db")
+        process = MagicMock(return_value={"id": 1, "ok": True, "description": "Done"})
+
+        first = journal.run("key", process)
+        journal.close()
+        second = BatchJournal(tmp_path / "journal.db").run("key", process)
+
+        assert first == ({"id": 1, "ok": True, "description": "Done"}, False)
+        assert second == ({"id": 1, "ok": True, "description": "Done"}, True)
+        process.assert_called_once()
+
+    def test_failures_are_retried(self, tmp_path) -> None:
+        """Test that failed results are not journaled."""
+        journal = BatchJournal(tmp_path / "journal.db")
+
+        journal.run("key", lambda: {"id": 1, "ok": False, "error": "Rate limited"})
+
+        assert journal.get("key") is None
+
+    def test_exceptions_are_not_journaled(self, tmp_path) -> None:
+        """Test that a failing call leaves no entry behind."""
+        journal = BatchJournal(tmp_path / "journal.db")
+
+        with pytest.raises(RuntimeError):
+            journal.run("key", MagicMock(side_effect=RuntimeError("Timeout")))
+
+        assert journal.get("key") is None
+
+    def test_concurrent_runs_share_one_call(self, tmp_path) -> None:
+        """Test that concurrent runs for the same key call process once."""
+        journal = BatchJournal(tmp_path / "journal.db")
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def process() -> dict:
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"id": 1, "ok": True, "description": "Done"}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(journal.run("key", process)))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(journal.run("key", process)))
+        follower.start()
+        release.set()
+        leader.join()
+        follower.join()
+
+        assert len(calls) == 1
+        assert sorted(was_resumed for _, was_resumed in results) == [False, True]
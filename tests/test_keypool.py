@@ -0,0 +1,140 @@
+"""Tests for the API key pool."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ai.keypool import KeyPool, key_id, parse_reset, response_headers
+from ai.service import AIService
+from ai.usage import UsageLedger
+from benchmarks.stub_provider import StubProvider
+
+
+def response_with_headers(headers: dict[str, str]) -> SimpleNamespace:
+    """Build a response carrying provider headers the way litellm attaches them."""
+    return SimpleNamespace(_hidden_params={"additional_headers": headers})
+
+
+class ProviderError(Exception):
+    """Error with a status code, like litellm's exceptions."""
+
+    def __init__(self, status_code: int, message: str = "Provider error") -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TestHelpers:
+    """Test cases for the key pool helpers."""
+
+    def test_key_id_hides_the_key(self) -> None:
+        """Test that key ids are short, stable and do not contain the key."""
+        assert key_id("sk-secret") == key_id("sk-secret")
+        assert len(key_id("sk-secret")) == 12
+        assert "secret" not in key_id("sk-secret")
+
+    def test_response_headers(self) -> None:
+        """Test that provider-prefixed header names are normalized."""
+        response = response_with_headers({"llm_provider-X-RateLimit-Remaining-Requests": "7"})
+
+        assert response_headers(response) == {"x-ratelimit-remaining-requests": "7"}
+        assert response_headers(object()) == {}
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [("6m0s", 360.0), ("1.5s", 1.5), ("20ms", 0.02), ("30", 30.0), ("1h2m", 3720.0)],
+    )
+    def test_parse_reset_durations(self, value, expected) -> None:
+        """Test the duration formats providers use for reset headers."""
+        assert parse_reset(value, 1000.0) == pytest.approx(1000.0 + expected)
+
+    def test_parse_reset_timestamp(self) -> None:
+        """Test RFC 3339 reset times and unparseable values."""
+        assert parse_reset("1970-01-01T00:01:00Z", 0.0) == 60.0
+        assert parse_reset("soon", 0.0) is None
+
+
+class TestKeyPool:
+    """Test cases for KeyPool."""
+
+    def test_prefers_key_with_most_budget(self) -> None:
+        """Test that requests go to the key with the most remaining requests."""
+        pool = KeyPool(["sk-a", "sk-b"])
+        pool.release(pool.acquire(), response_with_headers({"x-ratelimit-remaining-requests": "2"}))
+        pool.release(pool.acquire(), response_with_headers({"x-ratelimit-remaining-requests": "9"}))
+
+        chosen = [pool.acquire() for _ in range(3)]
+
+        assert len(set(chosen)) == 1
+        assert {stats["remaining"] for stats in pool.stats()} == {2, 6}
+
+    def test_unknown_keys_are_tried_first(self) -> None:
+        """Test that keys without rate-limit information are spread by in-flight count."""
+        pool = KeyPool(["sk-a", "sk-b", "sk-a", ""])
+
+        assert len(pool) == 2
+        assert {pool.acquire(), pool.acquire()} == {"sk-a", "sk-b"}
+
+    def test_auth_errors_disable_keys(self) -> None:
+        """Test that a key failing authentication is no longer used."""
+        pool = KeyPool(["sk-a", "sk-b"])
+        api_key = pool.acquire()
+
+        assert pool.report_error(api_key, ProviderError(401)) is True
+        assert all(pool.acquire() != api_key for _ in range(3))
+        assert [stats["status"] for stats in pool.stats()].count("disabled") == 1
+
+    def test_rate_limited_keys_are_sidelined_until_reset(self) -> None:
+        """Test that a rate-limited key comes back after its reset time."""
+        pool = KeyPool(["sk-a"])
+        pool.release(pool.acquire(), response_with_headers({"x-ratelimit-reset-requests": "50ms"}))
+
+        assert pool.report_error(pool.acquire(), ProviderError(429)) is True
+        with pytest.raises(RuntimeError, match="No API key"):
+            pool.acquire()
+        time.sleep(0.06)
+        assert pool.acquire() == "sk-a"
+
+    def test_other_errors_are_not_retried(self) -> None:
+        """Test that request errors do not sideline the key."""
+        pool = KeyPool(["sk-a", "sk-b"])
+        api_key = pool.acquire()
+
+        assert pool.report_error(api_key, ProviderError(400)) is False
+        assert pool.stats()[0]["status"] == "ok"
+
+    def test_requires_a_key(self) -> None:
+        """Test that an empty pool is rejected."""
+        with pytest.raises(ValueError):
+            KeyPool([""])
+
+
+class TestAIServiceKeyPool:
+    """Test cases for AIService with a key pool, against a stub provider."""
+
+    def test_rotates_and_skips_rejected_keys(self, tmp_path) -> None:
+        """Test that a rejected key is retried with another one and usage records the key id."""
+        ledger = UsageLedger(tmp_path / "usage.db")
+        with StubProvider("Generated") as stub:
+            stub.rejected_keys = {"sk-revoked"}
+            stub.rate_limits = {"sk-good": 100}
+            pool = KeyPool(["sk-revoked", "sk-good"])
+            service = AIService(
+                "openai",
+                "sk-good",
+                "openai/stub-model",
+                ledger=ledger,
+                api_base=stub.api_base,
+                key_pool=pool,
+            )
+
+            results = [service.refine_task_description("Text", f"Change {n}") for n in range(3)]
+
+        assert results == ["Generated"] * 3
+        assert stub.api_keys.count("sk-revoked") == 1
+        assert stub.api_keys.count("sk-good") == 3
+        assert service.last_usage["key_id"] == key_id("sk-good")
+        assert {stats["key_id"]: stats["remaining"] for stats in pool.stats()}[
+            key_id("sk-good")
+        ] == 100
+        assert [row["group"] for row in ledger.summarize("key")] == [key_id("sk-good")]
@@ -0,0 +1,148 @@
+"""Tests for the template library index."""
+
+import json
+
+import pytest
+
+from ticketplease.library import TemplateLibrary, template_library, tokenize, trigrams
+from ticketplease.main import run_template_search
+from ticketplease.templates import TemplateCache
+
+
+@pytest.fixture
+def library_dir(tmp_path):
+    """Create a template library with nested and hidden files."""
+    root = tmp_path / "library"
+    (root / "payments").mkdir(parents=True)
+    (root / ".git").mkdir()
+    (root / "security.md").write_text(
+        "Passwords are hashed with a slow algorithm\nSessions expire after inactivity\n"
+    )
+    (root / "payments" / "refunds.md").write_text(
+        "Refunds are idempotent\nRefund emails are sent to the customer\n"
+    )
+    (root / ".git" / "config").write_text("Refunds everywhere\n")
+    return root
+
+
+@pytest.fixture
+def library(library_dir):
+    """Create a refreshed index over the library."""
+    library = TemplateLibrary(library_dir, TemplateCache())
+    library.refresh()
+    return library
+
+
+class TestHelpers:
+    """Test cases for the tokenizer and trigrams."""
+
+    def test_tokenize(self) -> None:
+        """Test that text is split into lower-case words."""
+        assert tokenize("Refunds are idempotent, e-mails too") == [
+            "refunds",
+            "are",
+            "idempotent",
+            "e",
+            "mails",
+            "too",
+        ]
+
+    def test_trigrams_share_prefixes(self) -> None:
+        """Test that a prefix shares its leading grams with the full term."""
+        assert trigrams("ref") - {"ef "} <= trigrams("refunds")
+
+
+class TestTemplateLibrary:
+    """Test cases for TemplateLibrary."""
+
+    def test_indexes_visible_files(self, library) -> None:
+        """Test that items of nested files are indexed and hidden files are skipped."""
+        assert len(library) == 4
+        assert {match["file"] for match in library.search("refunds")} == {"payments/refunds.md"}
+
+    def test_exact_fuzzy_and_prefix_matches(self, library) -> None:
+        """Test that misspelled and partially typed words still match."""
+        assert library.search("sessions")[0]["text"] == "Sessions expire after inactivity"
+        assert library.search("pasword hashd")[0]["text"].startswith("Passwords")
+        match = library.search("idempot")[0]
+        assert (match["file"], match["item"]) == ("payments/refunds.md", 1)
+        assert library.search("zzzz") == []
+
+    def test_ranks_items_matching_more_terms_first(self, library) -> None:
+        """Test that items matching every query term rank above partial matches."""
+        results = library.search("refund customer emails", limit=2)
+
+        assert [match["item"] for match in results] == [2, 1]
+        assert results[0]["score"] > results[1]["score"]
+
+    def test_refresh_is_incremental(self, library, library_dir) -> None:
+        """Test that only added, changed and removed files are reindexed."""
+        assert library.refresh() == {"added": 0, "updated": 0, "removed": 0}
+
+        (library_dir / "security.md").write_text("Tokens are rotated monthly\n")
+        (library_dir / "security.md").touch()
+        (library_dir / "payments" / "refunds.md").unlink()
+        (library_dir / "api.md").write_text("Endpoints are versioned\n")
+
+        assert library.refresh() == {"added": 1, "updated": 1, "removed": 1}
+        assert len(library) == 2
+        assert library.search("refunds") == []
+        assert library.search("passwords") == []
+        assert library.search("rotated")[0]["file"] == "security.md"
+
+    def test_unreadable_files_are_not_read_again(self, library, library_dir) -> None:
+        """Test that files that fail to load are skipped until their metadata changes."""
+        (library_dir / "broken.toml").write_text("items = [")
+        (library_dir / "binary.md").write_bytes(b"\xff\xfe")
+
+        assert library.refresh() == {"added": 2, "updated": 0, "removed": 0}
+        assert library.refresh() == {"added": 0, "updated": 0, "removed": 0}
+
+        (library_dir / "broken.toml").write_text('items = ["Builds are reproducible"]')
+        assert library.refresh() == {"added": 0, "updated": 1, "removed": 0}
+        assert library.search("reproducible")[0]["file"] == "broken.toml"
+
+    def test_search_filters_conditions(self, library, library_dir) -> None:
+        """Test that items of structured templates are matched only where they apply."""
+        (library_dir / "copy.toml").write_text(
+            "items = [\n"
+            "  { text = 'Refund copy is translated', languages = ['es'] },\n"
+            "  { text = 'Refund issues are linked', platforms = ['jira'] },\n"
+            "]\n"
+        )
+        library.refresh()
+
+        texts = {match["text"] for match in library.search("refund", platform="github")}
+        assert "Refund copy is translated" in texts
+        assert "Refund issues are linked" not in texts
+        texts = {match["text"] for match in library.search("refund", language="en")}
+        assert "Refund copy is translated" not in texts
+        assert "Refund issues are linked" in texts
+
+    def test_template_library_is_shared(self, library_dir) -> None:
+        """Test that the process-wide index is reused and refreshed."""
+        first = template_library(str(library_dir))
+        (library_dir / "api.md").write_text("Endpoints are versioned\n")
+
+        assert template_library(str(library_dir)) is first
+        assert first.search("versioned")
+
+
+class TestRunTemplateSearch:
+    """Test cases for `tk templates search`."""
+
+    def test_prints_matches(self, library_dir, capsys) -> None:
+        """Test plain and JSON output."""
+        assert run_template_search("refund", 1, library=str(library_dir)) is True
+        assert capsys.readouterr().out.startswith("payments/refunds.md:")
+
+        assert run_template_search("session", 5, as_json=True, library=str(library_dir))
+        (match,) = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert match["text"] == "Sessions expire after inactivity"
+
+    def test_requires_a_library(self, tmp_path, monkeypatch, capsys) -> None:
+        """Test that a missing library directory is reported."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+
+        assert run_template_search("refund", 5) is False
+        assert "no template library" in capsys.readouterr().err
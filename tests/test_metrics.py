@@ -0,0 +1,74 @@
+"""Tests for the Prometheus-style metrics."""
+
+import pytest
+
+from ai.metrics import MetricsRegistry, _Metric
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry."""
+
+    def test_counter_and_gauge(self) -> None:
+        """Test that counters and gauges render one sample per label set."""
+        registry = MetricsRegistry()
+        requests = registry.counter("tk_requests_total", "Requests.", ("operation",))
+        in_flight = registry.gauge("tk_in_flight", "In flight.")
+
+        requests.inc(operation="refine")
+        requests.inc(2, operation="generate")
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+
+        assert registry.render() == (
+            "# HELP tk_requests_total Requests.\n"
+            "# TYPE tk_requests_total counter\n"
+            'tk_requests_total{operation="generate"} 2.0\n'
+            'tk_requests_total{operation="refine"} 1.0\n'
+            "# HELP tk_in_flight In flight.\n"
+            "# TYPE tk_in_flight gauge\n"
+            "tk_in_flight 1.0\n"
+        )
+
+    def test_histogram(self) -> None:
+        """Test that histograms render cumulative buckets, sum and count."""
+        registry = MetricsRegistry()
+        latency = registry.histogram("tk_latency_seconds", "Latency.", ("model",), (0.1, 1.0))
+
+        latency.observe(0.05, model="m")
+        latency.observe(0.5, model="m")
+        latency.observe(3, model="m")
+
+        assert registry.render().splitlines()[2:] == [
+            'tk_latency_seconds_bucket{model="m",le="0.1"} 1',
+            'tk_latency_seconds_bucket{model="m",le="1.0"} 2',
+            'tk_latency_seconds_bucket{model="m",le="+Inf"} 3',
+            'tk_latency_seconds_sum{model="m"} 3.55',
+            'tk_latency_seconds_count{model="m"} 3',
+        ]
+        assert latency.count(model="m") == 3
+
+    def test_label_values_are_escaped(self) -> None:
+        """Test that quotes, backslashes and newlines in label values are escaped."""
+        registry = MetricsRegistry()
+        counter = registry.counter("tk_total", "Total.", ("model",))
+
+        counter.inc(model='a"b\\c\nd')
+
+        assert 'tk_total{model="a\\"b\\\\c\\nd"} 1.0' in registry.render()
+
+    def test_unknown_label(self) -> None:
+        """Test that labels outside the family are rejected."""
+        counter = MetricsRegistry().counter("tk_total", "Total.", ("model",))
+
+        with pytest.raises(ValueError, match="Unknown labels"):
+            counter.inc(provider="openai")
+
+    def test_incomplete_metric_type(self) -> None:
+        """Test that a metric type without samples fails when created, not when scraped."""
+
+        class Summary(_Metric):
+            kind = "summary"
+
+        with pytest.raises(TypeError, match="_samples"):
+            Summary("tk_summary", "Summary.")
@@ -6,6 +6,7 @@ import pytest
 
 from config.service import Config
 from ticketplease.collector import TaskDataCollector
+from ticketplease.editor import PASTE_END, PASTE_START, DraftStore
 
 
 class TestMultilineInput:
@@ -18,6 +19,8 @@ class TestMultilineInput:
         self.config.get_language.return_value = "en"
         self.config.get_ac_path.return_value = None
         self.config.get_dod_path.return_value = None
+        self.config.get_relevant_items.return_value = 0
+        self.config.get_symbol_index.return_value = False
         self.collector = TaskDataCollector(self.config)
 
     @patch("builtins.input")
@@ -182,3 +185,59 @@ class TestMultilineInput:
 
         expected = "This is a multiline\ntask description\nwith multiple lines"
         assert result == expected
+
+    @patch("builtins.input")
+    def test_pasted_done_line_does_not_finish(self, mock_input):
+        """Test that a DONE line inside a bracketed paste is part of the description."""
+        mock_input.side_effect = [f"{PASTE_START}Deploy log", "DONE", f"exit 1{PASTE_END}", "DONE"]
+
+        result = self.collector._collect_multiline_input()
+
+        assert result == "Deploy log\nDONE\nexit 1"
+
+    @patch("ticketplease.collector.edit_text")
+    @patch("builtins.input")
+    def test_edit_opens_editor_with_last_draft(self, mock_input, mock_edit):
+        """Test that EDIT opens the editor on the last draft and returns its buffer."""
+        DraftStore().save("Previous draft")
+        mock_input.side_effect = ["EDIT"]
+        mock_edit.return_value = "Edited description\n"
+
+        result = self.collector._collect_multiline_input()
+
+        mock_edit.assert_called_once_with("Previous draft")
+        assert result == "Edited description"
+        assert DraftStore().load() == "Edited description"
+
+    @patch("ticketplease.collector.edit_text")
+    @patch("builtins.input")
+    def test_edit_starts_from_typed_lines(self, mock_input, mock_edit):
+        """Test that lines typed before EDIT are handed to the editor."""
+        mock_input.side_effect = ["Typed line", "EDIT"]
+        mock_edit.return_value = "Typed line, finished"
+
+        assert self.collector._collect_multiline_input() == "Typed line, finished"
+        mock_edit.assert_called_once_with("Typed line")
+
+    @patch("ticketplease.collector.edit_text")
+    @patch("builtins.input")
+    @patch("rich.console.Console.print")
+    def test_editor_failure_falls_back_to_typing(self, mock_print, mock_input, mock_edit):
+        """Test that a missing editor reports the error and prompts again."""
+        mock_edit.side_effect = FileNotFoundError("vi")
+        mock_input.side_effect = ["EDIT", "Typed instead", "DONE"]
+
+        result = self.collector._collect_multiline_input()
+
+        mock_print.assert_any_call("[red]Could not open the editor: vi[/red]")
+        assert result == "Typed instead"
+
+    @patch("builtins.input")
+    def test_cancel_keeps_draft(self, mock_input):
+        """Test that the lines typed before a cancel are saved as the draft."""
+        mock_input.side_effect = ["Half written", "task", KeyboardInterrupt()]
+
+        with pytest.raises(KeyboardInterrupt):
+            self.collector._collect_multiline_input()
+
+        assert DraftStore().load() == "Half written\ntask"
@@ -0,0 +1,70 @@
+"""Tests for the output formats module."""
+
+import json
+
+import pytest
+
+from ticketplease.output import build_metadata, render_output
+
+USAGE = {
+    "operation": "generate",
+    "provider": "openai",
+    "model": "gpt-4o-mini",
+    "platform": "github",
+    "prompt_tokens": 120,
+    "completion_tokens": 80,
+    "cached_tokens": 0,
+    "latency_ms": 950.5,
+    "cost": 0.0002,
+}
+
+
+class TestBuildMetadata:
+    """Test cases for build_metadata."""
+
+    def test_from_usage(self) -> None:
+        """Test that usage fields are kept in a stable order."""
+        metadata = build_metadata(USAGE, "jira", "en")
+
+        assert list(metadata) == [
+            "provider",
+            "model",
+            "platform",
+            "language",
+            "prompt_tokens",
+            "completion_tokens",
+            "cached_tokens",
+            "latency_ms",
+            "cost",
+        ]
+        assert metadata["platform"] == "jira"
+        assert "operation" not in metadata
+
+    def test_without_usage(self) -> None:
+        """Test metadata when no usage is available."""
+        assert build_metadata(None, "github", "es") == {"platform": "github", "language": "es"}
+
+
+class TestRenderOutput:
+    """Test cases for render_output."""
+
+    def test_plain(self) -> None:
+        """Test that plain output is the raw description."""
+        assert render_output("### Title", "plain", {"model": "x"}) == "### Title"
+
+    def test_json(self) -> None:
+        """Test that JSON output contains the description and metadata."""
+        rendered = json.loads(render_output("Texto ñ", "json", {"model": "gpt-4o-mini"}))
+
+        assert rendered == {"description": "Texto ñ", "model": "gpt-4o-mini"}
+
+    def test_markdown(self) -> None:
+        """Test that markdown output has a front matter block."""
+        rendered = render_output("### Title", "markdown", {"model": "gpt-4o-mini", "cost": 0.1})
+
+        assert rendered == '---\nmodel: "gpt-4o-mini"\ncost: 0.1\n---\n\n### Title'
+
+    def test_unsupported(self) -> None:
+        """Test that unknown formats are rejected."""
+        with pytest.raises(ValueError, match="Unsupported output format"):
+            render_output("x", "html", {})
@@ -0,0 +1,338 @@
+"""Tests for the NDJSON task pipeline."""
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from ai.scheduler import Scheduler
+from ai.service import AIService
+from ticketplease.pipeline import TaskProcessor, TaskSpecError, parse_task_spec, run_pipeline
+
+
+class TestParseTaskSpec:
+    """Test cases for parse_task_spec."""
+
+    def test_generate_defaults(self, config) -> None:
+        """Test that missing fields are filled from configuration."""
+        spec = parse_task_spec('{"description": "Add export"}', 3, config)
+
+        assert spec == {
+            "id": 3,
+            "operation": "generate",
+            "description": "Add export",
+            "platform": "github",
+            "language": "en",
+            "acceptance_criteria": [],
+            "definition_of_done": [],
+        }
+
+    def test_generate_with_files(self, config, tmp_path) -> None:
+        """Test that AC and DoD can be read from files."""
+        dod = tmp_path / "dod.md"
+        dod.write_text("Reviewed\nTested\n")
+        line = json.dumps(
+            {
+                "id": "T-1",
+                "description": "Add export",
+                "platform": "Jira",
+                "acceptance_criteria": ["Works", " "],
+                "dod_file": str(dod),
+            }
+        )
+
+        spec = parse_task_spec(line, 1, config)
+
+        assert spec["id"] == "T-1"
+        assert spec["platform"] == "jira"
+        assert spec["acceptance_criteria"] == ["Works"]
+        assert spec["definition_of_done"] == ["Reviewed", "Tested"]
+
+    def test_generate_with_structured_template(self, config, tmp_path) -> None:
+        """Test that structured templates are rendered for the spec's platform and tags."""
+        ac = tmp_path / "ac.toml"
+        ac.write_text(
+            'items = ["Works", { text = "Synced to Jira", platforms = ["jira"] }]\n'
+            '[[sections]]\ntitle = "API"\ntags = ["backend"]\nitems = ["Documented"]\n'
+        )
+
+        spec = parse_task_spec(
+            json.dumps({"description": "Add export", "ac_file": str(ac)}), 1, config
+        )
+        assert spec["acceptance_criteria"] == ["Works", "API: Documented"]
+
+        line = json.dumps(
+            {
+                "description": "Add export",
+                "platform": "jira",
+                "tags": ["ui"],
+                "ac_file": str(ac),
+            }
+        )
+        assert parse_task_spec(line, 1, config)["acceptance_criteria"] == [
+            "Works",
+            "Synced to Jira",
+        ]
+
+        ac.write_text("items = [")
+        with pytest.raises(TaskSpecError, match="Invalid template"):
+            parse_task_spec(
+                json.dumps({"description": "Add export", "ac_file": str(ac)}), 1, config
+            )
+
+    def test_only_template_files_are_trimmed(self, config, tmp_path) -> None:
+        """Test that relevant_items trims ac_file items but keeps explicit lists whole."""
+        config.get_relevant_items.return_value = 1
+        ac = tmp_path / "ac.md"
+        ac.write_text("CSV export includes headers\nDark mode toggle works\n")
+        items = ["Logs are rotated", "Dark mode toggle works"]
+
+        from_file = parse_task_spec(
+            json.dumps({"description": "Add CSV export", "ac_file": str(ac)}), 1, config
+        )
+        explicit = parse_task_spec(
+            json.dumps({"description": "Add CSV export", "acceptance_criteria": items}), 1, config
+        )
+
+        assert from_file["acceptance_criteria"] == ["CSV export includes headers"]
+        assert explicit["acceptance_criteria"] == items
+
+    def test_refine(self, config) -> None:
+        """Test parsing a refine spec."""
+        spec = parse_task_spec(
+            '{"operation": "refine", "description": "Text", "refinement": "Shorter"}', 1, config
+        )
+
+        assert spec == {
+            "id": 1,
+            "operation": "refine",
+            "description": "Text",
+            "refinement": "Shorter",
+        }
+
+    def test_convert(self, config) -> None:
+        """Test parsing a convert spec."""
+        spec = parse_task_spec('{"operation": "convert", "description": "Text"}', 2, config)
+
+        assert spec == {
+            "id": 2,
+            "operation": "convert",
+            "description": "Text",
+            "platform": "github",
+            "language": "en",
+        }
+
+    @pytest.mark.parametrize(
+        ("line", "message"),
+        [
+            ("not json", "Invalid JSON"),
+            ("[1, 2]", "JSON object"),
+            ('{"description": ""}', "non-empty 'description'"),
+            ('{"description": "x", "operation": "delete"}', "Unsupported operation"),
+            ('{"description": "x", "platform": "gitlab"}', "Unsupported platform"),
+            ('{"description": "x", "operation": "refine"}', "'refinement'"),
+            ('{"description": "x", "acceptance_criteria": "one"}', "must be a list"),
+        ],
+    )
+    def test_invalid_specs(self, config, line, message) -> None:
+        """Test that invalid specs are rejected with a clear message."""
+        with pytest.raises(TaskSpecError, match=message):
+            parse_task_spec(line, 1, config)
+
+    def test_priority_and_caller(self, config) -> None:
+        """Test that scheduling fields are kept and unknown priorities are rejected."""
+        spec = parse_task_spec(
+            '{"description": "Task", "priority": "batch", "caller": "nightly"}', 1, config
+        )
+
+        assert spec["priority"] == "batch"
+        assert spec["caller"] == "nightly"
+        with pytest.raises(TaskSpecError, match="Unsupported priority"):
+            parse_task_spec('{"description": "Task", "priority": "urgent"}', 1, config)
+
+
+class TestRunPipeline:
+    """Test cases for run_pipeline."""
+
+    def parse(self, line: str, line_number: int) -> dict:
+        """Parse a minimal spec."""
+        data = json.loads(line)
+        return {"id": data["id"], "delay": data.get("delay", 0), "fail": data.get("fail", False)}
+
+    def process(self, spec: dict) -> dict:
+        """Sleep, then succeed or fail as requested."""
+        time.sleep(spec["delay"])
+        if spec["fail"]:
+            raise RuntimeError("provider error")
+        return {"id": spec["id"], "ok": True}
+
+    def test_results_complete_out_of_order(self) -> None:
+        """Test that fast tasks are emitted before slow ones."""
+        lines = ['{"id": "slow", "delay": 0.2}', '{"id": "fast"}']
+        results = []
+
+        counts = run_pipeline(lines, self.parse, self.process, results.append, concurrency=2)
+
+        assert [record["id"] for record in results] == ["fast", "slow"]
+        assert counts == {"processed": 2, "failed": 0}
+
+    def test_errors_become_records(self) -> None:
+        """Test that parse and processing errors are reported as records."""
+        lines = ['{"id": "ok"}', "", '{"id": "bad", "fail": true}', "not json"]
+        results = []
+
+        def parse(line: str, line_number: int) -> dict:
+            try:
+                return self.parse(line, line_number)
+            except json.JSONDecodeError as e:
+                raise TaskSpecError("Invalid JSON") from e
+
+        counts = run_pipeline(lines, parse, self.process, results.append, concurrency=2)
+
+        by_id = {record["id"]: record for record in results}
+        assert by_id["ok"]["ok"] is True
+        assert by_id["bad"] == {"id": "bad", "ok": False, "error": "provider error"}
+        assert by_id[4] == {"id": 4, "ok": False, "error": "Invalid JSON"}
+        assert counts == {"processed": 3, "failed": 2}
+
+    def test_backpressure_limits_lines_read_ahead(self) -> None:
+        """Test that input is not consumed faster than tasks complete."""
+        in_flight = 0
+        max_in_flight = 0
+        lock = threading.Lock()
+
+        def lines():
+            for index in range(50):
+                yield json.dumps({"id": index})
+
+        def process(spec: dict) -> dict:
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.002)
+            with lock:
+                in_flight -= 1
+            return {"id": spec["id"], "ok": True}
+
+        results = []
+        run_pipeline(lines(), self.parse, process, results.append, concurrency=3)
+
+        assert len(results) == 50
+        assert max_in_flight <= 3
+
+
+class TestTaskProcessor:
+    """Test cases for TaskProcessor."""
+
+    def test_reuses_services(self, config) -> None:
+        """Test that services are created lazily and reused between specs."""
+        service = MagicMock(spec=AIService)
+        service.generate_task_description.return_value = " Generated "
+        service.last_usage = {"prompt_tokens": 10}
+        factory = MagicMock(return_value=service)
+        processor = TaskProcessor(config, factory)
+        spec = parse_task_spec('{"id": "A", "description": "Task"}', 1, config)
+
+        first = processor.process(spec)
+        processor.process(spec)
+
+        assert first == {
+            "id": "A",
+            "ok": True,
+            "description": "Generated",
+            "usage": {"prompt_tokens": 10},
+        }
+        factory.assert_called_once()
+
+    def test_context_is_passed_on(self, config) -> None:
+        """Test that a spec's code context reaches the generation call."""
+        service = MagicMock(spec=AIService)
+        service.generate_task_description.return_value = "Generated"
+        service.last_usage = None
+        processor = TaskProcessor(config, lambda: service)
+        spec = parse_task_spec('{"description": "Task", "context": "--- a.py:1"}', 1, config)
+
+        processor.process(spec)
+
+        assert service.generate_task_description.call_args.kwargs["context"] == "--- a.py:1"
+
+    def test_refine(self, config) -> None:
+        """Test that refine specs call the refinement API."""
+        service = MagicMock(spec=AIService)
+        service.refine_task_description.return_value = "Refined"
+        service.last_usage = None
+        processor = TaskProcessor(config, lambda: service)
+
+        result = processor.process(
+            {"id": 1, "operation": "refine", "description": "Text", "refinement": "Shorter"}
+        )
+
+        assert result["description"] == "Refined"
+        service.refine_task_description.assert_called_once_with("Text", "Shorter")
+
+    def test_stream(self, config) -> None:
+        """Test that streamed text is passed on and collected into the result."""
+        service = MagicMock(spec=AIService)
+        service.convert_task_description_stream.return_value = iter(["h3. ", "Title "])
+        service.last_usage = {"operation": "convert"}
+        processor = TaskProcessor(config, lambda: service)
+        texts = []
+
+        result = processor.stream(
+            {
+                "id": 1,
+                "operation": "convert",
+                "description": "### Title",
+                "platform": "jira",
+                "language": "en",
+            },
+            texts.append,
+        )
+
+        assert texts == ["h3. ", "Title "]
+        assert result == {
+            "id": 1,
+            "ok": True,
+            "description": "h3. Title",
+            "usage": {"operation": "convert"},
+        }
+        service.convert_task_description_stream.assert_called_once_with("### Title", "jira", "en")
+
+    def test_scheduler_admission(self, config) -> None:
+        """Test that specs are admitted in their priority class under the caller name."""
+        service = MagicMock(spec=AIService)
+        service.generate_task_description.return_value = "Generated"
+        service.refine_task_description.return_value = "Refined"
+        service.last_usage = None
+        scheduler = Scheduler()
+        processor = TaskProcessor(config, lambda: service, scheduler, caller="nightly")
+        spec = parse_task_spec('{"description": "Task"}', 1, config)
+
+        processor.process(spec)
+        processor.process({**spec, "priority": "batch"})
+        processor.process(
+            {"id": 2, "operation": "refine", "description": "Text", "refinement": "Shorter"}
+        )
+
+        classes = scheduler.stats()["classes"]
+        assert [classes[name]["granted"] for name in ("interactive", "refine", "batch")] == [
+            1,
+            1,
+            1,
+        ]
+        assert scheduler.stats()["in_flight"] == 0
+
+    def test_scheduler_timeout(self, config) -> None:
+        """Test that a spec not admitted in time raises TimeoutError without calling the AI."""
+        service = MagicMock(spec=AIService)
+        scheduler = Scheduler(max_concurrency=1)
+        processor = TaskProcessor(config, lambda: service, scheduler, priority="batch")
+        scheduler.acquire()
+
+        with pytest.raises(TimeoutError):
+            processor.process(parse_task_spec('{"description": "Task"}', 1, config), 0.05)
+
+        service.generate_task_description.assert_not_called()
@@ -1,6 +1,7 @@
 """Tests for the prompts module."""
 
 from ai.prompts import (
+    get_conversion_prompt,
     get_github_format_instructions,
     get_jira_format_instructions,
     get_refinement_prompt,
@@ -51,3 +52,16 @@ class TestPrompts:
         assert "Current task description" in prompt
         assert "Make it more detailed" in prompt
         assert "refine" in prompt.lower()
+
+    def test_get_conversion_prompt(self) -> None:
+        """Test conversion prompt."""
+        prompt = get_conversion_prompt(
+            description="### Description\nLogin",
+            format_instructions="Format as Jira markup",
+            language="English",
+        )
+
+        assert "### Description\nLogin" in prompt
+        assert "Format as Jira markup" in prompt
+        assert "English" in prompt
+        assert "convert" in prompt.lower()
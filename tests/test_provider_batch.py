@@ -0,0 +1,108 @@
+"""Tests for running task specs through a provider batch API."""
+
+import json
+
+import pytest
+
+from ai.batches import OpenAIBatchClient
+from ai.service import AIService
+from ai.usage import UsageLedger
+from benchmarks.stub_provider import BatchStubProvider
+from ticketplease.journal import BatchJournal
+from ticketplease.provider_batch import run_provider_batch
+
+SPECS = [
+    '{"id": "A", "operation": "refine", "description": "Text", "refinement": "Shorter"}\n',
+    '{"id": "B", "operation": "refine", "description": "Text", "refinement": "FAIL"}\n',
+    "not json\n",
+    '{"id": "C", "operation": "refine", "description": "Text", "refinement": "Shorter"}\n',
+]
+
+
+def parse(line: str, line_number: int) -> dict:
+    """Parse a refine spec."""
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(str(e)) from e
+
+
+def key_for(spec: dict) -> str:
+    """Key specs by their refinement, so A and C are identical."""
+    return spec["refinement"]
+
+
+@pytest.fixture
+def stub():
+    """Run the batch emulator."""
+    with BatchStubProvider("Refined", polls_until_done=2) as provider:
+        yield provider
+
+
+@pytest.fixture
+def service(tmp_path, stub):
+    """Create a service whose usage goes to a temporary ledger."""
+    ledger = UsageLedger(tmp_path / "usage.db")
+    return AIService("openai", "sk-test", "openai/gpt-4o-mini", ledger=ledger)
+
+
+class TestRunProviderBatch:
+    """Test cases for run_provider_batch."""
+
+    def test_emits_live_mode_records(self, service, stub) -> None:
+        """Test that results have the live record shape and identical specs are sent once."""
+        records, statuses = [], []
+
+        counts = run_provider_batch(
+            service,
+            OpenAIBatchClient("sk-test", stub.api_base),
+            SPECS,
+            parse,
+            key_for,
+            records.append,
+            poll_interval=0,
+            on_status=statuses.append,
+        )
+
+        by_id = {record["id"]: record for record in records}
+        assert counts == {"processed": 4, "failed": 2, "resumed": 0}
+        assert by_id["A"]["description"] == by_id["C"]["description"] == "Refined"
+        assert by_id["A"]["usage"]["operation"] == "refine"
+        assert by_id["A"]["usage"]["prompt_tokens"] == 100
+        assert by_id["B"] == {"id": "B", "ok": False, "error": "Invalid request"}
+        assert by_id[3]["ok"] is False
+        assert statuses[-1].endswith("completed")
+        (batch,) = stub.batches.values()
+        assert len(batch["requests"]) == 2
+        assert batch["requests"][0]["params"]["model"] == "gpt-4o-mini"
+        assert "Shorter" in batch["requests"][0]["params"]["messages"][0]["content"]
+        assert len(service.ledger.summarize("day")) == 1
+
+    def test_resumes_with_journal(self, tmp_path, service, stub) -> None:
+        """Test that a rerun polls the remembered batch and skips journaled rows."""
+        journal = BatchJournal(tmp_path / "journal.db")
+        client = OpenAIBatchClient("sk-test", stub.api_base)
+        records = []
+
+        class Interrupted(Exception):
+            pass
+
+        def interrupt(status: str) -> None:
+            raise Interrupted
+
+        with pytest.raises(Interrupted):
+            run_provider_batch(
+                service, client, SPECS, parse, key_for, records.append, journal, 0, interrupt
+            )
+        first = run_provider_batch(
+            service, client, SPECS, parse, key_for, records.append, journal, 0
+        )
+        second = run_provider_batch(
+            service, client, SPECS, parse, key_for, records.append, journal, 0
+        )
+
+        assert len(stub.batches) == 2
+        assert first["resumed"] == 0
+        assert second["resumed"] == 2
+        assert len(stub.batches["batch_1"]["requests"]) == 1
+        assert journal.pending_batch() is None
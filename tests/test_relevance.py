@@ -0,0 +1,66 @@
+"""Tests for relevance ranking of template items."""
+
+from ai.service import AIService
+from ticketplease.relevance import bm25_scores, select_relevant, stem
+
+DOD = [
+    "Unit tests cover the new code",
+    "Refund amounts are validated against the original payment",
+    "Documentation is updated",
+    "Refunded payments send a confirmation email",
+    "Feature flags are removed after rollout",
+    "Accessibility checks pass for new screens",
+]
+
+
+class TestRelevance:
+    """Test cases for BM25 scoring and item selection."""
+
+    def test_stem(self) -> None:
+        """Test that common inflections share a stem."""
+        assert stem("refunds") == stem("refunded") == stem("refund") == "refund"
+        assert stem("is") == "is"
+
+    def test_bm25_prefers_matching_items(self) -> None:
+        """Test that items sharing rare query terms score highest."""
+        scores = bm25_scores("Allow partial refunds of a payment", DOD)
+
+        assert scores[3] == max(scores)
+        assert scores[1] > 0
+        assert scores[2] == 0
+        assert bm25_scores("anything", []) == []
+
+    def test_select_relevant_keeps_original_order(self) -> None:
+        """Test that the top items are kept in file order and unmatched ones dropped."""
+        kept = select_relevant(DOD, "Allow partial refunds of a payment", 3)
+
+        assert kept == [DOD[1], DOD[3]]
+
+    def test_select_relevant_leaves_items_alone(self) -> None:
+        """Test the cases where selection does not apply."""
+        assert select_relevant(DOD, "refunds", 0) == DOD
+        assert select_relevant(DOD, "refunds", 10) == DOD
+        assert select_relevant(DOD, "Añadir reembolsos parciales", 2) == DOD
+
+    def test_shrinks_the_generation_prompt(self) -> None:
+        """Test that a prompt built from the selected items is much shorter."""
+        items = [f"Rule {index}: the billing module is reviewed" for index in range(120)]
+        items[42] = "Refund amounts are validated against the original payment"
+        description = "Allow partial refunds of a payment"
+        service = AIService("openai", "sk-test", "gpt-4o-mini")
+
+        def prompt(definition_of_done: list[str]) -> str:
+            spec = {
+                "operation": "generate",
+                "description": description,
+                "acceptance_criteria": [],
+                "definition_of_done": definition_of_done,
+                "platform": "github",
+                "language": "en",
+            }
+            return service.batch_request(spec)["messages"][0]["content"]
+
+        kept = select_relevant(items, description, 12)
+
+        assert kept == [items[42]]
+        assert len(prompt(kept)) < len(prompt(items)) / 2
@@ -0,0 +1,146 @@
+"""Tests for the priority scheduler."""
+
+import threading
+import time
+
+import pytest
+
+from ai.scheduler import Scheduler, TokenBucket
+
+
+def admit_in_order(scheduler: Scheduler, requests: list[tuple[str, str]]) -> list[str]:
+    """Queue requests behind a held slot, release it and return the admission order."""
+    order = []
+    lock = threading.Lock()
+    scheduler.acquire("interactive", "holder")
+
+    def run(priority: str, caller: str, label: str) -> None:
+        scheduler.acquire(priority, caller)
+        with lock:
+            order.append(label)
+        scheduler.release()
+
+    threads = []
+    for index, (priority, caller) in enumerate(requests):
+        thread = threading.Thread(target=run, args=(priority, caller, f"{caller}-{index}"))
+        thread.start()
+        threads.append(thread)
+        while scheduler.stats()["classes"][priority]["queued"] < sum(
+            queued_priority == priority for queued_priority, _ in requests[: index + 1]
+        ):
+            time.sleep(0.001)
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    return order
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket."""
+
+    def test_burst_then_delay(self) -> None:
+        """Test that a full bucket allows a burst and then reports the refill delay."""
+        bucket = TokenBucket(rate_per_second=2, capacity=2)
+        now = time.monotonic()
+
+        assert bucket.try_take(now) == 0
+        assert bucket.try_take(now) == 0
+        assert bucket.try_take(now) == pytest.approx(0.5, abs=0.01)
+        assert bucket.try_take(now + 0.5) == 0
+
+
+class TestScheduler:
+    """Test cases for Scheduler."""
+
+    def test_interactive_preempts_batch(self) -> None:
+        """Test that a queued interactive request is admitted before earlier batch work."""
+        scheduler = Scheduler(max_concurrency=1)
+
+        order = admit_in_order(
+            scheduler,
+            [("batch", "job"), ("batch", "job"), ("refine", "user"), ("interactive", "user")],
+        )
+
+        assert order == ["user-3", "user-2", "job-0", "job-1"]
+
+    def test_fair_queuing_across_callers(self) -> None:
+        """Test that one caller's backlog does not starve another caller in the same class."""
+        scheduler = Scheduler(max_concurrency=1)
+
+        order = admit_in_order(scheduler, [("batch", "big")] * 4 + [("batch", "small")] * 2)
+
+        assert order[:4] == ["big-0", "small-4", "big-1", "small-5"]
+
+    def test_caller_weights(self) -> None:
+        """Test that a heavier caller gets a proportionally larger share."""
+        scheduler = Scheduler(max_concurrency=1, weights={"heavy": 2})
+
+        order = admit_in_order(scheduler, [("batch", "light")] * 3 + [("batch", "heavy")] * 4)
+
+        assert [label.split("-")[0] for label in order[:6]] == [
+            "heavy",
+            "light",
+            "heavy",
+            "heavy",
+            "light",
+            "heavy",
+        ]
+
+    def test_rate_limit(self) -> None:
+        """Test that admissions beyond the burst wait for the shared budget."""
+        scheduler = Scheduler(requests_per_minute=600, burst=1)
+
+        start = time.monotonic()
+        for _ in range(3):
+            with scheduler.slot("batch"):
+                pass
+
+        assert time.monotonic() - start >= 0.18
+
+    def test_throttle(self) -> None:
+        """Test that throttled calls share the rate budget without holding a slot."""
+        scheduler = Scheduler(requests_per_minute=600, max_concurrency=1, burst=1)
+
+        start = time.monotonic()
+        with scheduler.slot("batch"):
+            scheduler.throttle()
+            scheduler.throttle()
+        assert time.monotonic() - start >= 0.18
+        assert scheduler.stats()["in_flight"] == 0
+
+        with pytest.raises(TimeoutError):
+            scheduler.throttle(timeout=0.01)
+        Scheduler().throttle(timeout=0)
+
+    def test_timeout(self) -> None:
+        """Test that a request not admitted in time raises TimeoutError and leaves the queue."""
+        scheduler = Scheduler(max_concurrency=1)
+        scheduler.acquire()
+
+        with pytest.raises(TimeoutError):
+            scheduler.acquire("batch", timeout=0.05)
+
+        assert scheduler.stats()["classes"]["batch"]["queued"] == 0
+        scheduler.release()
+        with scheduler.slot("batch", timeout=1):
+            pass
+
+    def test_unknown_priority(self) -> None:
+        """Test that unknown priority classes are rejected."""
+        with pytest.raises(ValueError, match="Unknown priority"):
+            Scheduler().acquire("urgent")
+
+    def test_stats(self) -> None:
+        """Test that stats report admissions, queue depth and wait times per class."""
+        scheduler = Scheduler()
+
+        with scheduler.slot("refine", "user"):
+            stats = scheduler.stats()
+
+        assert stats["in_flight"] == 1
+        assert stats["classes"]["refine"]["granted"] == 1
+        assert stats["classes"]["refine"]["queued"] == 0
+        assert stats["classes"]["batch"]["granted"] == 0
+        assert stats["classes"]["refine"]["wait_max_ms"] >= 0
+        assert scheduler.stats()["in_flight"] == 0
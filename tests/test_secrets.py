@@ -0,0 +1,111 @@
+"""Tests for the secrets module."""
+
+import pytest
+
+from config.secrets import FileKeyring, SecretStore, clear_memory_cache
+
+
+class TestFileKeyring:
+    """Test cases for FileKeyring."""
+
+    def test_set_get_delete(self, tmp_path) -> None:
+        """Test storing, reading and deleting a secret."""
+        backend = FileKeyring(tmp_path / "keyring.json")
+
+        backend.set_password("service", "user", "secret")
+        assert backend.get_password("service", "user") == "secret"
+
+        backend.delete_password("service", "user")
+        assert backend.get_password("service", "user") is None
+
+    def test_not_selected_automatically(self) -> None:
+        """Test that the file backend is never picked as a default backend."""
+        assert FileKeyring.viable is False
+
+
+class TestSecretStore:
+    """Test cases for SecretStore."""
+
+    def test_lookup_is_cached_in_memory(self, file_keyring, monkeypatch) -> None:
+        """Test that repeated lookups do not hit the keyring backend."""
+        store = SecretStore()
+        store.set("openai", "sk-one")
+        calls = []
+        original = file_keyring.get_password
+        monkeypatch.setattr(
+            file_keyring,
+            "get_password",
+            lambda service, user: calls.append(user) or original(service, user),
+        )
+
+        assert store.get("openai") == "sk-one"
+        assert store.get("openai") == "sk-one"
+        assert calls == ["openai"]
+
+    def test_session_cache_is_shared_across_processes(
+        self, file_keyring, tmp_path, monkeypatch
+    ) -> None:
+        """Test that the runtime-dir cache serves lookups after the memory cache is gone."""
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        store = SecretStore()
+        store.set("openai", "sk-one")
+        assert store.get("openai") == "sk-one"
+
+        clear_memory_cache()
+        file_keyring.delete_password("ticketplease", "openai")
+
+        assert store.get("openai") == "sk-one"
+        cache_file = tmp_path / "ticketplease" / "keyring-cache.json"
+        assert (cache_file.stat().st_mode & 0o777) == 0o600
+
+    @pytest.mark.parametrize(
+        "content",
+        ["[]", '{"openai": 1}', '{"openai": []}', '{"openai": ["sk", "soon"]}', '"text"'],
+    )
+    def test_malformed_session_cache_is_ignored(
+        self, file_keyring, tmp_path, monkeypatch, content
+    ) -> None:
+        """Test that a session cache with the wrong shape is treated as empty and rewritten."""
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        cache_file = tmp_path / "ticketplease" / "keyring-cache.json"
+        cache_file.parent.mkdir()
+        cache_file.write_text(content)
+        file_keyring.set_password("ticketplease", "openai", "sk-one")
+        clear_memory_cache()
+
+        assert SecretStore().get("openai") == "sk-one"
+        clear_memory_cache()
+        file_keyring.delete_password("ticketplease", "openai")
+        assert SecretStore().get("openai") == "sk-one"
+
+    def test_set_invalidates_cache(self, file_keyring) -> None:
+        """Test that updating a key replaces the cached value."""
+        store = SecretStore()
+        store.set("openai", "sk-one")
+        assert store.get("openai") == "sk-one"
+
+        store.set("openai", "sk-two")
+
+        assert store.get("openai") == "sk-two"
+
+    @pytest.mark.parametrize("ttl", ["0"])
+    def test_cache_can_be_disabled(self, file_keyring, monkeypatch, ttl) -> None:
+        """Test that a zero TTL always reads from the keyring."""
+        monkeypatch.setenv("TK_KEYRING_CACHE_TTL", ttl)
+        store = SecretStore()
+        store.set("openai", "sk-one")
+        assert store.get("openai") == "sk-one"
+
+        file_keyring.set_password("ticketplease", "openai", "sk-rotated")
+
+        assert store.get("openai") == "sk-rotated"
+
+    def test_delete(self, file_keyring) -> None:
+        """Test deleting a secret, including a missing one."""
+        store = SecretStore()
+        store.set("openai", "sk-one")
+
+        store.delete("openai")
+        store.delete("openai")
+
+        assert store.get("openai") is None
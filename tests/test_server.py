@@ -0,0 +1,261 @@
+"""Tests for the local HTTP API, run against a stub provider."""
+
+import asyncio
+import http.client
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from ai.service import AIService
+from benchmarks.stub_provider import StubProvider
+from ticketplease.server import TaskServer
+
+
+@pytest.fixture
+def stub():
+    """Run an OpenAI-compatible stub provider."""
+    with StubProvider("### Description\nExport tickets to CSV") as provider:
+        yield provider
+
+
+@pytest.fixture
+def start_server(config):
+    """Start TaskServer instances on a background event loop."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    servers = []
+
+    def start(service_factory, **options) -> TaskServer:
+        server = TaskServer(config, service_factory, port=0, **options)
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result(timeout=5)
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+
+
+def stub_service_factory(stub: StubProvider):
+    """Build AI services that talk to the stub provider."""
+    return lambda: AIService("openai", "sk-test", "openai/stub-model", api_base=stub.api_base)
+
+
+def request(server: TaskServer, method: str, path: str, payload=None):
+    """Send a request and return the status and raw body."""
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    body = json.dumps(payload) if payload is not None else None
+    connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    data = response.read().decode("utf-8")
+    connection.close()
+    return response.status, response.getheader("Content-Type"), data
+
+
+def parse_events(data: str) -> list[tuple[str, dict]]:
+    """Parse a Server-Sent Events body."""
+    events = []
+    for block in data.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestTaskServer:
+    """Test cases for TaskServer."""
+
+    def test_generate(self, start_server, stub) -> None:
+        """Test a JSON generate round trip through the stub provider."""
+        server = start_server(stub_service_factory(stub))
+
+        status, content_type, data = request(
+            server,
+            "POST",
+            "/v1/generate",
+            {"id": "T-1", "description": "Add export", "acceptance_criteria": ["CSV"]},
+        )
+
+        body = json.loads(data)
+        assert status == 200
+        assert content_type.startswith("application/json")
+        assert body["id"] == "T-1"
+        assert body["description"] == "### Description\nExport tickets to CSV"
+        assert body["usage"]["operation"] == "generate"
+        assert "- CSV" in stub.requests[0]["messages"][0]["content"]
+
+    def test_refine_and_convert(self, start_server, stub) -> None:
+        """Test that refine and convert use their own prompts."""
+        server = start_server(stub_service_factory(stub))
+
+        refine_status, _, _ = request(
+            server, "POST", "/v1/refine", {"description": "Text", "refinement": "Shorter"}
+        )
+        convert_status, _, data = request(
+            server, "POST", "/v1/convert", {"description": "### Title", "platform": "jira"}
+        )
+
+        assert refine_status == 200
+        assert convert_status == 200
+        assert json.loads(data)["usage"]["operation"] == "convert"
+        assert "Shorter" in stub.requests[0]["messages"][0]["content"]
+        assert "h3. Description" in stub.requests[1]["messages"][0]["content"]
+
+    def test_stream(self, start_server, stub) -> None:
+        """Test that streaming requests produce delta events and a final result."""
+        server = start_server(stub_service_factory(stub))
+
+        status, content_type, data = request(
+            server, "POST", "/v1/generate", {"description": "Add export", "stream": True}
+        )
+
+        events = parse_events(data)
+        assert status == 200
+        assert content_type.startswith("text/event-stream")
+        assert [name for name, _ in events[:-1]] == ["delta"] * (len(events) - 1)
+        assert "".join(payload["text"] for _, payload in events[:-1]) == stub.content
+        assert events[-1][0] == "done"
+        assert events[-1][1]["description"] == stub.content
+        assert stub.requests[0]["stream"] is True
+
+    def test_metrics(self, start_server, stub) -> None:
+        """Test that /metrics exposes request, latency and token metrics in Prometheus format."""
+        server = start_server(stub_service_factory(stub))
+        labels = 'provider="openai",model="openai/stub-model",platform="jira",operation="generate"'
+
+        request(server, "POST", "/v1/generate", {"description": "Add export", "platform": "jira"})
+        request(
+            server,
+            "POST",
+            "/v1/generate",
+            {"description": "Add export", "platform": "jira", "stream": True},
+        )
+        status, content_type, data = request(server, "GET", "/metrics")
+
+        assert status == 200
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert "# TYPE tk_request_duration_seconds histogram" in data
+        assert f'tk_completions_total{{{labels},result="ok"}}' in data
+        assert f'tk_tokens_total{{{labels},type="prompt"}}' in data
+        assert f"tk_time_to_first_token_seconds_count{{{labels}}}" in data
+        assert "tk_queue_wait_seconds_count{" in data
+        assert 'status="ok"} ' in data
+
+    @pytest.mark.parametrize(
+        ("method", "path", "payload", "status"),
+        [
+            ("GET", "/healthz", None, 200),
+            ("POST", "/v1/unknown", {}, 404),
+            ("GET", "/v1/generate", None, 405),
+            ("POST", "/v1/generate", {"description": ""}, 400),
+            ("POST", "/v1/refine", {"description": "Text"}, 400),
+            ("POST", "/v1/convert", {"description": "x", "platform": "gitlab"}, 400),
+            ("POST", "/v1/generate", {"description": "x", "ac_file": "/etc/passwd"}, 400),
+            ("POST", "/v1/generate", {"description": "x", "dod_file": "dod.toml"}, 400),
+        ],
+    )
+    def test_status_codes(self, start_server, method, path, payload, status) -> None:
+        """Test routing and validation errors."""
+        server = start_server(MagicMock())
+
+        assert request(server, method, path, payload)[0] == status
+
+    def test_timeout(self, start_server) -> None:
+        """Test that slow requests fail with 504."""
+        with StubProvider(latency=1.0) as slow_stub:
+            server = start_server(stub_service_factory(slow_stub), timeout=0.2)
+
+            status, _, data = request(server, "POST", "/v1/generate", {"description": "Task"})
+
+        assert status == 504
+        assert json.loads(data) == {"error": "Request timed out"}
+
+    def test_timed_out_calls_stay_pending(self, start_server) -> None:
+        """Test that a timed-out call holds its slot until its thread finishes."""
+        release = threading.Event()
+        service = MagicMock(spec=AIService)
+        service.refine_task_description.side_effect = lambda *args: release.wait(5) and "Done"
+        service.last_usage = None
+        server = start_server(lambda: service, timeout=0.1, max_pending=1)
+        payload = {"description": "Text", "refinement": "Shorter"}
+
+        assert request(server, "POST", "/v1/refine", payload)[0] == 504
+        assert json.loads(request(server, "GET", "/healthz")[2])["pending"] == 1
+        assert request(server, "POST", "/v1/refine", payload)[0] == 503
+
+        release.set()
+        while json.loads(request(server, "GET", "/healthz")[2])["pending"] != 0:
+            time.sleep(0.01)
+
+    def test_provider_error(self, start_server) -> None:
+        """Test that provider failures are reported as 502."""
+        service = MagicMock(spec=AIService)
+        service.refine_task_description.side_effect = RuntimeError("Rate limited")
+        server = start_server(lambda: service)
+
+        status, _, data = request(
+            server, "POST", "/v1/refine", {"description": "Text", "refinement": "Shorter"}
+        )
+
+        assert status == 502
+        assert json.loads(data) == {"error": "Rate limited"}
+
+    def test_concurrency_limit(self, start_server) -> None:
+        """Test that no more than the configured number of calls run at once."""
+        in_flight = 0
+        max_in_flight = 0
+        lock = threading.Lock()
+
+        def refine(description: str, refinement: str) -> str:
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            return "Refined"
+
+        service = MagicMock(spec=AIService)
+        service.refine_task_description.side_effect = refine
+        service.last_usage = None
+        server = start_server(lambda: service, concurrency=2)
+        statuses = []
+
+        def send() -> None:
+            payload = {"description": "Text", "refinement": "Shorter"}
+            statuses.append(request(server, "POST", "/v1/refine", payload)[0])
+
+        threads = [threading.Thread(target=send) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert statuses == [200] * 6
+        assert max_in_flight <= 2
+
+    def test_busy(self, start_server) -> None:
+        """Test that requests beyond max_pending are rejected with 503."""
+        release = threading.Event()
+        service = MagicMock(spec=AIService)
+        service.refine_task_description.side_effect = lambda *args: release.wait(5) and "Done"
+        service.last_usage = None
+        server = start_server(lambda: service, concurrency=1, max_pending=1)
+        payload = {"description": "Text", "refinement": "Shorter"}
+        first = threading.Thread(target=request, args=(server, "POST", "/v1/refine", payload))
+        first.start()
+        while json.loads(request(server, "GET", "/healthz")[2])["pending"] != 1:
+            time.sleep(0.01)
+
+        status, _, _ = request(server, "POST", "/v1/refine", payload)
+        release.set()
+        first.join()
+
+        assert status == 503
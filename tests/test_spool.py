@@ -0,0 +1,212 @@
+"""Tests for the shared batch spool."""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from ticketplease.spool import Spool, SpoolWorker, run_spooled
+
+
+@pytest.fixture
+def spool(tmp_path):
+    """Create an empty spool."""
+    return Spool(tmp_path / "spool", lease_seconds=30)
+
+
+def done(spec: dict) -> dict:
+    """Process a spec successfully."""
+    return {"id": spec["id"], "ok": True, "description": f"Done {spec['id']}"}
+
+
+class TestSpool:
+    """Test cases for Spool."""
+
+    def test_claim_and_complete(self, spool) -> None:
+        """Test that a job moves from pending to leased to done."""
+        assert spool.enqueue("k1", {"id": 1}) is True
+        assert spool.enqueue("k1", {"id": 1}) is False
+
+        job = spool.claim("w1")
+        assert job.key == "k1"
+        assert job.spec == {"id": 1}
+        assert spool.stats() == {"pending": 0, "leased": 1, "done": 0}
+        assert spool.claim("w2") is None
+        assert spool.enqueue("k1", {"id": 1}) is False
+
+        spool.complete(job, {"id": 1, "ok": True})
+
+        assert spool.result("k1") == {"id": 1, "ok": True}
+        assert spool.stats() == {"pending": 0, "leased": 0, "done": 1}
+        assert spool.enqueue("k1", {"id": 1}) is False
+
+    def test_failed_jobs_are_enqueued_again(self, spool) -> None:
+        """Test that enqueuing a failed job replaces its result."""
+        spool.enqueue("k1", {"id": 1})
+        spool.complete(spool.claim("w1"), {"id": 1, "ok": False, "error": "Rate limited"})
+
+        assert spool.enqueue("k1", {"id": 1}) is True
+        assert spool.result("k1") is None
+        assert spool.stats()["pending"] == 1
+
+    def test_each_job_is_claimed_once(self, spool) -> None:
+        """Test that concurrent claims never hand out the same job twice."""
+        for index in range(50):
+            spool.enqueue(f"k{index}", {"id": index})
+        claimed = []
+
+        def claim_all(worker: str) -> None:
+            while (job := spool.claim(worker)) is not None:
+                claimed.append(job.key)
+
+        threads = [threading.Thread(target=claim_all, args=(f"w{n}",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(claimed) == sorted(f"k{index}" for index in range(50))
+
+    def test_expired_leases_are_requeued(self, spool) -> None:
+        """Test that leases whose mtime did not change for a lease period go back to pending."""
+        now = [1000.0]
+        spool._clock = lambda: now[0]
+        spool.enqueue("stale", {"id": 1})
+        spool.enqueue("fresh", {"id": 2})
+        stale = spool.claim("w1")
+        fresh = spool.claim("w1")
+        if stale.key != "stale":
+            stale, fresh = fresh, stale
+        future = time.time() + 3600
+        os.utime(stale.lease_path, (future, future))
+
+        assert spool.requeue_expired() == 0
+        now[0] += 60
+        os.utime(fresh.lease_path, (future + 1, future + 1))
+
+        assert spool.requeue_expired() == 1
+        assert spool.heartbeat(stale) is False
+        assert spool.heartbeat(fresh) is True
+        assert spool.claim("w2").key == "stale"
+
+    def test_renewal_during_requeue_keeps_the_lease(self, spool) -> None:
+        """Test that a lease renewed after it was judged expired is put back."""
+        spool.enqueue("k1", {"id": 1})
+        job = spool.claim("w1")
+        mtime_ns = job.lease_path.stat().st_mtime_ns
+        os.utime(job.lease_path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+
+        assert spool._requeue(job.lease_path, mtime_ns) is False
+        assert spool.stats() == {"pending": 0, "leased": 1, "done": 0}
+
+
+class TestSpoolWorker:
+    """Test cases for SpoolWorker."""
+
+    def test_processes_all_jobs(self, spool) -> None:
+        """Test that a worker drains the spool and records failures as results."""
+
+        def process(spec: dict) -> dict:
+            if spec["id"] == 2:
+                raise RuntimeError("Rate limited")
+            return done(spec)
+
+        for index in range(4):
+            spool.enqueue(f"k{index}", {"id": index})
+
+        completed = SpoolWorker(spool, process, "w1", concurrency=2).run(exit_when_empty=True)
+
+        assert completed == 4
+        assert spool.result("k1") == {"id": 1, "ok": True, "description": "Done 1"}
+        assert spool.result("k2") == {"id": 2, "ok": False, "error": "Rate limited"}
+
+    def test_workers_share_the_spool(self, spool) -> None:
+        """Test that several workers split the jobs between them."""
+
+        def slow(spec: dict) -> dict:
+            time.sleep(0.02)
+            return done(spec)
+
+        for index in range(20):
+            spool.enqueue(f"k{index}", {"id": index})
+        workers = [SpoolWorker(spool, slow, f"w{n}", poll_interval=0.01) for n in range(2)]
+        threads = [threading.Thread(target=worker.run, args=(True,)) for worker in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(worker.completed for worker in workers) == 20
+        assert all(worker.completed > 0 for worker in workers)
+
+    def test_spool_errors_stop_the_worker(self, spool) -> None:
+        """Test that a failing spool operation is raised instead of ending the thread quietly."""
+        spool.enqueue("k1", {"id": 1})
+
+        def complete(job, record) -> None:
+            raise OSError("Stale file handle")
+
+        spool.complete = complete
+        worker = SpoolWorker(spool, done, "w1", concurrency=2, poll_interval=0.01)
+
+        with pytest.raises(OSError, match="Stale file handle"):
+            worker.run()
+
+
+class TestRunSpooled:
+    """Test cases for run_spooled."""
+
+    def test_enqueues_and_collects_results(self, spool) -> None:
+        """Test that results come back from a worker and invalid lines fail locally."""
+        worker = SpoolWorker(spool, done, "w1", poll_interval=0.01)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        records = []
+
+        try:
+            counts = run_spooled(
+                spool,
+                ['{"id": "A"}\n', "not json\n", '{"id": "B"}\n'],
+                lambda line, line_number: json.loads(line),
+                lambda spec: spec["id"],
+                records.append,
+                poll_interval=0.01,
+            )
+        finally:
+            worker.stop()
+            thread.join()
+
+        assert counts == {"processed": 3, "failed": 1}
+        assert {record["id"] for record in records} == {"A", "B", 2}
+
+    def test_identical_specs_run_once(self, spool) -> None:
+        """Test that specs sharing a key run once and emit a result for each id."""
+        processed = []
+
+        def process(spec: dict) -> dict:
+            processed.append(spec["id"])
+            return done(spec)
+
+        worker = SpoolWorker(spool, process, "w1", poll_interval=0.01)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        records = []
+
+        try:
+            counts = run_spooled(
+                spool,
+                ['{"id": 1, "description": "Same"}\n', '{"id": 2, "description": "Same"}\n'],
+                lambda line, line_number: json.loads(line),
+                lambda spec: spec["description"],
+                records.append,
+                poll_interval=0.01,
+            )
+        finally:
+            worker.stop()
+            thread.join()
+
+        assert processed == [1]
+        assert counts == {"processed": 2, "failed": 0}
+        assert sorted(record["id"] for record in records) == [1, 2]
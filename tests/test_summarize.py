@@ -0,0 +1,132 @@
+"""Tests for condensing oversized task descriptions."""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from ai.service import AIService
+from ai.summarize import Summarizer, SummaryCache, chunk_text, salient_lines
+
+LOG = "\n".join(
+    [f"INFO request {index} handled in 12ms" for index in range(300)]
+    + ['File "app/billing.py", line 42, in refund', "ValueError: amount exceeds the payment"]
+)
+
+
+class TestHelpers:
+    """Test cases for chunking and excerpts."""
+
+    def test_chunk_text(self) -> None:
+        """Test that chunks respect the size and prefer line boundaries."""
+        chunks = chunk_text("a" * 5 + "\n" + "b" * 5 + "\n" + "c" * 25, 12)
+
+        assert chunks == ["aaaaa\nbbbbb\n", "c" * 12, "c" * 12, "c"]
+        assert "".join(chunk_text(LOG, 1000)) == LOG
+
+    def test_salient_lines(self) -> None:
+        """Test that error-like lines are kept once, in order."""
+        text = "Started\nERROR: timeout\nok\nERROR: timeout\n  at Billing.refund(Billing.java:7)"
+
+        assert salient_lines(text) == ["ERROR: timeout", "at Billing.refund(Billing.java:7)"]
+        assert salient_lines(LOG) == [
+            'File "app/billing.py", line 42, in refund',
+            "ValueError: amount exceeds the payment",
+        ]
+
+
+class TestSummarizer:
+    """Test cases for Summarizer."""
+
+    def test_short_text_is_unchanged(self) -> None:
+        """Test that descriptions that fit are not summarized."""
+        summarize = MagicMock()
+
+        assert Summarizer(summarize, "m", max_chars=100).condense("Add export") == "Add export"
+        assert Summarizer(summarize, "m", max_chars=0).condense(LOG) == LOG
+        summarize.assert_not_called()
+
+    def test_condense(self) -> None:
+        """Test that chunks are summarized concurrently and excerpts kept verbatim."""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def summarize(chunk: str) -> str:
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            return f"Summary of {len(chunk)} chars"
+
+        summarizer = Summarizer(summarize, "m", max_chars=2000, chunk_chars=1000)
+        condensed = summarizer.condense(LOG)
+
+        assert len(peak) == len(chunk_text(LOG, 1000))
+        assert max(peak) > 1
+        assert condensed.startswith("Summary of")
+        assert "ValueError: amount exceeds the payment" in condensed
+        assert len(condensed) < len(LOG)
+
+    def test_summaries_are_reduced_until_they_fit(self) -> None:
+        """Test that long summaries are summarized again."""
+        summarize = MagicMock(return_value="x" * 300)
+        summarizer = Summarizer(summarize, "m", max_chars=700, chunk_chars=1000)
+
+        condensed = summarizer.condense("line\n" * 2000)
+
+        assert summarize.call_count > len(chunk_text("line\n" * 2000, 1000))
+        assert condensed == "x" * 300 + "\n\n" + "x" * 300
+
+    def test_chunk_summaries_are_cached(self, tmp_path) -> None:
+        """Test that chunks are summarized once per model across runs."""
+        summarize = MagicMock(return_value="Summary")
+        cache_path = tmp_path / "summaries.db"
+
+        first = Summarizer(summarize, "m", SummaryCache(cache_path), max_chars=2000)
+        second = Summarizer(summarize, "m", SummaryCache(cache_path), max_chars=2000)
+        other_model = Summarizer(summarize, "other", SummaryCache(cache_path), max_chars=2000)
+
+        assert first.condense(LOG) == second.condense(LOG)
+        calls = summarize.call_count
+        other_model.condense(LOG)
+        assert summarize.call_count == 2 * calls
+
+    def test_uncached_summaries_take_a_rate_token(self, tmp_path) -> None:
+        """Test that every provider call for a chunk summary waits for the scheduler."""
+        scheduler = MagicMock()
+        summarize = MagicMock(return_value="Summary")
+        cache = SummaryCache(tmp_path / "summaries.db")
+
+        Summarizer(summarize, "m", cache, max_chars=2000, scheduler=scheduler).condense(LOG)
+        calls = summarize.call_count
+        Summarizer(summarize, "m", cache, max_chars=2000, scheduler=scheduler).condense(LOG)
+
+        assert scheduler.throttle.call_count == calls == summarize.call_count
+
+
+class TestAIServiceSummarizer:
+    """Test cases for condensing in AIService."""
+
+    @patch("ai.service.compute_cost", return_value=0.0)
+    def test_generation_prompt_uses_condensed_description(self, mock_cost) -> None:
+        """Test that oversized descriptions are condensed before generation."""
+        prompts = []
+
+        def completion(**params):
+            prompt = params["messages"][0]["content"]
+            prompts.append(prompt)
+            content = "Short summary" if prompt.startswith("Summarize") else "Generated"
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None
+            )
+
+        service = AIService("openai", "key", "gpt-4o-mini", completion_fn=completion)
+        service.summarizer = Summarizer(service.summarize_chunk, "gpt-4o-mini", max_chars=2000)
+
+        assert service.generate_task_description(LOG, [], [], "github", "en") == "Generated"
+        assert "Short summary" in prompts[-1]
+        assert "INFO request 299" not in prompts[-1]
+        assert service.last_usage["operation"] == "generate"
@@ -0,0 +1,159 @@
+"""Tests for the repository symbol index."""
+
+import pytest
+
+from ticketplease.symbols import (
+    SymbolIndex,
+    code_names,
+    format_symbols,
+    parse_symbols,
+    repository_root,
+    repository_symbols,
+)
+
+COLLECTOR = '''class TaskDataCollector:
+    """Collect task data."""
+
+    def _collect_platform(self) -> str:
+        def choose():
+            pass
+        return "github"
+
+
+async def build_context():
+    pass
+'''
+
+
+@pytest.fixture
+def repo(tmp_path, git):
+    """Create a git repository with a few tracked source files."""
+    root = tmp_path / "repo"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "collector.py").write_text(COLLECTOR)
+    (root / "src" / "api.ts").write_text("export class ApiClient {}\n")
+    (root / "README.md").write_text("TaskDataCollector docs\n")
+    git(root, "init", "-q")
+    git(root, "add", ".")
+    return root
+
+
+class TestParsing:
+    """Test cases for symbol extraction and code names."""
+
+    def test_python_names_are_qualified(self) -> None:
+        """Test that Python definitions carry their enclosing classes and functions."""
+        assert parse_symbols("collector.py", COLLECTOR) == [
+            (1, "class", "TaskDataCollector", "TaskDataCollector"),
+            (4, "method", "_collect_platform", "TaskDataCollector._collect_platform"),
+            (5, "function", "choose", "TaskDataCollector._collect_platform.choose"),
+            (10, "function", "build_context", "build_context"),
+        ]
+
+    def test_other_languages(self) -> None:
+        """Test the lightweight patterns of other languages."""
+        source = "export const fetchUser = async (id) => {}\ninterface User {}\n"
+        assert parse_symbols("api.ts", source) == [
+            (1, "function", "fetchUser", "fetchUser"),
+            (2, "type", "User", "User"),
+        ]
+        assert parse_symbols("main.go", "func (s *Server) Start() {}\n") == [
+            (1, "function", "Start", "Start")
+        ]
+        assert parse_symbols("notes.md", "def not_code():\n") == []
+
+    def test_code_names(self) -> None:
+        """Test that only words that look like code are taken from free text."""
+        text = "Update `export` and TaskDataCollector._collect_platform in collector.py, fetchUser"
+
+        assert code_names(text) == [
+            "export",
+            "TaskDataCollector._collect_platform",
+            "collector.py",
+            "fetchUser",
+        ]
+
+
+class TestSymbolIndex:
+    """Test cases for SymbolIndex."""
+
+    def test_update_is_incremental(self, repo, tmp_path, git) -> None:
+        """Test that only new, changed and deleted files are reindexed."""
+        index = SymbolIndex(tmp_path / "symbols.db", repo)
+
+        assert index.update() == {"added": 2, "updated": 0, "removed": 0}
+        assert index.update() == {"added": 0, "updated": 0, "removed": 0}
+        assert index.stats() == {"files": 2, "symbols": 5}
+
+        (repo / "src" / "api.ts").write_text("export function fetchUser() {}\n")
+        git(repo, "rm", "-q", "-f", "src/collector.py")
+
+        assert index.update() == {"added": 0, "updated": 1, "removed": 1}
+        assert index.stats() == {"files": 1, "symbols": 1}
+        index.close()
+
+    def test_files_missing_from_the_worktree_are_removed(self, repo, tmp_path) -> None:
+        """Test that a tracked file deleted without git rm loses its symbols."""
+        index = SymbolIndex(tmp_path / "symbols.db", repo)
+        index.update()
+
+        (repo / "src" / "collector.py").unlink()
+
+        assert index.update() == {"added": 0, "updated": 0, "removed": 1}
+        assert index.stats() == {"files": 1, "symbols": 1}
+        assert index.lookup("TaskDataCollector") == []
+        index.close()
+
+    def test_file_names_match_exactly(self, repo, tmp_path, git) -> None:
+        """Test that file name lookups treat '_' literally and respect case."""
+        (repo / "src" / "task_data.py").write_text("")
+        (repo / "src" / "taskXdata.py").write_text("")
+        (repo / "src" / "Api.py").write_text("")
+        git(repo, "add", ".")
+        index = SymbolIndex(tmp_path / "symbols.db", repo)
+        index.update()
+
+        assert [match["path"] for match in index.lookup("task_data.py")] == ["src/task_data.py"]
+        assert [match["path"] for match in index.lookup("api.py")] == []
+        index.close()
+
+    def test_lookup(self, repo, tmp_path) -> None:
+        """Test that qualified names, short names and file names are found."""
+        index = SymbolIndex(tmp_path / "symbols.db", repo)
+        index.update()
+
+        matches = index.lookup(
+            "Refactor TaskDataCollector._collect_platform, ApiClient.get and collector.py"
+        )
+
+        assert [(match["name"], match["kind"], match["line"]) for match in matches] == [
+            ("TaskDataCollector._collect_platform", "method", 4),
+            ("ApiClient", "class", 1),
+            ("src/collector.py", "file", 1),
+        ]
+        assert index.lookup("Improve the docs") == []
+        assert format_symbols(matches[:1]) == (
+            "- TaskDataCollector._collect_platform (method, src/collector.py:4)"
+        )
+
+    def test_not_a_repository(self, tmp_path) -> None:
+        """Test that indexing outside a git repository fails cleanly."""
+        index = SymbolIndex(tmp_path / "symbols.db", tmp_path)
+
+        with pytest.raises(ValueError, match="Not a git repository"):
+            index.update()
+        assert repository_root(str(tmp_path)) is None
+
+
+class TestRepositorySymbols:
+    """Test cases for repository_symbols."""
+
+    def test_lists_named_symbols(self, repo, tmp_path) -> None:
+        """Test that the repository is indexed under the config directory and queried."""
+        config = type("StubConfig", (), {"config_dir": tmp_path / "config"})()
+
+        listing = repository_symbols(config, "Fix build_context", cwd=str(repo / "src"))
+
+        assert listing == "- build_context (function, src/collector.py:10)"
+        assert list((tmp_path / "config" / "symbols").glob("repo-*.db"))
+        assert repository_symbols(config, "Fix build_context", cwd=str(tmp_path)) == ""
@@ -0,0 +1,205 @@
+"""Tests for structured templates and the template cache."""
+
+import os
+
+import pytest
+
+from ticketplease.templates import (
+    Template,
+    TemplateCache,
+    TemplateError,
+    parse_template,
+    template_cache,
+)
+
+
+@pytest.fixture
+def template(tmp_path):
+    """Create a template file."""
+    path = tmp_path / "ac.md"
+    path.write_text("First\n\n  Second  \n")
+    return path
+
+
+def rewrite_keeping_metadata(path, text: str) -> None:
+    """Change a file in place without changing its size or mtime."""
+    stat_result = path.stat()
+    with open(path, "r+", encoding="utf-8") as file:
+        file.write(text)
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+
+STRUCTURED = """
+items = ["Code is reviewed"]
+
+[[sections]]
+title = "Security"
+tags = ["backend"]
+items = [
+    "Passwords are hashed",
+    { text = "Audit events are exported", platforms = ["jira"] },
+    { text = "Sessions", items = ["Expire after 30 minutes", { text = "Can be revoked", tags = ["admin"] }] },
+]
+
+[[sections]]
+title = "Copy"
+languages = ["es"]
+items = ["Los textos están traducidos"]
+"""
+
+
+class TestTemplate:
+    """Test cases for compiled templates."""
+
+    def test_plain_lines(self) -> None:
+        """Test that plain templates render every line unconditionally."""
+        template = Template.from_lines("a\n\nb\n")
+
+        assert template.render("github", "en", ["backend"]) == ["a", "b"]
+
+    def test_sections_are_flattened(self) -> None:
+        """Test that nested sections and items render with their headings."""
+        assert Template.from_toml(STRUCTURED).render() == [
+            "Code is reviewed",
+            "Security: Passwords are hashed",
+            "Security: Audit events are exported",
+            "Security: Sessions: Expire after 30 minutes",
+            "Security: Sessions: Can be revoked",
+            "Copy: Los textos están traducidos",
+        ]
+
+    def test_conditions(self) -> None:
+        """Test filtering by platform, language and tags, with inherited conditions."""
+        template = Template.from_toml(STRUCTURED)
+
+        github = template.render(platform="github", language="en")
+        assert "Security: Audit events are exported" not in github
+        assert "Copy: Los textos están traducidos" not in github
+        assert "Security: Audit events are exported" in template.render(platform="JIRA")
+        assert template.render(tags=["admin"]) == [
+            "Code is reviewed",
+            "Security: Sessions: Can be revoked",
+            "Copy: Los textos están traducidos",
+        ]
+        assert len(template.render(tags=["frontend"])) == 2
+
+    def test_invalid_templates(self) -> None:
+        """Test that invalid TOML and malformed items raise TemplateError."""
+        with pytest.raises(TemplateError, match="Invalid TOML"):
+            Template.from_toml("items = [")
+        with pytest.raises(TemplateError, match="'text'"):
+            Template.from_toml("items = [{ tags = ['x'] }]")
+        with pytest.raises(TemplateError, match="'platforms'"):
+            Template.from_toml("items = [{ text = 'a', platforms = 1 }]")
+        with pytest.raises(TemplateError, match="'items' must be an array"):
+            Template.from_toml("items = 'a'")
+        with pytest.raises(TemplateError, match="'sections' must be an array"):
+            Template.from_toml("[sections]\ntitle = 'Security'")
+
+    def test_json_round_trip(self) -> None:
+        """Test that compiled templates survive serialization."""
+        template = Template.from_toml(STRUCTURED)
+
+        assert Template.from_json(template.to_json()).items == template.items
+
+
+class TestTemplateCache:
+    """Test cases for TemplateCache."""
+
+    def test_parse_template(self) -> None:
+        """Test that templates are split into stripped, non-empty lines."""
+        assert parse_template("\n a \n\nb\n") == ["a", "b"]
+
+    def test_load(self, template, tmp_path) -> None:
+        """Test loading a template and rejecting missing files and directories."""
+        cache = TemplateCache()
+
+        assert cache.load(str(template)) == ["First", "Second"]
+        assert cache.load(str(tmp_path / "missing.md")) is None
+        assert cache.load(str(tmp_path)) is None
+        assert cache.load("") is None
+
+    def test_unchanged_files_are_not_read_again(self, template) -> None:
+        """Test that cached items are used while mtime, size and inode match."""
+        cache = TemplateCache()
+        cache.load(str(template))
+
+        rewrite_keeping_metadata(template, "Frist")
+        assert cache.load(str(template)) == ["First", "Second"]
+
+        template.write_text("Changed\n")
+        assert cache.load(str(template)) == ["Changed"]
+
+    def test_persisted_for_cold_starts(self, template, tmp_path) -> None:
+        """Test that a new cache reuses entries persisted by an earlier one."""
+        cache_path = tmp_path / "cache" / "templates.json"
+        TemplateCache(cache_path).load(str(template))
+        rewrite_keeping_metadata(template, "Frist")
+
+        assert TemplateCache(cache_path).load(str(template)) == ["First", "Second"]
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "{not json",
+            '{"version": 2, "entries": []}',
+            '{"version": 2, "entries": {"/t.md": {"items": []}}}',
+            '{"version": 2, "entries": {"/t.md": {"key": 1, "items": [["a"]]}}}',
+        ],
+    )
+    def test_corrupt_cache_is_ignored(self, template, tmp_path, content) -> None:
+        """Test that an unreadable or malformed cache file falls back to reading templates."""
+        cache_path = tmp_path / "templates.json"
+        cache_path.write_text(content)
+
+        assert TemplateCache(cache_path).load(str(template)) == ["First", "Second"]
+        assert TemplateCache(cache_path).get(str(template)) is not None
+
+    def test_save_prunes_entries(self, tmp_path, monkeypatch) -> None:
+        """Test that deleted files are dropped and the persisted cache stays bounded."""
+        monkeypatch.setattr("ticketplease.templates.MAX_CACHE_ENTRIES", 2)
+        cache_path = tmp_path / "cache" / "templates.json"
+        paths = []
+        for index in range(3):
+            path = tmp_path / f"t{index}.md"
+            path.write_text(f"Item {index}\n")
+            paths.append(str(path))
+        cache = TemplateCache(cache_path)
+
+        cache.load(paths[0])
+        os.remove(paths[0])
+        cache.load(paths[1])
+        assert list(TemplateCache(cache_path)._read_persisted()) == [paths[1]]
+
+        cache.load(paths[2])
+        cache.load(str(tmp_path / "missing.md"))
+        (tmp_path / "t3.md").write_text("Item 3\n")
+        cache.load(str(tmp_path / "t3.md"))
+        assert list(TemplateCache(cache_path)._read_persisted()) == [
+            paths[2],
+            str(tmp_path / "t3.md"),
+        ]
+
+    def test_template_cache_is_shared(self, tmp_path, monkeypatch) -> None:
+        """Test that the process-wide cache follows the user cache directory."""
+        assert template_cache() is template_cache()
+        first = template_cache()
+
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "other"))
+
+        assert template_cache() is not first
+        assert template_cache().cache_path == tmp_path / "other" / "ticketplease" / "templates.json"
+
+    def test_structured_templates(self, tmp_path) -> None:
+        """Test that TOML templates are compiled once and rendered per platform."""
+        path = tmp_path / "dod.toml"
+        path.write_text(STRUCTURED)
+        cache_path = tmp_path / "cache" / "templates.json"
+
+        assert len(TemplateCache(cache_path).load(str(path), platform="github")) == 5
+        persisted = TemplateCache(cache_path).get(str(path))
+        assert persisted.render(platform="jira") == Template.from_toml(STRUCTURED).render("jira")
+
+        (tmp_path / "broken.toml").write_text("items = [")
+        with pytest.raises(TemplateError, match="broken.toml"):
+            TemplateCache().load(str(tmp_path / "broken.toml"))
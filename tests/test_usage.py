@@ -0,0 +1,171 @@
+"""Tests for the usage ledger module."""
+
+import sqlite3
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ai.service import AIService
+from ai.usage import UsageLedger, extract_usage, percentile
+
+
+def make_response(
+    content: str = "Generated", prompt_tokens: int = 100, completion_tokens: int = 20
+):
+    """Build a minimal litellm-like completion response."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=30),
+        ),
+    )
+
+
+class TestUsageHelpers:
+    """Test cases for usage helper functions."""
+
+    def test_extract_usage(self) -> None:
+        """Test extracting token counts from a response."""
+        usage = extract_usage(make_response())
+
+        assert usage == {"prompt_tokens": 100, "completion_tokens": 20, "cached_tokens": 30}
+
+    def test_extract_usage_without_usage(self) -> None:
+        """Test extracting token counts from a response without usage."""
+        usage = extract_usage(SimpleNamespace())
+
+        assert usage == {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+
+    def test_percentile(self) -> None:
+        """Test nearest-rank percentiles."""
+        values = [float(value) for value in range(1, 101)]
+
+        assert percentile(values, 0.5) == 50.0
+        assert percentile(values, 0.9) == 90.0
+        assert percentile(values, 0.99) == 99.0
+        assert percentile([], 0.5) == 0.0
+
+
+class TestUsageLedger:
+    """Test cases for UsageLedger."""
+
+    @pytest.fixture
+    def ledger(self, tmp_path):
+        """Create a ledger in a temporary directory."""
+        ledger = UsageLedger(tmp_path / "usage.db")
+        yield ledger
+        ledger.close()
+
+    def test_summarize_counts_coalesced(self, ledger) -> None:
+        """Test that coalesced requests are counted per group."""
+        ledger.record("generate", "openai", "gpt-4o", prompt_tokens=10)
+        ledger.record("generate", "openai", "gpt-4o", coalesced=True)
+
+        summary = ledger.summarize("operation")[0]
+
+        assert summary["calls"] == 2
+        assert summary["coalesced"] == 1
+        assert summary["prompt_tokens"] == 10
+
+    def test_migrates_existing_ledger(self, tmp_path) -> None:
+        """Test that ledgers created before the coalesced column are upgraded."""
+        db_path = tmp_path / "old.db"
+        connection = sqlite3.connect(db_path)
+        connection.execute(
+            "CREATE TABLE usage (id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL, "
+            "operation TEXT NOT NULL, provider TEXT NOT NULL, model TEXT NOT NULL, "
+            "platform TEXT NOT NULL DEFAULT '', prompt_tokens INTEGER NOT NULL DEFAULT 0, "
+            "completion_tokens INTEGER NOT NULL DEFAULT 0, "
+            "cached_tokens INTEGER NOT NULL DEFAULT 0, latency_ms REAL NOT NULL DEFAULT 0, "
+            "cost REAL NOT NULL DEFAULT 0)"
+        )
+        connection.execute(
+            "INSERT INTO usage (created_at, operation, provider, model) "
+            "VALUES (1, 'generate', 'openai', 'gpt-4o')"
+        )
+        connection.commit()
+        connection.close()
+        ledger = UsageLedger(db_path)
+
+        ledger.record("refine", "openai", "gpt-4o", coalesced=True)
+
+        summary = {row["group"]: row for row in ledger.summarize("operation")}
+        ledger.close()
+        assert summary["generate"]["coalesced"] == 0
+        assert summary["refine"]["coalesced"] == 1
+
+    def test_summarize_empty(self, ledger) -> None:
+        """Test summarizing when no database exists yet."""
+        assert ledger.summarize("day") == []
+
+    def test_summarize_by_operation(self, ledger) -> None:
+        """Test aggregating entries by operation."""
+        ledger.record("generate", "openai", "gpt-4o-mini", "github", 100, 20, 0, 200.0, 0.01)
+        ledger.record("generate", "openai", "gpt-4o-mini", "jira", 300, 40, 10, 400.0, 0.02)
+        ledger.record("refine", "openai", "gpt-4o-mini", "github", 50, 10, 0, 100.0, 0.005)
+
+        summary = {row["group"]: row for row in ledger.summarize("operation")}
+
+        assert summary["generate"]["calls"] == 2
+        assert summary["generate"]["prompt_tokens"] == 400
+        assert summary["generate"]["cached_tokens"] == 10
+        assert summary["generate"]["cost"] == pytest.approx(0.03)
+        assert summary["generate"]["latency_p50_ms"] == 200.0
+        assert summary["refine"]["calls"] == 1
+
+    def test_summarize_since(self, ledger) -> None:
+        """Test filtering entries by timestamp."""
+        ledger.record("generate", "openai", "gpt-4o-mini")
+
+        assert ledger.summarize("model", since=0)[0]["calls"] == 1
+        assert ledger.summarize("model", since=4102444800) == []
+
+    def test_summarize_invalid_group(self, ledger) -> None:
+        """Test that unsupported groupings are rejected."""
+        with pytest.raises(ValueError, match="Unsupported grouping"):
+            ledger.summarize("color")
+
+    def test_unwritable_directory_is_ignored(self, tmp_path) -> None:
+        """Test that a ledger whose directory cannot be created does not raise."""
+        (tmp_path / "data").write_text("not a directory")
+        ledger = UsageLedger(tmp_path / "data" / "usage.db")
+
+        ledger.record("generate", "openai", "gpt-4o-mini", prompt_tokens=10)
+
+
+class TestAIServiceUsage:
+    """Test cases for usage recording in AIService."""
+
+    @patch("ai.service.compute_cost", return_value=0.001)
+    @patch("litellm.completion")
+    def test_generation_is_recorded(self, mock_completion, mock_cost, tmp_path) -> None:
+        """Test that generation calls are appended to the ledger."""
+        mock_completion.return_value = make_response()
+        ledger = MagicMock(spec=UsageLedger)
+        service = AIService("openai", "test-key", "gpt-4o-mini", ledger=ledger)
+
+        result = service.generate_task_description("Task", [], [], "jira", "en")
+
+        assert result == "Generated"
+        ledger.record.assert_called_once()
+        recorded = ledger.record.call_args.kwargs
+        assert recorded["operation"] == "generate"
+        assert recorded["platform"] == "jira"
+        assert recorded["prompt_tokens"] == 100
+        assert recorded["cost"] == 0.001
+        assert service.last_usage == recorded
+
+    @patch("ai.service.compute_cost", return_value=0.0)
+    @patch("litellm.completion")
+    def test_refinement_is_recorded(self, mock_completion, mock_cost) -> None:
+        """Test that refinement calls are recorded with the refine operation."""
+        mock_completion.return_value = make_response("Refined")
+        service = AIService("openai", "test-key", "gpt-4o-mini")
+
+        result = service.refine_task_description("Current", "Add more detail")
+
+        assert result == "Refined"
+        assert service.last_usage["operation"] == "refine"
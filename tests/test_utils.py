@@ -9,7 +9,6 @@ from ticketplease.utils import (
     expand_file_path,
     format_acceptance_criteria,
     format_definition_of_done,
-    read_file_content,
     validate_file_path,
 )
 
@@ -60,55 +59,6 @@ class TestCopyToClipboard:
         assert result is False
 
 
-class TestReadFileContent:
-    """Test read_file_content function."""
-
-    def test_read_existing_file(self) -> None:
-        """Test reading an existing file."""
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".txt") as f:
-            f.write("line 1\nline 2\n\nline 4\n")
-            temp_path = f.name
-
-        try:
-            content = read_file_content(temp_path)
-            assert content == ["line 1", "line 2", "line 4"]
-        finally:
-            os.unlink(temp_path)
-
-    def test_read_nonexistent_file(self) -> None:
-        """Test reading a non-existent file."""
-        content = read_file_content("/nonexistent/file.txt")
-        assert content == []
-
-    def test_read_empty_file(self) -> None:
-        """Test reading an empty file."""
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".txt") as f:
-            temp_path = f.name
-
-        try:
-            content = read_file_content(temp_path)
-            assert content == []
-        finally:
-            os.unlink(temp_path)
-
-    def test_read_file_with_home_path(self) -> None:
-        """Test reading file with ~ in path."""
-        # Create a temporary file in home directory for testing
-        home_dir = os.path.expanduser("~")
-        test_file = os.path.join(home_dir, "test_ticketplease.txt")
-
-        try:
-            with open(test_file, "w") as f:
-                f.write("test content\n")
-
-            # Use ~ in path
-            content = read_file_content("~/test_ticketplease.txt")
-            assert content == ["test content"]
-        finally:
-            if os.path.exists(test_file):
-                os.unlink(test_file)
-
-
 class TestValidateFilePath:
     """Test validate_file_path function."""
 
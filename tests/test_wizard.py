@@ -83,6 +83,42 @@ class TestConfigWizard:
             result = wizard.run()
             assert result is True
 
+    @patch("questionary.select")
+    @patch("questionary.password")
+    def test_update_model_keeps_key_pool(self, mock_password, mock_select) -> None:
+        """Test that updating the model keeps the key pool and other LLM settings."""
+        mock_select.return_value.ask.side_effect = ["OpenAI", "gpt-4o"]
+        mock_password.return_value.ask.return_value = "sk-new"
+        current_config = {
+            "api_keys": {"provider": "openai", "api_key": "sk-old", "pool": {"openai": 2}},
+            "llm": {"model": "gpt-4o-mini", "summary_model": "gpt-4o-mini"},
+        }
+
+        ConfigWizard()._process_update_choice("🤖 AI Provider & Model", current_config)
+
+        assert current_config == {
+            "api_keys": {"provider": "openai", "api_key": "sk-new", "pool": {"openai": 2}},
+            "llm": {"model": "gpt-4o", "summary_model": "gpt-4o-mini"},
+        }
+
+    @patch("questionary.select")
+    @patch("questionary.password")
+    def test_update_provider_drops_key_pool(self, mock_password, mock_select) -> None:
+        """Test that switching providers drops the previous provider's key pool."""
+        mock_select.return_value.ask.side_effect = ["Anthropic", "🔧 Specify custom model"]
+        mock_password.return_value.ask.return_value = "sk-ant"
+        current_config = {
+            "api_keys": {"provider": "openai", "api_key": "sk-old", "pool": {"openai": 2}},
+            "llm": {"model": "gpt-4o-mini"},
+        }
+
+        with patch("questionary.text") as mock_text:
+            mock_text.return_value.ask.return_value = "claude-custom"
+            ConfigWizard()._process_update_choice("🤖 AI Provider & Model", current_config)
+
+        assert current_config["api_keys"] == {"provider": "anthropic", "api_key": "sk-ant"}
+        assert current_config["llm"] == {"model": "claude-custom"}
+
     @patch("questionary.select")
     @patch("questionary.password")
     @patch("questionary.path")